@@ -3,11 +3,14 @@ Sandbox package initialization
 Exposes the factory function for creating sandbox runners.
 """
 
-from .base import SandboxBackend, SandboxConfig, BaseSandboxRunner
+from .base import BaseSandboxRunner, PooledSandbox, ReusableSandboxRunner, SandboxBackend, SandboxConfig
+from .pool import SandboxPool, SandboxPoolConfig, SandboxPoolStats
 
 
 def create_sandbox_runner(
-    backend: SandboxBackend = SandboxBackend.MICROSANDBOX, config: SandboxConfig | None = None
+    backend: SandboxBackend = SandboxBackend.MICROSANDBOX,
+    config: SandboxConfig | None = None,
+    pool_config: SandboxPoolConfig | None = None,
 ) -> BaseSandboxRunner:
     """
     创建沙箱执行器的工厂函数
@@ -15,6 +18,7 @@ def create_sandbox_runner(
     Args:
         backend: 沙箱后端类型
         config: 可选配置
+        pool_config: 预热池配置，None 表示每次执行冷启动
 
     Returns:
         BaseSandboxRunner 实现
@@ -22,7 +26,15 @@ def create_sandbox_runner(
     if backend == SandboxBackend.MICROSANDBOX:
         from .microsandbox_runner import MicrosandboxRunner
 
-        return MicrosandboxRunner(config)
+        return MicrosandboxRunner(config, pool_config)
+    elif backend == SandboxBackend.SUBPROCESS:
+        from .subprocess_runner import SubprocessSandboxRunner
+
+        return SubprocessSandboxRunner(config, pool_config)
+    elif backend == SandboxBackend.STUB:
+        from .stub_runner import StubSandboxRunner
+
+        return StubSandboxRunner(config, pool_config)
     elif backend == SandboxBackend.DOCKER:
         # TODO: Implement DockerSandboxRunner
         # from .docker_runner import DockerSandboxRunner
@@ -1,12 +1,29 @@
 """
 SandboxRunner 抽象基类
 支持多种沙箱后端的统一接口
+
+沙箱实例生命周期 (acquire/release)，由支持实例复用的后端继承 ReusableSandboxRunner 实现:
+- create_sandbox / destroy_sandbox: 启动与销毁单个沙箱实例
+- run_in_sandbox: 在已启动的实例中执行代码
+- reset_sandbox / check_sandbox: 复用前清理状态与健康检查
+- 配置 SandboxPoolConfig 后，acquire/release 走预热池，避免每次执行的冷启动
 """
 
+from __future__ import annotations
+
+import logging
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .pool import SandboxPool, SandboxPoolConfig
+
+logger = logging.getLogger(__name__)
 
 
 class SandboxBackend(Enum):
@@ -15,6 +32,8 @@ class SandboxBackend(Enum):
     MICROSANDBOX = "microsandbox"  # 推荐: microVM 隔离
     DOCKER = "docker"  # 备选: 容器隔离
     WASM = "wasm"  # 轻量: WebAssembly
+    SUBPROCESS = "subprocess"  # 本地: 子进程 + rlimit，无需外部服务
+    STUB = "stub"  # 测试: 进程内桩实现，无隔离
 
 
 @dataclass
@@ -42,6 +61,16 @@ class SandboxResult:
     metadata: dict = None  # 额外信息 (如资源使用)
 
 
+@dataclass
+class PooledSandbox:
+    """已启动的沙箱实例及其复用信息"""
+
+    instance: Any
+    uses: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
 class BaseSandboxRunner(ABC):
     """
     沙箱执行器抽象基类
@@ -49,6 +78,8 @@ class BaseSandboxRunner(ABC):
     使用方式:
         runner = MicrosandboxRunner(config)
         result = await runner.execute("print('Hello!')")
+
+    支持实例复用 (acquire/release、预热池) 的后端继承 ReusableSandboxRunner。
     """
 
     def __init__(self, config: SandboxConfig | None = None):
@@ -116,3 +147,127 @@ class BaseSandboxRunner(ABC):
     async def cleanup(self) -> None:
         """清理资源 (子类可覆写)"""
         pass
+
+
+class ReusableSandboxRunner(BaseSandboxRunner):
+    """
+    支持实例复用的沙箱执行器
+
+    子类实现单个沙箱实例的生命周期，基类在其上提供 acquire/release 与可选的预热池。
+
+    使用方式:
+        runner = MicrosandboxRunner(config, pool_config=SandboxPoolConfig(min_size=2, max_size=8))
+        await runner.warmup()
+        async with runner.sandbox() as pooled:
+            result = await runner.run_in_sandbox(pooled.instance, "print('Hello!')")
+    """
+
+    def __init__(self, config: SandboxConfig | None = None, pool_config: SandboxPoolConfig | None = None):
+        super().__init__(config)
+        self._pool_config = pool_config
+        self._pool: SandboxPool | None = None
+
+    async def cleanup(self) -> None:
+        """销毁预热池中的实例"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        await super().cleanup()
+
+    # ========================================
+    # 沙箱实例生命周期
+    # ========================================
+
+    @abstractmethod
+    async def create_sandbox(self) -> Any:
+        """启动一个沙箱实例"""
+
+    @abstractmethod
+    async def run_in_sandbox(self, sandbox: Any, code: str) -> SandboxResult:
+        """在已启动的沙箱实例中执行代码"""
+
+    @abstractmethod
+    async def destroy_sandbox(self, sandbox: Any) -> None:
+        """销毁沙箱实例"""
+
+    @abstractmethod
+    async def reset_sandbox(self, sandbox: Any) -> None:
+        """复用前清理上一次执行留下的状态，失败时抛出异常"""
+
+    async def check_sandbox(self, sandbox: Any) -> bool:
+        """检查空闲实例是否仍可用"""
+        try:
+            result = await self.run_in_sandbox(sandbox, "print('health')")
+            return result.success and "health" in result.stdout
+        except Exception:
+            return False
+
+    # ========================================
+    # acquire / release
+    # ========================================
+
+    @property
+    def pool(self) -> SandboxPool | None:
+        """预热池 (未配置 pool_config 时为 None)"""
+        if self._pool is None and self._pool_config is not None:
+            from .pool import SandboxPool
+
+            self._pool = SandboxPool(self, self._pool_config)
+        return self._pool
+
+    async def warmup(self) -> None:
+        """预先启动 min_size 个沙箱实例"""
+        if self.pool is not None:
+            await self.pool.start()
+
+    async def acquire(self) -> PooledSandbox:
+        """取出一个可用沙箱: 有预热池时复用空闲实例，否则冷启动"""
+        if self.pool is not None:
+            return await self.pool.acquire()
+        return PooledSandbox(instance=await self.create_sandbox())
+
+    async def release(self, sandbox: PooledSandbox, healthy: bool = True) -> None:
+        """
+        归还沙箱
+
+        Args:
+            sandbox: acquire 返回的实例
+            healthy: False 表示实例状态不可信 (如执行超时)，直接销毁不再复用
+        """
+        if self.pool is not None:
+            await self.pool.release(sandbox, healthy=healthy)
+        else:
+            try:
+                await self.destroy_sandbox(sandbox.instance)
+            except Exception as e:
+                logger.warning("Failed to destroy sandbox: %s", e)
+
+    @asynccontextmanager
+    async def sandbox(self) -> AsyncIterator[PooledSandbox]:
+        """acquire/release 的上下文管理器，异常时丢弃实例"""
+        pooled = await self.acquire()
+        healthy = True
+        try:
+            yield pooled
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            await self.release(pooled, healthy=healthy)
+
+    async def execute_pooled(self, code: str) -> SandboxResult:
+        """通过 acquire/release 执行代码，超时 (exit_code=-1) 的实例不再复用"""
+        start = time.time()
+        try:
+            pooled = await self.acquire()
+        except Exception as e:
+            return SandboxResult(
+                success=False, stdout="", stderr=str(e), exit_code=-1, execution_time_ms=(time.time() - start) * 1000
+            )
+        healthy = False
+        try:
+            result = await self.run_in_sandbox(pooled.instance, code)
+            healthy = result.exit_code != -1
+            return result
+        finally:
+            await self.release(pooled, healthy=healthy)
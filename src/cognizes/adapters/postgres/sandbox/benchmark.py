@@ -0,0 +1,91 @@
+"""
+沙箱后端延迟基准测试
+
+对比不同后端的冷启动与单次执行延迟 (P50/P99)。
+
+用法:
+    python -m cognizes.adapters.postgres.sandbox.benchmark --backends subprocess microsandbox
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from . import SandboxBackend, SandboxPoolConfig, create_sandbox_runner
+from .base import ReusableSandboxRunner
+
+
+@dataclass
+class SandboxBenchmarkResult:
+    """基准测试结果"""
+
+    backend: str
+    iterations: int
+    warmup_ms: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    failures: int
+
+
+def percentile(values: list[float], q: float) -> float:
+    """最近秩百分位 (q 取 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_sandbox_benchmark(
+    runner: ReusableSandboxRunner, code: str = "print(sum(range(1000)))", iterations: int = 50
+) -> SandboxBenchmarkResult:
+    """预热后串行执行 iterations 次，统计端到端延迟"""
+    start = time.perf_counter()
+    await runner.warmup()
+    warmup_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    failures = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = await runner.execute(code)
+        latencies.append((time.perf_counter() - start) * 1000)
+        failures += 0 if result.success else 1
+
+    return SandboxBenchmarkResult(
+        backend=runner.backend.value,
+        iterations=iterations,
+        warmup_ms=warmup_ms,
+        mean_ms=sum(latencies) / len(latencies) if latencies else 0.0,
+        p50_ms=percentile(latencies, 50),
+        p99_ms=percentile(latencies, 99),
+        failures=failures,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sandbox backend latency benchmark")
+    parser.add_argument("--backends", nargs="+", default=["subprocess"], choices=[b.value for b in SandboxBackend])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    print("| Backend | Warmup | Mean | P50 | P99 | Failures |")
+    print("|---------|--------|------|-----|-----|----------|")
+    for name in args.backends:
+        pool_config = SandboxPoolConfig(min_size=args.pool_size, max_size=args.pool_size)
+        runner = create_sandbox_runner(SandboxBackend(name), pool_config=pool_config)
+        try:
+            r = await run_sandbox_benchmark(runner, iterations=args.iterations)
+        finally:
+            await runner.cleanup()
+        print(
+            f"| {r.backend} | {r.warmup_ms:.1f}ms | {r.mean_ms:.2f}ms | {r.p50_ms:.2f}ms | {r.p99_ms:.2f}ms"
+            f" | {r.failures} |"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,64 +6,97 @@ MicrosandboxRunner: 基于 microsandbox 的安全沙箱
 - <200ms 冷启动
 - MCP 原生支持
 - OCI 镜像兼容
+- 可选预热池复用实例，所有实例共享 HTTP 会话
 """
 
 import asyncio
+import itertools
 import os
+import time
 from dataclasses import dataclass
+
+import aiohttp
 from microsandbox import PythonSandbox  # pip install microsandbox
 
+from .base import ReusableSandboxRunner, SandboxBackend, SandboxResult
+from .base import SandboxConfig as BaseSandboxConfig
+from .pool import SandboxPoolConfig
+
+# 归还预热实例前清理 REPL 中的用户变量与模块引用
+RESET_CODE = """
+for _name in [_n for _n in list(globals()) if not _n.startswith("__")]:
+    del globals()[_name]
+import gc as _gc
+_gc.collect()
+del _gc
+"""
+
 
 @dataclass
-class SandboxConfig:
-    name: str = "agent-sandbox"
+class SandboxConfig(BaseSandboxConfig):
     image: str = "microsandbox/python"  # Microsandbox 官方 Python 镜像
-    memory_mb: int = 256
-    timeout_seconds: int = 30
-    network_enabled: bool = False
     api_key: str | None = None  # 从环境变量 MSB_API_KEY 读取，或手动指定
 
 
-@dataclass
-class SandboxResult:
-    success: bool
-    stdout: str
-    stderr: str
-    exit_code: int
-    execution_time_ms: float
+class MicrosandboxRunner(ReusableSandboxRunner):
+    """
+    基于 microsandbox 的轻量级沙箱执行器
 
+    未配置 pool_config 时每次执行冷启动一个 microVM；配置后复用预热实例。
+    所有实例共享同一个 aiohttp.ClientSession。
+    """
 
-class MicrosandboxRunner:
-    """基于 microsandbox 的轻量级沙箱执行器"""
-
-    def __init__(self, config: SandboxConfig | None = None):
-        self._config = config or SandboxConfig()
+    def __init__(self, config: BaseSandboxConfig | None = None, pool_config: SandboxPoolConfig | None = None):
+        super().__init__(config or SandboxConfig(), pool_config)
         # 从环境变量获取 API 密钥，如未配置则使用 config 中的值
-        self._api_key = self._config.api_key or os.getenv("MSB_API_KEY")
+        self._api_key = getattr(self._config, "api_key", None) or os.getenv("MSB_API_KEY")
+        self._session: aiohttp.ClientSession | None = None
+        self._ids = itertools.count(1)
+
+    @property
+    def backend(self) -> SandboxBackend:
+        return SandboxBackend.MICROSANDBOX
 
     async def execute(self, code: str) -> SandboxResult:
         """在 microVM 中安全执行代码"""
-        import time
-        import aiohttp
-
-        start = time.time()
-
-        # Manually manage sandbox lifecycle to pass configuration params
-        sandbox = PythonSandbox(
-            name=self._config.name,
-            api_key=self._api_key,
+        return await self.execute_pooled(code)
+
+    async def execute_file(self, file_path: str) -> SandboxResult:
+        """执行文件"""
+        with open(file_path, encoding="utf-8") as f:
+            return await self.execute(f.read())
+
+    async def cleanup(self) -> None:
+        """销毁预热实例并关闭共享 HTTP 会话"""
+        await super().cleanup()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # ========================================
+    # 沙箱实例生命周期
+    # ========================================
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def create_sandbox(self) -> PythonSandbox:
+        # 预热池中同时存在多个实例，名称需唯一
+        name = self._config.name if self._pool_config is None else f"{self._config.name}-{next(self._ids)}"
+        sandbox = PythonSandbox(name=name, api_key=self._api_key)
+        sandbox._session = self._get_session()
+        # Note: Microsandbox SDK 0.1.8 start() supports: image, memory, cpus, timeout.
+        # Network config is not exposed in start(), likely determined by server config or image.
+        await sandbox.start(
+            image=self._config.image, memory=self._config.memory_mb, timeout=self._config.timeout_seconds
         )
-        sandbox._session = aiohttp.ClientSession()
+        return sandbox
 
+    async def run_in_sandbox(self, sandbox: PythonSandbox, code: str) -> SandboxResult:
+        start = time.time()
         try:
-            # Start with validation params
-            # Note: Microsandbox SDK 0.1.8 start() supports: image, memory, cpus, timeout.
-            # Network config is not exposed in start(), likely determined by server config or image.
-            await sandbox.start(
-                image=self._config.image, memory=self._config.memory_mb, timeout=self._config.timeout_seconds
-            )
-
-            # 执行代码
             execution = await asyncio.wait_for(sandbox.run(code), timeout=self._config.timeout_seconds)
 
             stdout = await execution.output()
@@ -90,13 +123,15 @@ class MicrosandboxRunner:
             return SandboxResult(
                 success=False, stdout="", stderr=str(e), exit_code=-1, execution_time_ms=(time.time() - start) * 1000
             )
-        finally:
-            try:
-                await sandbox.stop()
-            except Exception:
-                pass
-            if sandbox._session:
-                await sandbox._session.close()
+
+    async def reset_sandbox(self, sandbox: PythonSandbox) -> None:
+        execution = await asyncio.wait_for(sandbox.run(RESET_CODE), timeout=self._config.timeout_seconds)
+        if getattr(execution, "exit_code", 0) != 0:
+            raise RuntimeError("Sandbox reset failed")
+
+    async def destroy_sandbox(self, sandbox: PythonSandbox) -> None:
+        # 共享会话由 cleanup() 统一关闭，此处只停止实例
+        await sandbox.stop()
 
     async def execute_safe(self, code: str) -> SandboxResult:
         """带基础安全检查的执行"""
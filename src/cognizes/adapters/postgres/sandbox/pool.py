@@ -0,0 +1,225 @@
+"""
+SandboxPool: 预热沙箱池
+
+核心特性:
+- min_size 个实例预先启动，acquire 直接复用，省去 microVM 冷启动
+- max_size 限制实例总数，池满时排队等待 (acquire_timeout)
+- 单实例复用上限 (max_uses)，超过后销毁重建
+- 归还时 reset 清理状态，空闲过久的实例出借前做健康检查
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .base import PooledSandbox
+
+if TYPE_CHECKING:
+    from .base import ReusableSandboxRunner
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SandboxPoolConfig:
+    """预热池配置"""
+
+    min_size: int = 1
+    max_size: int = 4
+    max_uses: int = 50  # 单实例最多执行次数
+    acquire_timeout: float = 30.0
+    health_check_idle_seconds: float = 30.0  # 空闲超过该时长的实例出借前做健康检查
+    reset_between_runs: bool = True
+
+
+@dataclass
+class SandboxPoolStats:
+    """预热池统计"""
+
+    size: int = 0
+    idle: int = 0
+    in_use: int = 0
+    created: int = 0
+    destroyed: int = 0
+    acquired: int = 0
+    reused: int = 0
+    health_check_failures: int = 0
+    reset_failures: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        return self.reused / self.acquired if self.acquired else 0.0
+
+
+class SandboxPool:
+    """
+    预热沙箱池
+
+    使用方式:
+        pool = SandboxPool(runner, SandboxPoolConfig(min_size=2, max_size=8))
+        await pool.start()
+        sandbox = await pool.acquire()
+        try:
+            result = await runner.run_in_sandbox(sandbox.instance, code)
+        finally:
+            await pool.release(sandbox)
+    """
+
+    def __init__(self, runner: ReusableSandboxRunner, config: SandboxPoolConfig | None = None):
+        self.runner = runner
+        self.config = config or SandboxPoolConfig()
+        if self.config.min_size < 0 or self.config.max_size < 1 or self.config.min_size > self.config.max_size:
+            raise ValueError("Require 0 <= min_size <= max_size and max_size >= 1")
+        self._idle: deque[PooledSandbox] = deque()
+        self._slots = asyncio.Semaphore(self.config.max_size)
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._fill_task: asyncio.Task | None = None
+        self._stats = SandboxPoolStats()
+
+    # ========================================
+    # 生命周期
+    # ========================================
+
+    async def start(self) -> None:
+        """预先启动 min_size 个实例"""
+        await self._fill()
+
+    async def close(self) -> None:
+        """销毁全部空闲实例，使用中的实例归还时销毁"""
+        self._closed = True
+        if self._fill_task is not None:
+            self._fill_task.cancel()
+            await asyncio.gather(self._fill_task, return_exceptions=True)
+            self._fill_task = None
+        while self._idle:
+            await self._destroy(self._idle.popleft())
+
+    # ========================================
+    # acquire / release
+    # ========================================
+
+    async def acquire(self) -> PooledSandbox:
+        """取出空闲实例，无空闲时在 max_size 内新建"""
+        if self._closed:
+            raise RuntimeError("Sandbox pool is closed")
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.config.acquire_timeout)
+        except TimeoutError:
+            raise TimeoutError(f"No sandbox available within {self.config.acquire_timeout}s") from None
+
+        try:
+            sandbox = await self._take_idle()
+            if sandbox is not None:
+                self._stats.reused += 1
+            else:
+                sandbox = await self._create()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        self._in_use += 1
+        self._stats.acquired += 1
+        return sandbox
+
+    async def release(self, sandbox: PooledSandbox, healthy: bool = True) -> None:
+        """归还实例: 不健康或达到复用上限时销毁，否则 reset 后放回空闲队列"""
+        self._in_use -= 1
+        try:
+            sandbox.uses += 1
+            sandbox.last_used = time.monotonic()
+            if self._closed or not healthy or sandbox.uses >= self.config.max_uses:
+                await self._destroy(sandbox)
+            elif self.config.reset_between_runs and not await self._reset(sandbox):
+                await self._destroy(sandbox)
+            else:
+                self._idle.append(sandbox)
+        finally:
+            self._slots.release()
+        self._schedule_fill()
+
+    def get_stats(self) -> SandboxPoolStats:
+        """获取池统计快照"""
+        stats = SandboxPoolStats(**self._stats.__dict__)
+        stats.size = self._size
+        stats.idle = len(self._idle)
+        stats.in_use = self._in_use
+        return stats
+
+    # ========================================
+    # 内部方法
+    # ========================================
+
+    async def _take_idle(self) -> PooledSandbox | None:
+        """弹出可用的空闲实例，健康检查失败的直接销毁"""
+        while self._idle:
+            sandbox = self._idle.popleft()
+            idle_seconds = time.monotonic() - sandbox.last_used
+            if idle_seconds < self.config.health_check_idle_seconds or await self.runner.check_sandbox(
+                sandbox.instance
+            ):
+                return sandbox
+            self._stats.health_check_failures += 1
+            logger.warning("Sandbox failed health check after %.1fs idle, discarding", idle_seconds)
+            await self._destroy(sandbox)
+        return None
+
+    async def _create(self) -> PooledSandbox:
+        self._size += 1
+        try:
+            instance = await self.runner.create_sandbox()
+        except BaseException:
+            self._size -= 1
+            raise
+        self._stats.created += 1
+        return PooledSandbox(instance=instance)
+
+    async def _destroy(self, sandbox: PooledSandbox) -> None:
+        self._size -= 1
+        self._stats.destroyed += 1
+        try:
+            await self.runner.destroy_sandbox(sandbox.instance)
+        except Exception as e:
+            logger.warning("Failed to destroy sandbox: %s", e)
+
+    async def _reset(self, sandbox: PooledSandbox) -> bool:
+        try:
+            await self.runner.reset_sandbox(sandbox.instance)
+            return True
+        except Exception as e:
+            self._stats.reset_failures += 1
+            logger.warning("Failed to reset sandbox, discarding: %s", e)
+            return False
+
+    async def _fill(self) -> None:
+        """补齐至 min_size，创建期间占用名额，保证总数不超过 max_size"""
+        while not self._closed and self._size < self.config.min_size and not self._slots.locked():
+            await self._slots.acquire()
+            try:
+                sandbox = await self._create()
+                if self._closed:
+                    await self._destroy(sandbox)
+                    return
+                self._idle.append(sandbox)
+            finally:
+                self._slots.release()
+
+    def _schedule_fill(self) -> None:
+        """实例被销毁后在后台补齐，不阻塞 release 调用方"""
+        if self._closed or self._size >= self.config.min_size:
+            return
+        if self._fill_task is not None and not self._fill_task.done():
+            return
+        self._fill_task = asyncio.create_task(self._fill_safely())
+
+    async def _fill_safely(self) -> None:
+        try:
+            await self._fill()
+        except Exception as e:
+            logger.warning("Failed to refill sandbox pool: %s", e)
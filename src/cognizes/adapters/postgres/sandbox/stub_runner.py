@@ -0,0 +1,96 @@
+"""
+StubSandboxRunner: 进程内桩沙箱
+
+仅用于离线测试预热池与 acquire/release 流程:
+- 每个"沙箱实例"是一个独立的全局命名空间，模拟 REPL 状态保留
+- 可配置启动延迟，模拟 microVM 冷启动开销
+- 代码在当前进程内执行，不提供任何隔离，禁止用于生产
+"""
+
+import asyncio
+import contextlib
+import io
+import itertools
+import time
+import traceback
+from dataclasses import dataclass, field
+
+from .base import ReusableSandboxRunner, SandboxBackend, SandboxConfig, SandboxResult
+from .pool import SandboxPoolConfig
+
+
+@dataclass
+class StubSandbox:
+    """桩沙箱实例"""
+
+    sandbox_id: int
+    namespace: dict = field(default_factory=dict)
+    healthy: bool = True
+    stopped: bool = False
+
+
+class StubSandboxRunner(ReusableSandboxRunner):
+    """进程内桩沙箱执行器"""
+
+    def __init__(
+        self,
+        config: SandboxConfig | None = None,
+        pool_config: SandboxPoolConfig | None = None,
+        startup_delay: float = 0.0,
+    ):
+        super().__init__(config, pool_config)
+        self.startup_delay = startup_delay
+        self.started = 0
+        self._ids = itertools.count(1)
+
+    @property
+    def backend(self) -> SandboxBackend:
+        return SandboxBackend.STUB
+
+    async def execute(self, code: str) -> SandboxResult:
+        return await self.execute_pooled(code)
+
+    async def execute_file(self, file_path: str) -> SandboxResult:
+        with open(file_path, encoding="utf-8") as f:
+            return await self.execute(f.read())
+
+    # ========================================
+    # 沙箱实例生命周期
+    # ========================================
+
+    async def create_sandbox(self) -> StubSandbox:
+        await asyncio.sleep(self.startup_delay)
+        self.started += 1
+        return StubSandbox(sandbox_id=next(self._ids))
+
+    async def run_in_sandbox(self, sandbox: StubSandbox, code: str) -> SandboxResult:
+        start = time.time()
+        if sandbox.stopped or not sandbox.healthy:
+            raise RuntimeError(f"Sandbox {sandbox.sandbox_id} is not running")
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        exit_code = 0
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                exec(compile(code, "<sandbox>", "exec"), sandbox.namespace)
+        except Exception:
+            stderr.write(traceback.format_exc())
+            exit_code = 1
+
+        return SandboxResult(
+            success=(exit_code == 0),
+            stdout=stdout.getvalue(),
+            stderr=stderr.getvalue(),
+            exit_code=exit_code,
+            execution_time_ms=(time.time() - start) * 1000,
+            metadata={"sandbox_id": sandbox.sandbox_id},
+        )
+
+    async def reset_sandbox(self, sandbox: StubSandbox) -> None:
+        sandbox.namespace.clear()
+
+    async def check_sandbox(self, sandbox: StubSandbox) -> bool:
+        return sandbox.healthy and not sandbox.stopped
+
+    async def destroy_sandbox(self, sandbox: StubSandbox) -> None:
+        sandbox.stopped = True
@@ -0,0 +1,227 @@
+"""
+SubprocessSandboxRunner: 本地子进程沙箱
+
+核心特性:
+- 预先启动的 Python 工作进程池 (复用 SandboxPool)，无需 microsandbox 服务与网络往返
+- 每段代码在工作进程 fork 出的子进程中执行，子进程看不到协议通道，状态不跨执行保留
+- rlimit 限制: 内存 (RLIMIT_AS)、单文件大小、打开文件数、CPU 时间
+- 可用时进入独立的用户/网络命名空间 (不依赖 seccomp)，不可用时降级为仅 rlimit
+- 墙钟超时: 超时的工作进程直接 kill，不再复用
+- 每次执行在 metadata 中返回 run_ms / cpu_ms，便于与 microsandbox 对比基准
+
+隔离强度远低于 microVM: 没有 mount 命名空间与 seccomp，用户代码可以访问运行用户可见的整个文件系统，
+仅适合开发、测试与可信代码的执行。
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+
+from .base import ReusableSandboxRunner, SandboxBackend, SandboxConfig, SandboxResult
+from .pool import SandboxPoolConfig
+
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+WORKER_STARTUP_TIMEOUT = 10.0
+STREAM_LIMIT = 16 * 1024 * 1024  # 单行响应上限 (stdout/stderr 整体编码为一行 JSON)
+
+
+@dataclass
+class SubprocessWorker:
+    """工作进程句柄"""
+
+    process: asyncio.subprocess.Process
+    workdir: str
+    isolated: bool
+    startup_ms: float
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+
+class SubprocessSandboxRunner(ReusableSandboxRunner):
+    """
+    基于本地子进程的沙箱执行器
+
+    使用方式:
+        runner = SubprocessSandboxRunner(SandboxConfig(memory_mb=256, timeout_seconds=5))
+        await runner.warmup()
+        result = await runner.execute("print(sum(range(10)))")
+        await runner.cleanup()
+    """
+
+    def __init__(
+        self,
+        config: SandboxConfig | None = None,
+        pool_config: SandboxPoolConfig | None = None,
+        max_file_size_mb: int = 16,
+        max_open_files: int = 64,
+        python_executable: str | None = None,
+    ):
+        pool_config = pool_config or SandboxPoolConfig(min_size=2, max_size=4, max_uses=100)
+        super().__init__(config, pool_config)
+        self.max_file_size_mb = max_file_size_mb
+        self.max_open_files = max_open_files
+        self.python_executable = python_executable or sys.executable
+
+    @property
+    def backend(self) -> SandboxBackend:
+        return SandboxBackend.SUBPROCESS
+
+    async def execute(self, code: str) -> SandboxResult:
+        return await self.execute_pooled(code)
+
+    async def execute_file(self, file_path: str) -> SandboxResult:
+        with open(file_path, encoding="utf-8") as f:
+            return await self.execute(f.read())
+
+    # ========================================
+    # 沙箱实例生命周期
+    # ========================================
+
+    def _limits(self) -> dict:
+        timeout = max(1, int(self._config.timeout_seconds))
+        max_uses = self._pool_config.max_uses if self._pool_config else 1
+        return {
+            "memory_bytes": self._config.memory_mb * 1024 * 1024,
+            "file_size_bytes": self.max_file_size_mb * 1024 * 1024,
+            "open_files": self.max_open_files,
+            "cpu_seconds": timeout,
+            # 累计 CPU 硬上限: 工作进程整个生命周期的 CPU 预算
+            "cpu_seconds_total": timeout * max_uses + 1,
+            "network_enabled": self._config.network_enabled,
+        }
+
+    async def create_sandbox(self) -> SubprocessWorker:
+        start = time.perf_counter()
+        workdir = tempfile.mkdtemp(prefix=f"{self._config.name}-")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.python_executable,
+                "-I",
+                WORKER_PATH,
+                json.dumps(self._limits()),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                cwd=workdir,
+                env={"PATH": os.defpath, "LANG": "C.UTF-8", "HOME": workdir},
+                limit=STREAM_LIMIT,
+                start_new_session=True,
+            )
+        except BaseException:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+
+        worker = SubprocessWorker(process=process, workdir=workdir, isolated=False, startup_ms=0.0)
+        try:
+            line = await asyncio.wait_for(process.stdout.readline(), timeout=WORKER_STARTUP_TIMEOUT)
+            handshake = json.loads(line) if line else {}
+            if not handshake.get("ready"):
+                raise RuntimeError(f"Sandbox worker failed to start (exit code {process.returncode})")
+        except BaseException:
+            await self.destroy_sandbox(worker)
+            raise
+
+        worker.isolated = handshake.get("isolated", False)
+        worker.startup_ms = (time.perf_counter() - start) * 1000
+        return worker
+
+    async def run_in_sandbox(self, worker: SubprocessWorker, code: str) -> SandboxResult:
+        start = time.time()
+        metadata = {"worker_pid": worker.pid, "isolated": worker.isolated}
+        if not worker.alive:
+            return SandboxResult(
+                success=False, stdout="", stderr="Sandbox worker is not running", exit_code=-1, execution_time_ms=0
+            )
+
+        try:
+            worker.process.stdin.write((json.dumps({"code": code}) + "\n").encode())
+            await worker.process.stdin.drain()
+            line = await asyncio.wait_for(worker.process.stdout.readline(), timeout=self._config.timeout_seconds)
+        except TimeoutError:
+            return SandboxResult(
+                success=False,
+                stdout="",
+                stderr=f"Execution timeout ({self._config.timeout_seconds}s)",
+                exit_code=-1,
+                execution_time_ms=(time.time() - start) * 1000,
+                metadata=metadata,
+            )
+        except (ConnectionError, ValueError) as e:
+            return SandboxResult(
+                success=False,
+                stdout="",
+                stderr=str(e),
+                exit_code=-1,
+                execution_time_ms=(time.time() - start) * 1000,
+                metadata=metadata,
+            )
+
+        if not line:
+            # 工作进程在执行中退出 (如超出累计 CPU 限制被 SIGXCPU 终止)
+            returncode = await worker.process.wait()
+            return SandboxResult(
+                success=False,
+                stdout="",
+                stderr=self._describe_exit(returncode),
+                exit_code=-1,
+                execution_time_ms=(time.time() - start) * 1000,
+                metadata=metadata,
+            )
+
+        response = json.loads(line)
+        metadata.update(run_ms=response["run_ms"], cpu_ms=response["cpu_ms"])
+        stderr = response["stderr"]
+        if response["exit_code"] < 0:
+            # 执行代码的子进程被信号终止 (如超出 CPU 限制的 SIGXCPU)，工作进程仍可复用
+            stderr = self._describe_exit(response["exit_code"])
+        return SandboxResult(
+            success=(response["exit_code"] == 0),
+            stdout=response["stdout"],
+            stderr=stderr,
+            exit_code=response["exit_code"],
+            execution_time_ms=(time.time() - start) * 1000,
+            metadata=metadata,
+        )
+
+    async def reset_sandbox(self, worker: SubprocessWorker) -> None:
+        # 每次执行都在新的子进程中运行，这里只需清空工作目录
+        for entry in os.scandir(worker.workdir):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+
+    async def check_sandbox(self, worker: SubprocessWorker) -> bool:
+        return worker.alive and await super().check_sandbox(worker)
+
+    async def destroy_sandbox(self, worker: SubprocessWorker) -> None:
+        if worker.alive:
+            try:
+                # 工作进程独占进程组，连同用户代码派生的子进程一并终止
+                os.killpg(worker.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        await worker.process.wait()
+        shutil.rmtree(worker.workdir, ignore_errors=True)
+
+    @staticmethod
+    def _describe_exit(returncode: int) -> str:
+        if returncode == -signal.SIGXCPU:
+            return "CPU time limit exceeded"
+        if returncode == -signal.SIGXFSZ:
+            return "File size limit exceeded"
+        if returncode < 0:
+            return f"Sandbox worker killed by signal {signal.Signals(-returncode).name}"
+        return f"Sandbox worker exited unexpectedly (exit code {returncode})"
@@ -0,0 +1,157 @@
+"""
+沙箱工作进程 (由 SubprocessSandboxRunner 以 `python -I worker.py <limits>` 启动)
+
+仅依赖标准库，不导入 cognizes 包:
+- 启动时尝试 unshare 用户/网络命名空间 (不可用时降级)，并设为不可 dump，
+  子进程无法通过 /proc 或 ptrace 访问工作进程
+- 设置 rlimit: 地址空间、单文件大小、打开文件数、累计 CPU 时间
+- 协议: 请求/响应各占一行 JSON，通过启动时复制的原始 stdin/stdout 传输;
+  fd 0/1/2 重定向到 /dev/null
+- 每段代码在 fork 出的子进程中执行: 子进程先关闭除 0/1/2 与结果管道外的所有 fd
+  (包括协议通道)，结果经管道交回工作进程，执行结束即退出，状态不跨执行保留
+
+没有 mount 命名空间: 用户代码可以读写工作进程用户可访问的整个文件系统。
+"""
+
+import contextlib
+import io
+import json
+import math
+import os
+import resource
+import sys
+import time
+import traceback
+
+
+def isolate(network_enabled: bool) -> bool:
+    """进入新的用户 + 网络命名空间，返回是否成功"""
+    if network_enabled or not hasattr(os, "unshare"):
+        return False
+    try:
+        os.unshare(os.CLONE_NEWUSER | os.CLONE_NEWNET)
+        return True
+    except OSError:
+        return False
+
+
+def set_undumpable() -> None:
+    """PR_SET_DUMPABLE=0: 同用户的其他进程不能读取 /proc/<pid>/fd 或 ptrace 本进程 (仅 Linux)"""
+    try:
+        import ctypes
+
+        ctypes.CDLL(None, use_errno=True).prctl(4, 0, 0, 0, 0)
+    except (OSError, AttributeError):
+        pass
+
+
+def set_limit(name: str, value: int | None) -> None:
+    limit = getattr(resource, name, None)
+    if limit is None or value is None:
+        return
+    try:
+        resource.setrlimit(limit, (value, value))
+    except (ValueError, OSError):
+        pass
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def arm_cpu_limit(seconds: int) -> None:
+    """为本次执行设置 CPU 软限制 (超出时内核发送 SIGXCPU 终止进程)"""
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = math.ceil(cpu_seconds()) + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def execute(code: str) -> dict:
+    """在当前 (子) 进程中执行代码，捕获 stdout/stderr"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exec(compile(code, "<sandbox>", "exec"), {"__name__": "__main__"})
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        stderr.write(traceback.format_exc())
+        exit_code = 1
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+
+def run_child(code: str, cpu_limit: int, result_fd: int) -> None:
+    """子进程入口: 关闭协议通道等继承的 fd 后执行代码，结果写入 result_fd，不返回"""
+    status = 1
+    try:
+        os.closerange(3, result_fd)
+        os.closerange(result_fd + 1, os.sysconf("SC_OPEN_MAX"))
+        arm_cpu_limit(cpu_limit)
+        data = json.dumps(execute(code)).encode()
+        with os.fdopen(result_fd, "wb") as result:
+            result.write(data)
+        status = 0
+    finally:
+        os._exit(status)
+
+
+def run(code: str, cpu_limit: int) -> dict:
+    start = time.perf_counter()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        run_child(code, cpu_limit, write_fd)
+    os.close(write_fd)
+
+    with os.fdopen(read_fd, "rb") as result:
+        data = result.read()
+    _, status, usage = os.wait4(pid, 0)
+    # 子进程被信号终止时 exit_code 为负的信号值
+    response = {"stdout": "", "stderr": "", "exit_code": os.waitstatus_to_exitcode(status)}
+    if data and not os.WIFSIGNALED(status):
+        # 结果管道对用户代码可写，按不可信输入解析
+        try:
+            result = json.loads(data)
+            response.update(
+                stdout=str(result["stdout"]), stderr=str(result["stderr"]), exit_code=int(result["exit_code"])
+            )
+        except (ValueError, TypeError, KeyError):
+            response.update(stderr="Sandbox result channel corrupted", exit_code=1)
+    response.update(
+        run_ms=(time.perf_counter() - start) * 1000,
+        cpu_ms=(usage.ru_utime + usage.ru_stime) * 1000,
+    )
+    return response
+
+
+def main() -> None:
+    limits = json.loads(sys.argv[1])
+
+    requests = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    responses = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    isolated = isolate(limits.get("network_enabled", False))
+    set_undumpable()
+    set_limit("RLIMIT_AS", limits.get("memory_bytes"))
+    set_limit("RLIMIT_FSIZE", limits.get("file_size_bytes"))
+    set_limit("RLIMIT_NOFILE", limits.get("open_files"))
+    set_limit("RLIMIT_CORE", 0)
+    set_limit("RLIMIT_CPU", limits.get("cpu_seconds_total"))
+
+    responses.write(json.dumps({"ready": True, "pid": os.getpid(), "isolated": isolated}) + "\n")
+    for line in requests:
+        request = json.loads(line)
+        response = run(request["code"], limits.get("cpu_seconds", 30))
+        responses.write(json.dumps(response) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,53 @@
 """
 ToolRegistry: 数据库驱动的动态工具注册表
+
+工具可在注册元数据中声明结果缓存 (幂等工具)，相同参数的重复调用直接返回缓存结果:
+    openapi_schema={"x-cache": {"ttl_seconds": 300, "max_entries": 1000, "scope": "run"}}
+    或 permissions={"cache": {...}}
+scope: run (仅同一 run_id 内复用) | global (跨 run 复用)
+
+调用统计在进程内聚合 (次数、耗时总和、延迟直方图)，由后台任务每隔 stats_flush_interval 秒
+用一条批量 UPDATE 写回，调用路径上不再访问数据库。后台任务在 start() / attach() 或首次调用工具时启动，
+关闭时调用 close() 停止任务并写回剩余统计。
+
+工具目录按 app_name 缓存在进程内 (已解析的 ToolDefinition + 预计算的 LLM function schema)，
+tools 表定义变更经 NOTIFY tools_changed 通知各进程失效，未挂载监听时按 catalog_ttl_seconds 兜底过期。
 """
 
 from __future__ import annotations
-import json, uuid
-from dataclasses import dataclass
-from typing import Any, Callable
+
+import asyncio
+import bisect
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from typing import Any
+
 import asyncpg
 
+logger = logging.getLogger(__name__)
+
+# 延迟直方图区间上界 (毫秒)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+TOOLS_CHANGED_CHANNEL = "tools_changed"
+
+FLUSH_STATS_SQL = """
+    UPDATE tools AS t SET
+        call_count = t.call_count + s.calls,
+        avg_latency_ms = (COALESCE(t.avg_latency_ms, 0) * t.call_count + s.total_ms) / (t.call_count + s.calls),
+        p50_latency_ms = s.p50,
+        p95_latency_ms = s.p95,
+        p99_latency_ms = s.p99
+    FROM unnest($2::text[], $3::int[], $4::float8[], $5::float8[], $6::float8[], $7::float8[])
+        AS s(name, calls, total_ms, p50, p95, p99)
+    WHERE t.app_name = $1 AND t.name = s.name
+"""
+
 
 @dataclass
 class ToolDefinition:
@@ -20,6 +60,148 @@ class ToolDefinition:
     is_active: bool
     call_count: int
     avg_latency_ms: float
+    p50_latency_ms: float = 0.0
+    p95_latency_ms: float = 0.0
+    p99_latency_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+
+@dataclass
+class ToolCachePolicy:
+    """工具结果缓存策略"""
+
+    ttl_seconds: float = 300.0
+    max_entries: int = 1024
+    scope: str = "run"  # run | global
+
+    @classmethod
+    def from_metadata(cls, openapi_schema: dict | None, permissions: dict | None) -> ToolCachePolicy | None:
+        """从注册元数据解析缓存声明，未声明时返回 None"""
+        config = (openapi_schema or {}).get("x-cache") or (permissions or {}).get("cache")
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        policy = cls(
+            ttl_seconds=float(config.get("ttl_seconds", cls.ttl_seconds)),
+            max_entries=int(config.get("max_entries", cls.max_entries)),
+            scope=config.get("scope", cls.scope),
+        )
+        if policy.scope not in ("run", "global"):
+            raise ValueError(f"Invalid cache scope: {policy.scope}")
+        return policy
+
+
+class ToolResultCache:
+    """单个工具的结果缓存：LRU + TTL"""
+
+    def __init__(self, policy: ToolCachePolicy):
+        self.policy = policy
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, params: dict, run_id: str | None) -> tuple | None:
+        """(作用域, 规范化参数)；run 作用域下缺少 run_id 时不缓存"""
+        if self.policy.scope == "run" and run_id is None:
+            return None
+        scope_key = run_id if self.policy.scope == "run" else None
+        return scope_key, json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, key: tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.policy.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.policy.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear_run(self, run_id: str) -> None:
+        for key in [k for k in self._entries if k[0] == run_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LatencyHistogram:
+    """固定分桶延迟直方图，分位数按桶内线性插值估算"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_right(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, q: float) -> float:
+        total = sum(self.counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else max(self.max_ms, lower)
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max_ms)
+            seen += count
+        return self.max_ms
+
+
+@dataclass
+class ToolStats:
+    """单个工具的进程内调用统计"""
+
+    pending_calls: int = 0  # 尚未写回数据库的调用数
+    pending_total_ms: float = 0.0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)  # 进程启动以来的累计分布
+
+    def record(self, latency_ms: float) -> None:
+        self.pending_calls += 1
+        self.pending_total_ms += latency_ms
+        self.histogram.record(latency_ms)
+
+
+@dataclass
+class ToolCatalog:
+    """单个 app 的工具目录快照"""
+
+    tools: list[ToolDefinition]
+    function_schemas: list[dict]
+    loaded_at: float
+
+
+def to_function_schema(tool: ToolDefinition) -> dict:
+    """ToolDefinition -> LLM function calling schema"""
+    schema = tool.openapi_schema or {}
+    return {
+        "type": "function",
+        "function": {
+            "name": tool.name,
+            "description": tool.description or schema.get("description") or tool.display_name or tool.name,
+            "parameters": schema.get("parameters") or {"type": "object", "properties": {}},
+        },
+    }
 
 
 @dataclass
@@ -34,11 +216,26 @@ class FrontendTool:
 
 
 class ToolRegistry:
-    def __init__(self, pool: asyncpg.Pool, app_name: str | None = None):
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        app_name: str | None = None,
+        *,
+        stats_flush_interval: float = 5.0,
+        catalog_ttl_seconds: float = 60.0,
+    ):
         self._pool = pool
         self._app_name = app_name or "default_app"
         self._function_registry: dict[str, Callable] = {}
         self._frontend_tools: dict[str, FrontendTool] = {}
+        self._result_caches: dict[str, ToolResultCache] = {}
+        self._stats: dict[str, ToolStats] = {}
+        self._stats_flush_interval = stats_flush_interval
+        self._flush_task: asyncio.Task | None = None
+        self._catalogs: dict[str, ToolCatalog] = {}
+        self._catalog_versions: dict[str, int] = {}
+        self._catalog_ttl = catalog_ttl_seconds
+        self._catalog_lock = asyncio.Lock()
 
     async def register_tool(
         self,
@@ -67,6 +264,12 @@ class ToolRegistry:
                 json.dumps(permissions or {"allowed_users": ["*"]}),
             )
         self._function_registry[name] = func
+        # 重新注册视为新版本，旧缓存作废
+        self._result_caches.pop(name, None)
+        policy = ToolCachePolicy.from_metadata(openapi_schema, permissions)
+        if policy:
+            self._result_caches[name] = ToolResultCache(policy)
+        self.invalidate_catalog(self._app_name)
         return ToolDefinition(
             id=tool_id,
             name=name,
@@ -80,10 +283,69 @@ class ToolRegistry:
         )
 
     async def get_available_tools(self, user_id: str | None = None) -> list[ToolDefinition]:
-        """获取可用工具列表"""
-        async with self._pool.acquire() as conn:
-            rows = await conn.fetch("SELECT * FROM tools WHERE app_name = $1 AND is_active = true", self._app_name)
+        """获取可用工具列表 (目录缓存命中时不访问数据库)"""
+        catalog = await self._get_catalog(self._app_name)
+        # 缓存命中统计为进程内实时数据，返回副本以免调用方改动共享快照
         return [
+            replace(
+                tool,
+                cache_hits=self._result_caches[tool.name].hits if tool.name in self._result_caches else 0,
+                cache_misses=self._result_caches[tool.name].misses if tool.name in self._result_caches else 0,
+            )
+            for tool in catalog.tools
+        ]
+
+    async def get_function_schemas(self) -> list[dict]:
+        """获取预计算的 LLM function calling schema 列表"""
+        catalog = await self._get_catalog(self._app_name)
+        return catalog.function_schemas
+
+    # ========================================
+    # 工具目录缓存
+    # ========================================
+
+    def attach(self, listener) -> None:
+        """挂载到事件传输层 (PgNotifyListener / RelayTransport)，监听 tools_changed 通知，并启动统计写回任务
+
+        频道会加入 listener.channels，应在 listener.start() 之前调用。
+        """
+        listener.add_channel(TOOLS_CHANGED_CHANNEL)
+        listener.on_event(TOOLS_CHANGED_CHANNEL, self._on_tools_changed)
+        self._start_flush_loop()
+
+    def _on_tools_changed(self, event) -> None:
+        app_name = event.payload.get("app_name")
+        self.invalidate_catalog(app_name)
+
+    def invalidate_catalog(self, app_name: str | None = None) -> None:
+        """使指定 app (或全部) 的目录缓存失效"""
+        targets = [app_name] if app_name else list(self._catalogs)
+        for name in targets:
+            self._catalogs.pop(name, None)
+            self._catalog_versions[name] = self._catalog_versions.get(name, 0) + 1
+
+    async def _get_catalog(self, app_name: str) -> ToolCatalog:
+        catalog = self._catalogs.get(app_name)
+        if catalog and time.monotonic() - catalog.loaded_at < self._catalog_ttl:
+            return catalog
+
+        async with self._catalog_lock:
+            # 等锁期间可能已由其他协程加载
+            catalog = self._catalogs.get(app_name)
+            if catalog and time.monotonic() - catalog.loaded_at < self._catalog_ttl:
+                return catalog
+
+            version = self._catalog_versions.get(app_name, 0)
+            catalog = await self._load_catalog(app_name)
+            # 加载期间收到失效通知时不缓存本次结果，避免回填旧数据
+            if self._catalog_versions.get(app_name, 0) == version:
+                self._catalogs[app_name] = catalog
+            return catalog
+
+    async def _load_catalog(self, app_name: str) -> ToolCatalog:
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch("SELECT * FROM tools WHERE app_name = $1 AND is_active = true", app_name)
+        tools = [
             ToolDefinition(
                 id=str(r["id"]),
                 name=r["name"],
@@ -94,32 +356,149 @@ class ToolRegistry:
                 is_active=r["is_active"],
                 call_count=r["call_count"],
                 avg_latency_ms=r["avg_latency_ms"],
+                p50_latency_ms=r.get("p50_latency_ms") or 0.0,
+                p95_latency_ms=r.get("p95_latency_ms") or 0.0,
+                p99_latency_ms=r.get("p99_latency_ms") or 0.0,
             )
             for r in rows
         ]
+        return ToolCatalog(
+            tools=tools,
+            function_schemas=[to_function_schema(tool) for tool in tools],
+            loaded_at=time.monotonic(),
+        )
 
     async def invoke_tool(self, name: str, params: dict, *, run_id: str | None = None) -> Any:
-        """调用工具并记录统计"""
-        import time, asyncio
-
+        """调用工具并记录统计 (统计在进程内聚合，由后台任务批量写回)"""
         func = self._function_registry.get(name)
         if not func:
             raise ValueError(f"Tool '{name}' not found")
+
+        cache = self._result_caches.get(name)
+        cache_key = cache.make_key(params, run_id) if cache is not None else None
+        if cache_key is not None:
+            hit, cached = cache.get(cache_key)
+            if hit:
+                return cached
+
         start = time.time()
         result = await func(**params) if asyncio.iscoroutinefunction(func) else func(**params)
         latency = (time.time() - start) * 1000
-        # 更新统计
-        async with self._pool.acquire() as conn:
-            await conn.execute(
-                "UPDATE tools SET call_count = call_count + 1, "
-                "avg_latency_ms = (avg_latency_ms * call_count + $1) / (call_count + 1) "
-                "WHERE app_name = $2 AND name = $3",
-                latency,
-                self._app_name,
-                name,
-            )
+        if cache_key is not None:
+            cache.put(cache_key, result)
+
+        self._stats.setdefault(name, ToolStats()).record(latency)
+        self._start_flush_loop()
         return result
 
+    # ========================================
+    # 调用统计
+    # ========================================
+
+    async def flush_stats(self) -> int:
+        """将待写回的统计合并为一条 UPDATE 写入 tools 表，返回涉及的工具数"""
+        pending = [(name, stats) for name, stats in self._stats.items() if stats.pending_calls]
+        if not pending:
+            return 0
+
+        names, calls, total_ms, p50, p95, p99 = [], [], [], [], [], []
+        for name, stats in pending:
+            names.append(name)
+            calls.append(stats.pending_calls)
+            total_ms.append(stats.pending_total_ms)
+            p50.append(stats.histogram.percentile(0.50))
+            p95.append(stats.histogram.percentile(0.95))
+            p99.append(stats.histogram.percentile(0.99))
+            stats.pending_calls = 0
+            stats.pending_total_ms = 0.0
+
+        try:
+            async with self._pool.acquire() as conn:
+                await conn.execute(FLUSH_STATS_SQL, self._app_name, names, calls, total_ms, p50, p95, p99)
+        except BaseException:
+            # 写回失败或被取消 (close 时停止写回任务)：把增量放回，下一轮重试
+            for (_, stats), n, ms in zip(pending, calls, total_ms, strict=True):
+                stats.pending_calls += n
+                stats.pending_total_ms += ms
+            raise
+        return len(names)
+
+    async def start(self) -> None:
+        """启动后台统计写回任务 (幂等)"""
+        self._start_flush_loop()
+
+    def _start_flush_loop(self) -> None:
+        """在当前事件循环中启动写回任务，已在运行或无事件循环时不做任何事"""
+        if self._stats_flush_interval <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # attach() 可能在事件循环启动前调用，首次调用工具时再启动
+            return
+        if self._flush_task is not None and not self._flush_task.done() and self._flush_task.get_loop() is loop:
+            return
+        self._flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        """每隔 stats_flush_interval 秒写回一次，无待写回统计时不访问数据库"""
+        while True:
+            await asyncio.sleep(self._stats_flush_interval)
+            try:
+                await self.flush_stats()
+            except Exception:
+                logger.exception("Failed to flush tool stats")
+
+    async def close(self) -> None:
+        """停止写回任务并写回剩余统计"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_stats()
+
+    def get_latency_stats(self) -> dict[str, dict]:
+        """进程内各工具的延迟分位数 (含尚未写回的调用)"""
+        return {
+            name: {
+                "calls": sum(stats.histogram.counts),
+                "pending_calls": stats.pending_calls,
+                "p50_ms": stats.histogram.percentile(0.50),
+                "p95_ms": stats.histogram.percentile(0.95),
+                "p99_ms": stats.histogram.percentile(0.99),
+                "max_ms": stats.histogram.max_ms,
+            }
+            for name, stats in self._stats.items()
+        }
+
+    def get_cache_stats(self) -> dict[str, dict]:
+        """各工具的缓存命中统计"""
+        return {
+            name: {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "hit_rate": cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else 0.0,
+                "entries": len(cache),
+                "scope": cache.policy.scope,
+            }
+            for name, cache in self._result_caches.items()
+        }
+
+    def clear_run_cache(self, run_id: str) -> None:
+        """run 结束时释放 run 作用域的缓存条目"""
+        for cache in self._result_caches.values():
+            if cache.policy.scope == "run":
+                cache.clear_run(run_id)
+
+    def invalidate_cache(self, name: str | None = None) -> None:
+        """清空指定工具 (或全部工具) 的缓存"""
+        for tool_name, cache in self._result_caches.items():
+            if name is None or tool_name == name:
+                cache.clear()
+
     async def register_frontend_tool(self, app_name: str, tool: FrontendTool) -> None:
         """注册前端定义工具"""
         self._frontend_tools[f"{app_name}:{tool.name}"] = tool
@@ -140,6 +519,7 @@ class ToolRegistry:
             json.dumps(tool.parameters),
             json.dumps({"requires_confirmation": tool.requires_confirmation}),
         )
+        self.invalidate_catalog(app_name)
 
     def get_frontend_tools(self, app_name: str) -> list[FrontendTool]:
         """获取应用的前端工具列表"""
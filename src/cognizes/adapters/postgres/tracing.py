@@ -13,16 +13,37 @@ OpenTelemetry 双路导出集成
     │ PostgreSQL    │ OTLP/Langfuse │  │ Console     │
     │ (实时调试)    │  │ (开发环境)  │
     └─────────────┘  └─────────────┘
+
+采样:
+- 头部采样: SpanNameRatioSampler 按 Span 名称前缀配置采样率，子 Span 跟随父 Span
+- 尾部采样: TailSamplingSpanProcessor 按 trace 缓冲，仅保留错误 / 慢 / 白名单 run_id 的 trace
+
+看板:
+- traces 按日分区，rollup_trace_latency() 维护每分钟每 operation 的延迟直方图
+- TraceAnalytics 只读汇总表计算分位数，过期分区直接 DROP
+- 未启用 pg_cron 时，TraceAnalytics.start() / TracingManager.start() 启动后台任务定期创建与清理日分区
 """
 
+import asyncio
 import json
-from datetime import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from datetime import UTC, datetime
 from contextlib import asynccontextmanager
 from typing import Any
 
 import asyncpg
 from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider, ReadableSpan
+from opentelemetry.sdk.trace import TracerProvider, ReadableSpan, SpanProcessor
+from opentelemetry.sdk.trace.sampling import (
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
 from opentelemetry.sdk.trace.export import (
     BatchSpanProcessor,
     SpanExporter,
@@ -33,72 +54,412 @@ from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExport
 from opentelemetry.trace import Status, StatusCode
 
 
+TRACE_COLUMNS = (
+    "trace_id",
+    "span_id",
+    "parent_span_id",
+    "operation_name",
+    "span_kind",
+    "attributes",
+    "events",
+    "start_time",
+    "end_time",
+    "duration_ns",
+    "status_code",
+    "status_message",
+)
+
+COPY_TRACES_SQL = f"COPY traces ({', '.join(TRACE_COLUMNS)}) FROM STDIN"
+
+logger = logging.getLogger(__name__)
+
+INSERT_TRACES_SQL = f"""
+    INSERT INTO traces ({", ".join(TRACE_COLUMNS)})
+    VALUES ({", ".join(["%s"] * len(TRACE_COLUMNS))})
+"""
+
+
+@dataclass
+class ExporterStats:
+    """PostgresSpanExporter 导出统计"""
+
+    batches: int = 0
+    exported_spans: int = 0
+    failed_batches: int = 0
+    dropped_spans: int = 0  # 导出失败丢弃的 Span (处理器队列满时的丢弃见 BoundedBatchSpanProcessor)
+    reconnects: int = 0
+    last_batch_size: int = 0
+    last_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+    total_latency_ms: float = 0.0
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return self.total_latency_ms / self.batches if self.batches else 0.0
+
+
 class PostgresSpanExporter(SpanExporter):
     """
     将 Span 持久化到 PostgreSQL traces 表
 
     注意: BatchSpanProcessor 在后台线程调用 export()，
     因此使用 psycopg (同步驱动) 或独立事件循环执行异步操作。
+
+    - 复用同一条持久连接，连接失效时自动重连并重试一次
+    - 每个批次一条 COPY traces FROM STDIN (use_copy=False 时退化为 executemany)
     """
 
-    def __init__(self, dsn: str | None = None, pool: asyncpg.Pool | None = None):
+    def __init__(
+        self,
+        dsn: str | None = None,
+        pool: asyncpg.Pool | None = None,
+        use_copy: bool = True,
+        max_retries: int = 1,
+    ):
         """
         Args:
             dsn: PostgreSQL 连接字符串 (推荐)
             pool: 连接池 (仅用于兼容旧代码)
+            use_copy: 是否使用 COPY 批量写入
+            max_retries: 连接失效时的重连重试次数
         """
         self._dsn = dsn
         self._pool = pool
+        self.use_copy = use_copy
+        self.max_retries = max_retries
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stats = ExporterStats()
+        self._completed_spans = 0
 
     def export(self, spans: list[ReadableSpan]) -> SpanExportResult:
         """同步导出 Spans 到 PostgreSQL"""
-        try:
-            # 使用 psycopg (同步驱动) 执行插入
-            import psycopg
-
-            if not self._dsn:
-                raise ValueError("PostgresSpanExporter 需要 dsn 参数")
-
-            with psycopg.connect(self._dsn) as conn:
-                with conn.cursor() as cur:
-                    for span in spans:
-                        cur.execute(
-                            """
-                            INSERT INTO traces
-                            (trace_id, span_id, parent_span_id, operation_name, span_kind,
-                             attributes, events, start_time, end_time, duration_ns,
-                             status_code, status_message)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                format(span.context.trace_id, "032x"),
-                                format(span.context.span_id, "016x"),
-                                format(span.parent.span_id, "016x") if span.parent else None,
-                                span.name,
-                                span.kind.name if span.kind else "INTERNAL",
-                                json.dumps(dict(span.attributes or {})),
-                                json.dumps([self._event_to_dict(e) for e in (span.events or [])]),
-                                datetime.fromtimestamp(span.start_time / 1e9),
-                                datetime.fromtimestamp(span.end_time / 1e9) if span.end_time else None,
-                                (span.end_time - span.start_time) if span.end_time else None,
-                                span.status.status_code.name if span.status else "UNSET",
-                                span.status.description if span.status else None,
-                            ),
-                        )
-                conn.commit()
+        if not spans:
+            return SpanExportResult.SUCCESS
 
+        started = time.perf_counter()
+        with self._lock:
+            try:
+                if not self._dsn:
+                    raise ValueError("PostgresSpanExporter 需要 dsn 参数")
+
+                rows = [self._span_to_row(span) for span in spans]
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        self._write_rows(self._get_connection(), rows)
+                        break
+                    except Exception:
+                        # 连接失效或写入失败：丢弃连接，下一轮重新建立
+                        self._close_connection()
+                        if attempt >= self.max_retries:
+                            raise
+                        self._stats.reconnects += 1
+            except Exception as e:
+                import sys
+
+                self._stats.failed_batches += 1
+                self._stats.dropped_spans += len(spans)
+                self._completed_spans += len(spans)
+                print(f"PostgresSpanExporter 导出失败: {e}", file=sys.stderr)
+                return SpanExportResult.FAILURE
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            self._stats.batches += 1
+            self._stats.exported_spans += len(spans)
+            self._completed_spans += len(spans)
+            self._stats.last_batch_size = len(spans)
+            self._stats.last_latency_ms = latency_ms
+            self._stats.max_latency_ms = max(self._stats.max_latency_ms, latency_ms)
+            self._stats.total_latency_ms += latency_ms
             return SpanExportResult.SUCCESS
-        except Exception as e:
-            import sys
 
-            print(f"PostgresSpanExporter 导出失败: {e}", file=sys.stderr)
-            return SpanExportResult.FAILURE
+    @property
+    def completed_spans(self) -> int:
+        """已完成导出 (成功或失败) 的 Span 数；只由导出线程递增，读取无需加锁"""
+        return self._completed_spans
+
+    def _get_connection(self):
+        """获取持久连接 (惰性建立)"""
+        import psycopg
+
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg.connect(self._dsn)
+        return self._conn
+
+    def _close_connection(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _write_rows(self, conn, rows: list[tuple]) -> None:
+        """单次往返写入整个批次"""
+        try:
+            with conn.cursor() as cur:
+                if self.use_copy:
+                    with cur.copy(COPY_TRACES_SQL) as copy:
+                        for row in rows:
+                            copy.write_row(row)
+                else:
+                    cur.executemany(INSERT_TRACES_SQL, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _span_to_row(self, span: ReadableSpan) -> tuple:
+        """Span -> traces 行 (列顺序同 TRACE_COLUMNS)"""
+        return (
+            format(span.context.trace_id, "032x"),
+            format(span.context.span_id, "016x"),
+            format(span.parent.span_id, "016x") if span.parent else None,
+            span.name,
+            span.kind.name if span.kind else "INTERNAL",
+            json.dumps(dict(span.attributes or {})),
+            json.dumps([self._event_to_dict(e) for e in (span.events or [])]),
+            datetime.fromtimestamp(span.start_time / 1e9, tz=UTC),
+            datetime.fromtimestamp(span.end_time / 1e9, tz=UTC) if span.end_time else None,
+            int(span.end_time - span.start_time) if span.end_time else None,
+            span.status.status_code.name if span.status else "UNSET",
+            span.status.description if span.status else None,
+        )
 
     def _event_to_dict(self, event) -> dict:
         return {"name": event.name, "timestamp": event.timestamp, "attributes": dict(event.attributes or {})}
 
+    def get_stats(self) -> ExporterStats:
+        """获取导出统计 (快照)"""
+        with self._lock:
+            return replace(self._stats)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._close_connection()
+
+
+class BoundedBatchSpanProcessor(SpanProcessor):
+    """
+    带丢弃计数的 BatchSpanProcessor
+
+    BatchSpanProcessor 队列满时静默丢弃 Span 且不暴露计数。本处理器以
+    「已提交 - 导出器已完成」作为待导出数，达到 max_queue_size 时在提交前丢弃并计数；
+    该值不小于内部队列长度，因此内部队列不会溢出，所有丢弃都能被统计。
+    """
+
+    def __init__(
+        self,
+        exporter: PostgresSpanExporter,
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        schedule_delay_millis: float = 5000,
+    ):
+        self._exporter = exporter
+        self.max_queue_size = max_queue_size
+        self._processor = BatchSpanProcessor(
+            exporter,
+            max_queue_size=max_queue_size,
+            max_export_batch_size=min(max_export_batch_size, max_queue_size),
+            schedule_delay_millis=schedule_delay_millis,
+        )
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._dropped = 0
+
+    @property
+    def queue_size(self) -> int:
+        """待导出 Span 数 (排队中与导出中)"""
+        return self._submitted - self._exporter.completed_spans
+
+    @property
+    def dropped_spans(self) -> int:
+        """队列满时丢弃的 Span 数"""
+        return self._dropped
+
+    def on_start(self, span, parent_context=None) -> None:
+        self._processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if not span.context.trace_flags.sampled:
+            return
+        with self._lock:
+            if self.queue_size >= self.max_queue_size:
+                self._dropped += 1
+                return
+            self._submitted += 1
+        self._processor.on_end(span)
+
+    def shutdown(self) -> None:
+        self._processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._processor.force_flush(timeout_millis)
+
+
+class SpanNameRatioSampler(Sampler):
+    """
+    头部采样器：按 Span 名称前缀配置采样率
+
+    规则按最长前缀匹配，例如 {"llm.": 0.1, "tool.": 0.5}；未命中时使用 default_ratio。
+    基于 trace_id 的确定性采样 (TraceIdRatioBased)，同一 trace 在各节点决策一致。
+    """
+
+    def __init__(self, default_ratio: float = 1.0, rules: dict[str, float] | None = None):
+        self._default = TraceIdRatioBased(default_ratio)
+        # 最长前缀优先
+        self._rules = [
+            (prefix, TraceIdRatioBased(ratio))
+            for prefix, ratio in sorted((rules or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        ]
+
+    def should_sample(
+        self,
+        parent_context,
+        trace_id: int,
+        name: str,
+        kind=None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        sampler = next((s for prefix, s in self._rules if name.startswith(prefix)), self._default)
+        return sampler.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+
+    def get_description(self) -> str:
+        rules = ",".join(f"{prefix}={s.rate}" for prefix, s in self._rules)
+        return f"SpanNameRatioSampler{{default={self._default.rate},{rules}}}"
+
+
+@dataclass
+class TailSamplingStats:
+    """尾部采样统计"""
+
+    buffered_traces: int
+    kept_traces: int
+    dropped_traces: int
+    evicted_traces: int
+    kept_spans: int
+    dropped_spans: int
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    尾部采样处理器：按 trace 缓冲 Span，本地根 Span 结束时整体决策
+
+    满足任一条件则保留整条 trace 并转发给下游处理器 (BatchSpanProcessor 等)：
+    - 任一 Span 状态为 ERROR
+    - 根 Span 耗时超过 latency_threshold_ms
+    - 任一 Span 的 run_id 属性命中 run_id_allowlist
+    缓冲 trace 数超过 max_traces 时，最早的 trace 按已有 Span 提前决策。
+    """
+
+    def __init__(
+        self,
+        processors: list[SpanProcessor],
+        latency_threshold_ms: float | None = None,
+        run_id_allowlist: set[str] | None = None,
+        max_traces: int = 10000,
+        max_spans_per_trace: int = 1000,
+        run_id_attribute: str = "run_id",
+    ):
+        self._processors = processors
+        self.latency_threshold_ms = latency_threshold_ms
+        self.run_id_allowlist = set(run_id_allowlist or ())
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self.run_id_attribute = run_id_attribute
+        self._traces: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._kept_traces = 0
+        self._dropped_traces = 0
+        self._evicted_traces = 0
+        self._kept_spans = 0
+        self._dropped_spans = 0
+
+    def on_start(self, span, parent_context=None) -> None:
+        for processor in self._processors:
+            processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        decided: list[tuple[list[ReadableSpan], ReadableSpan | None]] = []
+
+        with self._lock:
+            spans = self._traces.setdefault(trace_id, [])
+            if len(spans) < self.max_spans_per_trace:
+                spans.append(span)
+            else:
+                self._dropped_spans += 1
+
+            if span.parent is None or span.parent.is_remote:
+                # 本地根 Span 结束：整条 trace 可以决策
+                decided.append((self._traces.pop(trace_id), span))
+
+            while len(self._traces) > self.max_traces:
+                _, evicted = self._traces.popitem(last=False)
+                self._evicted_traces += 1
+                decided.append((evicted, None))
+
+        for trace_spans, root in decided:
+            self._decide(trace_spans, root)
+
+    def _decide(self, spans: list[ReadableSpan], root: ReadableSpan | None) -> None:
+        keep = self.should_keep(spans, root)
+        with self._lock:
+            if keep:
+                self._kept_traces += 1
+                self._kept_spans += len(spans)
+            else:
+                self._dropped_traces += 1
+                self._dropped_spans += len(spans)
+        if keep:
+            for span in spans:
+                for processor in self._processors:
+                    processor.on_end(span)
+
+    def should_keep(self, spans: list[ReadableSpan], root: ReadableSpan | None) -> bool:
+        """保留判定：错误 / 慢 trace / run_id 白名单"""
+        for span in spans:
+            if span.status is not None and span.status.status_code == StatusCode.ERROR:
+                return True
+            if (
+                self.run_id_allowlist
+                and str((span.attributes or {}).get(self.run_id_attribute)) in self.run_id_allowlist
+            ):
+                return True
+
+        if self.latency_threshold_ms is not None:
+            candidates = [root] if root is not None else spans
+            for span in candidates:
+                if span.end_time and (span.end_time - span.start_time) / 1e6 >= self.latency_threshold_ms:
+                    return True
+        return False
+
+    def get_stats(self) -> TailSamplingStats:
+        with self._lock:
+            return TailSamplingStats(
+                buffered_traces=len(self._traces),
+                kept_traces=self._kept_traces,
+                dropped_traces=self._dropped_traces,
+                evicted_traces=self._evicted_traces,
+                kept_spans=self._kept_spans,
+                dropped_spans=self._dropped_spans,
+            )
+
     def shutdown(self) -> None:
-        pass
+        # 未等到根 Span 的 trace 按已有 Span 决策后再关闭下游
+        with self._lock:
+            pending = list(self._traces.values())
+            self._traces.clear()
+        for spans in pending:
+            self._decide(spans, None)
+        for processor in self._processors:
+            processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return all(processor.force_flush(timeout_millis) for processor in self._processors)
 
 
 class TracingManager:
@@ -125,23 +486,55 @@ class TracingManager:
         langfuse_public_key: str | None = None,
         langfuse_secret_key: str | None = None,
         langfuse_host: str | None = None,
+        # PostgreSQL 导出批处理配置
+        pg_max_queue_size: int = 8192,
+        pg_max_export_batch_size: int = 512,
+        pg_schedule_delay_millis: float = 1000,
+        # 头部采样: 默认采样率 + 按 Span 名称前缀的采样率 (子 Span 跟随父 Span 决策)
+        sample_ratio: float = 1.0,
+        sample_rules: dict[str, float] | None = None,
+        # 尾部采样: 开启后仅保留错误 / 慢 / 白名单 run_id 的 trace
+        tail_sampling: bool = False,
+        tail_latency_threshold_ms: float | None = None,
+        tail_run_id_allowlist: set[str] | None = None,
+        tail_max_traces: int = 10000,
+        # 日分区维护: 间隔 (秒)、提前创建天数、保留天数；interval <= 0 时不启动后台任务
+        partition_maintenance_interval: float = 3600.0,
+        partition_days_ahead: int = 3,
+        partition_retention_days: int = 7,
     ):
-        provider = TracerProvider()
+        sampler = None
+        if sample_ratio < 1.0 or sample_rules:
+            sampler = ParentBased(SpanNameRatioSampler(sample_ratio, sample_rules))
+        provider = TracerProvider(sampler=sampler)
+        processors: list[SpanProcessor] = []
+        self.tail_sampler: TailSamplingSpanProcessor | None = None
+        self.pg_exporter: PostgresSpanExporter | None = None
+        self._pg_processor: BoundedBatchSpanProcessor | None = None
 
         # 双路导出配置
         if pg_dsn:
             # PostgreSQL (DSN): 使用同步驱动，推荐用于生产环境
-            provider.add_span_processor(BatchSpanProcessor(PostgresSpanExporter(dsn=pg_dsn)))
+            self.pg_exporter = PostgresSpanExporter(dsn=pg_dsn)
         elif pg_pool:
             # PostgreSQL (Pool): 仅用于旧代码兼容
-            provider.add_span_processor(BatchSpanProcessor(PostgresSpanExporter(pool=pg_pool)))
+            self.pg_exporter = PostgresSpanExporter(pool=pg_pool)
+
+        if self.pg_exporter:
+            self._pg_processor = BoundedBatchSpanProcessor(
+                self.pg_exporter,
+                max_queue_size=pg_max_queue_size,
+                max_export_batch_size=pg_max_export_batch_size,
+                schedule_delay_millis=pg_schedule_delay_millis,
+            )
+            processors.append(self._pg_processor)
 
         # OTLP: 实时可视化 (Langfuse)
         if otlp_exporter:
             # 优先使用注入的 Exporter (测试用)
-            provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
+            processors.append(BatchSpanProcessor(otlp_exporter))
         elif otlp_endpoint:
-            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=otlp_endpoint, insecure=True)))
+            processors.append(BatchSpanProcessor(OTLPSpanExporter(endpoint=otlp_endpoint, insecure=True)))
 
         # Langfuse SDK 集成
         if langfuse_public_key and langfuse_secret_key:
@@ -165,19 +558,67 @@ class TracingManager:
 
         if console_export:
             # Console: 开发调试
-            provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+            processors.append(BatchSpanProcessor(ConsoleSpanExporter()))
+
+        if tail_sampling and processors:
+            self.tail_sampler = TailSamplingSpanProcessor(
+                processors,
+                latency_threshold_ms=tail_latency_threshold_ms,
+                run_id_allowlist=tail_run_id_allowlist,
+                max_traces=tail_max_traces,
+            )
+            provider.add_span_processor(self.tail_sampler)
+        else:
+            for processor in processors:
+                provider.add_span_processor(processor)
 
         trace.set_tracer_provider(provider)
         self.provider = provider
         self._tracer = self.provider.get_tracer(service_name)
+        self._pg_pool = pg_pool
+        self._maintenance_options = {
+            "maintenance_interval": partition_maintenance_interval,
+            "days_ahead": partition_days_ahead,
+            "retention_days": partition_retention_days,
+        }
+        self.analytics: TraceAnalytics | None = None
+
+    async def start(self, pool: asyncpg.Pool | None = None) -> None:
+        """
+        启动 traces 日分区维护 (立即执行一次，之后按间隔执行)
+
+        Args:
+            pool: asyncpg 连接池，默认使用构造时传入的 pg_pool；两者都没有时不做任何事
+        """
+        pool = pool or self._pg_pool
+        if pool is None or self.analytics is not None:
+            return
+        self.analytics = TraceAnalytics(pool, **self._maintenance_options)
+        await self.analytics.start()
+
+    async def stop(self) -> None:
+        """停止分区维护任务"""
+        if self.analytics is not None:
+            await self.analytics.stop()
+            self.analytics = None
+
+    def get_exporter_stats(self) -> dict[str, Any] | None:
+        """获取 PostgreSQL 导出统计：批次/延迟/导出失败丢弃数，以及处理器待导出数与队列满丢弃数"""
+        if not self.pg_exporter or not self._pg_processor:
+            return None
+
+        stats = self.pg_exporter.get_stats()
+        result = asdict(stats)
+        result["avg_latency_ms"] = stats.avg_latency_ms
+        result["queue_size"] = self._pg_processor.queue_size
+        result["queue_dropped_spans"] = self._pg_processor.dropped_spans
+        return result
 
     @asynccontextmanager
     async def span(self, name: str, *, attributes: dict[str, Any] | None = None):
-        """创建 Span 上下文"""
-        with self._tracer.start_as_current_span(name) as span:
-            if attributes:
-                for k, v in attributes.items():
-                    span.set_attribute(k, str(v))
+        """创建 Span 上下文 (属性在创建时传入，供头部采样器按属性决策)"""
+        span_attributes = {k: str(v) for k, v in (attributes or {}).items()}
+        with self._tracer.start_as_current_span(name, attributes=span_attributes) as span:
             try:
                 yield span
                 span.set_status(Status(StatusCode.OK))
@@ -213,3 +654,224 @@ class TracingManager:
             return wrapper
 
         return decorator
+
+
+# ========================================
+# 延迟汇总查询 (trace_latency_rollups)
+# ========================================
+
+# 直方图区间上界 (毫秒)，与 mind_schema.sql 中 trace_latency_bounds_ms() 保持一致
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+@dataclass
+class OperationLatency:
+    """单个 operation 的延迟汇总"""
+
+    operation_name: str
+    span_count: int
+    error_count: int
+    avg_ms: float
+    max_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def histogram_percentile(histogram: list[int], q: float, max_ms: float | None = None) -> float:
+    """
+    由分桶直方图估算分位数 (桶内线性插值)
+
+    溢出桶没有上界，使用 max_ms (若提供) 作为上界。
+    """
+    total = sum(histogram)
+    if total == 0:
+        return 0.0
+
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else 0.0
+            if i < len(LATENCY_BUCKETS_MS):
+                upper = LATENCY_BUCKETS_MS[i]
+            else:
+                upper = max(max_ms or lower, lower)
+            value = lower + (upper - lower) * (rank - seen) / count
+            return min(value, max_ms) if max_ms is not None else value
+        seen += count
+    return float(max_ms if max_ms is not None else LATENCY_BUCKETS_MS[-1])
+
+
+def _merge_histograms(histograms: list[list[int]]) -> list[int]:
+    merged = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for histogram in histograms:
+        for i, count in enumerate(histogram):
+            merged[i] += count
+    return merged
+
+
+class TraceAnalytics:
+    """
+    Trace 看板查询：只读 trace_latency_rollups，不扫描 traces 明细
+
+    使用方式:
+        analytics = TraceAnalytics(pool)
+        await analytics.start()  # 定期维护日分区 (或由 pg_cron 调用)
+        await analytics.rollup()  # 或由 pg_cron 调用 rollup_trace_latency()
+        stats = await analytics.get_operation_latency(since=datetime.now(UTC) - timedelta(hours=1))
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        maintenance_interval: float = 3600.0,
+        days_ahead: int = 3,
+        retention_days: int = 7,
+    ):
+        """
+        Args:
+            pool: asyncpg 连接池
+            maintenance_interval: 后台分区维护间隔 (秒)，<= 0 时 start() 只执行一次维护
+            days_ahead: 提前创建的日分区天数
+            retention_days: 日分区保留天数
+        """
+        self._pool = pool
+        self._maintenance_interval = maintenance_interval
+        self._days_ahead = days_ahead
+        self._retention_days = retention_days
+        self._maintenance_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """立即执行一次分区维护，并启动后台维护任务 (幂等)"""
+        if self._maintenance_task is not None and not self._maintenance_task.done():
+            return
+        await self._maintain_safely()
+        if self._maintenance_interval > 0:
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self) -> None:
+        """停止后台维护任务"""
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+
+    async def maintain(self) -> tuple[int, int]:
+        """创建未来日分区并删除过期分区，返回 (新建分区数, 删除分区数)"""
+        created = await self.ensure_partitions(self._days_ahead)
+        dropped = await self.drop_expired_partitions(self._retention_days)
+        return created, dropped
+
+    async def _maintain_safely(self) -> None:
+        try:
+            await self.maintain()
+        except Exception:
+            logger.exception("Failed to maintain traces partitions")
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._maintenance_interval)
+            await self._maintain_safely()
+
+    async def rollup(self, upto: datetime | None = None) -> int:
+        """按写入时间增量汇总到 upto (默认 NOW() - 2min)，晚导出的 Span 也会计入，返回写入的 rollup 行数"""
+        async with self._pool.acquire() as conn:
+            if upto is None:
+                return await conn.fetchval("SELECT rollup_trace_latency()")
+            return await conn.fetchval("SELECT rollup_trace_latency($1)", upto)
+
+    async def ensure_partitions(self, days_ahead: int = 3) -> int:
+        """提前创建日分区，返回新建分区数"""
+        async with self._pool.acquire() as conn:
+            return await conn.fetchval("SELECT ensure_traces_partitions($1)", days_ahead)
+
+    async def drop_expired_partitions(self, retention_days: int = 7) -> int:
+        """DROP 早于保留期的日分区，返回删除分区数"""
+        async with self._pool.acquire() as conn:
+            return await conn.fetchval("SELECT drop_traces_partitions($1)", retention_days)
+
+    async def get_operation_latency(
+        self,
+        since: datetime,
+        until: datetime | None = None,
+        operation_name: str | None = None,
+    ) -> list[OperationLatency]:
+        """按 operation 汇总 [since, until) 的延迟分位数，按 P99 降序"""
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT operation_name, span_count, error_count,
+                       total_duration_ns, max_duration_ns, histogram
+                FROM trace_latency_rollups
+                WHERE bucket >= $1
+                  AND ($2::timestamptz IS NULL OR bucket < $2)
+                  AND ($3::varchar IS NULL OR operation_name = $3)
+                """,
+                since,
+                until,
+                operation_name,
+            )
+
+        grouped: dict[str, list] = {}
+        for row in rows:
+            grouped.setdefault(row["operation_name"], []).append(row)
+
+        results = [self._summarize(name, op_rows) for name, op_rows in grouped.items()]
+        return sorted(results, key=lambda r: r.p99_ms, reverse=True)
+
+    async def get_latency_timeseries(
+        self,
+        operation_name: str,
+        since: datetime,
+        until: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        """单个 operation 的每分钟延迟曲线"""
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT bucket, span_count, error_count, total_duration_ns, max_duration_ns, histogram
+                FROM trace_latency_rollups
+                WHERE operation_name = $1
+                  AND bucket >= $2
+                  AND ($3::timestamptz IS NULL OR bucket < $3)
+                ORDER BY bucket
+                """,
+                operation_name,
+                since,
+                until,
+            )
+
+        series = []
+        for row in rows:
+            summary = self._summarize(operation_name, [row])
+            series.append(
+                {
+                    "bucket": row["bucket"],
+                    "span_count": summary.span_count,
+                    "error_count": summary.error_count,
+                    "avg_ms": summary.avg_ms,
+                    "p50_ms": summary.p50_ms,
+                    "p99_ms": summary.p99_ms,
+                }
+            )
+        return series
+
+    def _summarize(self, operation_name: str, rows: list) -> OperationLatency:
+        span_count = sum(row["span_count"] for row in rows)
+        total_ns = sum(row["total_duration_ns"] for row in rows)
+        max_ms = max((row["max_duration_ns"] for row in rows), default=0) / 1e6
+        histogram = _merge_histograms([list(row["histogram"]) for row in rows])
+        return OperationLatency(
+            operation_name=operation_name,
+            span_count=span_count,
+            error_count=sum(row["error_count"] for row in rows),
+            avg_ms=total_ns / span_count / 1e6 if span_count else 0.0,
+            max_ms=max_ms,
+            p50_ms=histogram_percentile(histogram, 0.50, max_ms),
+            p95_ms=histogram_percentile(histogram, 0.95, max_ms),
+            p99_ms=histogram_percentile(histogram, 0.99, max_ms),
+        )
@@ -3,10 +3,14 @@
 import asyncio
 import logging
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any
 
 logger = logging.getLogger(__name__)
 
+# 流式进度回调：接收 {"type": "delta" | "batch_completed", ...} 事件
+ProgressCallback = Callable[[dict[str, Any]], Awaitable[None]]
+
 
 class BaseAgent(ABC):
     """Agent 基类，定义统一接口."""
@@ -70,6 +74,21 @@ class BaseAgent(ABC):
             logger.error(f"Error calling skill {skill_name}: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    async def stream_skill(self, skill_name: str, params: dict[str, Any]) -> AsyncIterator[str]:
+        """流式调用 Claude Skill，逐段产出生成的文本.
+
+        Args:
+            skill_name: Skill 名称（支持 zh-translator、heartfelt）
+            params: Skill 参数
+
+        Yields:
+            文本增量
+        """
+        from .skills import SkillInvoker
+
+        async for text in SkillInvoker().stream_skill(skill_name, params):
+            yield text
+
     async def batch_call_skill(self, calls: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """批量调用 Skills，提高并发性能.
 
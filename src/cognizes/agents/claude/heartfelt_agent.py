@@ -5,6 +5,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from cognizes.agents.utils import get_output_dir
+
 from .base import BaseAgent
 
 logger = logging.getLogger(__name__)
@@ -162,8 +164,7 @@ class HeartfeltAgent(BaseAgent):
             data: 分析数据
         """
         try:
-            category = paper_id.split("_")[0] if "_" in paper_id else "general"
-            output_dir = self.papers_dir / "heartfelt" / category
+            output_dir = get_output_dir(self.papers_dir, "heartfelt", paper_id)
             output_dir.mkdir(parents=True, exist_ok=True)
 
             # 保存主分析内容
@@ -205,8 +206,8 @@ class HeartfeltAgent(BaseAgent):
             阅读报告
         """
         try:
-            category = paper_id.split("_")[0] if "_" in paper_id else "general"
-            analysis_file = self.papers_dir / "heartfelt" / category / f"{paper_id}_analysis.json"
+            output_dir = get_output_dir(self.papers_dir, "heartfelt", paper_id)
+            analysis_file = output_dir / f"{paper_id}_analysis.json"
 
             if not analysis_file.exists():
                 return {"success": False, "error": "Analysis not found"}
@@ -221,7 +222,7 @@ class HeartfeltAgent(BaseAgent):
             report = self._generate_report_content(analysis_data)
 
             # 保存报告
-            report_file = self.papers_dir / "heartfelt" / category / f"{paper_id}_report.md"
+            report_file = output_dir / f"{paper_id}_report.md"
             with open(report_file, "w", encoding="utf-8") as f:
                 f.write(report)
 
@@ -0,0 +1,137 @@
+"""Shared Anthropic client and request limiter for the skills layer.
+
+SkillInvoker is created for every skill call, so the client (and its HTTP connection pool)
+lives here and is shared by all invokers with the same credentials. Every Claude request goes
+through a process-wide LLMRateLimiter that bounds in-flight requests and, optionally, the
+request rate, so concurrent batches run in parallel without overrunning API limits.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import anthropic
+import httpx
+
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "20"))
+ANTHROPIC_KEEPALIVE_EXPIRY = float(os.getenv("ANTHROPIC_KEEPALIVE_EXPIRY", "60"))
+ANTHROPIC_TIMEOUT = float(os.getenv("ANTHROPIC_TIMEOUT", "600"))
+ANTHROPIC_MAX_RETRIES = int(os.getenv("ANTHROPIC_MAX_RETRIES", "3"))
+ANTHROPIC_MAX_CONCURRENCY = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "8"))
+ANTHROPIC_REQUESTS_PER_MINUTE = float(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "0"))
+
+_clients: dict[tuple[str, str | None], anthropic.AsyncAnthropic] = {}
+_clients_lock = threading.Lock()
+
+
+def get_anthropic_client(api_key: str, base_url: str | None = None) -> anthropic.AsyncAnthropic:
+    """Return the shared async client for the given credentials.
+
+    Args:
+        api_key: Anthropic API key
+        base_url: Optional API base URL
+
+    Returns:
+        AsyncAnthropic client backed by a keep-alive connection pool
+    """
+    key = (api_key, base_url or None)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            http_client = anthropic.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=ANTHROPIC_MAX_CONNECTIONS,
+                    max_keepalive_connections=ANTHROPIC_MAX_CONNECTIONS,
+                    keepalive_expiry=ANTHROPIC_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(ANTHROPIC_TIMEOUT, connect=10.0),
+            )
+            kwargs = {"base_url": base_url} if base_url else {}
+            client = _clients[key] = anthropic.AsyncAnthropic(
+                api_key=api_key, max_retries=ANTHROPIC_MAX_RETRIES, http_client=http_client, **kwargs
+            )
+        return client
+
+
+async def close_anthropic_clients() -> None:
+    """Close all shared clients (call on application shutdown)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        await client.close()
+
+
+class LLMRateLimiter:
+    """Bounds concurrent Claude requests and, optionally, requests per minute.
+
+    Concurrency is limited by a semaphore; the request rate by a token bucket that holds
+    up to one second's worth of requests. The asyncio primitives are recreated when the
+    running event loop changes, so the process-wide instance survives multiple loops.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = ANTHROPIC_MAX_CONCURRENCY,
+        requests_per_minute: float = ANTHROPIC_REQUESTS_PER_MINUTE,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum number of in-flight requests
+            requests_per_minute: Request rate limit, 0 disables rate limiting
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate = requests_per_minute / 60
+        self.capacity = max(1.0, self.rate)
+        self.in_flight = 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._rate_lock = asyncio.Lock()
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._rate_lock = asyncio.Lock()
+
+    async def _wait_for_token(self) -> None:
+        async with self._rate_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a request slot for the duration of the block."""
+        self._bind()
+        async with self._semaphore:
+            if self.rate > 0:
+                await self._wait_for_token()
+            self.in_flight += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+
+
+_limiter: LLMRateLimiter | None = None
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """Return the process-wide request limiter."""
+    global _limiter
+    if _limiter is None:
+        _limiter = LLMRateLimiter()
+    return _limiter
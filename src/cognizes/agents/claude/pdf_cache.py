@@ -0,0 +1,155 @@
+"""Persistent per-page PDF extraction cache backed by SQLite.
+
+Extracted page text and tables are stored under (file SHA-256, extractor options, page
+number), so repeated pdf-reader calls on the same file (another page_range, or the
+translate and heartfelt stages of one workflow) only parse pages not seen before.
+Document page count and metadata are cached per file hash as well. The least recently
+used documents are evicted beyond PDF_PAGE_CACHE_MAX_DOCUMENTS.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from .pdf_extraction import DocumentInfo, PageContent
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "pages.sqlite3"
+PDF_PAGE_CACHE_MAX_DOCUMENTS = 500
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS documents (
+    sha256     TEXT PRIMARY KEY,
+    page_count INTEGER NOT NULL,
+    metadata   TEXT NOT NULL,
+    last_used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_last_used ON documents (last_used);
+CREATE TABLE IF NOT EXISTS pages (
+    sha256  TEXT NOT NULL,
+    options TEXT NOT NULL,
+    page    INTEGER NOT NULL,
+    text    TEXT NOT NULL,
+    tables  TEXT NOT NULL,
+    PRIMARY KEY (sha256, options, page)
+);
+"""
+
+
+class PageCache:
+    """Per-page extraction cache."""
+
+    _instances: dict[Path, "PageCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: Path, max_documents: int = PDF_PAGE_CACHE_MAX_DOCUMENTS) -> None:
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            max_documents: Number of documents kept before least recently used ones are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.db_path = self.cache_dir / CACHE_FILENAME
+        self.max_documents = max_documents
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, cache_dir: Path) -> "PageCache":
+        """Return the shared cache for a directory (one connection per process)."""
+        key = Path(cache_dir).resolve()
+        with cls._instances_lock:
+            cache = cls._instances.get(key)
+            if cache is None:
+                cache = cls._instances[key] = cls(cache_dir)
+            return cache
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA_SQL)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_document(self, sha256: str) -> DocumentInfo | None:
+        """Return the cached page count and metadata of a file, marking it as recently used."""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT page_count, metadata FROM documents WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE documents SET last_used = ? WHERE sha256 = ?", (time.time(), sha256))
+        return DocumentInfo(page_count=row[0], metadata=json.loads(row[1]))
+
+    def put_document(self, sha256: str, document: DocumentInfo) -> None:
+        """Cache the page count and metadata of a file, evicting least recently used documents."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO documents (sha256, page_count, metadata, last_used) VALUES (?, ?, ?, ?)",
+                    (sha256, document.page_count, json.dumps(document.metadata, default=str), time.time()),
+                )
+                evicted = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT sha256 FROM documents ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                        (self.max_documents,),
+                    )
+                ]
+                for old in evicted:
+                    conn.execute("DELETE FROM documents WHERE sha256 = ?", (old,))
+                    conn.execute("DELETE FROM pages WHERE sha256 = ?", (old,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def get_pages(self, sha256: str, options: str, start: int, end: int) -> dict[int, PageContent]:
+        """Return the cached pages in [start, end) (0-indexed), keyed by page index."""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT page, text, tables FROM pages WHERE sha256 = ? AND options = ? AND page >= ? AND page < ?",
+                    (sha256, options, start + 1, end + 1),
+                )
+                .fetchall()
+            )
+        return {page - 1: PageContent(number=page, text=text, tables=json.loads(tables)) for page, text, tables in rows}
+
+    def put_pages(self, sha256: str, options: str, pages: list[PageContent]) -> None:
+        """Cache extracted pages."""
+        rows: list[tuple[Any, ...]] = [
+            (sha256, options, page.number, page.text, json.dumps(page.tables)) for page in pages
+        ]
+        with self._lock:
+            self._connect().executemany(
+                "INSERT OR REPLACE INTO pages (sha256, options, page, text, tables) VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+
+def get_page_cache() -> PageCache | None:
+    """Return the configured cache, or None when PDF_PAGE_CACHE_DIR is empty."""
+    from cognizes.agents.config import settings
+
+    if not settings.PDF_PAGE_CACHE_DIR:
+        return None
+    return PageCache.for_directory(Path(settings.PDF_PAGE_CACHE_DIR))
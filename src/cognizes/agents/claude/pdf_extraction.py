@@ -0,0 +1,250 @@
+"""Off-loop, page-parallel PDF extraction for the pdf-reader skill.
+
+pdfplumber parsing is synchronous and CPU-bound, so it never runs on the event loop:
+short page ranges are extracted in a worker thread, longer ones are split into page
+chunks that are extracted in parallel in a process pool. Pages are yielded in document
+order as soon as every earlier chunk has finished.
+
+Pages and document info are looked up in the per-page cache (pdf_cache) first, keyed by
+the file's SHA-256, so only pages not extracted before are parsed.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import pdfplumber
+
+from cognizes.agents.utils import get_file_hash
+
+if TYPE_CHECKING:
+    from .pdf_cache import PageCache
+
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "16"))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+@dataclass
+class PageContent:
+    """Extracted content of a single page."""
+
+    number: int  # 1-based page number
+    text: str
+    tables: list[list[list[str]]] = field(default_factory=list)
+
+
+@dataclass
+class DocumentInfo:
+    """Page count and document metadata."""
+
+    page_count: int
+    metadata: dict[str, Any]
+
+
+def read_document_info(file_path: str) -> DocumentInfo:
+    """Read the page count and metadata of a PDF.
+
+    Args:
+        file_path: Path to the PDF file
+
+    Returns:
+        Document page count and metadata
+    """
+    with pdfplumber.open(file_path) as pdf:
+        metadata = {}
+        if hasattr(pdf, "metadata") and pdf.metadata:
+            metadata = {
+                "title": pdf.metadata.get("Title", ""),
+                "author": pdf.metadata.get("Author", ""),
+                "creator": pdf.metadata.get("Creator", ""),
+                "producer": pdf.metadata.get("Producer", ""),
+                "creation_date": str(pdf.metadata.get("CreationDate", "")),
+                "modification_date": str(pdf.metadata.get("ModDate", "")),
+            }
+        return DocumentInfo(page_count=len(pdf.pages), metadata=metadata)
+
+
+def extract_pages(file_path: str, start: int, end: int, extract_tables: bool = True) -> list[PageContent]:
+    """Extract text and tables from the pages in [start, end) (0-indexed).
+
+    Args:
+        file_path: Path to the PDF file
+        start: First page index (inclusive)
+        end: Last page index (exclusive)
+        extract_tables: Whether to extract tables
+
+    Returns:
+        Extracted pages in document order
+    """
+    return extract_page_list(file_path, list(range(start, end)), extract_tables)
+
+
+def extract_page_list(file_path: str, indexes: list[int], extract_tables: bool = True) -> list[PageContent]:
+    """Extract text and tables from the given pages (0-indexed).
+
+    Runs in a worker thread or pool process; opens the PDF itself so that only the
+    path and the picklable results cross the process boundary.
+
+    Args:
+        file_path: Path to the PDF file
+        indexes: Page indexes in ascending order
+        extract_tables: Whether to extract tables
+
+    Returns:
+        Extracted pages in the order of indexes
+    """
+    pages = []
+    with pdfplumber.open(file_path) as pdf:
+        for index in indexes:
+            page = pdf.pages[index]
+            tables = []
+            if extract_tables:
+                for table in page.extract_tables():
+                    if table:
+                        # Filter out None values and ensure all cells are strings
+                        tables.append([[str(cell) if cell is not None else "" for cell in row] for row in table])
+            pages.append(PageContent(number=index + 1, text=page.extract_text() or "", tables=tables))
+    return pages
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs an event loop and thread pools is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_pdf_workers() -> None:
+    """Shut down the extraction process pool (call on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extraction_options(extract_tables: bool) -> str:
+    """Cache key part for the extractor and its options (a new pdfplumber version invalidates pages)."""
+    return f"pdfplumber={pdfplumber.__version__};tables={int(extract_tables)}"
+
+
+def _file_sha256(file_path: str) -> str | None:
+    try:
+        return get_file_hash(file_path, algorithm="sha256")
+    except OSError:
+        return None
+
+
+def _resolve_cache(cache: "PageCache | None") -> "PageCache | None":
+    if cache is not None:
+        return cache
+    from .pdf_cache import get_page_cache
+
+    return get_page_cache()
+
+
+async def file_sha256(file_path: str) -> str | None:
+    """Hash a file off the event loop; None if it cannot be read (extraction then bypasses the cache)."""
+    return await asyncio.to_thread(_file_sha256, file_path)
+
+
+async def load_document_info(
+    file_path: str, sha256: str | None = None, cache: "PageCache | None" = None
+) -> DocumentInfo:
+    """Read page count and metadata off the event loop, from the cache when available.
+
+    Args:
+        file_path: Path to the PDF file
+        sha256: File hash (see file_sha256); None bypasses the cache
+        cache: Page cache, defaults to the configured one
+
+    Returns:
+        Document page count and metadata
+    """
+    cache = _resolve_cache(cache) if sha256 else None
+    if cache and sha256:
+        document = await asyncio.to_thread(cache.get_document, sha256)
+        if document is not None:
+            return document
+
+    document = await asyncio.to_thread(read_document_info, file_path)
+    if cache and sha256:
+        await asyncio.to_thread(cache.put_document, sha256, document)
+    return document
+
+
+async def iter_pages(
+    file_path: str,
+    start: int,
+    end: int,
+    extract_tables: bool = True,
+    pages_per_chunk: int = PDF_PAGES_PER_CHUNK,
+    sha256: str | None = None,
+    cache: "PageCache | None" = None,
+) -> AsyncIterator[PageContent]:
+    """Extract pages [start, end) off the event loop, yielding them in order.
+
+    Cached pages are served from the page cache; the remaining pages are extracted in a
+    worker thread, or in parallel chunks in the process pool when there are more than
+    pages_per_chunk of them, and written back to the cache.
+
+    Args:
+        file_path: Path to the PDF file
+        start: First page index (inclusive)
+        end: Last page index (exclusive)
+        extract_tables: Whether to extract tables
+        pages_per_chunk: Pages per parallel extraction task
+        sha256: File hash (see file_sha256); None bypasses the cache
+        cache: Page cache, defaults to the configured one
+
+    Yields:
+        Extracted pages in document order
+    """
+    cache = _resolve_cache(cache) if sha256 else None
+    options = extraction_options(extract_tables)
+    cached: dict[int, PageContent] = {}
+    if cache and sha256:
+        cached = await asyncio.to_thread(cache.get_pages, sha256, options, start, end)
+
+    missing = [index for index in range(start, end) if index not in cached]
+    if len(missing) <= pages_per_chunk or PDF_EXTRACT_WORKERS <= 1:
+        batches = [missing] if missing else []
+        use_pool = False
+    else:
+        batches = [missing[i : i + pages_per_chunk] for i in range(0, len(missing), pages_per_chunk)]
+        use_pool = True
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool() if use_pool else None
+    chunks: list[asyncio.Future[list[PageContent]]] = [
+        loop.run_in_executor(pool, extract_page_list, file_path, batch, extract_tables)
+        if pool is not None
+        else asyncio.ensure_future(asyncio.to_thread(extract_page_list, file_path, batch, extract_tables))
+        for batch in batches
+    ]
+    chunk_of = {index: n for n, batch in enumerate(batches) for index in batch}
+    try:
+        for index in range(start, end):
+            if index not in cached:
+                # First page of a not yet merged chunk: wait for the chunk and cache all of its pages
+                pages = await chunks[chunk_of[index]]
+                cached.update((page.number - 1, page) for page in pages)
+                if cache and sha256:
+                    await asyncio.to_thread(cache.put_pages, sha256, options, pages)
+            yield cached[index]
+    finally:
+        # Caller stopped early or a chunk failed: drop chunks that have not started
+        for chunk in chunks:
+            chunk.cancel()
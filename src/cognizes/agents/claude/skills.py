@@ -1,16 +1,19 @@
 """Skill implementation for Claude Agent Skills fallback."""
 
+import asyncio
 import logging
 import os
 import re
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import Any
 
-import anthropic
 import httpx
-import pdfplumber
 from bs4 import BeautifulSoup
 
+from .llm_client import get_anthropic_client, get_rate_limiter
+from .pdf_extraction import PageContent, file_sha256, iter_pages, load_document_info
+
 try:
     from marko.ext.gfm import GFM
 except ImportError:
@@ -35,11 +38,8 @@ class SkillInvoker:
         base_url = os.getenv("ANTHROPIC_BASE_URL")
 
         if api_key:
-            # Only pass base_url if it's configured
-            if base_url:
-                self.anthropic_client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
-            else:
-                self.anthropic_client = anthropic.Anthropic(api_key=api_key)
+            # Shared AsyncAnthropic client: invokers are created per call, the connection pool is not
+            self.anthropic_client = get_anthropic_client(api_key, base_url or None)
 
         # Registry of available skills
         self.skill_registry = {
@@ -80,6 +80,56 @@ class SkillInvoker:
                 "error_type": type(e).__name__,
             }
 
+    async def stream_skill(self, skill_name: str, params: dict[str, Any]) -> AsyncIterator[str]:
+        """Stream the text output of an LLM-backed skill.
+
+        Supported for zh-translator and heartfelt, whose text deltas are yielded as Claude
+        produces them, and for pdf-reader, which yields the Markdown of each page in order
+        as extraction progresses.
+
+        Args:
+            skill_name: Name of the skill to stream
+            params: Same parameters as the non-streaming skill
+
+        Yields:
+            Text deltas
+
+        Raises:
+            ValueError: If the skill does not support streaming or no content is provided
+            RuntimeError: If the Anthropic API key is not configured (zh-translator)
+        """
+        if skill_name == "pdf-reader":
+            async for text in self._stream_pdf_pages(params):
+                yield text
+            return
+
+        content = params.get("content") or params.get("text") or ""
+        if skill_name == "zh-translator":
+            if not content:
+                raise ValueError("No content provided")
+            if not self.anthropic_client:
+                raise RuntimeError("Anthropic API key not configured")
+            prompt, max_tokens = self._translation_prompt(content), 4000
+        elif skill_name == "heartfelt":
+            analysis_type = params.get("analysis_type", "comprehensive")
+            if not self.anthropic_client:
+                # Same offline fallback as the non-streaming skill, as a single chunk
+                result = await self._handle_heartfelt(params)
+                yield result["analysis"]
+                return
+            prompt, max_tokens = self._heartfelt_prompt(content, analysis_type), 2000
+        else:
+            raise ValueError(f"Streaming not supported for skill: {skill_name}")
+
+        async with get_rate_limiter().slot():
+            async with self.anthropic_client.messages.stream(
+                model="claude-3-sonnet-20240229",
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}],
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+
     async def _handle_pdf_reader(self, params: dict[str, Any]) -> dict[str, Any]:
         """Handle PDF reading and conversion to Markdown.
 
@@ -102,89 +152,36 @@ class SkillInvoker:
                 "error_type": "ValueError",
             }
 
-        # Handle URLs by downloading first
-        if file_path.startswith(("http://", "https://")):
-            # Download PDF from URL
-            async with httpx.AsyncClient() as client:
-                response = await client.get(file_path)
-                response.raise_for_status()
-                # Save to temporary file
-                temp_path = Path("/tmp") / f"temp_{os.getpid()}.pdf"
-                with open(temp_path, "wb") as f:
-                    f.write(response.content)
-                file_path = str(temp_path)
-                cleanup_temp = True
-        else:
-            # Convert relative to absolute path
-            if not os.path.isabs(file_path):
-                file_path = os.path.abspath(file_path)
-            cleanup_temp = False
+        file_path, cleanup_temp = await self._resolve_pdf_path(file_path)
 
         try:
-            # Extract content using pdfplumber for better text extraction
+            # Extract content using pdfplumber: cached pages are reused, the rest is extracted off the event loop
             content_parts = []
-            metadata = {}
             assets: dict[str, Any] = {"images": [], "tables": 0, "formulas": 0}
 
-            with pdfplumber.open(file_path) as pdf:
-                # Extract metadata
-                if hasattr(pdf, "metadata") and pdf.metadata:
-                    metadata = {
-                        "title": pdf.metadata.get("Title", ""),
-                        "author": pdf.metadata.get("Author", ""),
-                        "creator": pdf.metadata.get("Creator", ""),
-                        "producer": pdf.metadata.get("Producer", ""),
-                        "creation_date": str(pdf.metadata.get("CreationDate", "")),
-                        "modification_date": str(pdf.metadata.get("ModDate", "")),
-                    }
+            sha256 = await file_sha256(file_path)
+            document = await load_document_info(file_path, sha256)
+            metadata = document.metadata
+            start_page, end_page = self._page_bounds(params.get("page_range"), document.page_count)
 
-                # Get page range - page_range is [start, end) where end is exclusive (0-indexed)
-                page_range = params.get("page_range")
-                if page_range and len(page_range) >= 2:
-                    start_page = max(0, int(page_range[0]))
-                    end_page = min(len(pdf.pages), int(page_range[1]))
-                    # Slice format already uses exclusive end
-                    pages_to_process = pdf.pages[start_page:end_page]
-                else:
-                    start_page = 0
-                    end_page = len(pdf.pages)
-                    pages_to_process = pdf.pages
-
-                total_words = 0
-                for i, page in enumerate(pages_to_process):
-                    page_num = start_page + i + 1
-                    text = page.extract_text() or ""
-
-                    # Add page header
-                    content_parts.append(f"\n\n## Page {page_num}\n\n")
-
-                    # Add extracted text
-                    if text.strip():
-                        content_parts.append(text)
-                        total_words += len(text.split())
-
-                    # Extract tables if requested
-                    if params.get("extract_tables", True):
-                        tables = page.extract_tables()
-                        for table in tables:
-                            if table:
-                                assets["tables"] += 1
-                                # Convert table to markdown
-                                # Filter out None values and ensure all cells are strings
-                                clean_table = [[str(cell) if cell is not None else "" for cell in row] for row in table]
-                                markdown_table = self._convert_table_to_markdown(clean_table)
-                                content_parts.append(f"\n\n{markdown_table}\n")
-
-                # Combine all content
-                full_content = "\n".join(content_parts)
-
-                # Add metadata header
-                if metadata:
-                    metadata_header = "\n## Document Metadata\n\n"
-                    for key, value in metadata.items():
-                        if value:
-                            metadata_header += f"- **{key.title()}**: {value}\n"
-                    full_content = metadata_header + "\n" + full_content
+            total_words = 0
+            extract_tables = params.get("extract_tables", True)
+            async for page in iter_pages(file_path, start_page, end_page, extract_tables, sha256=sha256):
+                content_parts.extend(self._render_page(page))
+                if page.text.strip():
+                    total_words += len(page.text.split())
+                assets["tables"] += len(page.tables)
+
+            # Combine all content
+            full_content = "\n".join(content_parts)
+
+            # Add metadata header
+            if metadata:
+                metadata_header = "\n## Document Metadata\n\n"
+                for key, value in metadata.items():
+                    if value:
+                        metadata_header += f"- **{key.title()}**: {value}\n"
+                full_content = metadata_header + "\n" + full_content
 
             # Cleanup temp file if downloaded from URL
             if cleanup_temp:
@@ -236,6 +233,59 @@ class SkillInvoker:
             # Re-raise other exceptions to be caught by the outer handler
             raise e
 
+    async def _stream_pdf_pages(self, params: dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the Markdown of each extracted page in order as soon as it is available."""
+        file_path = params.get("file_path") or params.get("url") or params.get("pdf_path") or params.get("pdf_source")
+        if not file_path:
+            raise ValueError("No file_path, url, or pdf_source provided")
+
+        file_path, cleanup_temp = await self._resolve_pdf_path(file_path)
+        try:
+            sha256 = await file_sha256(file_path)
+            document = await load_document_info(file_path, sha256)
+            start_page, end_page = self._page_bounds(params.get("page_range"), document.page_count)
+            separator = ""
+            extract_tables = params.get("extract_tables", True)
+            async for page in iter_pages(file_path, start_page, end_page, extract_tables, sha256=sha256):
+                yield separator + "\n".join(self._render_page(page))
+                separator = "\n"
+        finally:
+            if cleanup_temp and os.path.exists(file_path):
+                os.unlink(file_path)
+
+    async def _resolve_pdf_path(self, file_path: str) -> tuple[str, bool]:
+        """Download URLs to a temporary file and make local paths absolute.
+
+        Returns:
+            Local path and whether it is a temporary file to delete afterwards
+        """
+        if not file_path.startswith(("http://", "https://")):
+            return os.path.abspath(file_path), False
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get(file_path)
+            response.raise_for_status()
+        # Save to temporary file
+        temp_path = Path("/tmp") / f"temp_{os.getpid()}_{id(response)}.pdf"
+        await asyncio.to_thread(temp_path.write_bytes, response.content)
+        return str(temp_path), True
+
+    @staticmethod
+    def _page_bounds(page_range: list[int] | None, page_count: int) -> tuple[int, int]:
+        """Resolve page_range [start, end) (0-indexed, end exclusive) against the page count."""
+        if page_range and len(page_range) >= 2:
+            return max(0, int(page_range[0])), min(page_count, int(page_range[1]))
+        return 0, page_count
+
+    def _render_page(self, page: PageContent) -> list[str]:
+        """Render an extracted page as Markdown parts (page header, text, tables)."""
+        parts = [f"\n\n## Page {page.number}\n\n"]
+        if page.text.strip():
+            parts.append(page.text)
+        for table in page.tables:
+            parts.append(f"\n\n{self._convert_table_to_markdown(table)}\n")
+        return parts
+
     async def _handle_web_translator(self, params: dict[str, Any]) -> dict[str, Any]:
         """Handle web page content extraction and conversion to Markdown.
 
@@ -397,33 +447,15 @@ class SkillInvoker:
 
         try:
             # Create translation prompt
-            prompt = f"""Please translate the following Markdown content to Chinese while preserving:
-
-1. All formatting (headers, lists, bold, italic, etc.)
-2. Code blocks and inline code
-3. URLs and file paths
-4. LaTeX mathematical formulas
-5. HTML tags
-6. Special characters and emojis
-
-Do not translate:
-- Code blocks
-- URLs
-- File paths
-- Technical terms that should remain in English
-
-Here is the content to translate:
-
-{content}
-
-Please provide only the translated content without any explanations."""
+            prompt = self._translation_prompt(content)
 
             # Call Claude API
-            response = await self.anthropic_client.messages.create(  # type: ignore[misc]
-                model="claude-3-sonnet-20240229",
-                max_tokens=4000,
-                messages=[{"role": "user", "content": prompt}],
-            )
+            async with get_rate_limiter().slot():
+                response = await self.anthropic_client.messages.create(
+                    model="claude-3-sonnet-20240229",
+                    max_tokens=4000,
+                    messages=[{"role": "user", "content": prompt}],
+                )
 
             # Extract text from response content
             translated_content = ""
@@ -472,8 +504,6 @@ Please provide only the translated content without any explanations."""
                 translated_content = str(response)
 
             # Ensure we're not returning a coroutine
-            import asyncio
-
             # Check if it's actually a coroutine object that wasn't handled
             if asyncio.iscoroutine(translated_content) or "coroutine" in str(type(translated_content)):
                 # If we somehow have a coroutine, await it
@@ -649,33 +679,15 @@ Please provide only the translated content without any explanations."""
 
         try:
             # Create analysis prompt
-            if analysis_type == "comprehensive":
-                prompt = f"""Please provide a heartfelt, comprehensive analysis of the following document content. Include:
-
-1. Key themes and main ideas
-2. Emotional tone and sentiment
-3. Important insights and takeaways
-4. Personal reflections and connections
-5. Actionable conclusions
-
-Content to analyze:
-
-{content}
-
-Please provide a thoughtful, human-like analysis that goes beyond simple summary."""
-            else:
-                prompt = f"""Please analyze the following document content from a heartfelt perspective:
-
-{content}
-
-Focus on the emotional and human aspects of the content."""
+            prompt = self._heartfelt_prompt(content, analysis_type)
 
             # Call Claude API
-            response = self.anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}],
-            )
+            async with get_rate_limiter().slot():
+                response = await self.anthropic_client.messages.create(
+                    model="claude-3-sonnet-20240229",
+                    max_tokens=2000,
+                    messages=[{"role": "user", "content": prompt}],
+                )
 
             # Extract text from response content
             analysis = ""
@@ -689,8 +701,6 @@ Focus on the emotional and human aspects of the content."""
                         text_value = block.text
 
                         # Check if it's a coroutine (happens with some AsyncMock configurations)
-                        import asyncio
-
                         if asyncio.iscoroutine(text_value):
                             text_value = await text_value
                             analysis = str(text_value)
@@ -833,7 +843,7 @@ Focus on the emotional and human aspects of the content."""
 
             for i in range(0, len(items), batch_size):
                 batch = items[i : i + batch_size]
-                batch_results = []
+                calls = []
 
                 for item in batch:
                     # Prepare skill parameters with current item
@@ -842,12 +852,10 @@ Focus on the emotional and human aspects of the content."""
                         item_params.update(item)
                     else:
                         item_params["content"] = str(item)
+                    calls.append(self.call_skill(skill_name, item_params))
 
-                    # Call the skill
-                    result = await self.call_skill(skill_name, item_params)
-                    batch_results.append(result)
-
-                results.extend(batch_results)
+                # Items in a batch run concurrently; Claude requests are bounded by the shared rate limiter
+                results.extend(await asyncio.gather(*calls))
 
             # Count successes and failures
             success_count = sum(1 for r in results if r.get("success", False))
@@ -864,6 +872,53 @@ Focus on the emotional and human aspects of the content."""
                 },
             }
 
+    @staticmethod
+    def _translation_prompt(content: str) -> str:
+        """Build the zh-translator prompt."""
+        return f"""Please translate the following Markdown content to Chinese while preserving:
+
+1. All formatting (headers, lists, bold, italic, etc.)
+2. Code blocks and inline code
+3. URLs and file paths
+4. LaTeX mathematical formulas
+5. HTML tags
+6. Special characters and emojis
+
+Do not translate:
+- Code blocks
+- URLs
+- File paths
+- Technical terms that should remain in English
+
+Here is the content to translate:
+
+{content}
+
+Please provide only the translated content without any explanations."""
+
+    @staticmethod
+    def _heartfelt_prompt(content: str, analysis_type: str) -> str:
+        """Build the heartfelt analysis prompt."""
+        if analysis_type == "comprehensive":
+            return f"""Please provide a heartfelt, comprehensive analysis of the following document content. Include:
+
+1. Key themes and main ideas
+2. Emotional tone and sentiment
+3. Important insights and takeaways
+4. Personal reflections and connections
+5. Actionable conclusions
+
+Content to analyze:
+
+{content}
+
+Please provide a thoughtful, human-like analysis that goes beyond simple summary."""
+        return f"""Please analyze the following document content from a heartfelt perspective:
+
+{content}
+
+Focus on the emotional and human aspects of the content."""
+
     def _convert_table_to_markdown(self, table: list[list[str]]) -> str:
         """Convert a table to Markdown format.
 
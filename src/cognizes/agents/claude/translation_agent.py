@@ -1,14 +1,22 @@
 """Translation Agent - 封装翻译功能."""
 
+import asyncio
 import logging
 from pathlib import Path
 from typing import Any
 
-from .base import BaseAgent
+from cognizes.agents.utils import get_output_dir
+
+from .base import BaseAgent, ProgressCallback
 
 logger = logging.getLogger(__name__)
 
 
+def _append_text(path: Path, text: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
 class TranslationAgent(BaseAgent):
     """翻译处理专用 Agent."""
 
@@ -51,6 +59,7 @@ class TranslationAgent(BaseAgent):
                 "preserve_code": options["preserve_code"],
                 "preserve_formulas": options["preserve_formulas"],
                 "paper_id": input_data.get("paper_id"),
+                "on_progress": input_data.get("on_progress"),
             }
         )
 
@@ -69,12 +78,28 @@ class TranslationAgent(BaseAgent):
         preserve_code = params.get("preserve_code", True)
         preserve_formulas = params.get("preserve_formulas", True)
         paper_id = params.get("paper_id")
+        on_progress = params.get("on_progress")
 
         try:
             # 检查内容长度，决定是否需要批处理
             content_length = len(content)
             batch_size = self.default_options["batch_size"]
 
+            if on_progress is not None:
+                # 流式翻译：增量推送文本并按批次写入译文文件
+                return await self._translate_stream(
+                    {
+                        "content": content,
+                        "target_language": target_language,
+                        "preserve_format": preserve_format,
+                        "preserve_code": preserve_code,
+                        "preserve_formulas": preserve_formulas,
+                        "batch_size": batch_size,
+                        "paper_id": paper_id,
+                    },
+                    on_progress,
+                )
+
             if content_length <= int(batch_size):
                 # 单次翻译
                 result = await self._translate_single(
@@ -181,6 +206,8 @@ class TranslationAgent(BaseAgent):
         translated_batches = []
         total_word_count = 0
 
+        failed_batches = []
+
         for i, result in enumerate(results):
             if isinstance(result, dict) and result.get("success"):
                 translated_batches.append(result["data"])
@@ -190,6 +217,7 @@ class TranslationAgent(BaseAgent):
                 # 使用原文作为后备
                 translated_batches.append(batches[i])
                 total_word_count += len(batches[i].split())
+                failed_batches.append(i)
 
         # 合并翻译内容
         translated_content = "".join(translated_batches)
@@ -204,6 +232,99 @@ class TranslationAgent(BaseAgent):
                 "content": translated_content,
                 "word_count": total_word_count,
                 "batch_count": len(batches),
+                "failed_batches": failed_batches,
+            },
+        }
+
+    async def _translate_stream(self, params: dict[str, Any], on_progress: ProgressCallback) -> dict[str, Any]:
+        """流式批量翻译.
+
+        各批次并发流式翻译（并发度由 Claude 请求限流器控制），文本增量通过 on_progress 推送；
+        批次完成后按原文顺序追加写入译文文件，前面的批次写入后即可读取部分译文。
+        失败的批次以原文代替并记录在 failed_batches 中；全部批次失败时删除译文文件并返回失败。
+
+        Args:
+            params: 批量翻译参数
+            on_progress: 进度回调，接收 delta（batch、text）与 batch_completed（completed、total）事件
+
+        Returns:
+            翻译结果
+        """
+        content = params["content"]
+        paper_id = params.get("paper_id")
+        batches = self._split_content(content, params["batch_size"]) or [content]
+        total = len(batches)
+
+        output_file = self._get_translation_path(paper_id) if paper_id else None
+        if output_file:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(output_file.write_text, "", encoding="utf-8")
+
+        translated: list[str | None] = [None] * total
+        errors: dict[int, str] = {}
+        written = 0
+        completed = 0
+        write_lock = asyncio.Lock()
+
+        async def emit(event: dict[str, Any]) -> None:
+            try:
+                await on_progress(event)
+            except Exception as e:
+                logger.warning(f"Translation progress callback failed: {str(e)}")
+
+        async def translate_batch(index: int, batch: str) -> None:
+            nonlocal written, completed
+            parts: list[str] = []
+            try:
+                async for text in self.stream_skill(
+                    "zh-translator",
+                    {
+                        "content": batch,
+                        "target_language": params["target_language"],
+                        "preserve_format": params["preserve_format"],
+                        "preserve_code_blocks": params["preserve_code"],
+                        "preserve_math_formulas": params["preserve_formulas"],
+                    },
+                ):
+                    parts.append(text)
+                    await emit({"type": "delta", "batch": index, "text": text})
+                translated[index] = "".join(parts)
+            except Exception as e:
+                logger.error(f"Batch {index} translation failed: {str(e)}")
+                # 使用原文作为后备
+                translated[index] = batch
+                errors[index] = str(e)
+
+            completed += 1
+            await emit({"type": "batch_completed", "batch": index, "completed": completed, "total": total})
+
+            # 只追加已连续完成的前缀批次，保证文件内容顺序与原文一致
+            async with write_lock:
+                while written < total and (ready := translated[written]) is not None:
+                    if output_file:
+                        await asyncio.to_thread(_append_text, output_file, ready)
+                    written += 1
+
+        logger.info(f"Streaming translation of {total} batches")
+        await asyncio.gather(*(translate_batch(i, batch) for i, batch in enumerate(batches)))
+
+        if len(errors) == total:
+            # 没有任何译文，不保留仅含原文的文件
+            if output_file:
+                await asyncio.to_thread(output_file.unlink, missing_ok=True)
+            return {"success": False, "error": f"All {total} translation batches failed: {errors[0]}"}
+
+        translated_content = "".join(part or "" for part in translated)
+        if output_file:
+            logger.info(f"Translation saved to {output_file}")
+
+        return {
+            "success": True,
+            "data": {
+                "content": translated_content,
+                "word_count": len(translated_content.split()),
+                "batch_count": total,
+                "failed_batches": sorted(errors),
             },
         }
 
@@ -257,6 +378,10 @@ class TranslationAgent(BaseAgent):
 
         return batches
 
+    def _get_translation_path(self, paper_id: str) -> Path:
+        """译文文件路径."""
+        return get_output_dir(self.papers_dir, "translation", paper_id) / f"{paper_id}.md"
+
     async def _save_translation(self, paper_id: str, content: str) -> None:
         """保存翻译结果.
 
@@ -265,11 +390,8 @@ class TranslationAgent(BaseAgent):
             content: 翻译内容
         """
         try:
-            category = paper_id.split("_")[0] if "_" in paper_id else "general"
-            output_dir = self.papers_dir / "translation" / category
-            output_dir.mkdir(parents=True, exist_ok=True)
-
-            output_file = output_dir / f"{paper_id}.md"
+            output_file = self._get_translation_path(paper_id)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
             with open(output_file, "w", encoding="utf-8") as f:
                 f.write(content)
 
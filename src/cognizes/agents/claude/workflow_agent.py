@@ -6,7 +6,9 @@ import os
 from pathlib import Path
 from typing import Any
 
-from .base import BaseAgent
+from cognizes.agents.utils import get_output_dir
+
+from .base import BaseAgent, ProgressCallback
 from .heartfelt_agent import HeartfeltAgent
 from .pdf_agent import PDFProcessingAgent
 from .translation_agent import TranslationAgent
@@ -65,17 +67,18 @@ class WorkflowAgent(BaseAgent):
         source_path = input_data.get("source_path")
         workflow = input_data.get("workflow", "full")
         paper_id = input_data.get("paper_id")
+        on_progress = input_data.get("on_progress")
 
         if not source_path or not os.path.exists(source_path):
             return {"success": False, "error": f"Source file not found: {source_path}"}
 
         try:
             if workflow == "full":
-                return await self._full_workflow(source_path, paper_id)
+                return await self._full_workflow(source_path, paper_id, on_progress)
             elif workflow == "extract_only":
                 return await self._extract_workflow(source_path, paper_id)
             elif workflow == "translate_only":
-                return await self._translate_workflow(source_path, paper_id)
+                return await self._translate_workflow(source_path, paper_id, on_progress)
             elif workflow == "heartfelt_only":
                 return await self._heartfelt_workflow(source_path, paper_id)
             else:
@@ -84,12 +87,15 @@ class WorkflowAgent(BaseAgent):
             logger.error(f"Error in workflow processing: {str(e)}")
             return {"success": False, "error": str(e)}
 
-    async def _full_workflow(self, source_path: str, paper_id: str | None = None) -> dict[str, Any]:
+    async def _full_workflow(
+        self, source_path: str, paper_id: str | None = None, on_progress: ProgressCallback | None = None
+    ) -> dict[str, Any]:
         """完整处理流程：提取 -> 翻译 -> 分析.
 
         Args:
             source_path: 源文件路径
             paper_id: 论文ID
+            on_progress: 流式翻译进度回调，提供时翻译以流式模式执行
 
         Returns:
             处理结果
@@ -117,6 +123,7 @@ class WorkflowAgent(BaseAgent):
                 "content": extract_result["data"]["content"],
                 "preserve_format": True,
                 "paper_id": paper_id,
+                "on_progress": on_progress,
             }
         )
 
@@ -176,12 +183,15 @@ class WorkflowAgent(BaseAgent):
             "workflow": "extract_only",
         }
 
-    async def _translate_workflow(self, source_path: str, paper_id: str | None = None) -> dict[str, Any]:
+    async def _translate_workflow(
+        self, source_path: str, paper_id: str | None = None, on_progress: ProgressCallback | None = None
+    ) -> dict[str, Any]:
         """仅翻译流程.
 
         Args:
             source_path: 源文件路径
             paper_id: 论文ID
+            on_progress: 流式翻译进度回调，提供时翻译以流式模式执行
 
         Returns:
             翻译结果
@@ -202,6 +212,7 @@ class WorkflowAgent(BaseAgent):
                 "content": extract_result["data"]["content"],
                 "preserve_format": True,
                 "paper_id": paper_id,
+                "on_progress": on_progress,
             }
         )
 
@@ -341,7 +352,7 @@ class WorkflowAgent(BaseAgent):
         """
         # 构建文件路径
         category = paper_id.split("_")[0] if "_" in paper_id else "general"
-        output_dir = self.papers_dir / "translation" / category
+        output_dir = get_output_dir(self.papers_dir, "translation", paper_id)
         output_dir.mkdir(parents=True, exist_ok=True)
 
         # 保存 Markdown 内容
@@ -375,8 +386,7 @@ class WorkflowAgent(BaseAgent):
             paper_id: 论文ID
             data: 分析数据
         """
-        category = paper_id.split("_")[0] if "_" in paper_id else "general"
-        output_dir = self.papers_dir / "heartfelt" / category
+        output_dir = get_output_dir(self.papers_dir, "heartfelt", paper_id)
         output_dir.mkdir(parents=True, exist_ok=True)
 
         output_file = output_dir / f"{paper_id}.md"
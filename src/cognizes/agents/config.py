@@ -27,6 +27,10 @@ class Settings:
         # 文件存储
         self.PAPERS_DIR: str = os.getenv("PAPERS_DIR", "papers")
         self.MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", "50")) * 1024 * 1024  # MB
+        # PDF 逐页提取缓存目录，置空禁用
+        self.PDF_PAGE_CACHE_DIR: str = os.getenv(
+            "PDF_PAGE_CACHE_DIR", str(Path(self.PAPERS_DIR) / ".cache" / "pdf_pages")
+        )
 
         # Claude API
         self.ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
@@ -65,6 +69,9 @@ class Settings:
         # 数据库设置（保留但暂不使用）
         self.DATABASE_URL: str | None = os.getenv("DATABASE_URL")
 
+        # 任务存储: sqlite:///<path>（默认，单机）、postgresql://...（多机）或 memory://
+        self.TASK_STORE_URL: str = os.getenv("TASK_STORE_URL", "sqlite:///logs/tasks/tasks.sqlite3")
+
         # Redis 设置（保留但暂不使用）
         self.REDIS_URL: str | None = os.getenv("REDIS_URL")
 
@@ -60,20 +60,22 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
-def get_file_hash(file_path: str) -> str:
+def get_file_hash(file_path: str, algorithm: str = "md5", chunk_size: int = 1024 * 1024) -> str:
     """计算文件哈希值.
 
     Args:
         file_path: 文件路径
+        algorithm: 哈希算法（hashlib 支持的名称，如 md5、sha256）
+        chunk_size: 读取块大小
 
     Returns:
         文件哈希值
     """
-    hash_md5 = hashlib.md5()
+    hasher = hashlib.new(algorithm)
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -209,6 +211,24 @@ def get_category_from_path(file_path: str) -> str:
     return "general"
 
 
+def get_output_dir(papers_dir: str | Path, content_type: str, paper_id: str) -> Path:
+    """获取论文输出目录（translation / heartfelt 等），各 agent 与 API 服务共用.
+
+    分类取 paper_id 的第一段，无下划线时为 general。分类名本身含下划线时与元数据中的
+    category 不同，输出文件始终按此路径读写。
+
+    Args:
+        papers_dir: 论文根目录
+        content_type: 内容类型（输出子目录名）
+        paper_id: 论文ID
+
+    Returns:
+        输出目录路径
+    """
+    category = paper_id.split("_")[0] if "_" in paper_id else "general"
+    return Path(papers_dir) / content_type / category
+
+
 def ensure_directory(directory: str) -> Path:
     """确保目录存在.
 
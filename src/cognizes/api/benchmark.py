@@ -0,0 +1,201 @@
+"""
+Papers API 并发基准测试
+
+在临时论文目录上启动独立的 uvicorn 进程，并发请求上传、内容读取与列表接口，
+统计各接口延迟 (P50/P99) 与吞吐量。同时以固定频率探测 /health:
+该接口不做任何 I/O，其 P99 直接反映事件循环被阻塞的程度。
+
+用法:
+    python -m cognizes.api.benchmark --concurrency 32 --requests 256
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+
+@dataclass
+class RouteBenchmarkResult:
+    """单个接口的基准测试结果"""
+
+    route: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+
+
+def percentile(values: list[float], q: float) -> float:
+    """最近秩百分位 (q 取 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def seed_papers(papers_dir: Path, count: int, content_kb: int) -> list[str]:
+    """生成源文件、元数据与翻译 Markdown"""
+    paper_ids = []
+    body = "x" * 1023 + "\n"
+    body *= max(1, content_kb)
+    metadata_dir = papers_dir / ".metadata"
+    metadata_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        paper_id = f"bench_20240101_{i:05d}.pdf"
+        source = papers_dir / "source" / "bench" / paper_id
+        source.parent.mkdir(parents=True, exist_ok=True)
+        source.write_bytes(b"%PDF-1.4\n" + b"0" * 1024)
+        translation = papers_dir / "translation" / "bench" / f"{paper_id}.md"
+        translation.parent.mkdir(parents=True, exist_ok=True)
+        translation.write_text(body, encoding="utf-8")
+        metadata = {
+            "paper_id": paper_id,
+            "filename": paper_id,
+            "category": "bench",
+            "status": "completed",
+            "size": 1033,
+            "upload_time": f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}",
+        }
+        (metadata_dir / f"{paper_id}.json").write_text(json.dumps(metadata), encoding="utf-8")
+        paper_ids.append(paper_id)
+    return paper_ids
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("API server did not become ready")
+
+
+async def run_papers_benchmark(
+    concurrency: int = 32,
+    requests: int = 256,
+    papers: int = 200,
+    content_kb: int = 256,
+    upload_mb: int = 8,
+    probe_interval: float = 0.01,
+) -> tuple[list[RouteBenchmarkResult], float]:
+    """
+    运行并发基准测试
+
+    Returns:
+        (各接口结果, 总吞吐 req/s)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        papers_dir = Path(tmp) / "papers"
+        paper_ids = seed_papers(papers_dir, papers, content_kb)
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "cognizes.api.main:app", "--port", str(port), "--log-level", "warning"],
+            env={**os.environ, "PAPERS_DIR": str(papers_dir)},
+        )
+        try:
+            return await _drive(f"http://127.0.0.1:{port}", paper_ids, concurrency, requests, upload_mb, probe_interval)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+async def _drive(
+    base_url: str, paper_ids: list[str], concurrency: int, requests: int, upload_mb: int, probe_interval: float
+) -> tuple[list[RouteBenchmarkResult], float]:
+    upload_body = b"%PDF-1.4\n" + b"0" * (upload_mb * 1024 * 1024)
+    latencies: dict[str, list[float]] = {"upload": [], "content": [], "list": [], "health": []}
+    errors: dict[str, int] = dict.fromkeys(latencies, 0)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency + 1)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        await _wait_ready(client)
+
+        async def timed(route: str, request) -> None:
+            start = time.perf_counter()
+            response = await request
+            latencies[route].append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors[route] += 1
+
+        async def one(i: int) -> None:
+            route = ("upload", "content", "list", "list")[i % 4]
+            paper_id = paper_ids[i % len(paper_ids)]
+            async with semaphore:
+                if route == "upload":
+                    files = {"file": (f"upload_{i}.pdf", upload_body, "application/pdf")}
+                    await timed(route, client.post("/api/papers/upload", params={"category": "upload"}, files=files))
+                elif route == "content":
+                    params = {"content_type": "translation"}
+                    await timed(route, client.get(f"/api/papers/{paper_id}/content", params=params))
+                else:
+                    await timed(route, client.get("/api/papers/", params={"category": "bench", "limit": 20}))
+
+        async def probe(stop: asyncio.Event) -> None:
+            while not stop.is_set():
+                await timed("health", client.get("/health"))
+                await asyncio.sleep(probe_interval)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    results = [
+        RouteBenchmarkResult(
+            route=route,
+            requests=len(values),
+            errors=errors[route],
+            p50_ms=percentile(values, 50),
+            p99_ms=percentile(values, 99),
+        )
+        for route, values in latencies.items()
+    ]
+    return results, requests / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Papers API concurrency benchmark")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--papers", type=int, default=200)
+    parser.add_argument("--content-kb", type=int, default=256)
+    parser.add_argument("--upload-mb", type=int, default=8)
+    args = parser.parse_args()
+
+    results, throughput = await run_papers_benchmark(
+        args.concurrency, args.requests, args.papers, args.content_kb, args.upload_mb
+    )
+
+    print("| Route | Requests | Errors | P50 | P99 |")
+    print("|-------|----------|--------|-----|-----|")
+    for r in results:
+        print(f"| {r.route} | {r.requests} | {r.errors} | {r.p50_ms:.1f}ms | {r.p99_ms:.1f}ms |")
+    print(f"\nThroughput: {throughput:.1f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -36,9 +36,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # 关闭时清理
     logger.info("Shutting down Agentic AI Papers API...")
     try:
+        from cognizes.agents.claude.llm_client import close_anthropic_clients
+        from cognizes.agents.claude.pdf_extraction import shutdown_pdf_workers
         from cognizes.api.services.task_service import task_service
 
         await task_service.cleanup()
+        await close_anthropic_clients()
+        shutdown_pdf_workers()
         logger.info("Services cleanup completed")
     except Exception as e:
         logger.error(f"Error during cleanup: {str(e)}")
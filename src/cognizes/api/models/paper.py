@@ -25,6 +25,8 @@ class PaperUploadResponse(BaseModel):
     filename: str = Field(..., description="原始文件名")
     category: str = Field(..., description="论文分类")
     size: int = Field(..., description="文件大小（字节）")
+    sha256: str | None = Field(None, description="文件 SHA-256")
+    duplicate_of: str | None = Field(None, description="内容相同的已有论文ID")
     upload_time: str = Field(..., description="上传时间")
 
 
@@ -105,6 +107,7 @@ class PaperListResponse(BaseModel):
     total: int = Field(..., description="总数")
     offset: int = Field(..., description="偏移量")
     limit: int = Field(..., description="限制数")
+    next_cursor: str | None = Field(None, description="下一页游标")
 
 
 class BatchProcessRequest(BaseModel):
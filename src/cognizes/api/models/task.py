@@ -55,6 +55,7 @@ class TaskListResponse(BaseModel):
     total: int = Field(..., description="总数")
     offset: int = Field(..., description="偏移量")
     limit: int = Field(..., description="限制数")
+    next_cursor: str | None = Field(None, description="下一页游标")
 
 
 class TaskUpdate(BaseModel):
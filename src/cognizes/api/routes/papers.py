@@ -21,11 +21,22 @@ from cognizes.api.models.paper import (
     PaperStatus,
     PaperUploadResponse,
 )
+from cognizes.api.services.file_io import UploadTooLargeError, run_io
 from cognizes.api.services.paper_service import PaperService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024  # 50MB
+
+
+def _measure_file(fileobj: Any) -> int:
+    """通过 seek 获取文件大小，不读取内容."""
+    position = fileobj.tell()
+    size = fileobj.seek(0, 2)
+    fileobj.seek(position)
+    return size
+
 
 @router.get("/health")
 async def health_check() -> dict[str, Any]:
@@ -56,17 +67,17 @@ async def upload_paper(
     if not (file.filename and file.filename.lower().endswith(".pdf")):
         raise HTTPException(status_code=400, detail="只支持 PDF 文件")
 
-    # Read file content to check actual size since file.size is None
-    file_content = await file.read()
-    file_size = len(file_content)
-    await file.seek(0)  # Reset file pointer for further processing
+    # Prefer the size reported by the multipart parser; fall back to seeking, never read the body here
+    file_size = file.size if file.size is not None else await run_io(_measure_file, file.file)
 
-    if file_size > 50 * 1024 * 1024:  # 50MB limit
+    if file_size > MAX_UPLOAD_BYTES:
         raise HTTPException(status_code=400, detail="文件大小不能超过 50MB")
 
     try:
-        result = await service.upload_paper(file, category)
+        result = await service.upload_paper(file, category, max_size=MAX_UPLOAD_BYTES)
         return PaperUploadResponse(**result)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=400, detail="文件大小不能超过 50MB") from e
     except Exception as e:
         logger.error(f"Error uploading paper: {str(e)}")
         raise HTTPException(status_code=500, detail=f"上传失败: {str(e)}") from e
@@ -145,6 +156,7 @@ async def list_papers(
     status: str | None = Query(None, description="Filter by status"),
     limit: int = Query(20, ge=1, le=100, description="Return limit"),
     offset: int = Query(0, ge=0, description="Offset"),
+    cursor: str | None = Query(None, description="Cursor from the previous page (overrides offset)"),
     service: PaperService = Depends(get_paper_service),
 ) -> dict[str, Any]:
     """
@@ -154,10 +166,13 @@ async def list_papers(
     - **status**: Status filter
     - **limit**: Return limit
     - **offset**: Offset
+    - **cursor**: Keyset cursor returned as `next_cursor` by the previous page
     """
     try:
-        papers = await service.list_papers(category=category, status=status, limit=limit, offset=offset)
+        papers = await service.list_papers(category=category, status=status, limit=limit, offset=offset, cursor=cursor)
         return papers
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error listing papers: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get list: {str(e)}") from e
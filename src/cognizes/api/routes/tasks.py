@@ -1,9 +1,11 @@
 """Task management routes."""
 
 import logging
-from typing import Any
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
 
 from cognizes.api.models.task import TaskListResponse, TaskResponse
 from cognizes.api.services.task_service import TaskService
@@ -25,6 +27,7 @@ async def list_tasks(
     workflow: str | None = Query(None, description="按工作流筛选"),
     limit: int = Query(20, ge=1, le=100, description="返回数量限制"),
     offset: int = Query(0, ge=0, description="偏移量"),
+    cursor: str | None = Query(None, description="分页游标（上一页返回的 next_cursor）"),
     service: TaskService = Depends(get_task_service),
 ) -> dict[str, Any]:
     """
@@ -35,6 +38,7 @@ async def list_tasks(
     - **workflow**: 工作流筛选
     - **limit**: 返回数量限制
     - **offset**: 偏移量
+    - **cursor**: 分页游标，提供时忽略 offset
     """
     try:
         tasks = await service.list_tasks(
@@ -43,8 +47,11 @@ async def list_tasks(
             workflow=workflow,
             limit=limit,
             offset=offset,
+            cursor=cursor,
         )
         return tasks
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error listing tasks: {str(e)}")
         raise HTTPException(status_code=500, detail=f"获取任务列表失败: {str(e)}") from e
@@ -95,13 +102,29 @@ async def get_task_logs(
     task_id: str = Path(..., description="任务 ID"),
     lines: int = Query(100, ge=1, le=1000, description="返回日志行数"),
     service: TaskService = Depends(get_task_service),
-) -> dict[str, Any]:
+    follow: Annotated[bool, Query(description="以 SSE 流持续推送新增日志")] = False,
+    last_event_id: Annotated[str | None, Header(alias="Last-Event-ID")] = None,
+) -> Any:
     """
     获取任务日志.
 
     - **task_id**: 任务 ID
     - **lines**: 返回日志行数
+    - **follow**: 为 true 时返回 text/event-stream，先推送最后 lines 行，之后推送新增行直到任务结束；
+      事件 id 为日志字节偏移，断线重连时携带 Last-Event-ID 即可续读
     """
+    if follow:
+        try:
+            await service.get_task(task_id)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e)) from e
+        offset = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        return StreamingResponse(
+            _log_events(service, task_id, lines, offset),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     try:
         logs = await service.get_task_logs(task_id, lines)
         return {"task_id": task_id, "logs": logs}
@@ -112,6 +135,16 @@ async def get_task_logs(
         raise HTTPException(status_code=500, detail=f"获取日志失败: {str(e)}") from e
 
 
+async def _log_events(service: TaskService, task_id: str, lines: int, offset: int | None) -> AsyncIterator[str]:
+    """将日志块编码为 SSE 事件."""
+    async for chunk in service.follow_task_logs(task_id, lines, offset):
+        if not chunk.lines:
+            yield ": heartbeat\n\n"
+        for line, line_offset in zip(chunk.lines, chunk.offsets, strict=True):
+            yield f"id: {line_offset}\ndata: {line}\n\n"
+    yield "event: end\ndata: \n\n"
+
+
 @router.delete("/cleanup")
 async def cleanup_completed_tasks(
     older_than_hours: int = Query(24, ge=1, description="清理多少小时前的任务"),
@@ -1,7 +1,11 @@
 """WebSocket routes for real-time updates."""
 
+import asyncio
+import itertools
 import json
 import logging
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from typing import Any
 
@@ -13,52 +17,95 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+WS_SEND_TIMEOUT = 5.0  # 单条消息发送超时（秒），超时的客户端视为失联并断开
+WS_MAX_PENDING = 100  # 每个客户端待发送消息上限，超过时丢弃最旧的消息（任务完成通知除外）
+UNDROPPABLE_TYPES = frozenset({"task_completed"})  # 队列溢出时不丢弃的消息类型
+
+
+@dataclass
+class ClientChannel:
+    """单个客户端的发送通道.
+
+    同一时刻每个客户端只有一个发送在进行；发送期间到达的消息进入 pending，
+    同一任务的进度消息按 coalesce key 合并，只保留最新一条并移到队尾，保持与其他消息的先后顺序。
+    """
+
+    websocket: WebSocket
+    sending: bool = False
+    pending: OrderedDict[Any, dict[str, Any]] = field(default_factory=OrderedDict)
+    drain_task: asyncio.Task | None = None
+
+
+@dataclass
+class BroadcastStats:
+    """广播统计."""
+
+    sent: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    max_lag: int = 0  # 观测到的单个客户端最大待发送消息数
+
+
 # WebSocket 连接管理器
 class ConnectionManager:
-    def __init__(self) -> None:
+    def __init__(self, send_timeout: float = WS_SEND_TIMEOUT, max_pending: int = WS_MAX_PENDING) -> None:
         self.active_connections: dict[str, WebSocket] = {}
         self.client_subscriptions: dict[str, set[str]] = {}  # client_id -> set of task_ids
+        self.task_subscribers: dict[str, set[str]] = {}  # task_id -> set of client_ids
+        self.send_timeout = send_timeout
+        self.max_pending = max_pending
+        self.stats = BroadcastStats()
+        self._channels: dict[str, ClientChannel] = {}
+        self._sequence = itertools.count()
 
     async def connect(self, websocket: WebSocket, client_id: str) -> None:
         """接受 WebSocket 连接."""
         await websocket.accept()
         self.active_connections[client_id] = websocket
         self.client_subscriptions[client_id] = set()
+        self._channels[client_id] = ClientChannel(websocket=websocket)
         logger.info(f"WebSocket client connected: {client_id}")
 
     async def disconnect(self, client_id: str) -> None:
-        """断开 WebSocket 连接."""
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
+        """断开 WebSocket 连接（先移除连接状态再关闭，关闭期间的广播不再发往该客户端）."""
+        channel = self._channels.pop(client_id, None)
+        if channel and channel.drain_task and channel.drain_task is not asyncio.current_task():
+            channel.drain_task.cancel()
+        websocket = self.active_connections.pop(client_id, None)
+        if client_id in self.client_subscriptions:
+            self._unindex(client_id, self.client_subscriptions.pop(client_id))
+        if websocket is not None:
             try:
                 await websocket.close()
             except Exception:
                 pass  # Ignore errors when closing
-            del self.active_connections[client_id]
-        if client_id in self.client_subscriptions:
-            del self.client_subscriptions[client_id]
         logger.info(f"WebSocket client disconnected: {client_id}")
 
     async def send_personal_message(self, message: dict[str, Any], client_id: str) -> None:
         """发送个人消息."""
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {str(e)}")
-                await self.disconnect(client_id)
+        await self._deliver(client_id, message)
 
     async def broadcast_to_subscribers(self, message: dict[str, Any], task_id: str) -> None:
-        """向任务订阅者广播消息."""
-        for client_id, subscriptions in self.client_subscriptions.items():
-            if task_id in subscriptions:
-                await self.send_personal_message(message, client_id)
+        """向任务订阅者并发广播消息（task_update 消息按客户端合并）."""
+        subscribers = self.task_subscribers.get(task_id)
+        if not subscribers:
+            return
+        coalesce_key = ("task_update", task_id) if message.get("type") == "task_update" else None
+        await asyncio.gather(*(self._deliver(client_id, message, coalesce_key) for client_id in list(subscribers)))
+
+    async def broadcast_to_all(self, message: dict[str, Any], coalesce_key: Any = None) -> None:
+        """向所有连接并发广播消息."""
+        await asyncio.gather(
+            *(self._deliver(client_id, message, coalesce_key) for client_id in list(self.active_connections))
+        )
 
     async def subscribe(self, client_id: str, task_id: str) -> None:
         """订阅任务更新."""
         if client_id in self.client_subscriptions:
             self.client_subscriptions[client_id].add(task_id)
+            self.task_subscribers.setdefault(task_id, set()).add(client_id)
             logger.info(f"Client {client_id} subscribed to task {task_id}")
 
     async def unsubscribe(self, client_id: str, task_id: str) -> None:
@@ -66,9 +113,11 @@ class ConnectionManager:
         if client_id in self.client_subscriptions:
             # If task_id is None, unsubscribe from all tasks
             if task_id is None:
+                self._unindex(client_id, self.client_subscriptions[client_id])
                 self.client_subscriptions[client_id].clear()
             else:
                 self.client_subscriptions[client_id].discard(task_id)
+                self._unindex(client_id, {task_id})
             logger.info(f"Client {client_id} unsubscribed from task {task_id or 'all tasks'}")
 
     def get_connection_count(self) -> int:
@@ -77,11 +126,17 @@ class ConnectionManager:
 
     def get_subscriber_count(self, task_id: str) -> int:
         """获取指定任务的订阅者数量."""
-        count = 0
-        for subscriptions in self.client_subscriptions.values():
-            if task_id in subscriptions:
-                count += 1
-        return count
+        return len(self.task_subscribers.get(task_id, ()))
+
+    def get_metrics(self) -> dict[str, Any]:
+        """获取连接、订阅与广播统计（含当前积压的客户端）."""
+        lagging = {client_id: len(channel.pending) for client_id, channel in self._channels.items() if channel.pending}
+        return {
+            "connections": len(self.active_connections),
+            "subscribed_tasks": len(self.task_subscribers),
+            "lagging_clients": lagging,
+            **asdict(self.stats),
+        }
 
     async def cleanup_subscriptions(self) -> None:
         """清理已断开连接的客户端的订阅."""
@@ -91,9 +146,84 @@ class ConnectionManager:
                 disconnected_clients.append(client_id)
 
         for client_id in disconnected_clients:
-            del self.client_subscriptions[client_id]
+            self._unindex(client_id, self.client_subscriptions.pop(client_id))
             logger.info(f"Cleaned up subscriptions for disconnected client: {client_id}")
 
+    def _unindex(self, client_id: str, task_ids: set[str]) -> None:
+        """从反向索引中移除客户端的订阅."""
+        for task_id in task_ids:
+            subscribers = self.task_subscribers.get(task_id)
+            if subscribers is not None:
+                subscribers.discard(client_id)
+                if not subscribers:
+                    del self.task_subscribers[task_id]
+
+    # ========================================
+    # 发送通道
+    # ========================================
+
+    async def _deliver(self, client_id: str, message: dict[str, Any], coalesce_key: Any = None) -> None:
+        """发送消息；客户端正在发送时排队（可合并的消息只保留最新一条）."""
+        # 通道只在 connect 时创建；已断开或正在断开的客户端直接忽略
+        channel = self._channels.get(client_id)
+        if channel is None:
+            return
+
+        if channel.sending:
+            self._enqueue(channel, message, coalesce_key)
+            return
+
+        channel.sending = True
+        try:
+            ok = await self._send(client_id, channel, message)
+        finally:
+            channel.sending = False
+        if ok and channel.pending and channel.drain_task is None:
+            # 积压的消息在后台发送，当前广播不等待慢客户端
+            channel.sending = True
+            channel.drain_task = asyncio.create_task(self._drain(client_id, channel))
+
+    def _enqueue(self, channel: ClientChannel, message: dict[str, Any], coalesce_key: Any) -> None:
+        if coalesce_key is not None and coalesce_key in channel.pending:
+            # 替换为最新消息并移到队尾：最新状态不能先于之前排队的增量 / 完成消息发送
+            channel.pending[coalesce_key] = message
+            channel.pending.move_to_end(coalesce_key)
+            self.stats.coalesced += 1
+            return
+        channel.pending[coalesce_key if coalesce_key is not None else next(self._sequence)] = message
+        if len(channel.pending) > self.max_pending:
+            # 丢弃最旧的可丢弃消息；任务完成通知只发送一次，不能丢
+            for key, pending in channel.pending.items():
+                if pending.get("type") not in UNDROPPABLE_TYPES:
+                    del channel.pending[key]
+                    self.stats.dropped += 1
+                    break
+        self.stats.max_lag = max(self.stats.max_lag, len(channel.pending))
+
+    async def _drain(self, client_id: str, channel: ClientChannel) -> None:
+        try:
+            while channel.pending:
+                _, message = channel.pending.popitem(last=False)
+                if not await self._send(client_id, channel, message):
+                    return
+        finally:
+            channel.sending = False
+            channel.drain_task = None
+
+    async def _send(self, client_id: str, channel: ClientChannel, message: dict[str, Any]) -> bool:
+        try:
+            await asyncio.wait_for(channel.websocket.send_json(message), timeout=self.send_timeout)
+            self.stats.sent += 1
+            return True
+        except TimeoutError:
+            self.stats.timed_out += 1
+            logger.warning(f"Timed out sending message to {client_id}, disconnecting")
+        except Exception as e:
+            self.stats.failed += 1
+            logger.error(f"Error sending message to {client_id}: {str(e)}")
+        await self.disconnect(client_id)
+        return False
+
 
 manager = ConnectionManager()
 
@@ -153,6 +283,12 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str) -> None:
         await manager.disconnect(client_id)
 
 
+@router.get("/stats")
+async def websocket_stats() -> dict[str, Any]:
+    """WebSocket 连接与广播统计（发送量、合并、丢弃、超时与积压客户端）."""
+    return manager.get_metrics()
+
+
 # WebSocket 服务依赖
 async def get_websocket_service() -> WebSocketService:
     """获取 WebSocketService 实例."""
@@ -175,6 +311,24 @@ async def send_task_update(
     await manager.broadcast_to_subscribers(update_message, task_id)
 
 
+# 发送流式文本增量
+async def send_task_stream(task_id: str, batch: int, offset: int, text: str) -> None:
+    """发送流式文本增量给所有订阅者.
+
+    与 task_update 不同，增量消息不按任务合并；offset 为 text 在该批次文本中的字符偏移，
+    客户端据此按批次拼接，并能发现慢连接上因队列溢出而丢失的片段。
+    """
+    stream_message = {
+        "type": "task_stream",
+        "task_id": task_id,
+        "batch": batch,
+        "offset": offset,
+        "text": text,
+        "timestamp": datetime.now().isoformat(),
+    }
+    await manager.broadcast_to_subscribers(stream_message, task_id)
+
+
 # 发送任务完成通知
 async def send_task_completion(task_id: str, result: dict[Any, Any] | None = None, error: str | None = None) -> None:
     """发送任务完成通知."""
@@ -202,6 +356,5 @@ async def send_batch_progress(batch_id: str, total: int, processed: int, current
         "timestamp": datetime.now().isoformat(),
     }
 
-    # 向所有连接的客户端发送批处理更新
-    for client_id in manager.active_connections:
-        await manager.send_personal_message(progress_message, client_id)
+    # 向所有连接的客户端并发发送批处理更新（同一批次的进度按客户端合并）
+    await manager.broadcast_to_all(progress_message, coalesce_key=("batch_progress", batch_id))
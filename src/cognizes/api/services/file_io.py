@@ -0,0 +1,138 @@
+"""Non-blocking file I/O helpers for API services.
+
+阻塞的文件操作统一提交到有界线程池执行，避免大文件或慢磁盘阻塞事件循环:
+- run_io: 在文件 I/O 线程池中执行任意阻塞调用
+- read_text / write_text / read_json / write_json: 常用读写封装（write_json 原子替换目标文件）
+- save_upload: 按固定块大小流式保存上传文件，同时增量计算 SHA-256
+"""
+
+import asyncio
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+FILE_IO_WORKERS = int(os.getenv("FILE_IO_WORKERS", "8"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=FILE_IO_WORKERS, thread_name_prefix="file-io")
+    return _executor
+
+
+async def run_io[T](func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在文件 I/O 线程池中执行阻塞调用.
+
+    Args:
+        func: 阻塞函数
+        *args: 位置参数
+        **kwargs: 关键字参数
+
+    Returns:
+        函数返回值
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def _read_text(path: Path) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_text(path: Path, content: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _replace_text(path: Path, content: str) -> None:
+    # 先写同目录下的临时文件再 os.replace，读者只会看到旧文件或完整的新文件
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        _write_text(tmp, content)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            tmp.unlink()
+        raise
+
+
+def _read_json(path: Path) -> Any:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+async def read_text(path: Path) -> str:
+    """异步读取文本文件."""
+    return await run_io(_read_text, path)
+
+
+async def write_text(path: Path, content: str) -> None:
+    """异步写入文本文件."""
+    await run_io(_write_text, path, content)
+
+
+async def read_json(path: Path) -> Any:
+    """异步读取 JSON 文件."""
+    return await run_io(_read_json, path)
+
+
+async def write_json(path: Path, data: Any) -> None:
+    """异步原子写入 JSON 文件（序列化在线程池中完成）."""
+    await run_io(_replace_text, path, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+@dataclass
+class UploadResult:
+    """流式保存结果."""
+
+    size: int
+    sha256: str
+
+
+class UploadTooLargeError(ValueError):
+    """上传文件超过大小限制."""
+
+
+def _copy_chunks(src: IO[bytes], dest: Path, chunk_size: int, max_size: int | None) -> UploadResult:
+    hasher = hashlib.sha256()
+    size = 0
+    with open(dest, "wb") as f:
+        while chunk := src.read(chunk_size):
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                raise UploadTooLargeError(f"File exceeds {max_size} bytes")
+            hasher.update(chunk)
+            f.write(chunk)
+    return UploadResult(size=size, sha256=hasher.hexdigest())
+
+
+async def save_upload(
+    src: IO[bytes], dest: Path, chunk_size: int = UPLOAD_CHUNK_SIZE, max_size: int | None = None
+) -> UploadResult:
+    """流式保存上传文件.
+
+    整个拷贝循环在一个线程池任务中完成，内存占用为单个块大小，哈希随写入增量计算。
+
+    Args:
+        src: 上传文件的底层文件对象（如 UploadFile.file）
+        dest: 目标路径
+        chunk_size: 块大小
+        max_size: 最大字节数，超过时抛出 UploadTooLargeError
+
+    Returns:
+        文件大小与 SHA-256
+    """
+    return await run_io(_copy_chunks, src, dest, chunk_size, max_size)
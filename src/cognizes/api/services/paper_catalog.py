@@ -0,0 +1,307 @@
+"""Paper catalog index backed by SQLite.
+
+`.metadata/<paper_id>.json` 仍是元数据的权威来源，目录索引只保存列表页所需字段，
+由 PaperService 在保存/更新/删除元数据时同步，使 list/filter/paginate 成为索引上的 keyset 查询。
+索引同时维护内容哈希 (SHA-256) → paper_id 的映射，用于识别重复上传并复用已有处理结果。
+
+重建索引:
+    python -m cognizes.api.services.paper_catalog --papers-dir papers
+"""
+
+import argparse
+import base64
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+from cognizes.agents.utils import get_file_hash
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILENAME = "catalog.sqlite3"
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id    TEXT PRIMARY KEY,
+    filename    TEXT,
+    category    TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    upload_time TEXT NOT NULL,
+    updated_at  TEXT,
+    size        INTEGER,
+    sha256      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_papers_upload_time ON papers (upload_time DESC, paper_id DESC);
+CREATE INDEX IF NOT EXISTS idx_papers_category ON papers (category, upload_time DESC, paper_id DESC);
+CREATE INDEX IF NOT EXISTS idx_papers_status ON papers (status, upload_time DESC, paper_id DESC);
+CREATE INDEX IF NOT EXISTS idx_papers_category_status ON papers (category, status, upload_time DESC, paper_id DESC);
+"""
+
+# 早期版本的索引没有 sha256 列，需在建列之后再建索引
+HASH_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_papers_sha256 ON papers (sha256, upload_time, paper_id)"
+
+UPSERT_SQL = """
+INSERT INTO papers (paper_id, filename, category, status, upload_time, updated_at, size, sha256)
+VALUES (:paper_id, :filename, :category, :status, :upload_time, :updated_at, :size, :sha256)
+ON CONFLICT (paper_id) DO UPDATE SET
+    filename = excluded.filename,
+    category = excluded.category,
+    status = excluded.status,
+    upload_time = excluded.upload_time,
+    updated_at = excluded.updated_at,
+    size = COALESCE(excluded.size, papers.size),
+    sha256 = COALESCE(excluded.sha256, papers.sha256)
+"""
+
+COLUMNS = ("paper_id", "filename", "category", "status", "upload_time", "updated_at", "size")
+
+
+def encode_cursor(upload_time: str, paper_id: str) -> str:
+    """编码 keyset 分页游标."""
+    return base64.urlsafe_b64encode(json.dumps([upload_time, paper_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """解码 keyset 分页游标."""
+    try:
+        upload_time, paper_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(upload_time), str(paper_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class PaperCatalog:
+    """论文目录索引."""
+
+    _instances: dict[Path, "PaperCatalog"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, papers_dir: Path) -> None:
+        """初始化目录索引.
+
+        Args:
+            papers_dir: 论文根目录，索引文件位于 `<papers_dir>/.metadata/catalog.sqlite3`
+        """
+        self.papers_dir = Path(papers_dir)
+        self.db_path = self.papers_dir / ".metadata" / CATALOG_FILENAME
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, papers_dir: Path) -> "PaperCatalog":
+        """获取论文目录对应的共享索引实例（PaperService 按请求创建，索引连接需跨请求复用）."""
+        key = Path(papers_dir).resolve()
+        with cls._instances_lock:
+            catalog = cls._instances.get(key)
+            if catalog is None:
+                catalog = cls._instances[key] = cls(papers_dir)
+            return catalog
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开索引数据库，首次创建时从现有元数据重建."""
+        if self._conn is not None:
+            return self._conn
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.db_path.exists()
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA_SQL)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(papers)")}
+        if "sha256" not in columns:
+            conn.execute("ALTER TABLE papers ADD COLUMN sha256 TEXT")
+            is_new = True
+        conn.execute(HASH_INDEX_SQL)
+        self._conn = conn
+
+        if is_new:
+            count = self._rebuild_locked()
+            if count:
+                logger.info(f"Paper catalog bootstrapped with {count} papers")
+        return conn
+
+    def close(self) -> None:
+        """关闭数据库连接."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # 写入
+
+    def upsert(self, metadata: dict[str, Any]) -> None:
+        """写入或更新一篇论文的索引行.
+
+        Args:
+            metadata: 论文元数据（与 `.metadata/<paper_id>.json` 一致）
+        """
+        with self._lock:
+            self._connect().execute(UPSERT_SQL, self._to_row(metadata))
+
+    def delete(self, paper_id: str) -> None:
+        """删除论文索引行."""
+        with self._lock:
+            self._connect().execute("DELETE FROM papers WHERE paper_id = ?", (paper_id,))
+
+    def rebuild(self) -> int:
+        """从 `.metadata/*.json` 全量重建索引.
+
+        Returns:
+            索引的论文数量
+        """
+        with self._lock:
+            self._connect()
+            return self._rebuild_locked()
+
+    def _rebuild_locked(self) -> int:
+        rows = []
+        for metadata_file in (self.papers_dir / ".metadata").glob("*.json"):
+            try:
+                with open(metadata_file, encoding="utf-8") as f:
+                    metadata = json.load(f)
+            except Exception as e:
+                logger.warning(f"Error loading metadata file {metadata_file}: {e}")
+                continue
+
+            metadata.setdefault("paper_id", metadata_file.stem)
+            row = self._to_row(metadata)
+            # 与目录遍历的列表语义一致：只索引源 PDF 仍存在的论文
+            source_path = self.papers_dir / "source" / row["category"] / row["paper_id"]
+            if source_path.suffix != ".pdf" or not source_path.is_file():
+                continue
+            if row["size"] is None:
+                row["size"] = source_path.stat().st_size
+            if row["sha256"] is None:
+                # 哈希功能之前上传的论文: 从源文件补算
+                row["sha256"] = get_file_hash(str(source_path), algorithm="sha256")
+            rows.append(row)
+
+        conn = self._conn
+        assert conn is not None
+        conn.execute("BEGIN")
+        try:
+            conn.execute("DELETE FROM papers")
+            conn.executemany(UPSERT_SQL, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    # 查询
+
+    def list_papers(
+        self,
+        category: str | None = None,
+        status: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """按上传时间倒序分页查询.
+
+        Args:
+            category: 分类筛选
+            status: 状态筛选
+            limit: 返回数量限制
+            offset: 偏移量（提供 cursor 时忽略）
+            cursor: 上一页返回的 next_cursor，使用 keyset 分页
+
+        Returns:
+            论文列表、总数与下一页游标
+        """
+        filters = []
+        params: list[Any] = []
+        if category:
+            filters.append("category = ?")
+            params.append(category)
+        if status:
+            filters.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+        page_filters = list(filters)
+        page_params = list(params)
+        if cursor:
+            page_filters.append("(upload_time, paper_id) < (?, ?)")
+            page_params.extend(decode_cursor(cursor))
+            offset = 0
+        page_where = f"WHERE {' AND '.join(page_filters)}" if page_filters else ""
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(f"SELECT COUNT(*) FROM papers {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM papers {page_where} "
+                "ORDER BY upload_time DESC, paper_id DESC LIMIT ? OFFSET ?",
+                [*page_params, limit, offset],
+            ).fetchall()
+
+        papers = [dict(row) for row in rows]
+        next_cursor = None
+        if len(papers) == limit:
+            last = papers[-1]
+            next_cursor = encode_cursor(last["upload_time"], last["paper_id"])
+        return {"papers": papers, "total": total, "next_cursor": next_cursor}
+
+    def find_by_sha256(self, sha256: str, exclude: str | None = None) -> list[str]:
+        """按内容哈希查找论文.
+
+        Args:
+            sha256: 文件 SHA-256
+            exclude: 排除的论文ID（通常是当前论文自身）
+
+        Returns:
+            内容相同的论文ID列表，按上传时间正序（最早的在前）
+        """
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT paper_id FROM papers WHERE sha256 = ? AND paper_id != ? ORDER BY upload_time, paper_id",
+                    (sha256, exclude or ""),
+                )
+                .fetchall()
+            )
+        return [row["paper_id"] for row in rows]
+
+    @staticmethod
+    def _to_row(metadata: dict[str, Any]) -> dict[str, Any]:
+        paper_id = metadata["paper_id"]
+        category = metadata.get("category") or (paper_id.split("_")[0] if "_" in paper_id else "general")
+        return {
+            "paper_id": paper_id,
+            "filename": metadata.get("filename") or paper_id,
+            "category": category,
+            "status": metadata.get("status") or "unknown",
+            "upload_time": metadata.get("upload_time") or "",
+            "updated_at": metadata.get("updated_at"),
+            "size": metadata.get("size"),
+            "sha256": metadata.get("sha256"),
+        }
+
+
+def main() -> None:
+    """重建论文目录索引."""
+    from cognizes.agents.config import settings
+
+    parser = argparse.ArgumentParser(description="Rebuild the paper catalog index from .metadata/*.json")
+    parser.add_argument("--papers-dir", default=settings.PAPERS_DIR, help="Papers root directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    catalog = PaperCatalog(Path(args.papers_dir))
+    try:
+        count = catalog.rebuild()
+    finally:
+        catalog.close()
+    print(f"Indexed {count} papers into {catalog.db_path}")
+
+
+if __name__ == "__main__":
+    main()
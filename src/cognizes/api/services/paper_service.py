@@ -1,21 +1,73 @@
 """Paper service for managing papers."""
 
+import asyncio
+import json
 import logging
-import os
 import shutil
+import sqlite3
+import time
+import weakref
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 from fastapi import UploadFile
 
+from cognizes.agents.claude.base import ProgressCallback
 from cognizes.agents.claude.batch_agent import BatchProcessingAgent
 from cognizes.agents.claude.heartfelt_agent import HeartfeltAgent
 from cognizes.agents.claude.workflow_agent import WorkflowAgent
 from cognizes.agents.config import settings
+from cognizes.agents.utils import get_output_dir
+from cognizes.api.services.file_io import read_json, read_text, run_io, save_upload, write_json
+from cognizes.api.services.paper_catalog import PaperCatalog, decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
+STREAM_UPDATE_INTERVAL = 0.5  # 流式文本增量推送的最小间隔（秒）
+
+# 各工作流产出的内容类型（状态记录中的工作流名称 → 输出目录），第一个为必需输出。
+# 不同工作流可能写同一文件（如 extract_only 与 translate 都写 translation/<分类>/<id>.md），
+# 元数据 outputs 字段记录每种内容最近由哪个工作流完整生成，复用时据此校验
+REUSABLE_OUTPUTS: dict[str, tuple[str, ...]] = {
+    "full": ("translation", "heartfelt"),
+    "extract_only": ("translation",),
+    "translate_only": ("translation",),
+    "translate": ("translation",),
+    "heartfelt_only": ("heartfelt",),
+    "heartfelt": ("heartfelt",),
+}
+
+# 各内容类型下的输出文件名模板，第一个为主文件
+OUTPUT_FILES: dict[str, tuple[str, ...]] = {
+    "translation": ("{paper_id}.md",),
+    "heartfelt": ("{paper_id}.md", "{paper_id}_analysis.json", "{paper_id}_report.md"),
+}
+
+# 元数据文件路径 → 读-改-写锁（PaperService 按请求创建，锁需跨实例共享；无人持有时自动回收）
+_metadata_locks: weakref.WeakValueDictionary[Path, asyncio.Lock] = weakref.WeakValueDictionary()
+
+
+def _metadata_lock(metadata_file: Path) -> asyncio.Lock:
+    """获取元数据文件的锁."""
+    lock = _metadata_locks.get(metadata_file)
+    if lock is None:
+        lock = _metadata_locks[metadata_file] = asyncio.Lock()
+    return lock
+
+
+def _partial_outputs(result: dict[str, Any]) -> tuple[str, ...]:
+    """工作流结果中未完整生成的内容类型（翻译失败或有批次以原文代替）."""
+    if "translate_result" in result:
+        translation = result["translate_result"]
+        if translation is None:
+            return ("translation",)
+    else:
+        translation = result.get("data")
+    if isinstance(translation, dict) and translation.get("failed_batches"):
+        return ("translation",)
+    return ()
+
 
 class PaperService:
     """论文处理服务."""
@@ -26,13 +78,15 @@ class PaperService:
         self.workflow_agent = WorkflowAgent({"papers_dir": str(self.papers_dir)})
         self.batch_agent = BatchProcessingAgent({"papers_dir": str(self.papers_dir)})
         self.heartfelt_agent = HeartfeltAgent({"papers_dir": str(self.papers_dir)})
+        self.catalog = PaperCatalog.for_directory(self.papers_dir)
 
-    async def upload_paper(self, file: UploadFile, category: str) -> dict[str, Any]:
+    async def upload_paper(self, file: UploadFile, category: str, max_size: int | None = None) -> dict[str, Any]:
         """处理文件上传.
 
         Args:
             file: 上传的文件
             category: 论文分类
+            max_size: 最大字节数，超过时抛出 UploadTooLargeError
 
         Returns:
             上传结果
@@ -44,15 +98,17 @@ class PaperService:
 
         # 确保目录存在
         source_dir = self.papers_dir / "source" / category
-        source_dir.mkdir(parents=True, exist_ok=True)
+        await run_io(source_dir.mkdir, parents=True, exist_ok=True)
 
-        # 保存文件
+        # 分块流式保存文件，同时计算哈希
         source_path = source_dir / paper_id
         try:
-            with open(source_path, "wb") as f:
-                shutil.copyfileobj(file.file, f)
+            saved = await save_upload(file.file, source_path, max_size=max_size)
+            file_size = saved.size
 
-            file_size = os.path.getsize(source_path)
+            # 内容相同的论文（最早上传的一篇），后续处理可直接复用其结果
+            duplicates = await self._find_same_content(saved.sha256, paper_id)
+            duplicate_of = duplicates[0] if duplicates else None
 
             # 保存元数据
             metadata: dict[str, Any] = {
@@ -61,10 +117,13 @@ class PaperService:
                 "safe_filename": safe_filename,
                 "category": category,
                 "size": file_size,
+                "sha256": saved.sha256,
                 "upload_time": datetime.now().isoformat(),
                 "status": "uploaded",
                 "workflows": {},
             }
+            if duplicate_of:
+                metadata["duplicate_of"] = duplicate_of
 
             await self._save_metadata(paper_id, metadata)
 
@@ -75,13 +134,14 @@ class PaperService:
                 "filename": file.filename,
                 "category": category,
                 "size": file_size,
+                "sha256": saved.sha256,
+                "duplicate_of": duplicate_of,
                 "upload_time": metadata["upload_time"],
             }
 
         except Exception as e:
             # 如果保存失败，删除可能已创建的文件
-            if source_path.exists():
-                source_path.unlink()
+            await run_io(self._unlink_existing, [source_path])
             logger.error(f"Error uploading paper: {str(e)}")
             raise
 
@@ -93,39 +153,46 @@ class PaperService:
         Args:
             paper_id: 论文ID
             workflow: 工作流类型
-            options: 处理选项
+            options: 处理选项；stream 为真时翻译以流式执行，文本增量通过 WebSocket 推送给
+                task_id（可由调用方在 options.task_id 中预先指定并订阅）的订阅者
 
         Returns:
             处理结果
         """
         source_path = self._get_source_path(paper_id)
-        if not source_path.exists():
+        if not await run_io(source_path.exists):
             raise ValueError(f"Paper not found: {paper_id}")
 
         # 更新状态
         await self._update_status(paper_id, "processing", workflow)
 
+        options = options or {}
+        task_id = options.get("task_id") or f"task_{paper_id}_{workflow}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
         try:
-            # 启动处理
-            result = await self.workflow_agent.process(
-                {
+            # 内容相同的论文已完成该工作流时直接复用其输出
+            reused_from = await self._reuse_outputs(paper_id, workflow)
+            if reused_from:
+                result = {"success": True, "status": "completed", "workflow": workflow, "reused_from": reused_from}
+            else:
+                # 启动处理
+                workflow_params: dict[str, Any] = {
                     "source_path": str(source_path),
                     "workflow": workflow,
                     "paper_id": paper_id,
-                    "options": options or {},
+                    "options": options,
                 }
-            )
+                if options.get("stream"):
+                    workflow_params["on_progress"] = self._stream_progress(task_id)
+                result = await self.workflow_agent.process(workflow_params)
 
             if result["success"]:
-                await self._update_status(paper_id, "completed", workflow)
+                await self._update_status(paper_id, "completed", workflow, partial=_partial_outputs(result))
             else:
                 await self._update_status(paper_id, "failed", workflow, result.get("error") or "")
 
-            # Use task_id from result if available, otherwise generate one
-            task_id = result.get(
-                "task_id",
-                f"task_{paper_id}_{workflow}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
-            )
+            # Use task_id from result if available
+            task_id = result.get("task_id", task_id)
             await self._create_task_record(paper_id, task_id, workflow, result)
 
             return {
@@ -196,14 +263,15 @@ class PaperService:
         if content_type == "source":
             # 源文件（PDF）
             source_path = self._get_source_path(paper_id)
-            if not source_path.exists():
+            size = await run_io(self._file_size, source_path)
+            if size is None:
                 raise ValueError(f"Source file not found: {paper_id}")
             return {
                 "paper_id": paper_id,
                 "content_type": "source",
                 "format": "pdf",
                 "file_path": str(source_path),
-                "size": source_path.stat().st_size,
+                "size": size,
             }
 
         else:
@@ -216,11 +284,10 @@ class PaperService:
                 raise ValueError(f"Unsupported content type: {content_type}")
 
             content_path = content_dir / f"{base_filename}.md"
-            if not content_path.exists():
+            if not await run_io(content_path.exists):
                 raise ValueError(f"{content_type} content not found: {paper_id}")
 
-            with open(content_path, encoding="utf-8") as f:
-                content = f.read()
+            content = await read_text(content_path)
 
             return {
                 "paper_id": paper_id,
@@ -237,6 +304,7 @@ class PaperService:
         status: str | None = None,
         limit: int = 20,
         offset: int = 0,
+        cursor: str | None = None,
     ) -> dict[str, Any]:
         """获取论文列表.
 
@@ -245,11 +313,12 @@ class PaperService:
             status: 状态筛选
             limit: 返回数量限制
             offset: 偏移量
+            cursor: 上一页返回的 next_cursor（keyset 分页，提供时忽略 offset）
 
         Returns:
             论文列表
         """
-        return await self._list_papers_internal(category, status, limit, offset)
+        return await self._list_papers_internal(category, status, limit, offset, cursor)
 
     async def _list_papers_internal(
         self,
@@ -257,52 +326,94 @@ class PaperService:
         status: str | None = None,
         limit: int = 20,
         offset: int = 0,
+        cursor: str | None = None,
     ) -> dict[str, Any]:
-        """内部方法：获取论文列表."""
-        papers = []
-        source_dir = self.papers_dir / "source"
+        """内部方法：基于目录索引获取论文列表，索引不可用时回退为目录遍历."""
+        try:
+            result = await run_io(
+                self.catalog.list_papers, category=category, status=status, limit=limit, offset=offset, cursor=cursor
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Paper catalog unavailable, scanning directories: {e}")
+            return await self._scan_papers(category, status, limit, offset, cursor)
 
-        # 遍历所有分类目录
-        for cat_dir in source_dir.iterdir():
-            if cat_dir.is_dir():
-                current_category = cat_dir.name
+        return {
+            "papers": result["papers"],
+            "total": result["total"],
+            "offset": 0 if cursor else offset,
+            "limit": limit,
+            "next_cursor": result["next_cursor"],
+        }
 
-                # 分类筛选
-                if category and current_category != category:
+    async def _scan_papers(
+        self,
+        category: str | None = None,
+        status: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """遍历源文件目录获取论文列表（O(全部论文) 的磁盘 I/O，仅作索引不可用时的回退）.
+
+        排序与游标格式与目录索引一致，客户端按 next_cursor 翻页时回退前后结果连续。
+        """
+        papers = []
+        source_files = await run_io(self._list_source_files, self.papers_dir / "source", category)
+
+        for current_category, paper_id, size in source_files:
+            # 获取元数据
+            metadata = await self._get_metadata(paper_id)
+            if metadata:
+                # 状态筛选
+                if status and metadata.get("status") != status:
                     continue
 
-                # 遍历分类下的所有文件
-                for file_path in cat_dir.iterdir():
-                    if file_path.is_file() and file_path.suffix == ".pdf":
-                        paper_id = file_path.name
-
-                        # 获取元数据
-                        metadata = await self._get_metadata(paper_id)
-                        if metadata:
-                            # 状态筛选
-                            if status and metadata.get("status") != status:
-                                continue
-
-                            papers.append(
-                                {
-                                    "paper_id": paper_id,
-                                    "filename": metadata.get("filename", paper_id),
-                                    "category": current_category,
-                                    "status": metadata.get("status", "unknown"),
-                                    "upload_time": metadata.get("upload_time"),
-                                    "updated_at": metadata.get("updated_at"),
-                                    "size": file_path.stat().st_size,
-                                }
-                            )
-
-        # 排序（按上传时间倒序）
-        papers.sort(key=lambda x: x["upload_time"], reverse=True)
+                papers.append(
+                    {
+                        "paper_id": paper_id,
+                        "filename": metadata.get("filename", paper_id),
+                        "category": current_category,
+                        "status": metadata.get("status", "unknown"),
+                        "upload_time": metadata.get("upload_time"),
+                        "updated_at": metadata.get("updated_at"),
+                        "size": size,
+                    }
+                )
+
+        # 排序（按上传时间倒序，与目录索引相同）
+        papers.sort(key=lambda x: (x["upload_time"] or "", x["paper_id"]), reverse=True)
 
         # 分页
         total = len(papers)
+        if cursor:
+            after = decode_cursor(cursor)
+            papers = [p for p in papers if (p["upload_time"] or "", p["paper_id"]) < after]
+            offset = 0
         papers = papers[offset : offset + limit]
 
-        return {"papers": papers, "total": total, "offset": offset, "limit": limit}
+        next_cursor = None
+        if len(papers) == limit:
+            last = papers[-1]
+            next_cursor = encode_cursor(last["upload_time"] or "", last["paper_id"])
+
+        return {"papers": papers, "total": total, "offset": offset, "limit": limit, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _list_source_files(source_dir: Path, category: str | None) -> list[tuple[str, str, int]]:
+        """遍历源文件目录，返回 (分类, 论文ID, 文件大小)（在文件 I/O 线程池中执行）."""
+        files = []
+        # 遍历所有分类目录
+        for cat_dir in source_dir.iterdir():
+            if not cat_dir.is_dir():
+                continue
+            # 分类筛选
+            if category and cat_dir.name != category:
+                continue
+            # 遍历分类下的所有文件
+            for file_path in cat_dir.iterdir():
+                if file_path.is_file() and file_path.suffix == ".pdf":
+                    files.append((cat_dir.name, file_path.name, file_path.stat().st_size))
+        return files
 
     async def delete_paper(self, paper_id: str) -> bool:
         """删除论文及其相关数据.
@@ -322,29 +433,18 @@ class PaperService:
             # 获取分类
             category = await self._get_paper_category(paper_id)
 
-            # 删除源文件
-            source_path = self._get_source_path(paper_id)
-            if source_path.exists():
-                source_path.unlink()
-
-            # 删除翻译文件
-            translation_path = self.papers_dir / "translation" / category / f"{paper_id}.md"
-            if translation_path.exists():
-                translation_path.unlink()
-
-            # 删除深度分析文件
+            # 删除源文件、翻译文件与深度分析文件
             heartfelt_dir = self.papers_dir / "heartfelt" / category
-            heartfelt_path = heartfelt_dir / f"{paper_id}.md"
-            if heartfelt_path.exists():
-                heartfelt_path.unlink()
-
-            heartfelt_json_path = heartfelt_dir / f"{paper_id}_analysis.json"
-            if heartfelt_json_path.exists():
-                heartfelt_json_path.unlink()
-
-            report_path = heartfelt_dir / f"{paper_id}_report.md"
-            if report_path.exists():
-                report_path.unlink()
+            await run_io(
+                self._unlink_existing,
+                [
+                    self._get_source_path(paper_id),
+                    self.papers_dir / "translation" / category / f"{paper_id}.md",
+                    heartfelt_dir / f"{paper_id}.md",
+                    heartfelt_dir / f"{paper_id}_analysis.json",
+                    heartfelt_dir / f"{paper_id}_report.md",
+                ],
+            )
 
             # 删除元数据
             await self._delete_metadata(paper_id)
@@ -371,7 +471,7 @@ class PaperService:
         file_paths = []
         for paper_id in paper_ids:
             source_path = self._get_source_path(paper_id)
-            if source_path.exists():
+            if await run_io(source_path.exists):
                 file_paths.append(str(source_path))
 
         if not file_paths:
@@ -423,9 +523,8 @@ class PaperService:
         """
         try:
             output_path = self._get_output_path(paper_id, content_type)
-            if output_path.exists():
-                with open(output_path, encoding="utf-8") as f:
-                    return f.read()
+            if await run_io(output_path.exists):
+                return await read_text(output_path)
             return None
         except Exception:
             return None
@@ -444,9 +543,9 @@ class PaperService:
             return None
 
         # Add source file size if available
-        source_path = self._get_source_path(paper_id)
-        if source_path.exists():
-            metadata["size"] = source_path.stat().st_size
+        size = await run_io(self._file_size, self._get_source_path(paper_id))
+        if size is not None:
+            metadata["size"] = size
 
         return metadata
 
@@ -517,41 +616,186 @@ class PaperService:
     async def _save_metadata(self, paper_id: str, metadata: dict[str, Any]) -> None:
         """保存元数据."""
         metadata_dir = self.papers_dir / ".metadata"
-        metadata_dir.mkdir(exist_ok=True)
+        await run_io(metadata_dir.mkdir, exist_ok=True)
 
         metadata_file = metadata_dir / f"{paper_id}.json"
-        import json
+        await write_json(metadata_file, metadata)
 
-        with open(metadata_file, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        await self._sync_catalog(paper_id, metadata)
 
     async def _get_metadata(self, paper_id: str) -> dict[str, Any] | None:
         """获取元数据."""
         metadata_dir = self.papers_dir / ".metadata"
         metadata_file = metadata_dir / f"{paper_id}.json"
 
-        if not metadata_file.exists():
+        if not await run_io(metadata_file.exists):
             return None
 
-        import json
+        return await read_json(metadata_file)
 
-        with open(metadata_file, encoding="utf-8") as f:
-            return json.load(f)
+    async def _update_metadata(
+        self, paper_id: str, updates: dict[str, Any], merge: dict[str, dict[str, Any]] | None = None
+    ) -> None:
+        """更新元数据（同一论文的读-改-写串行执行，避免并发更新互相覆盖）.
 
-    async def _update_metadata(self, paper_id: str, updates: dict[str, Any]) -> None:
-        """更新元数据."""
-        metadata = await self._get_metadata(paper_id) or {}
-        metadata.update(updates)
-        metadata["updated_at"] = datetime.now().isoformat()
-        await self._save_metadata(paper_id, metadata)
+        Args:
+            paper_id: 论文ID
+            updates: 覆盖写入的顶层字段
+            merge: 按键合并到对应字典字段（如 workflows、outputs）的条目
+        """
+        async with _metadata_lock(self._get_metadata_path(paper_id)):
+            metadata = await self._get_metadata(paper_id) or {}
+            metadata.update(updates)
+            for field, entries in (merge or {}).items():
+                metadata[field] = {**metadata.get(field, {}), **entries}
+            metadata["updated_at"] = datetime.now().isoformat()
+            await self._save_metadata(paper_id, metadata)
 
     async def _delete_metadata(self, paper_id: str) -> None:
         """删除元数据."""
-        metadata_dir = self.papers_dir / ".metadata"
-        metadata_file = metadata_dir / f"{paper_id}.json"
+        metadata_file = self._get_metadata_path(paper_id)
 
-        if metadata_file.exists():
-            metadata_file.unlink()
+        async with _metadata_lock(metadata_file):
+            await run_io(self._unlink_existing, [metadata_file])
+
+        try:
+            await run_io(self.catalog.delete, paper_id)
+        except sqlite3.Error as e:
+            logger.warning(f"Error removing {paper_id} from paper catalog: {e}")
+
+    @staticmethod
+    def _file_size(path: Path) -> int | None:
+        """文件大小，文件不存在时返回 None（在文件 I/O 线程池中执行）."""
+        return path.stat().st_size if path.is_file() else None
+
+    @staticmethod
+    def _unlink_existing(paths: list[Path]) -> None:
+        """删除存在的文件（在文件 I/O 线程池中执行）."""
+        for path in paths:
+            if path.exists():
+                path.unlink()
+
+    async def _sync_catalog(self, paper_id: str, metadata: dict[str, Any]) -> None:
+        """同步目录索引（元数据文件为权威来源，索引失败只记录日志，可通过重建修复）."""
+        entry = {**metadata, "paper_id": paper_id}
+        if entry.get("size") is None:
+            entry["size"] = await run_io(self._file_size, self._get_source_path(paper_id)) or 0
+        try:
+            await run_io(self.catalog.upsert, entry)
+        except sqlite3.Error as e:
+            logger.warning(f"Error syncing {paper_id} to paper catalog: {e}")
+
+    async def _find_same_content(self, sha256: str, paper_id: str) -> list[str]:
+        """查找内容哈希相同的其他论文（索引不可用时视为无重复）."""
+        try:
+            return await run_io(self.catalog.find_by_sha256, sha256, exclude=paper_id)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Error looking up content hash for {paper_id}: {e}")
+            return []
+
+    async def _reuse_outputs(self, paper_id: str, workflow: str) -> str | None:
+        """复用内容相同论文的工作流输出.
+
+        查找由同一工作流生成了全部所需输出的同内容论文，将其 Markdown 等输出复制到当前论文的
+        输出路径，从而跳过 PDF 提取与 LLM 调用。
+
+        Args:
+            paper_id: 论文ID
+            workflow: 工作流类型（与状态记录中的名称一致）
+
+        Returns:
+            被复用的论文ID，无可复用结果时返回 None
+        """
+        content_types = REUSABLE_OUTPUTS.get(workflow)
+        metadata = await self._get_metadata(paper_id) or {}
+        sha256 = metadata.get("sha256")
+        if not content_types or not sha256:
+            return None
+
+        for other_id in await self._find_same_content(sha256, paper_id):
+            outputs = (await self._get_metadata(other_id) or {}).get("outputs", {})
+            if any(outputs.get(content_type) != workflow for content_type in content_types):
+                continue
+            copied = await run_io(self._copy_outputs, other_id, paper_id, content_types)
+            if copied:
+                logger.info(f"Reused {workflow} outputs of {other_id} for {paper_id}")
+                return other_id
+
+        return None
+
+    def _copy_outputs(self, src_id: str, dest_id: str, content_types: tuple[str, ...]) -> bool:
+        """复制输出文件（在文件 I/O 线程池中执行，路径与 agent 写入时一致）.
+
+        Returns:
+            必需的主输出文件存在并已复制时返回 True
+        """
+        primary = OUTPUT_FILES[content_types[0]][0].format(paper_id=src_id)
+        if not (get_output_dir(self.papers_dir, content_types[0], src_id) / primary).is_file():
+            return False
+
+        for content_type in content_types:
+            src_dir = get_output_dir(self.papers_dir, content_type, src_id)
+            dest_dir = get_output_dir(self.papers_dir, content_type, dest_id)
+            for template in OUTPUT_FILES[content_type]:
+                src = src_dir / template.format(paper_id=src_id)
+                if not src.is_file():
+                    continue
+                dest_dir.mkdir(parents=True, exist_ok=True)
+                dest = dest_dir / template.format(paper_id=dest_id)
+                if src.suffix == ".json":
+                    # 结构化分析结果中记录了 paper_id，需改写为当前论文
+                    with open(src, encoding="utf-8") as f:
+                        data = json.load(f)
+                    data["paper_id"] = dest_id
+                    with open(dest, "w", encoding="utf-8") as f:
+                        json.dump(data, f, ensure_ascii=False, indent=2)
+                else:
+                    shutil.copyfile(src, dest)
+        return True
+
+    def _stream_progress(self, task_id: str) -> ProgressCallback:
+        """创建流式进度回调，将文本增量节流后通过 WebSocket 推送.
+
+        各批次的增量按 STREAM_UPDATE_INTERVAL 合并为 task_stream 消息（带批次与字符偏移，
+        不会被合并丢弃）；批次完成时立即推送剩余增量，并以 task_update 更新进度。
+        完整译文以按批次增量写入的文件为准。
+
+        Args:
+            task_id: 推送的任务ID
+
+        Returns:
+            进度回调
+        """
+        pending: dict[int, list[str]] = {}
+        offsets: dict[int, int] = {}
+        state = {"sent_at": time.monotonic()}
+
+        async def flush() -> None:
+            from cognizes.api.routes.websocket import send_task_stream
+
+            state["sent_at"] = time.monotonic()
+            # 先取走并记账，推送期间到达的增量留给下一次
+            chunks = [(batch, "".join(parts)) for batch, parts in pending.items()]
+            pending.clear()
+            for batch, text in chunks:
+                offset = offsets.get(batch, 0)
+                offsets[batch] = offset + len(text)
+                await send_task_stream(task_id, batch, offset, text)
+
+        async def on_progress(event: dict[str, Any]) -> None:
+            from cognizes.api.routes.websocket import send_task_update
+
+            if event["type"] == "delta":
+                pending.setdefault(event["batch"], []).append(event["text"])
+                if time.monotonic() - state["sent_at"] >= STREAM_UPDATE_INTERVAL:
+                    await flush()
+            elif event["type"] == "batch_completed":
+                await flush()
+                # 完成状态由任务记录给出，流式阶段进度最多到 99
+                progress = min(99.0, 100.0 * event["completed"] / event["total"])
+                await send_task_update(task_id, "processing", progress, "")
+
+        return on_progress
 
     async def _update_status(
         self,
@@ -559,21 +803,34 @@ class PaperService:
         status: str,
         workflow: str | None = None,
         error: str | None = None,
+        partial: tuple[str, ...] = (),
     ) -> None:
-        """更新状态."""
-        updates = {"status": status}
+        """更新状态.
+
+        Args:
+            paper_id: 论文ID
+            status: 状态
+            workflow: 工作流类型
+            error: 错误信息
+            partial: 未完整生成的内容类型，不记录为该工作流的可复用输出
+        """
+        merge: dict[str, dict[str, Any]] = {}
         if workflow:
-            workflows = (await self._get_metadata(paper_id) or {}).get("workflows", {})
             workflow_status = {
                 "status": status,
                 "updated_at": datetime.now().isoformat(),
             }
             if error:
                 workflow_status["error"] = error
-            workflows[workflow] = workflow_status
-            updates["workflows"] = workflows
+            merge["workflows"] = {workflow: workflow_status}
+            # 运行中或失败时输出文件可能已被改写，只有完成时才记录生成它的工作流
+            producer = workflow if status == "completed" else None
+            merge["outputs"] = {
+                content_type: None if content_type in partial else producer
+                for content_type in REUSABLE_OUTPUTS.get(workflow, ())
+            }
 
-        await self._update_metadata(paper_id, updates)
+        await self._update_metadata(paper_id, {"status": status}, merge)
 
     async def _create_task_record(self, paper_id: str, task_id: str, workflow: str, result: dict[str, Any]) -> None:
         """创建任务记录."""
@@ -591,16 +848,12 @@ class PaperService:
         metadata_list: list[dict[str, Any]] = []
         metadata_dir = self.papers_dir / ".metadata"
 
-        if not metadata_dir.exists():
+        if not await run_io(metadata_dir.exists):
             return metadata_list
 
-        import json
-
-        for metadata_file in metadata_dir.glob("*.json"):
+        for metadata_file in await run_io(lambda: list(metadata_dir.glob("*.json"))):
             try:
-                with open(metadata_file, encoding="utf-8") as f:
-                    metadata = json.load(f)
-                    metadata_list.append(metadata)
+                metadata_list.append(await read_json(metadata_file))
             except Exception as e:
                 logger.warning(f"Error loading metadata file {metadata_file}: {e}")
 
@@ -644,7 +897,7 @@ class PaperService:
 
         Args:
             paper_id: 论文ID
-            options: 翻译选项
+            options: 翻译选项（stream/task_id 含义同 process_paper）
 
         Returns:
             翻译任务结果
@@ -661,7 +914,7 @@ class PaperService:
             raise ValueError(f"Paper must be extracted before translation: {paper_id}")
 
         source_path = self._get_source_path(paper_id)
-        if not source_path.exists():
+        if not await run_io(source_path.exists):
             raise ValueError(f"Paper must be extracted before translation: {paper_id}")
 
         # 更新状态
@@ -676,16 +929,22 @@ class PaperService:
             }
             if options:
                 workflow_params["options"] = options
-
-            result = await self.workflow_agent.process(workflow_params)
+            task_id = (options or {}).get(
+                "task_id"
+            ) or f"translate_{paper_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            if options and options.get("stream"):
+                workflow_params["on_progress"] = self._stream_progress(task_id)
+
+            reused_from = await self._reuse_outputs(paper_id, "translate")
+            if reused_from:
+                result = {"success": True, "status": "completed", "reused_from": reused_from}
+            else:
+                result = await self.workflow_agent.process(workflow_params)
 
             if result["success"]:
-                await self._update_status(paper_id, "completed", "translate")
-                # Use task_id from result if available, otherwise generate one
-                task_id = result.get(
-                    "task_id",
-                    f"translate_{paper_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                )
+                await self._update_status(paper_id, "completed", "translate", partial=_partial_outputs(result))
+                # Use task_id from result if available
+                task_id = result.get("task_id", task_id)
                 await self._create_task_record(paper_id, task_id, "translate", result)
                 # Extract the actual translation result if available
                 translation_result = result.get("result", result)
@@ -737,7 +996,7 @@ class PaperService:
             raise ValueError(f"Paper must be extracted before analysis: {paper_id}")
 
         source_path = self._get_source_path(paper_id)
-        if not source_path.exists():
+        if not await run_io(source_path.exists):
             raise ValueError(f"Paper must be extracted before analysis: {paper_id}")
 
         # 更新状态
@@ -749,7 +1008,11 @@ class PaperService:
             if analysis_type:
                 analysis_params["analysis_type"] = analysis_type
 
-            result = await self.heartfelt_agent.analyze(analysis_params)
+            reused_from = await self._reuse_outputs(paper_id, "heartfelt")
+            if reused_from:
+                result = {"success": True, "status": "completed", "reused_from": reused_from}
+            else:
+                result = await self.heartfelt_agent.analyze(analysis_params)
 
             if result.get("success", False):
                 await self._update_status(paper_id, "completed", "heartfelt")
@@ -817,7 +1080,7 @@ class PaperService:
         all_valid = True
         for paper_id in paper_ids:
             source_path = self._get_source_path(paper_id)
-            if not source_path.exists():
+            if not await run_io(source_path.exists):
                 all_valid = False
                 break
 
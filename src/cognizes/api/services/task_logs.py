@@ -0,0 +1,221 @@
+"""Task log files: buffered writes, tail reads and incremental follow reads.
+
+- TaskLogWriter: 按任务缓冲日志行，定时或缓冲满时批量追加写入，避免每条消息打开/关闭一次文件
+- tail_lines: 从文件末尾按块反向 seek 读取最后 N 行，开销与 N 成正比而不是与文件大小成正比
+- read_new_lines: 从给定字节偏移读取新增的完整行（超长行分段返回），供 follow 模式增量推送
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from cognizes.api.services.file_io import run_io
+
+logger = logging.getLogger(__name__)
+
+TASK_LOG_FLUSH_INTERVAL = float(os.getenv("TASK_LOG_FLUSH_INTERVAL", "1.0"))
+TASK_LOG_BUFFER_LINES = 256
+TAIL_BLOCK_SIZE = 8192
+FOLLOW_READ_BYTES = 1024 * 1024
+
+
+def tail_lines(path: Path, lines: int, block_size: int = TAIL_BLOCK_SIZE) -> list[str]:
+    """读取文件最后 N 行.
+
+    Args:
+        path: 日志文件路径
+        lines: 行数
+        block_size: 反向读取的块大小
+
+    Returns:
+        去除首尾空白的日志行
+    """
+    if lines <= 0:
+        return []
+
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        # 多读一个换行符，保证最前面可能不完整的一行被丢弃
+        while position > 0 and data.count(b"\n") <= lines:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    return [line.strip() for line in data.decode("utf-8", errors="replace").splitlines()[-lines:]]
+
+
+@dataclass
+class LogChunk:
+    """从某一偏移开始读取到的完整日志行."""
+
+    lines: list[str]
+    offsets: list[int]  # 每行结束处的字节偏移（可作为断点续传位置）
+    end_offset: int
+
+
+def _utf8_prefix_length(data: bytes) -> int:
+    """去掉末尾被截断的 UTF-8 多字节字符后的长度."""
+    for back in range(1, min(4, len(data)) + 1):
+        lead = data[-back]
+        if lead & 0xC0 == 0x80:
+            continue  # 续字节，继续向前找起始字节
+        size = 1 if lead < 0xC0 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+        return len(data) if back >= size else len(data) - back
+    return len(data)
+
+
+def read_new_lines(path: Path, offset: int, max_bytes: int = FOLLOW_READ_BYTES) -> LogChunk:
+    """读取 offset 之后新增的完整行（末尾未写完的行留到下次读取）.
+
+    单行超过 max_bytes 时无法等到换行符，此时按字符边界截断，作为部分行返回，
+    保证 follow 模式持续推进。
+
+    Args:
+        path: 日志文件路径
+        offset: 起始字节偏移
+        max_bytes: 单次最多读取的字节数
+
+    Returns:
+        新增的日志行及其结束偏移
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        # 多读一个字节: 恰好 max_bytes 长的行若紧跟换行符，仍按完整行返回
+        data = f.read(max_bytes + 1)
+
+    complete = data[: data.rfind(b"\n") + 1]
+    if not complete and len(data) > max_bytes:
+        partial = data[:max_bytes]
+        complete = partial[: _utf8_prefix_length(partial) or max_bytes]
+    lines: list[str] = []
+    offsets: list[int] = []
+    position = offset
+    for raw in complete.splitlines(keepends=True):
+        position += len(raw)
+        lines.append(raw.decode("utf-8", errors="replace").strip())
+        offsets.append(position)
+    return LogChunk(lines=lines, offsets=offsets, end_offset=position)
+
+
+def _append_lines(path: Path, lines: list[str]) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+class TaskLogWriter:
+    """按任务缓冲的日志写入器.
+
+    write() 只把行追加到内存缓冲；缓冲在 flush_interval 秒后或达到 max_buffered_lines 行时
+    在文件 I/O 线程池中批量追加到 `<logs_dir>/<task_id>.log`。读取日志前调用 flush(task_id)
+    即可看到本进程尚未落盘的行。
+    """
+
+    _instances: dict[Path, "TaskLogWriter"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        logs_dir: Path,
+        flush_interval: float = TASK_LOG_FLUSH_INTERVAL,
+        max_buffered_lines: int = TASK_LOG_BUFFER_LINES,
+    ) -> None:
+        """初始化日志写入器.
+
+        Args:
+            logs_dir: 日志目录
+            flush_interval: 定时落盘间隔（秒）
+            max_buffered_lines: 缓冲行数上限，达到后立即落盘
+        """
+        self.logs_dir = logs_dir
+        self.flush_interval = flush_interval
+        self.max_buffered_lines = max_buffered_lines
+        self._buffers: dict[str, list[str]] = {}
+        self._buffered = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_lock = asyncio.Lock()
+        self._pending: set[asyncio.Task] = set()
+
+    @classmethod
+    def for_directory(cls, logs_dir: Path) -> "TaskLogWriter":
+        """获取日志目录对应的共享写入器（TaskService 按请求创建，缓冲需跨请求共享）."""
+        with cls._instances_lock:
+            writer = cls._instances.get(logs_dir)
+            if writer is None:
+                writer = cls._instances[logs_dir] = cls(logs_dir)
+            return writer
+
+    def log_path(self, task_id: str) -> Path:
+        """任务日志文件路径."""
+        return self.logs_dir / f"{task_id}.log"
+
+    def write(self, task_id: str, line: str) -> None:
+        """缓冲一行日志（需包含换行符）."""
+        self._buffers.setdefault(task_id, []).append(line)
+        self._buffered += 1
+
+        try:
+            loop = self._bind()
+        except RuntimeError:
+            return
+
+        if self._buffered >= self.max_buffered_lines:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self._start_flush)
+
+    def _bind(self) -> asyncio.AbstractEventLoop:
+        """绑定当前事件循环（共享实例可能跨越多个事件循环，如测试或重启应用）."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._timer = None
+            self._flush_lock = asyncio.Lock()
+        return loop
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def flush(self, task_id: str | None = None) -> None:
+        """将缓冲写入文件.
+
+        Args:
+            task_id: 只落盘该任务的缓冲，为 None 时落盘全部
+        """
+        self._bind()
+
+        # 串行化落盘，保证同一任务的行按写入顺序追加
+        async with self._flush_lock:
+            if task_id is None:
+                batches, self._buffers = self._buffers, {}
+            else:
+                batch = self._buffers.pop(task_id, None)
+                batches = {task_id: batch} if batch else {}
+            self._buffered -= sum(len(lines) for lines in batches.values())
+
+            for batch_task_id, lines in batches.items():
+                try:
+                    await run_io(_append_lines, self.log_path(batch_task_id), lines)
+                except Exception as e:
+                    logger.error(f"Error saving task log: {str(e)}")
+
+    def discard(self, task_id: str) -> None:
+        """丢弃任务尚未落盘的缓冲（删除任务日志时使用）."""
+        self._buffered -= len(self._buffers.pop(task_id, []))
+
+    async def close(self) -> None:
+        """取消定时器并落盘全部缓冲."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
@@ -1,32 +1,51 @@
 """Task service for managing background tasks."""
 
+import asyncio
 import logging
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
+from cognizes.agents.config import settings
+from cognizes.api.services.file_io import run_io
+from cognizes.api.services.task_logs import LogChunk, TaskLogWriter, read_new_lines, tail_lines
+from cognizes.api.services.task_store import TaskStore, get_task_store
+
 logger = logging.getLogger(__name__)
 
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+ACTIVE_STATUSES = ("pending", "processing")
+
+FOLLOW_POLL_INTERVAL = 0.5
+FOLLOW_HEARTBEAT_INTERVAL = 15.0
+
 
 class TaskService:
     """任务管理服务."""
 
-    def __init__(self) -> None:
-        """初始化 TaskService."""
-        self.tasks: dict[str, dict[str, Any]] = {}  # 内存中的任务存储
+    def __init__(self, store: TaskStore | None = None) -> None:
+        """初始化 TaskService.
+
+        Args:
+            store: 任务存储，默认使用 settings.TASK_STORE_URL 对应的共享存储
+        """
+        self.store = store or get_task_store(settings.TASK_STORE_URL)
         self.logs_dir = Path("logs/tasks")
         self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self.log_writer = TaskLogWriter.for_directory(self.logs_dir)
 
     async def initialize(self) -> None:
         """初始化服务."""
+        await self.store.initialize()
         logger.info("TaskService initialized")
-        # 可以在这里加载持久化的任务
 
     async def cleanup(self) -> None:
         """清理服务."""
+        await self.log_writer.close()
+        await self.store.close()
         logger.info("TaskService cleanup completed")
-        # 保存正在运行的任务状态
 
     async def create_task(self, paper_id: str, workflow: str, params: dict[str, Any] | None = None) -> str:
         """创建新任务.
@@ -55,7 +74,7 @@ class TaskService:
             "params": params or {},
         }
 
-        self.tasks[task_id] = task
+        await self.store.create(task)
 
         # 保存到日志文件
         await self._save_task_log(task_id, "Task created")
@@ -71,10 +90,11 @@ class TaskService:
         Returns:
             任务详情
         """
-        if task_id not in self.tasks:
+        task = await self.store.get(task_id)
+        if task is None:
             raise ValueError(f"Task not found: {task_id}")
 
-        return self.tasks[task_id]
+        return task
 
     async def update_task(
         self,
@@ -87,6 +107,8 @@ class TaskService:
     ) -> None:
         """更新任务状态.
 
+        指定 status 时只允许从未结束的状态转换（在存储中原子校验），已结束的任务不会被覆盖。
+
         Args:
             task_id: 任务ID
             status: 状态
@@ -95,24 +117,27 @@ class TaskService:
             result: 结果
             error: 错误信息
         """
-        if task_id not in self.tasks:
-            logger.warning(f"Task not found for update: {task_id}")
-            return
-
-        task = self.tasks[task_id]
-
+        fields: dict[str, Any] = {}
         if status is not None:
-            task["status"] = status
+            fields["status"] = status
         if progress is not None:
-            task["progress"] = max(0, min(100, progress))
+            fields["progress"] = max(0, min(100, progress))
         if message is not None:
-            task["message"] = message
+            fields["message"] = message
         if result is not None:
-            task["result"] = result
+            fields["result"] = result
         if error is not None:
-            task["error"] = error
+            fields["error"] = error
 
-        task["updated_at"] = datetime.now().isoformat()
+        fields["updated_at"] = datetime.now().isoformat()
+
+        expected_status = ACTIVE_STATUSES if status is not None else None
+        if await self.store.update(task_id, fields, expected_status) is None:
+            if status is not None and await self.store.get(task_id) is not None:
+                logger.warning(f"Task {task_id} already finished, ignoring status update to {status}")
+            else:
+                logger.warning(f"Task not found for update: {task_id}")
+            return
 
         # 保存状态更新
         log_message = f"Status: {status}, Progress: {progress}%"
@@ -150,20 +175,24 @@ class TaskService:
         Returns:
             取消结果
         """
-        if task_id not in self.tasks:
-            raise ValueError(f"Task not found: {task_id}")
-
-        task = self.tasks[task_id]
+        task = await self.get_task(task_id)
 
-        if task["status"] in ["completed", "failed", "cancelled"]:
+        if task["status"] in FINISHED_STATUSES:
             return {
                 "task_id": task_id,
                 "status": task["status"],
                 "message": f"Task is already {task['status']}",
             }
 
-        # 更新状态
+        # 更新状态（任务可能在读取后已结束，以存储中的原子转换为准）
         await self.update_task(task_id, status="cancelled", message="Task cancelled by user")
+        task = await self.get_task(task_id)
+        if task["status"] != "cancelled":
+            return {
+                "task_id": task_id,
+                "status": task["status"],
+                "message": f"Task is already {task['status']}",
+            }
 
         return {
             "task_id": task_id,
@@ -178,37 +207,25 @@ class TaskService:
         workflow: str | None = None,
         limit: int = 20,
         offset: int = 0,
+        cursor: str | None = None,
     ) -> dict[str, Any]:
-        """获取任务列表.
+        """获取任务列表（按创建时间倒序）.
 
         Args:
             status: 状态筛选
             paper_id: 论文ID筛选
             workflow: 工作流筛选
             limit: 返回数量限制
-            offset: 偏移量
+            offset: 偏移量（提供 cursor 时忽略）
+            cursor: 上一页返回的 next_cursor，使用 keyset 分页
 
         Returns:
-            任务列表
+            任务列表、总数与下一页游标
         """
-        tasks = list(self.tasks.values())
-
-        # 应用筛选
-        if status:
-            tasks = [t for t in tasks if t["status"] == status]
-        if paper_id:
-            tasks = [t for t in tasks if t["paper_id"] == paper_id]
-        if workflow:
-            tasks = [t for t in tasks if t["workflow"] == workflow]
-
-        # 排序（按创建时间倒序）
-        tasks.sort(key=lambda x: x["created_at"], reverse=True)
-
-        # 分页
-        total = len(tasks)
-        tasks = tasks[offset : offset + limit]
-
-        return {"tasks": tasks, "total": total, "offset": offset, "limit": limit}
+        page = await self.store.list_tasks(
+            status=status, paper_id=paper_id, workflow=workflow, limit=limit, offset=offset, cursor=cursor
+        )
+        return {**page, "offset": 0 if cursor else offset, "limit": limit}
 
     async def get_task_logs(self, task_id: str, lines: int = 100) -> list[str]:
         """获取任务日志.
@@ -220,22 +237,90 @@ class TaskService:
         Returns:
             日志行列表
         """
-        log_file = self.logs_dir / f"{task_id}.log"
+        await self.log_writer.flush(task_id)
+        log_file = self.log_writer.log_path(task_id)
 
         if not log_file.exists():
             return []
 
         try:
-            with open(log_file, encoding="utf-8") as f:
-                all_lines = f.readlines()
-
-            # 返回最后 N 行
-            return [line.strip() for line in all_lines[-lines:]]
+            # 从文件末尾反向按块读取最后 N 行
+            return await run_io(tail_lines, log_file, lines)
 
         except Exception as e:
             logger.error(f"Error reading task logs: {str(e)}")
             return []
 
+    async def follow_task_logs(
+        self,
+        task_id: str,
+        lines: int = 100,
+        offset: int | None = None,
+        poll_interval: float = FOLLOW_POLL_INTERVAL,
+        heartbeat_interval: float = FOLLOW_HEARTBEAT_INTERVAL,
+    ) -> AsyncIterator[LogChunk]:
+        """持续读取任务日志（follow 模式）.
+
+        先返回最后 lines 行（提供 offset 时改为从该字节偏移续读），之后轮询文件大小，
+        只读取新增的完整行。任务结束且剩余日志读完后停止；空闲超过 heartbeat_interval
+        时返回空块作为心跳。
+
+        Args:
+            task_id: 任务ID
+            lines: 初始返回的日志行数
+            offset: 续读的字节偏移（如 SSE 的 Last-Event-ID）
+            poll_interval: 轮询间隔（秒）
+            heartbeat_interval: 心跳间隔（秒）
+
+        Yields:
+            新增日志行及其结束偏移
+        """
+        log_file = self.log_writer.log_path(task_id)
+        loop = asyncio.get_running_loop()
+
+        await self.log_writer.flush(task_id)
+        if offset is None:
+            offset = await run_io(self._log_size, log_file)
+            tail = await run_io(tail_lines, log_file, lines) if offset else []
+            yield LogChunk(lines=tail, offsets=[offset] * len(tail), end_offset=offset)
+
+        finished_at: float | None = None
+        last_sent = loop.time()
+        while True:
+            await self.log_writer.flush(task_id)
+            size = await run_io(self._log_size, log_file)
+            if size < offset:
+                # 日志已被清理或截断
+                return
+            if size > offset:
+                chunk = await run_io(read_new_lines, log_file, offset)
+                if chunk.lines:
+                    offset = chunk.end_offset
+                    last_sent = loop.time()
+                    yield chunk
+                    continue
+
+            if finished_at is None:
+                task = await self.store.get(task_id)
+                if task is None or task["status"] in FINISHED_STATUSES:
+                    finished_at = loop.time()
+            elif loop.time() - finished_at >= self.log_writer.flush_interval:
+                # 等待一个落盘周期，读完其他进程缓冲中的最后几行
+                return
+
+            if loop.time() - last_sent >= heartbeat_interval:
+                last_sent = loop.time()
+                yield LogChunk(lines=[], offsets=[], end_offset=offset)
+            await asyncio.sleep(poll_interval)
+
+    @staticmethod
+    def _log_size(log_file: Path) -> int:
+        """日志文件大小（不存在时为 0）."""
+        try:
+            return log_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+
     async def cleanup_completed_tasks(self, older_than_hours: int = 24) -> dict[str, Any]:
         """清理已完成的任务.
 
@@ -248,19 +333,12 @@ class TaskService:
         cutoff_time = datetime.now() - timedelta(hours=older_than_hours)
         cutoff_str = cutoff_time.isoformat()
 
-        tasks_to_remove = []
+        tasks_to_remove = await self.store.delete_finished(FINISHED_STATUSES, cutoff_str)
 
-        for task_id, task in self.tasks.items():
-            if task["status"] in ["completed", "failed", "cancelled"]:
-                if task["updated_at"] < cutoff_str:
-                    tasks_to_remove.append(task_id)
-
-        # 删除任务
+        # 删除日志文件
         for task_id in tasks_to_remove:
-            del self.tasks[task_id]
-
-            # 删除日志文件
-            log_file = self.logs_dir / f"{task_id}.log"
+            self.log_writer.discard(task_id)
+            log_file = self.log_writer.log_path(task_id)
             if log_file.exists():
                 log_file.unlink()
 
@@ -269,20 +347,14 @@ class TaskService:
         return {"cleaned": len(tasks_to_remove), "cutoff_time": cutoff_str}
 
     async def _save_task_log(self, task_id: str, message: str) -> None:
-        """保存任务日志.
+        """保存任务日志（写入缓冲，由 TaskLogWriter 定时批量落盘）.
 
         Args:
             task_id: 任务ID
             message: 日志消息
         """
-        log_file = self.logs_dir / f"{task_id}.log"
         timestamp = datetime.now().isoformat()
-
-        try:
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(f"[{timestamp}] {message}\n")
-        except Exception as e:
-            logger.error(f"Error saving task log: {str(e)}")
+        self.log_writer.write(task_id, f"[{timestamp}] {message}\n")
 
     async def get_task_statistics(self) -> dict[str, Any]:
         """获取任务统计信息.
@@ -290,19 +362,10 @@ class TaskService:
         Returns:
             统计信息
         """
-        stats = {
-            "total": len(self.tasks),
-            "pending": 0,
-            "processing": 0,
-            "completed": 0,
-            "failed": 0,
-            "cancelled": 0,
-        }
-
-        for task in self.tasks.values():
-            status = task["status"]
-            if status in stats:
-                stats[status] += 1
+        counts = await self.store.count_by_status()
+        stats = {"total": sum(counts.values())}
+        for status in (*ACTIVE_STATUSES, *FINISHED_STATUSES):
+            stats[status] = counts.get(status, 0)
 
         # 计算成功率
         completed = stats["completed"]
@@ -0,0 +1,553 @@
+"""Durable task storage backends for TaskService.
+
+任务记录保存在带索引的数据库中，多个 uvicorn worker 共享同一视图，重启后不丢失:
+- SQLiteTaskStore: 单机部署，WAL 模式，默认后端
+- PostgresTaskStore: 多机部署，基于 asyncpg 连接池
+- MemoryTaskStore: 进程内存储，用于测试
+
+列表查询按 (created_at, task_id) 倒序，支持 offset 与 keyset 游标分页；
+状态更新可指定允许的源状态，在一条条件 UPDATE 中完成校验与写入（原子状态转换）。
+
+后端通过 TASK_STORE_URL 选择:
+    sqlite:///logs/tasks/tasks.sqlite3 | postgresql://user@host/db | memory://
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Collection
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from cognizes.api.services.file_io import run_io
+from cognizes.api.services.paper_catalog import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+TASK_COLUMNS = (
+    "task_id",
+    "paper_id",
+    "workflow",
+    "status",
+    "progress",
+    "message",
+    "result",
+    "error",
+    "created_at",
+    "updated_at",
+    "params",
+)
+JSON_COLUMNS = ("result", "params")
+
+
+class TaskStore(ABC):
+    """任务存储接口."""
+
+    @abstractmethod
+    async def initialize(self) -> None:
+        """建表/建索引（幂等）."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """释放连接，之后的调用会重新连接."""
+
+    @abstractmethod
+    async def create(self, task: dict[str, Any]) -> None:
+        """写入新任务."""
+
+    @abstractmethod
+    async def get(self, task_id: str) -> dict[str, Any] | None:
+        """获取任务，不存在时返回 None."""
+
+    @abstractmethod
+    async def update(
+        self, task_id: str, fields: dict[str, Any], expected_status: Collection[str] | None = None
+    ) -> dict[str, Any] | None:
+        """原子更新任务.
+
+        Args:
+            task_id: 任务ID
+            fields: 要更新的字段
+            expected_status: 允许的当前状态，为 None 时不校验
+
+        Returns:
+            更新后的任务；任务不存在或当前状态不在 expected_status 中时返回 None
+        """
+
+    @abstractmethod
+    async def list_tasks(
+        self,
+        status: str | None = None,
+        paper_id: str | None = None,
+        workflow: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """按创建时间倒序分页查询.
+
+        Returns:
+            任务列表、总数与下一页游标
+        """
+
+    @abstractmethod
+    async def delete_finished(self, statuses: Collection[str], updated_before: str) -> list[str]:
+        """删除在 updated_before 之前结束的任务.
+
+        Returns:
+            被删除的任务ID
+        """
+
+    @abstractmethod
+    async def count_by_status(self) -> dict[str, int]:
+        """按状态统计任务数."""
+
+    @staticmethod
+    def _page(tasks: list[dict[str, Any]], total: int, limit: int) -> dict[str, Any]:
+        next_cursor = None
+        if len(tasks) == limit and tasks:
+            last = tasks[-1]
+            next_cursor = encode_cursor(last["created_at"], last["task_id"])
+        return {"tasks": tasks, "total": total, "next_cursor": next_cursor}
+
+
+# ========================================
+# 内存后端
+# ========================================
+
+
+class MemoryTaskStore(TaskStore):
+    """进程内任务存储（不持久化，仅用于测试与单进程调试）."""
+
+    def __init__(self) -> None:
+        """初始化内存存储."""
+        self.tasks: dict[str, dict[str, Any]] = {}
+
+    async def initialize(self) -> None:
+        """内存存储无需建表."""
+
+    async def close(self) -> None:
+        """内存存储没有需要释放的连接."""
+
+    async def create(self, task: dict[str, Any]) -> None:
+        self.tasks[task["task_id"]] = dict(task)
+
+    async def get(self, task_id: str) -> dict[str, Any] | None:
+        task = self.tasks.get(task_id)
+        return dict(task) if task else None
+
+    async def update(
+        self, task_id: str, fields: dict[str, Any], expected_status: Collection[str] | None = None
+    ) -> dict[str, Any] | None:
+        task = self.tasks.get(task_id)
+        if task is None or (expected_status is not None and task["status"] not in expected_status):
+            return None
+        task.update(fields)
+        return dict(task)
+
+    async def list_tasks(
+        self,
+        status: str | None = None,
+        paper_id: str | None = None,
+        workflow: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        tasks = [
+            t
+            for t in self.tasks.values()
+            if (not status or t["status"] == status)
+            and (not paper_id or t["paper_id"] == paper_id)
+            and (not workflow or t["workflow"] == workflow)
+        ]
+        tasks.sort(key=lambda t: (t["created_at"], t["task_id"]), reverse=True)
+        total = len(tasks)
+        if cursor:
+            position = decode_cursor(cursor)
+            tasks = [t for t in tasks if (t["created_at"], t["task_id"]) < position]
+            offset = 0
+        return self._page([dict(t) for t in tasks[offset : offset + limit]], total, limit)
+
+    async def delete_finished(self, statuses: Collection[str], updated_before: str) -> list[str]:
+        task_ids = [
+            task_id
+            for task_id, task in self.tasks.items()
+            if task["status"] in statuses and task["updated_at"] < updated_before
+        ]
+        for task_id in task_ids:
+            del self.tasks[task_id]
+        return task_ids
+
+    async def count_by_status(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for task in self.tasks.values():
+            counts[task["status"]] = counts.get(task["status"], 0) + 1
+        return counts
+
+
+# ========================================
+# SQLite 后端
+# ========================================
+
+SQLITE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id    TEXT PRIMARY KEY,
+    paper_id   TEXT NOT NULL,
+    workflow   TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    progress   REAL NOT NULL DEFAULT 0,
+    message    TEXT NOT NULL DEFAULT '',
+    result     TEXT,
+    error      TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    params     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at DESC, task_id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at DESC, task_id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_paper ON tasks (paper_id, created_at DESC, task_id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_workflow ON tasks (workflow, created_at DESC, task_id DESC);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON tasks (status, updated_at);
+"""
+
+
+class SQLiteTaskStore(TaskStore):
+    """基于 SQLite 的任务存储（单机多 worker 共享同一数据库文件）."""
+
+    def __init__(self, db_path: Path) -> None:
+        """初始化 SQLite 存储.
+
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SQLITE_SCHEMA_SQL)
+            self._conn = conn
+        return self._conn
+
+    def _run(self, sql: str, params: Any = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    async def _execute(self, sql: str, params: Any = ()) -> list[sqlite3.Row]:
+        return await run_io(self._run, sql, params)
+
+    async def initialize(self) -> None:
+        await run_io(self._run, "SELECT 1")
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def create(self, task: dict[str, Any]) -> None:
+        row = _encode_json(task)
+        await self._execute(
+            f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}) VALUES ({', '.join(':' + c for c in TASK_COLUMNS)})",
+            row,
+        )
+
+    async def get(self, task_id: str) -> dict[str, Any] | None:
+        rows = await self._execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,))
+        return _decode_json(dict(rows[0])) if rows else None
+
+    async def update(
+        self, task_id: str, fields: dict[str, Any], expected_status: Collection[str] | None = None
+    ) -> dict[str, Any] | None:
+        fields = _encode_json(fields)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        sql = f"UPDATE tasks SET {assignments} WHERE task_id = ?"
+        params: list[Any] = [*fields.values(), task_id]
+        if expected_status is not None:
+            sql += f" AND status IN ({', '.join('?' * len(expected_status))})"
+            params.extend(expected_status)
+        rows = await self._execute(sql + " RETURNING *", params)
+        return _decode_json(dict(rows[0])) if rows else None
+
+    async def list_tasks(
+        self,
+        status: str | None = None,
+        paper_id: str | None = None,
+        workflow: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        filters, params = _filters({"status": status, "paper_id": paper_id, "workflow": workflow}, "?")
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+        page_filters, page_params = list(filters), list(params)
+        if cursor:
+            page_filters.append("(created_at, task_id) < (?, ?)")
+            page_params.extend(decode_cursor(cursor))
+            offset = 0
+        page_where = f"WHERE {' AND '.join(page_filters)}" if page_filters else ""
+
+        def query() -> tuple[int, list[sqlite3.Row]]:
+            with self._lock:
+                conn = self._connect()
+                total = conn.execute(f"SELECT COUNT(*) FROM tasks {where}", params).fetchone()[0]
+                rows = conn.execute(
+                    f"SELECT * FROM tasks {page_where} ORDER BY created_at DESC, task_id DESC LIMIT ? OFFSET ?",
+                    [*page_params, limit, offset],
+                ).fetchall()
+            return total, rows
+
+        total, rows = await run_io(query)
+        return self._page([_decode_json(dict(row)) for row in rows], total, limit)
+
+    async def delete_finished(self, statuses: Collection[str], updated_before: str) -> list[str]:
+        rows = await self._execute(
+            f"DELETE FROM tasks WHERE status IN ({', '.join('?' * len(statuses))}) AND updated_at < ? "
+            "RETURNING task_id",
+            [*statuses, updated_before],
+        )
+        return [row["task_id"] for row in rows]
+
+    async def count_by_status(self) -> dict[str, int]:
+        rows = await self._execute("SELECT status, COUNT(*) AS count FROM tasks GROUP BY status")
+        return {row["status"]: row["count"] for row in rows}
+
+
+# ========================================
+# PostgreSQL 后端
+# ========================================
+
+POSTGRES_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS paper_tasks (
+    task_id    TEXT PRIMARY KEY,
+    paper_id   TEXT NOT NULL,
+    workflow   TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    progress   DOUBLE PRECISION NOT NULL DEFAULT 0,
+    message    TEXT NOT NULL DEFAULT '',
+    result     JSONB,
+    error      TEXT,
+    created_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    params     JSONB
+);
+CREATE INDEX IF NOT EXISTS idx_paper_tasks_created ON paper_tasks (created_at DESC, task_id DESC);
+CREATE INDEX IF NOT EXISTS idx_paper_tasks_status ON paper_tasks (status, created_at DESC, task_id DESC);
+CREATE INDEX IF NOT EXISTS idx_paper_tasks_paper ON paper_tasks (paper_id, created_at DESC, task_id DESC);
+CREATE INDEX IF NOT EXISTS idx_paper_tasks_workflow ON paper_tasks (workflow, created_at DESC, task_id DESC);
+CREATE INDEX IF NOT EXISTS idx_paper_tasks_status_updated ON paper_tasks (status, updated_at);
+"""
+
+
+class PostgresTaskStore(TaskStore):
+    """基于 PostgreSQL 的任务存储（多机部署）."""
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 5) -> None:
+        """初始化 PostgreSQL 存储.
+
+        Args:
+            dsn: 连接串
+            min_size: 连接池最小连接数
+            max_size: 连接池最大连接数
+        """
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool: Any = None
+        self._pool_lock = asyncio.Lock()
+
+    async def _get_pool(self) -> Any:
+        if self._pool is not None:
+            return self._pool
+        # 并发的首次调用只创建一个连接池；建表完成后才对其他调用可见
+        async with self._pool_lock:
+            if self._pool is None:
+                import asyncpg
+
+                pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+                try:
+                    async with pool.acquire() as conn:
+                        await conn.execute(POSTGRES_SCHEMA_SQL)
+                except BaseException:
+                    await pool.close()
+                    raise
+                self._pool = pool
+            return self._pool
+
+    async def initialize(self) -> None:
+        await self._get_pool()
+
+    async def close(self) -> None:
+        async with self._pool_lock:
+            pool, self._pool = self._pool, None
+            if pool is not None:
+                await pool.close()
+
+    async def create(self, task: dict[str, Any]) -> None:
+        row = _to_pg(task)
+        pool = await self._get_pool()
+        await pool.execute(
+            f"INSERT INTO paper_tasks ({', '.join(TASK_COLUMNS)}) "
+            f"VALUES ({', '.join(_pg_placeholder(c, i) for i, c in enumerate(TASK_COLUMNS, 1))})",
+            *(row[c] for c in TASK_COLUMNS),
+        )
+
+    async def get(self, task_id: str) -> dict[str, Any] | None:
+        pool = await self._get_pool()
+        row = await pool.fetchrow("SELECT * FROM paper_tasks WHERE task_id = $1", task_id)
+        return _from_pg(row) if row else None
+
+    async def update(
+        self, task_id: str, fields: dict[str, Any], expected_status: Collection[str] | None = None
+    ) -> dict[str, Any] | None:
+        fields = _to_pg(fields)
+        columns = list(fields)
+        assignments = ", ".join(f"{c} = {_pg_placeholder(c, i)}" for i, c in enumerate(columns, 1))
+        sql = f"UPDATE paper_tasks SET {assignments} WHERE task_id = ${len(columns) + 1}"
+        params: list[Any] = [*fields.values(), task_id]
+        if expected_status is not None:
+            sql += f" AND status = ANY(${len(columns) + 2}::text[])"
+            params.append(list(expected_status))
+        pool = await self._get_pool()
+        row = await pool.fetchrow(sql + " RETURNING *", *params)
+        return _from_pg(row) if row else None
+
+    async def list_tasks(
+        self,
+        status: str | None = None,
+        paper_id: str | None = None,
+        workflow: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        filters, params = _filters({"status": status, "paper_id": paper_id, "workflow": workflow}, "$")
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+        page_filters, page_params = list(filters), list(params)
+        if cursor:
+            created_at, task_id = decode_cursor(cursor)
+            n = len(page_params)
+            page_filters.append(f"(created_at, task_id) < (${n + 1}, ${n + 2})")
+            page_params.extend([datetime.fromisoformat(created_at), task_id])
+            offset = 0
+        page_where = f"WHERE {' AND '.join(page_filters)}" if page_filters else ""
+        n = len(page_params)
+
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            total = await conn.fetchval(f"SELECT COUNT(*) FROM paper_tasks {where}", *params)
+            rows = await conn.fetch(
+                f"SELECT * FROM paper_tasks {page_where} "
+                f"ORDER BY created_at DESC, task_id DESC LIMIT ${n + 1} OFFSET ${n + 2}",
+                *page_params,
+                limit,
+                offset,
+            )
+        return self._page([_from_pg(row) for row in rows], total, limit)
+
+    async def delete_finished(self, statuses: Collection[str], updated_before: str) -> list[str]:
+        pool = await self._get_pool()
+        rows = await pool.fetch(
+            "DELETE FROM paper_tasks WHERE status = ANY($1::text[]) AND updated_at < $2 RETURNING task_id",
+            list(statuses),
+            datetime.fromisoformat(updated_before),
+        )
+        return [row["task_id"] for row in rows]
+
+    async def count_by_status(self) -> dict[str, int]:
+        pool = await self._get_pool()
+        rows = await pool.fetch("SELECT status, COUNT(*) AS count FROM paper_tasks GROUP BY status")
+        return {row["status"]: row["count"] for row in rows}
+
+
+# ========================================
+# 工具函数
+# ========================================
+
+
+def _filters(values: dict[str, Any], style: str) -> tuple[list[str], list[Any]]:
+    """构建等值筛选条件（style 为 "?" 或 "$"）."""
+    filters: list[str] = []
+    params: list[Any] = []
+    for column, value in values.items():
+        if value:
+            params.append(value)
+            filters.append(f"{column} = ?" if style == "?" else f"{column} = ${len(params)}")
+    return filters, params
+
+
+def _encode_json(fields: dict[str, Any]) -> dict[str, Any]:
+    return {
+        k: json.dumps(v, ensure_ascii=False) if k in JSON_COLUMNS and v is not None else v for k, v in fields.items()
+    }
+
+
+def _decode_json(row: dict[str, Any]) -> dict[str, Any]:
+    for column in JSON_COLUMNS:
+        if row.get(column) is not None:
+            row[column] = json.loads(row[column])
+    return row
+
+
+def _pg_placeholder(column: str, index: int) -> str:
+    return f"${index}::jsonb" if column in JSON_COLUMNS else f"${index}"
+
+
+def _to_pg(fields: dict[str, Any]) -> dict[str, Any]:
+    row = _encode_json(fields)
+    for column in ("created_at", "updated_at"):
+        if isinstance(row.get(column), str):
+            row[column] = datetime.fromisoformat(row[column])
+    return row
+
+
+def _from_pg(record: Any) -> dict[str, Any]:
+    row = _decode_json(dict(record))
+    for column in ("created_at", "updated_at"):
+        if isinstance(row.get(column), datetime):
+            row[column] = row[column].isoformat()
+    return row
+
+
+_stores: dict[str, TaskStore] = {}
+_stores_lock = threading.Lock()
+
+
+def create_task_store(url: str) -> TaskStore:
+    """根据 URL 创建任务存储.
+
+    Args:
+        url: sqlite:///<path>、postgresql://... 或 memory://
+
+    Returns:
+        任务存储实例
+    """
+    if url.startswith(("postgresql://", "postgres://")):
+        return PostgresTaskStore(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteTaskStore(Path(url.removeprefix("sqlite:///")))
+    if url == "memory://":
+        return MemoryTaskStore()
+    raise ValueError(f"Unsupported task store URL: {url}")
+
+
+def get_task_store(url: str) -> TaskStore:
+    """获取 URL 对应的共享任务存储（TaskService 按请求创建，连接需跨请求复用）."""
+    with _stores_lock:
+        store = _stores.get(url)
+        if store is None:
+            store = _stores[url] = create_task_store(url)
+        return store
@@ -9,9 +9,15 @@ import asyncio
 import logging
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, WebSocket, WebSocketDisconnect
 
-from cognizes.engine.pulse.pg_notify_listener import PgNotifyListener, NotifyEvent
+import asyncpg
+
+from cognizes.engine.pulse.event_bridge import parse_event_id
+from cognizes.engine.pulse.event_fetcher import CURSOR_CHANNEL, EventFetcher, SequenceWindow
+from cognizes.engine.pulse.event_hub import EventHub, Subscription
+from cognizes.engine.pulse.event_relay import DEFAULT_RELAY_SOCKET, create_event_transport
+from cognizes.engine.pulse.pg_notify_listener import EventTransport
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -20,26 +26,70 @@ logger = logging.getLogger(__name__)
 # 数据库连接配置
 DB_DSN = os.getenv("DATABASE_URL", "postgresql://aigc:@localhost/cognizes-engine")
 
+# 断线重连单次最多回放的事件数，超出时通知客户端整体重载
+MAX_REPLAY_EVENTS = int(os.getenv("EVENT_MAX_REPLAY", "1000"))
+
+# 事件流模式: notify (NOTIFY 直接携带元数据) | cursor (NOTIFY 携带水位，按需批量拉取行数据)
+EVENT_STREAM_MODE = os.getenv("EVENT_STREAM_MODE", "notify")
+
+# 事件传输层: listen (每进程直连 LISTEN) | relay (经本地 EventRelay 接收，多进程共享一个 LISTEN 连接)
+EVENT_TRANSPORT = os.getenv("EVENT_TRANSPORT", "listen")
+EVENT_RELAY_SOCKET = os.getenv("EVENT_RELAY_SOCKET", DEFAULT_RELAY_SOCKET)
+
 # 全局监听器实例
-listener: PgNotifyListener | None = None
+listener: EventTransport | None = None
+fetcher: EventFetcher | None = None
+pool: asyncpg.Pool | None = None
+
+# 全局事件扇出中枢：每条 NOTIFY 只解码一次，按 thread_id/run_id 索引路由
+hub = EventHub(
+    channel="event_stream",
+    queue_maxsize=int(os.getenv("EVENT_HUB_QUEUE_SIZE", "256")),
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    global listener
+    global listener, fetcher, pool
 
     # 启动时：初始化监听器
-    listener = PgNotifyListener(dsn=DB_DSN, channels=["event_stream"])
+    # Cursor 模式下行数据只经 EventFetcher 发布到 hub，不再订阅逐行 NOTIFY 频道，避免重复投递
+    channels = [CURSOR_CHANNEL] if EVENT_STREAM_MODE == "cursor" else ["event_stream"]
+
+    listener = create_event_transport(
+        dsn=DB_DSN,
+        channels=channels,
+        mode=EVENT_TRANSPORT,
+        socket_path=EVENT_RELAY_SOCKET,
+    )
+
+    # EventFetcher 同时承担断线重连回放，两种模式下都需要
+    pool = await asyncpg.create_pool(DB_DSN, min_size=1, max_size=5)
+    fetcher = EventFetcher(pool)
+
+    if EVENT_STREAM_MODE == "cursor":
+        fetcher.on_event(hub.publish)
+        fetcher.attach(listener)
+        await fetcher.install_trigger()
+        await fetcher.start()
+        logger.info("✓ EventFetcher started (cursor mode)")
+    else:
+        hub.attach(listener)
+
     await listener.start()
-    logger.info("✓ PgNotifyListener started")
+    logger.info(f"✓ Event transport started ({EVENT_TRANSPORT})")
 
     yield
 
     # 关闭时：停止监听器
     if listener:
         await listener.stop()
-        logger.info("✓ PgNotifyListener stopped")
+        logger.info("✓ Event transport stopped")
+    if fetcher:
+        await fetcher.stop()
+    if pool:
+        await pool.close()
 
 
 app = FastAPI(
@@ -55,43 +105,97 @@ async def health_check():
     return {"status": "ok", "listener_running": listener._running if listener else False}
 
 
+@app.get("/api/event-hub/metrics")
+async def event_hub_metrics():
+    """EventHub 指标：订阅数、队列深度、分发/投递延迟"""
+    from dataclasses import asdict
+
+    return {
+        "hub": asdict(hub.get_metrics()),
+        "subscribers": [asdict(stats) for stats in hub.subscriber_stats()],
+        "fetcher": asdict(fetcher.get_metrics()) if fetcher else None,
+    }
+
+
+def _event_seq(payload: dict) -> int | None:
+    """读取事件载荷中的 sequence_num (顶层或 data 子对象)"""
+    seq = payload.get("sequence_num")
+    if seq is None and isinstance(payload.get("data"), dict):
+        seq = payload["data"].get("sequence_num")
+    return int(seq) if seq is not None else None
+
+
+def _sent_window(subscription: Subscription) -> SequenceWindow:
+    """
+    已发送事件的 sequence_num 窗口，回放与实时发送后都记录
+
+    按序号集合而非最大水位去重：晚提交的较小序号事件在回放之后才可见，不能被跳过。
+    窗口覆盖一次回放加上回放期间订阅队列中积压的实时事件。
+    """
+    return SequenceWindow(MAX_REPLAY_EVENTS + subscription.maxsize)
+
+
+async def _replay_missed(thread_id: str, last_seq: int) -> tuple[list[dict], bool]:
+    """从 events 表回放 last_seq 之后的事件；thread_id 非法或未初始化时不回放"""
+    if fetcher is None or thread_id == "*":
+        return [], False
+    try:
+        return await fetcher.replay(thread_id, last_seq, max_events=MAX_REPLAY_EVENTS)
+    except ValueError:
+        return [], False
+
+
 @app.websocket("/ws/events/{thread_id}")
-async def websocket_endpoint(websocket: WebSocket, thread_id: str):
+async def websocket_endpoint(websocket: WebSocket, thread_id: str, last_event_id: str | None = None):
     """
     WebSocket 端点：订阅指定 thread_id 的实时事件
 
+    重连时携带最后收到的 id (即 events.sequence_num)，先回放遗漏事件再切换实时流。
+
     Usage:
-        ws://localhost:8000/ws/events/{thread_id}
+        ws://localhost:8000/ws/events/{thread_id}?last_event_id=1024
     """
     await websocket.accept()
     logger.info(f"WebSocket connected: thread_id={thread_id}")
 
-    queue: asyncio.Queue = asyncio.Queue()
-
-    async def on_event(event: NotifyEvent):
-        """事件回调：将事件放入队列"""
-        payload_thread_id = event.payload.get("thread_id") or event.payload.get("data", {}).get("thread_id")
-        if payload_thread_id == thread_id or thread_id == "*":
-            await queue.put(event)
-
-    # 注册回调
-    if listener:
-        listener.on_event("event_stream", on_event)
+    # 先订阅再回放：回放期间的实时事件缓存在订阅队列中，随后按 sequence_num 去重
+    subscription = hub.subscribe(thread_id=thread_id)
+    sent = _sent_window(subscription)
 
     try:
-        while True:
-            event = await queue.get()
+        last_seq = parse_event_id(last_event_id)
+        if last_seq is not None:
+            payloads, truncated = await _replay_missed(thread_id, last_seq)
+            if truncated:
+                # 遗漏过多：通知客户端整体重载，此后仅推送实时事件
+                await websocket.send_json({"channel": "control", "payload": {"name": "resync_required"}})
+                payloads = []
+            for payload in payloads:
+                seq = _event_seq(payload)
+                await websocket.send_json({"id": seq, "channel": "replay", "payload": payload})
+                if seq is not None:
+                    sent.add(seq)
+
+        async for event in subscription:
+            seq = _event_seq(event.payload)
+            if seq is not None and seq in sent:
+                continue
             await websocket.send_json(
                 {
+                    "id": seq,
                     "channel": event.channel,
                     "payload": event.payload,
                     "received_at": event.received_at.isoformat(),
                 }
             )
+            if seq is not None:
+                sent.add(seq)
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected: thread_id={thread_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
+        subscription.close()
 
 
 @app.get("/api/test-notify")
@@ -122,12 +226,21 @@ async def test_notify():
 
 
 @app.get("/api/runs/{run_id}/events")
-async def sse_events(run_id: str):
+async def sse_events(
+    run_id: str,
+    thread_id: str | None = None,
+    last_event_id: str | None = None,
+    last_event_id_header: str | None = Header(default=None, alias="Last-Event-ID"),
+):
     """
     SSE 端点：订阅指定 run_id 的 AG-UI 事件流
 
+    传入 thread_id 时按 thread 订阅，并支持断线续传：浏览器 EventSource 重连时自动回传
+    Last-Event-ID (也可用 last_event_id 查询参数)，服务端先回放遗漏事件再切换实时流。
+
     Usage:
         curl -N http://localhost:8000/api/runs/test-run/events
+        curl -N -H "Last-Event-ID: 1024" "http://localhost:8000/api/runs/test-run/events?thread_id=..."
 
     Response:
         Content-Type: text/event-stream
@@ -137,19 +250,12 @@ async def sse_events(run_id: str):
     from cognizes.engine.pulse.event_bridge import AgUiEvent, AgUiEventType
     import json
 
+    last_seq = parse_event_id(last_event_id_header or last_event_id)
+
     async def event_generator():
         """生成 SSE 事件流"""
-        queue: asyncio.Queue = asyncio.Queue()
-
-        async def on_event(event: NotifyEvent):
-            """事件回调：将事件放入队列"""
-            payload_run_id = event.payload.get("run_id") or event.payload.get("id")
-            if payload_run_id == run_id or run_id == "*":
-                await queue.put(event)
-
-        # 注册回调
-        if listener:
-            listener.on_event("event_stream", on_event)
+        subscription = hub.subscribe(thread_id=thread_id) if thread_id else hub.subscribe(run_id=run_id)
+        sent = _sent_window(subscription)
 
         try:
             # 发送初始连接事件
@@ -160,18 +266,47 @@ async def sse_events(run_id: str):
             )
             yield initial_event.to_sse()
 
+            # 断线续传：回放遗漏事件
+            if last_seq is not None and thread_id:
+                payloads, truncated = await _replay_missed(thread_id, last_seq)
+                if truncated:
+                    yield AgUiEvent(type=AgUiEventType.CUSTOM, run_id=run_id, data={"name": "resync_required"}).to_sse()
+                    payloads = []
+                for payload in payloads:
+                    seq = _event_seq(payload)
+                    yield AgUiEvent(
+                        type=AgUiEventType.RAW,
+                        run_id=run_id,
+                        data={"payload": payload},
+                        event_id=str(seq) if seq is not None else None,
+                    ).to_sse()
+                    if seq is not None:
+                        sent.add(seq)
+
             while True:
                 try:
-                    event = await asyncio.wait_for(queue.get(), timeout=30.0)
+                    event = await subscription.get(timeout=30.0)
+                    seq = _event_seq(event.payload)
+                    if seq is not None and seq in sent:
+                        continue
                     # 转换为 AG-UI 事件格式
-                    agui_event = AgUiEvent(type=AgUiEventType.RAW, run_id=run_id, data={"payload": event.payload})
+                    agui_event = AgUiEvent(
+                        type=AgUiEventType.RAW,
+                        run_id=run_id,
+                        data={"payload": event.payload},
+                        event_id=str(seq) if seq is not None else None,
+                    )
                     yield agui_event.to_sse()
+                    if seq is not None:
+                        sent.add(seq)
                 except asyncio.TimeoutError:
                     # 发送心跳保持连接
                     heartbeat = AgUiEvent(type=AgUiEventType.CUSTOM, run_id=run_id, data={"name": "heartbeat"})
                     yield heartbeat.to_sse()
         except asyncio.CancelledError:
             logger.info(f"SSE stream cancelled: run_id={run_id}")
+        finally:
+            subscription.close()
 
     return StreamingResponse(
         event_generator(),
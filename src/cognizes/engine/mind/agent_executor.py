@@ -1,11 +1,21 @@
 """
 AgentExecutor: Agent 执行编排器 - 管理 Thought -> Action -> Observation 循环
+
+单步可包含多个 Action，相互独立的工具调用并发执行 (按工具限流、按步截止)，
+Observation 按 Action 出现顺序合并。
+
+run_stream() 为流式模式：逐 token 消费 LLM 输出，增量解析 Action / Action Input，
+参数一旦完整即派发工具，并把增量转发给 ThinkingVisualizer。
 """
 
-from dataclasses import dataclass
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import AsyncGenerator
+
+from cognizes.engine.mind.thinking_visualizer import ThinkingVisualizer, ToolExecution
 
 
 class ExecutionStatus(Enum):
@@ -17,6 +27,15 @@ class ExecutionStatus(Enum):
     MAX_STEPS_REACHED = "max_steps_reached"
 
 
+@dataclass
+class ToolCall:
+    action: str
+    action_input: dict
+    observation: str | None = None
+    duration_ms: float = 0.0
+    error: str | None = None
+
+
 @dataclass
 class ThinkingStep:
     step_number: int
@@ -25,6 +44,9 @@ class ThinkingStep:
     action_input: dict | None
     observation: str | None
     timestamp: datetime
+    tool_calls: list[ToolCall] = field(default_factory=list)
+    wall_time_ms: float = 0.0  # 本步工具执行的墙钟耗时
+    tool_time_ms: float = 0.0  # 本步各工具耗时之和 (> wall_time_ms 说明并发生效)
 
 
 @dataclass
@@ -36,12 +58,131 @@ class ExecutionResult:
     error: str | None = None
 
 
+class StreamingActionParser:
+    """
+    增量解析 Action / Action Input
+
+    Action 在以下时机视为完整：JSON 参数对象闭合、出现下一个 Action、非 JSON 参数行结束、流结束。
+    """
+
+    ACTION = "Action:"
+    ACTION_INPUT = "Action Input:"
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._may_close = False
+
+    def feed(self, delta: str) -> list[tuple[str, dict]]:
+        """追加增量，返回本次新完成的 Action"""
+        self._buffer += delta
+        # 仅当增量含 "}" 时才尝试解码 JSON，避免长参数逐 token 重复解析
+        self._may_close = "}" in delta
+        return self._drain(final=False)
+
+    def close(self) -> list[tuple[str, dict]]:
+        """流结束，返回剩余的 Action"""
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> list[tuple[str, dict]]:
+        actions = []
+        while (start := self._buffer.find(self.ACTION, self._pos)) != -1:
+            name_start = start + len(self.ACTION)
+            next_action = self._buffer.find(self.ACTION, name_start)
+            marker = self._buffer.find(self.ACTION_INPUT, name_start)
+            if marker != -1 and (next_action == -1 or marker < next_action):
+                completed = self._parse_input(marker + len(self.ACTION_INPUT), next_action, final)
+                if completed is None:
+                    break
+                params, end = completed
+                name_end = marker
+            elif next_action != -1 or final:
+                params, end = {}, next_action if next_action != -1 else len(self._buffer)
+                name_end = end
+            else:
+                break
+
+            name = self._buffer[name_start:name_end].strip()
+            name = name.splitlines()[0].strip() if name else ""
+            if name:
+                actions.append((name, params))
+            self._pos = end
+        return actions
+
+    def _parse_input(self, begin: int, next_action: int, final: bool) -> tuple[dict, int] | None:
+        """解析参数；尚未完整时返回 None"""
+        limit = next_action if next_action != -1 else len(self._buffer)
+        raw = self._buffer[begin:limit]
+        stripped = raw.lstrip()
+        offset = begin + len(raw) - len(stripped)
+
+        if stripped.startswith("{"):
+            if not (self._may_close or final or next_action != -1):
+                return None
+            try:
+                parsed, size = json.JSONDecoder().raw_decode(stripped)
+                return (parsed if isinstance(parsed, dict) else {}), offset + size
+            except json.JSONDecodeError:
+                # JSON 尚未闭合：等待更多 token，除非已被下一个 Action 截断
+                return ({}, limit) if next_action != -1 or final else None
+
+        if stripped:
+            newline = stripped.find("\n")
+            if newline != -1:
+                return {}, offset + newline
+            return ({}, limit) if next_action != -1 or final else None
+        return ({}, limit) if next_action != -1 or final else None
+
+
+class _ToolDispatcher:
+    """流式模式下单步的工具派发状态：首个工具派发时开始计时与截止"""
+
+    def __init__(self, executor: "AgentExecutor", run_id: str | None):
+        self._executor = executor
+        self._run_id = run_id
+        self.calls: list[ToolCall] = []
+        self._tasks: list[asyncio.Task] = []
+        self.started_at: float = 0.0
+        self._deadline: float | None = None
+
+    def dispatch(self, actions: list[tuple[str, dict]]) -> None:
+        for name, params in actions:
+            if not self.calls:
+                self.started_at = time.perf_counter()
+                if self._executor._step_timeout:
+                    self._deadline = asyncio.get_running_loop().time() + self._executor._step_timeout
+            call = ToolCall(name, params)
+            self.calls.append(call)
+            self._tasks.append(asyncio.create_task(self._executor._invoke(call, self._deadline, self._run_id)))
+
+    async def wait(self) -> None:
+        await asyncio.gather(*self._tasks)
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+
 class AgentExecutor:
-    def __init__(self, llm_client, tool_registry, *, max_steps: int = 10, timeout_seconds: float = 300.0):
+    def __init__(
+        self,
+        llm_client,
+        tool_registry,
+        *,
+        max_steps: int = 10,
+        timeout_seconds: float = 300.0,
+        max_concurrency_per_tool: int = 4,
+        step_timeout_seconds: float | None = None,
+        visualizer: ThinkingVisualizer | None = None,
+    ):
         self._llm = llm_client
         self._tool_registry = tool_registry
         self._max_steps = max_steps
         self._timeout = timeout_seconds
+        self._max_concurrency_per_tool = max_concurrency_per_tool
+        self._step_timeout = step_timeout_seconds
+        self._tool_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._visualizer = visualizer
 
     async def run(self, user_input: str, *, run_id: str | None = None) -> ExecutionResult:
         start_time = datetime.now()
@@ -67,11 +208,10 @@ class AgentExecutor:
                     ExecutionStatus.COMPLETED, thought, steps, (datetime.now() - start_time).total_seconds() * 1000
                 )
             if action:
-                try:
-                    observation = await self._tool_registry.invoke_tool(action, action_input or {}, run_id=run_id)
-                    step.observation = str(observation)
-                except Exception as e:
-                    step.observation = f"Error: {e}"
+                step.tool_calls = [ToolCall(name, params) for name, params in self._parse_actions(llm_response)]
+                if step.tool_calls:
+                    step.action, step.action_input = step.tool_calls[0].action, step.tool_calls[0].action_input
+                    await self._execute_tool_calls(step, run_id=run_id)
             steps.append(step)
 
         return ExecutionResult(
@@ -82,6 +222,115 @@ class AgentExecutor:
             f"Max steps ({self._max_steps}) reached",
         )
 
+    async def run_stream(self, user_input: str, *, run_id: str | None = None) -> ExecutionResult:
+        """
+        流式执行：LLM 客户端需提供 stream(user_input) -> AsyncIterator[str]
+
+        工具在其参数完整时立即派发，与剩余 token 的生成并行。
+        """
+        start_time = datetime.now()
+        steps = []
+        for step_num in range(1, self._max_steps + 1):
+            if (datetime.now() - start_time).total_seconds() > self._timeout:
+                return ExecutionResult(
+                    ExecutionStatus.TIMEOUT,
+                    None,
+                    steps,
+                    (datetime.now() - start_time).total_seconds() * 1000,
+                    "Execution timeout",
+                )
+
+            step_id = f"{run_id or 'run'}-step-{step_num}"
+            parser = StreamingActionParser()
+            dispatcher = _ToolDispatcher(self, run_id)
+            chunks: list[str] = []
+            try:
+                async for delta in self._llm.stream(user_input):
+                    chunks.append(delta)
+                    if self._visualizer:
+                        await self._visualizer.emit_thinking_content(run_id or "", step_id, delta)
+                    dispatcher.dispatch(parser.feed(delta))
+                dispatcher.dispatch(parser.close())
+                await dispatcher.wait()
+            finally:
+                dispatcher.cancel()
+
+            llm_response = "".join(chunks)
+            thought, action, action_input, is_final = self._parse_response(llm_response)
+            step = ThinkingStep(step_num, thought, action, action_input, None, datetime.now())
+            calls = dispatcher.calls
+            if is_final and not calls:
+                steps.append(step)
+                return ExecutionResult(
+                    ExecutionStatus.COMPLETED, thought, steps, (datetime.now() - start_time).total_seconds() * 1000
+                )
+            if calls:
+                step.tool_calls = calls
+                step.action, step.action_input = calls[0].action, calls[0].action_input
+                step.wall_time_ms = (time.perf_counter() - dispatcher.started_at) * 1000
+                step.tool_time_ms = sum(call.duration_ms for call in calls)
+                self._merge_observations(step)
+            steps.append(step)
+
+        return ExecutionResult(
+            ExecutionStatus.MAX_STEPS_REACHED,
+            None,
+            steps,
+            (datetime.now() - start_time).total_seconds() * 1000,
+            f"Max steps ({self._max_steps}) reached",
+        )
+
+    async def _execute_tool_calls(self, step: ThinkingStep, *, run_id: str | None = None) -> None:
+        """并发执行本步所有工具调用，按 Action 顺序合并 Observation"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._step_timeout if self._step_timeout else None
+
+        start = time.perf_counter()
+        await asyncio.gather(*(self._invoke(call, deadline, run_id) for call in step.tool_calls))
+        step.wall_time_ms = (time.perf_counter() - start) * 1000
+        step.tool_time_ms = sum(call.duration_ms for call in step.tool_calls)
+        self._merge_observations(step)
+
+    def _merge_observations(self, step: ThinkingStep) -> None:
+        if len(step.tool_calls) == 1:
+            step.observation = step.tool_calls[0].observation
+        else:
+            step.observation = "\n".join(f"[{call.action}] {call.observation}" for call in step.tool_calls)
+
+    async def _invoke(self, call: ToolCall, deadline: float | None, run_id: str | None) -> None:
+        """单个工具调用：同名工具共享并发上限，超过本步截止时间即取消"""
+        semaphore = self._tool_semaphores.setdefault(call.action, asyncio.Semaphore(self._max_concurrency_per_tool))
+        tool_call_id = f"{call.action}-{id(call):x}"
+        if self._visualizer:
+            await self._visualizer.emit_tool_call_start(
+                run_id or "", ToolExecution(tool_call_id=tool_call_id, tool_name=call.action, args=call.action_input)
+            )
+        start = time.perf_counter()
+        step_timeout = asyncio.timeout_at(deadline)
+        try:
+            async with step_timeout:
+                async with semaphore:
+                    start = time.perf_counter()
+                    result = await self._tool_registry.invoke_tool(call.action, call.action_input, run_id=run_id)
+            call.observation = str(result)
+        except TimeoutError as e:
+            # 仅本步截止时间触发的超时标记为 deadline，工具自身抛出的超时按工具错误上报
+            call.error = "Step deadline exceeded" if step_timeout.expired() else str(e) or "TimeoutError"
+            call.observation = f"Error: {call.error}"
+        except Exception as e:
+            call.error = str(e)
+            call.observation = f"Error: {e}"
+        finally:
+            call.duration_ms = (time.perf_counter() - start) * 1000
+
+        if self._visualizer:
+            await self._visualizer.emit_tool_call_end(run_id or "", tool_call_id, call.observation, call.duration_ms)
+
+    def _parse_actions(self, response: str) -> list[tuple[str, dict]]:
+        """解析响应中的全部 Action / Action Input 对 (Action Input 为 JSON 对象时解析为参数)"""
+        parser = StreamingActionParser()
+        return parser.feed(response) + parser.close()
+
     def _parse_response(self, response: str) -> tuple[str, str | None, dict | None, bool]:
         if "Final Answer:" in response:
             return response.split("Final Answer:")[-1].strip(), None, None, True
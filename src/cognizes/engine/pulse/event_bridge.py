@@ -5,17 +5,22 @@ Pulse EventBridge: 将 PostgreSQL 事件转换为 AG-UI 标准事件
 1. 监听 PostgreSQL NOTIFY 事件
 2. 转换为 AG-UI 标准事件格式
 3. 通过 SSE/WebSocket 推送到前端
+4. 每个订阅者独立的有界队列与背压策略，慢客户端不拖累其他订阅者
 """
 
 from __future__ import annotations
 
 import json
 import asyncio
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, StrEnum
 from typing import Any, Callable, AsyncGenerator
 from datetime import datetime
 
+from cognizes.engine.pulse.event_fetcher import SequenceWindow
+
 
 class AgUiEventType(str, Enum):
     """AG-UI 标准事件类型"""
@@ -46,18 +51,176 @@ class AgUiEvent:
     run_id: str
     timestamp: float = field(default_factory=lambda: datetime.now().timestamp())
     data: dict = field(default_factory=dict)
+    event_id: str | None = None  # events.sequence_num，作为 SSE id / 断线续传游标
 
     def to_sse(self) -> str:
-        """转换为 SSE 格式"""
+        """转换为 SSE 格式 (带 event_id 时输出 id 字段，供浏览器回传 Last-Event-ID)"""
         payload = {
             "type": self.type.value,
             "runId": self.run_id,
             "timestamp": self.timestamp,
             **self.data,
         }
+        if self.event_id is not None:
+            return f"id: {self.event_id}\ndata: {json.dumps(payload)}\n\n"
         return f"data: {json.dumps(payload)}\n\n"
 
 
+def parse_event_id(value: str | int | None) -> int | None:
+    """解析 Last-Event-ID / resume cursor，非法值视为未提供"""
+    if value is None or value == "":
+        return None
+    try:
+        seq = int(value)
+    except (TypeError, ValueError):
+        return None
+    return seq if seq >= 0 else None
+
+
+class BackpressurePolicy(StrEnum):
+    """订阅队列满载时的背压策略"""
+
+    DROP_OLDEST = "drop_oldest"  # 丢弃最旧事件
+    COALESCE_STATE = "coalesce_state"  # 将积压的 STATE_DELTA 合并为一个 STATE_SNAPSHOT
+    DISCONNECT = "disconnect"  # 断开慢订阅者，由客户端携带 Last-Event-ID 重连
+
+
+@dataclass
+class SubscriberLag:
+    """单个订阅者的滞后指标"""
+
+    run_id: str
+    policy: str
+    depth: int
+    maxsize: int
+    enqueued: int
+    delivered: int
+    dropped: int
+    coalesced: int
+    oldest_age_ms: float
+    disconnected: bool
+
+
+class SubscriberQueue:
+    """
+    订阅者有界队列
+
+    offer() 为同步非阻塞写入，满载时按 BackpressurePolicy 处理；get() 供订阅协程异步读取。
+    """
+
+    def __init__(self, run_id: str, maxsize: int, policy: BackpressurePolicy):
+        self.run_id = run_id
+        self.maxsize = maxsize
+        self.policy = policy
+        self._buffer: deque[tuple[float, AgUiEvent]] = deque()
+        self._ready = asyncio.Event()
+        self.disconnected = False
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def offer(self, event: AgUiEvent, snapshot: dict | None = None) -> bool:
+        """
+        非阻塞写入
+
+        Args:
+            event: AG-UI 事件
+            snapshot: 当前完整状态，COALESCE_STATE 策略用于生成 STATE_SNAPSHOT
+
+        Returns:
+            事件是否入队
+        """
+        if self.disconnected:
+            return False
+
+        if len(self._buffer) >= self.maxsize:
+            if self.policy == BackpressurePolicy.DISCONNECT:
+                self.disconnected = True
+                self.dropped += len(self._buffer) + 1
+                self._buffer.clear()
+                self._ready.set()
+                return False
+
+            absorbed = self.policy == BackpressurePolicy.COALESCE_STATE and self._coalesce_state(event, snapshot)
+            limit = self.maxsize if absorbed else self.maxsize - 1
+            while len(self._buffer) > limit:
+                self._buffer.popleft()
+                self.dropped += 1
+            if absorbed:
+                self.enqueued += 1
+                self._ready.set()
+                return True
+
+        self._buffer.append((time.perf_counter(), event))
+        self.enqueued += 1
+        self._ready.set()
+        return True
+
+    def _coalesce_state(self, event: AgUiEvent, snapshot: dict | None) -> bool:
+        """
+        将积压的 STATE_DELTA / STATE_SNAPSHOT 合并为一个携带最新完整状态的 STATE_SNAPSHOT
+
+        Returns:
+            新事件是否已被快照吸收 (新事件本身是 STATE_DELTA 时为 True)
+        """
+        if snapshot is None:
+            return False
+
+        state_types = (AgUiEventType.STATE_DELTA, AgUiEventType.STATE_SNAPSHOT)
+        stale = [item for item in self._buffer if item[1].type in state_types]
+        incoming_delta = event.type == AgUiEventType.STATE_DELTA
+        if not stale and not incoming_delta:
+            return False
+
+        for item in stale:
+            self._buffer.remove(item)
+        self.coalesced += sum(1 for _, e in stale if e.type == AgUiEventType.STATE_DELTA) + int(incoming_delta)
+
+        snapshot_event = AgUiEvent(
+            type=AgUiEventType.STATE_SNAPSHOT,
+            run_id=self.run_id,
+            data={"snapshot": snapshot},
+            event_id=event.event_id if incoming_delta else None,
+        )
+        self._buffer.append((time.perf_counter(), snapshot_event))
+        return incoming_delta
+
+    async def get(self) -> AgUiEvent:
+        """
+        等待并取出一个事件
+
+        Raises:
+            ConnectionAbortedError: 订阅者已被 DISCONNECT 策略断开
+        """
+        while not self._buffer:
+            if self.disconnected:
+                raise ConnectionAbortedError(f"Subscriber disconnected by backpressure: {self.run_id}")
+            self._ready.clear()
+            await self._ready.wait()
+        _, event = self._buffer.popleft()
+        self.delivered += 1
+        return event
+
+    def lag(self) -> SubscriberLag:
+        oldest_age = (time.perf_counter() - self._buffer[0][0]) * 1000 if self._buffer else 0.0
+        return SubscriberLag(
+            run_id=self.run_id,
+            policy=self.policy.value,
+            depth=len(self._buffer),
+            maxsize=self.maxsize,
+            enqueued=self.enqueued,
+            delivered=self.delivered,
+            dropped=self.dropped,
+            coalesced=self.coalesced,
+            oldest_age_ms=oldest_age,
+            disconnected=self.disconnected,
+        )
+
+
 class PulseEventBridge:
     """
     Pulse 事件桥接器
@@ -65,13 +228,29 @@ class PulseEventBridge:
     将 PostgreSQL 事件转换为 AG-UI 标准事件
     """
 
-    def __init__(self, pg_listener):
+    def __init__(
+        self,
+        pg_listener,
+        fetcher=None,
+        max_replay: int = 1000,
+        queue_maxsize: int = 256,
+        backpressure: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+    ):
         """
         Args:
             pg_listener: PgNotifyListener 实例
+            fetcher: EventFetcher 实例，用于断线重连时从 events 表回放 (可选)
+            max_replay: 单次重连最多回放的事件数，超出时发送 resync 通知
+            queue_maxsize: 每个订阅者队列的容量上限
+            backpressure: 队列满载时的默认背压策略
         """
         self._pg_listener = pg_listener
-        self._subscribers: dict[str, list[asyncio.Queue]] = {}  # run_id -> queues
+        self._fetcher = fetcher
+        self._max_replay = max_replay
+        self._queue_maxsize = queue_maxsize
+        self._backpressure = backpressure
+        self._subscribers: dict[str, list[SubscriberQueue]] = {}  # run_id -> queues
+        self._latest_state: dict[str, dict] = {}  # run_id -> 最近一次完整状态，用于合并快照
         self._running = False
 
     async def start(self) -> None:
@@ -86,31 +265,45 @@ class PulseEventBridge:
         self._running = False
         await self._pg_listener.unsubscribe("event_stream")
 
-    async def subscribe(self, run_id: str) -> AsyncGenerator[AgUiEvent, None]:
+    async def subscribe(
+        self,
+        run_id: str,
+        thread_id: str | None = None,
+        last_event_id: str | int | None = None,
+        backpressure: BackpressurePolicy | None = None,
+    ) -> AsyncGenerator[AgUiEvent]:
         """
         订阅指定 run_id 的事件流
 
+        传入 thread_id 与 last_event_id 时先从 events 表回放遗漏事件，再切换到实时流；
+        实时队列在回放前即已注册，回放期间到达的事件不会丢失，且按已发送 event_id 集合去重
+        (序号在 INSERT 时分配、提交时可见，晚提交的较小序号不能按最大水位跳过)。
+        被 DISCONNECT 策略断开时发送 backpressure_disconnect 事件后结束订阅。
+
         Yields:
             AgUiEvent: AG-UI 标准事件
         """
-        queue: asyncio.Queue = asyncio.Queue()
+        queue = SubscriberQueue(run_id, self._queue_maxsize, backpressure or self._backpressure)
 
         if run_id not in self._subscribers:
             self._subscribers[run_id] = []
         self._subscribers[run_id].append(queue)
 
+        # 窗口覆盖一次回放加上回放期间队列中积压的实时事件
+        sent = SequenceWindow(self._max_replay + queue.maxsize)
+
         try:
+            last_seq = parse_event_id(last_event_id)
+            if last_seq is not None and thread_id and self._fetcher:
+                async for event in self._replay(run_id, thread_id, last_seq):
+                    if event.event_id is not None:
+                        sent.add(int(event.event_id))
+                        last_seq = max(last_seq, int(event.event_id))
+                    yield event
+
             while self._running:
                 try:
                     event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield event
-
-                    # 如果是完成事件，结束订阅
-                    if event.type in (
-                        AgUiEventType.RUN_FINISHED,
-                        AgUiEventType.RUN_ERROR,
-                    ):
-                        break
                 except asyncio.TimeoutError:
                     # 发送心跳
                     yield AgUiEvent(
@@ -118,22 +311,93 @@ class PulseEventBridge:
                         run_id=run_id,
                         data={"name": "heartbeat"},
                     )
+                    continue
+                except ConnectionAbortedError:
+                    # 慢订阅者被断开：告知最后投递的 event_id，客户端据此续传
+                    yield AgUiEvent(
+                        type=AgUiEventType.CUSTOM,
+                        run_id=run_id,
+                        data={
+                            "name": "backpressure_disconnect",
+                            "lastEventId": str(last_seq) if last_seq is not None else None,
+                        },
+                    )
+                    break
+
+                if event.event_id is not None:
+                    seq = int(event.event_id)
+                    if not sent.add(seq):
+                        continue
+                    last_seq = seq if last_seq is None else max(last_seq, seq)
+                yield event
+
+                # 如果是完成事件，结束订阅
+                if event.type in (
+                    AgUiEventType.RUN_FINISHED,
+                    AgUiEventType.RUN_ERROR,
+                ):
+                    break
         finally:
             self._subscribers[run_id].remove(queue)
             if not self._subscribers[run_id]:
                 del self._subscribers[run_id]
+                self._latest_state.pop(run_id, None)
+
+    async def _replay(self, run_id: str, thread_id: str, after_seq: int) -> AsyncGenerator[AgUiEvent]:
+        """从 events 表回放 after_seq 之后的事件 (有界 keyset 查询)"""
+        payloads, truncated = await self._fetcher.replay(thread_id, after_seq, max_events=self._max_replay)
+        if truncated:
+            # 遗漏过多，回放代价高于整体重载，通知客户端重新同步
+            yield AgUiEvent(
+                type=AgUiEventType.CUSTOM,
+                run_id=run_id,
+                data={"name": "resync_required", "afterEventId": str(after_seq)},
+            )
+            return
+
+        for payload in payloads:
+            # 回放按 thread 查询：属于其他 run 的事件跳过，不含 run_id 的行归入当前订阅
+            row_run_id = payload["data"].get("run_id")
+            if row_run_id and row_run_id != run_id:
+                continue
+            if not row_run_id:
+                payload["data"]["run_id"] = run_id
+            event = self._convert_to_agui_event(payload)
+            if event:
+                yield event
 
     async def _handle_pg_event(self, channel: str, payload: str) -> None:
         """处理 PostgreSQL 事件并转换为 AG-UI 事件"""
         try:
             data = json.loads(payload)
-            event = self._convert_to_agui_event(data)
-
-            if event and event.run_id in self._subscribers:
-                for queue in self._subscribers[event.run_id]:
-                    await queue.put(event)
         except json.JSONDecodeError:
-            pass
+            return
+        self.dispatch(data)
+
+    def dispatch(self, pg_data: dict) -> int:
+        """
+        将 PostgreSQL 事件非阻塞地分发给订阅者
+
+        每个订阅者队列独立执行背压策略，慢订阅者不会阻塞其他订阅者。
+
+        Returns:
+            成功入队的订阅者数量
+        """
+        event = self._convert_to_agui_event(pg_data)
+        if not event or event.run_id not in self._subscribers:
+            return 0
+
+        if event.type == AgUiEventType.STATE_DELTA:
+            state = pg_data.get("data", {}).get("state")
+            if isinstance(state, dict):
+                self._latest_state[event.run_id] = state
+
+        snapshot = self._latest_state.get(event.run_id)
+        return sum(1 for queue in self._subscribers[event.run_id] if queue.offer(event, snapshot))
+
+    def get_subscriber_lag(self) -> list[SubscriberLag]:
+        """每个订阅者的队列深度、最旧事件滞后与丢弃/合并计数"""
+        return [queue.lag() for queues in self._subscribers.values() for queue in queues]
 
     def _convert_to_agui_event(self, pg_data: dict) -> AgUiEvent | None:
         """
@@ -153,7 +417,15 @@ class PulseEventBridge:
         if not run_id:
             return None
 
-        # 根据表和操作类型映射事件
+        event = self._map_agui_event(table, operation, run_id, row_data)
+        if event:
+            seq = row_data.get("sequence_num", pg_data.get("sequence_num"))
+            if seq is not None:
+                event.event_id = str(seq)
+        return event
+
+    def _map_agui_event(self, table: str, operation: str, run_id: str, row_data: dict) -> AgUiEvent | None:
+        """按表与操作类型映射 AG-UI 事件"""
         if table == "runs":
             if operation == "INSERT":
                 return AgUiEvent(
@@ -209,17 +481,22 @@ class PulseEventBridge:
 
 
 # FastAPI 端点示例
-async def create_sse_endpoint(bridge: PulseEventBridge, run_id: str):
+async def create_sse_endpoint(
+    bridge: PulseEventBridge,
+    run_id: str,
+    thread_id: str | None = None,
+    last_event_id: str | None = None,
+):
     """
     创建 SSE 事件流端点
 
     Usage:
         @app.get("/api/runs/{run_id}/events")
-        async def stream_events(run_id: str):
+        async def stream_events(run_id: str, request: Request, thread_id: str | None = None):
             return StreamingResponse(
-                create_sse_endpoint(bridge, run_id),
+                create_sse_endpoint(bridge, run_id, thread_id, request.headers.get("last-event-id")),
                 media_type="text/event-stream"
             )
     """
-    async for event in bridge.subscribe(run_id):
+    async for event in bridge.subscribe(run_id, thread_id=thread_id, last_event_id=last_event_id):
         yield event.to_sse()
@@ -0,0 +1,356 @@
+"""
+Pulse EventFetcher: Cursor 模式事件拉取器
+
+PostgreSQL NOTIFY 载荷上限为 8000 字节，且 notify_event_insert 只携带 id 等元数据。
+Cursor 模式下 NOTIFY 仅携带 (thread_id, min_seq, max_seq)，监听端据此批量拉取完整行数据：
+- 同一 thread 的通知突发合并为一次 keyset 查询 (idx_events_sequence)
+- 大体积工具输出随行数据一起返回，不受 NOTIFY 载荷限制
+- 每个 thread 同时最多一个拉取任务，保证事件按 sequence_num 有序投递
+- sequence_num 按 INSERT 顺序分配、按提交顺序可见：晚提交的较小序号仍会被拉取，
+  已投递序号在有界窗口内去重
+- 每个 thread 的水位与去重窗口按最近活动做 LRU 淘汰，长期运行的进程状态有界
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import asyncpg
+
+from cognizes.engine.pulse.pg_notify_listener import EventTransport, NotifyEvent
+
+logger = logging.getLogger(__name__)
+
+CURSOR_CHANNEL = "event_cursor"
+
+# 每个 thread 记住的已投递 sequence_num 数量，用于晚提交事件重拉时去重
+DELIVERED_WINDOW = 1024
+
+# 最多跟踪的 thread 数 (水位 + 去重窗口)，超出时淘汰最久未活动的 thread
+MAX_TRACKED_THREADS = 10_000
+
+FETCH_EVENTS_SQL = """
+    SELECT id, thread_id, invocation_id, author, event_type,
+           content, actions, created_at, sequence_num
+    FROM events
+    WHERE thread_id = $1 AND sequence_num > $2 AND sequence_num <= $3
+    ORDER BY sequence_num ASC
+    LIMIT $4
+"""
+
+# 语句级触发器：按 thread 聚合，一条多行 INSERT 只产生一条通知 (函数定义见 agent_schema.sql)
+INSTALL_TRIGGER_SQL = """
+    DROP TRIGGER IF EXISTS trigger_event_cursor_notify ON events;
+    CREATE TRIGGER trigger_event_cursor_notify
+        AFTER INSERT ON events
+        REFERENCING NEW TABLE AS new_events
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION notify_event_cursor();
+"""
+
+
+@dataclass
+class FetcherMetrics:
+    """EventFetcher 运行指标"""
+
+    notifications: int
+    coalesced: int
+    fetches: int
+    rows: int
+    tracked_threads: int
+    evicted_threads: int
+    active_drains: int
+
+
+class SequenceWindow:
+    """有界的已见 sequence_num 集合：超过 maxlen 时淘汰最早记录的序号"""
+
+    def __init__(self, maxlen: int = DELIVERED_WINDOW):
+        self.maxlen = maxlen
+        self._seen: dict[int, None] = {}
+
+    def __contains__(self, seq: int) -> bool:
+        return seq in self._seen
+
+    def add(self, seq: int) -> bool:
+        """记录序号，返回是否首次出现"""
+        if seq in self._seen:
+            return False
+        self._seen[seq] = None
+        if len(self._seen) > self.maxlen:
+            del self._seen[next(iter(self._seen))]
+        return True
+
+
+def row_to_payload(row: Any) -> dict[str, Any]:
+    """将 events 行转换为与 NOTIFY 载荷兼容的结构 (table/operation/data)"""
+    content = row["content"]
+    actions = row["actions"]
+    created_at = row["created_at"]
+    data = {
+        "id": str(row["id"]),
+        "thread_id": str(row["thread_id"]),
+        "invocation_id": str(row["invocation_id"]),
+        "author": row["author"],
+        "event_type": row["event_type"],
+        "content": json.loads(content) if isinstance(content, str) else (content or {}),
+        "actions": json.loads(actions) if isinstance(actions, str) else (actions or {}),
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+        "sequence_num": row["sequence_num"],
+    }
+    return {
+        "table": "events",
+        "operation": "INSERT",
+        "event_id": data["id"],
+        "thread_id": data["thread_id"],
+        "event_type": data["event_type"],
+        "sequence_num": data["sequence_num"],
+        "data": data,
+    }
+
+
+class EventFetcher:
+    """
+    Cursor 模式事件拉取器
+
+    Usage:
+        fetcher = EventFetcher(pool)
+        fetcher.on_event(hub.publish)
+        fetcher.attach(listener)  # listener 需监听 "event_cursor" 频道
+        await fetcher.install_trigger()
+        await fetcher.start()
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        channel: str = CURSOR_CHANNEL,
+        batch_size: int = 500,
+        output_channel: str = "event_stream",
+        max_tracked_threads: int = MAX_TRACKED_THREADS,
+    ):
+        self._pool = pool
+        self.channel = channel
+        self.batch_size = batch_size
+        self.output_channel = output_channel
+        self.max_tracked_threads = max_tracked_threads
+        self._callbacks: list[Callable[[NotifyEvent], Any]] = []
+        # thread_id -> 已投递的最大 sequence_num，按最近活动排序 (最久未活动的在前)
+        self._cursors: OrderedDict[str, int] = OrderedDict()
+        self._delivered: dict[str, SequenceWindow] = {}  # thread_id -> 最近投递的 sequence_num
+        self._pending: dict[str, tuple[int, int]] = {}  # thread_id -> 待拉取区间 (after_seq, upto_seq]
+        self._drains: dict[str, asyncio.Task] = {}
+        self._start_seq = 0
+        self._evicted_seq = 0  # 已淘汰 thread 的最大水位
+
+        self._notifications = 0
+        self._coalesced = 0
+        self._fetches = 0
+        self._rows = 0
+        self._evicted = 0
+
+    async def start(self) -> None:
+        """记录启动水位：未见过的 thread 从该水位之后开始拉取"""
+        async with self._pool.acquire() as conn:
+            self._start_seq = await conn.fetchval("SELECT COALESCE(MAX(sequence_num), 0) FROM events") or 0
+
+    async def install_trigger(self) -> None:
+        """在 events 表上安装 cursor 通知触发器 (仅 Cursor 模式需要，幂等)"""
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(INSTALL_TRIGGER_SQL)
+
+    async def stop(self) -> None:
+        """取消所有进行中的拉取任务"""
+        tasks = list(self._drains.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._drains.clear()
+
+    def attach(self, listener: EventTransport) -> None:
+        """挂载到事件传输层 (PgNotifyListener / RelayTransport) 的 cursor 频道"""
+        listener.on_event(self.channel, self.handle_notify)
+
+    def on_event(self, callback: Callable[[NotifyEvent], Any]) -> None:
+        """注册行数据回调 (同步或协程)，例如 EventHub.publish"""
+        self._callbacks.append(callback)
+
+    def set_cursor(self, thread_id: str, sequence_num: int) -> None:
+        """显式设置 thread 的已投递水位"""
+        thread_id = str(thread_id)
+        self._cursors[thread_id] = sequence_num
+        self._cursors.move_to_end(thread_id)
+        self._evict_idle_threads()
+
+    def _default_cursor(self) -> int:
+        """未跟踪 (从未见过或已淘汰) thread 的起始水位
+
+        不低于已淘汰 thread 的最大水位，淘汰后再次活动的 thread 不会重复投递已投递的事件；
+        通知携带的 (min_seq, max_seq] 区间总会被拉取，晚提交事件不受影响。
+        """
+        return max(self._start_seq, self._evicted_seq)
+
+    def _evict_idle_threads(self) -> None:
+        """淘汰最久未活动的 thread 状态，正在拉取或待拉取的 thread 保留"""
+        if len(self._cursors) <= self.max_tracked_threads:
+            return
+        for thread_id in list(self._cursors):
+            if len(self._cursors) <= self.max_tracked_threads:
+                break
+            if thread_id in self._drains or thread_id in self._pending:
+                continue
+            self._evicted_seq = max(self._evicted_seq, self._cursors.pop(thread_id))
+            self._delivered.pop(thread_id, None)
+            self._evicted += 1
+
+    # ========================================
+    # 通知处理
+    # ========================================
+
+    def handle_notify(self, event: NotifyEvent) -> None:
+        """处理 cursor 通知：合并待拉取区间，并确保该 thread 有且仅有一个拉取任务
+
+        低于已投递水位的通知同样会重新查询：BIGSERIAL 序号在 INSERT 时分配，
+        较小序号的事务可能晚提交，其行在通知到达前对拉取连接不可见。
+        """
+        thread_id = event.payload.get("thread_id")
+        max_seq = event.payload.get("max_seq")
+        if thread_id is None or max_seq is None:
+            logger.warning(f"Malformed cursor notification: {event.payload}")
+            return
+
+        thread_id = str(thread_id)
+        max_seq = int(max_seq)
+        min_seq = int(event.payload.get("min_seq", max_seq))
+        self._notifications += 1
+
+        cursor = self._cursors.get(thread_id)
+        if cursor is None:
+            cursor = self._default_cursor()
+        else:
+            self._cursors.move_to_end(thread_id)
+        after = min(cursor, min_seq - 1)
+        if thread_id in self._pending:
+            pending_after, pending_upto = self._pending[thread_id]
+            self._pending[thread_id] = (min(pending_after, after), max(pending_upto, max_seq))
+        else:
+            self._pending[thread_id] = (after, max_seq)
+
+        if thread_id in self._drains:
+            # 已有拉取任务在运行，新区间会在其下一轮被合并处理
+            self._coalesced += 1
+            return
+        self._drains[thread_id] = asyncio.create_task(self._drain(thread_id))
+
+    async def _drain(self, thread_id: str) -> None:
+        """循环拉取待拉取区间，直到没有新的通知"""
+        try:
+            while thread_id in self._pending:
+                after, upto = self._pending.pop(thread_id)
+                while True:
+                    rows = await self.fetch_since(thread_id, after, upto_seq=upto, limit=self.batch_size)
+                    for row in rows:
+                        if self._mark_delivered(thread_id, row["sequence_num"]):
+                            await self._emit(row_to_payload(row))
+                    if len(rows) < self.batch_size:
+                        # 区间内尚未可见的行由其所在事务提交时的通知再次触发拉取
+                        break
+                    after = rows[-1]["sequence_num"]
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(f"Failed to fetch events for thread: {thread_id}")
+        finally:
+            self._drains.pop(thread_id, None)
+
+    def _mark_delivered(self, thread_id: str, seq: int) -> bool:
+        """记录已投递序号并推进水位，返回是否为首次投递"""
+        window = self._delivered.get(thread_id)
+        if window is None:
+            window = self._delivered[thread_id] = SequenceWindow()
+        if not window.add(seq):
+            return False
+        self._cursors[thread_id] = max(seq, self._cursors.get(thread_id, self._default_cursor()))
+        self._cursors.move_to_end(thread_id)
+        self._evict_idle_threads()
+        return True
+
+    async def fetch_since(
+        self,
+        thread_id: str,
+        after_seq: int,
+        upto_seq: int | None = None,
+        limit: int | None = None,
+    ) -> list[asyncpg.Record]:
+        """
+        Keyset 查询：拉取 (after_seq, upto_seq] 区间的事件行
+
+        命中 idx_events_sequence (thread_id, sequence_num)，按 sequence_num 升序返回。
+        """
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                FETCH_EVENTS_SQL,
+                uuid.UUID(str(thread_id)),
+                after_seq,
+                upto_seq if upto_seq is not None else 2**63 - 1,
+                limit or self.batch_size,
+            )
+        self._fetches += 1
+        self._rows += len(rows)
+        return rows
+
+    async def replay(
+        self,
+        thread_id: str,
+        after_seq: int,
+        max_events: int = 1000,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """
+        断线重连回放：按 keyset 分页拉取 after_seq 之后的事件，最多 max_events 条
+
+        Returns:
+            (载荷列表, 是否被截断)。被截断时客户端应整体重新加载会话。
+        """
+        payloads: list[dict[str, Any]] = []
+        cursor = after_seq
+        while len(payloads) < max_events:
+            limit = min(self.batch_size, max_events - len(payloads))
+            rows = await self.fetch_since(thread_id, cursor, limit=limit)
+            payloads.extend(row_to_payload(row) for row in rows)
+            if len(rows) < limit:
+                return payloads, False
+            cursor = rows[-1]["sequence_num"]
+
+        more = await self.fetch_since(thread_id, cursor, limit=1)
+        return payloads, bool(more)
+
+    async def _emit(self, payload: dict[str, Any]) -> None:
+        event = NotifyEvent(channel=self.output_channel, payload=payload, received_at=datetime.now())
+        for callback in self._callbacks:
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("EventFetcher callback failed")
+
+    def get_metrics(self) -> FetcherMetrics:
+        return FetcherMetrics(
+            notifications=self._notifications,
+            coalesced=self._coalesced,
+            fetches=self._fetches,
+            rows=self._rows,
+            tracked_threads=len(self._cursors),
+            evicted_threads=self._evicted,
+            active_drains=len(self._drains),
+        )
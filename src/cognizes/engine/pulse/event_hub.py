@@ -0,0 +1,372 @@
+"""
+Pulse EventHub: NOTIFY 事件扇出中枢
+
+解决「每个 WebSocket/SSE 客户端注册一个回调」带来的扇出放大问题：
+- 每条 NOTIFY 只解码一次 (由 PgNotifyListener 完成)
+- 通过 thread_id / run_id 字典索引直接路由到订阅者，O(匹配订阅者) 而非 O(全部客户端)
+- 每个订阅者持有有界队列，满载时按策略丢弃或合并
+- 暴露队列深度与分发延迟指标
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+from cognizes.engine.pulse.pg_notify_listener import EventTransport, NotifyEvent
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = "*"
+
+
+class SubscriptionClosedError(Exception):
+    """订阅已关闭异常"""
+
+    pass
+
+
+class OverflowPolicy(StrEnum):
+    """订阅队列满载时的处理策略"""
+
+    DROP_OLDEST = "drop_oldest"  # 丢弃队首最旧事件
+    DROP_NEWEST = "drop_newest"  # 丢弃新到达的事件
+    COALESCE = "coalesce"  # 用新事件替换队列中同类事件，无同类时退化为 DROP_OLDEST
+
+
+@dataclass
+class SubscriptionStats:
+    """单个订阅者的统计信息"""
+
+    key: str
+    depth: int
+    maxsize: int
+    delivered: int
+    dropped: int
+    coalesced: int
+
+
+@dataclass
+class HubMetrics:
+    """EventHub 运行指标"""
+
+    subscribers: int
+    indexed_keys: int
+    total_queue_depth: int
+    max_queue_depth: int
+    published: int
+    routed: int
+    dropped: int
+    coalesced: int
+    avg_dispatch_latency_ms: float
+    max_dispatch_latency_ms: float
+    avg_delivery_latency_ms: float
+
+
+def extract_route(payload: dict[str, Any]) -> tuple[str | None, str | None]:
+    """从 NOTIFY 载荷中提取 (thread_id, run_id)，兼容顶层字段与 data 子对象，run_id 缺失时回退到顶层 id"""
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else {}
+    thread_id = payload.get("thread_id") or data.get("thread_id")
+    run_id = payload.get("run_id") or data.get("run_id") or payload.get("id")
+    return (
+        str(thread_id) if thread_id is not None else None,
+        str(run_id) if run_id is not None else None,
+    )
+
+
+def _coalesce_key(event: NotifyEvent) -> tuple:
+    """同类事件判定：同一 thread/run 下相同的 table + event_type"""
+    payload = event.payload
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else {}
+    return (
+        *extract_route(payload),
+        payload.get("table"),
+        payload.get("event_type") or data.get("event_type"),
+    )
+
+
+class Subscription:
+    """
+    EventHub 订阅句柄
+
+    持有一个有界缓冲区，由 EventHub 同步写入 (不阻塞分发)，由消费者异步读取。
+    """
+
+    def __init__(self, hub: EventHub, key: str, maxsize: int, policy: OverflowPolicy):
+        self.key = key
+        self.maxsize = maxsize
+        self.policy = policy
+        self._hub = hub
+        self._buffer: deque[tuple[float, NotifyEvent]] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def offer(self, event: NotifyEvent) -> bool:
+        """
+        非阻塞写入事件
+
+        Returns:
+            事件是否被接收 (DROP_NEWEST 满载时返回 False)
+        """
+        if self._closed:
+            return False
+
+        if len(self._buffer) >= self.maxsize:
+            if self.policy == OverflowPolicy.DROP_NEWEST:
+                self.dropped += 1
+                return False
+            if self.policy == OverflowPolicy.COALESCE and self._coalesce(event):
+                self.coalesced += 1
+                self._ready.set()
+                return True
+            self._buffer.popleft()
+            self.dropped += 1
+
+        self._buffer.append((time.perf_counter(), event))
+        self._ready.set()
+        return True
+
+    def _coalesce(self, event: NotifyEvent) -> bool:
+        """用新事件替换队列中最近的同类事件，保持其余事件的相对顺序"""
+        key = _coalesce_key(event)
+        for index in range(len(self._buffer) - 1, -1, -1):
+            if _coalesce_key(self._buffer[index][1]) == key:
+                del self._buffer[index]
+                self._buffer.append((time.perf_counter(), event))
+                return True
+        return False
+
+    def get_nowait(self) -> NotifyEvent | None:
+        """取出一个事件，队列为空时返回 None"""
+        if not self._buffer:
+            self._ready.clear()
+            return None
+        enqueued_at, event = self._buffer.popleft()
+        if not self._buffer:
+            self._ready.clear()
+        self.delivered += 1
+        self._hub._record_delivery(time.perf_counter() - enqueued_at)
+        return event
+
+    async def get(self, timeout: float | None = None) -> NotifyEvent:
+        """
+        等待并取出一个事件
+
+        Raises:
+            asyncio.TimeoutError: 超时仍无事件
+            SubscriptionClosedError: 订阅已关闭
+        """
+        while True:
+            event = self.get_nowait()
+            if event is not None:
+                return event
+            if self._closed:
+                raise SubscriptionClosedError(f"Subscription closed: {self.key}")
+            if timeout is None:
+                await self._ready.wait()
+            else:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+
+    def close(self) -> None:
+        """关闭订阅并从 EventHub 索引中移除"""
+        if self._closed:
+            return
+        self._closed = True
+        self._ready.set()
+        self._hub.unsubscribe(self)
+
+    def stats(self) -> SubscriptionStats:
+        return SubscriptionStats(
+            key=self.key,
+            depth=self.depth,
+            maxsize=self.maxsize,
+            delivered=self.delivered,
+            dropped=self.dropped,
+            coalesced=self.coalesced,
+        )
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> NotifyEvent:
+        try:
+            return await self.get()
+        except SubscriptionClosedError:
+            raise StopAsyncIteration from None
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class EventHub:
+    """
+    NOTIFY 事件扇出中枢
+
+    Usage:
+        hub = EventHub()
+        hub.attach(listener)
+
+        with hub.subscribe(thread_id=thread_id) as sub:
+            async for event in sub:
+                await websocket.send_json(event.payload)
+    """
+
+    def __init__(
+        self,
+        channel: str = "event_stream",
+        queue_maxsize: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
+        self.channel = channel
+        self.queue_maxsize = queue_maxsize
+        self.overflow_policy = overflow_policy
+        self._thread_index: dict[str, set[Subscription]] = {}
+        self._run_index: dict[str, set[Subscription]] = {}
+
+        self._published = 0
+        self._routed = 0
+        self._dispatch_total = 0.0
+        self._dispatch_max = 0.0
+        self._delivery_total = 0.0
+        self._delivery_count = 0
+        self._dropped_closed = 0
+        self._coalesced_closed = 0
+
+    def attach(self, listener: EventTransport) -> None:
+        """挂载到事件传输层：整个进程只注册一个同步回调"""
+        listener.on_event(self.channel, self.publish)
+
+    # ========================================
+    # 订阅管理
+    # ========================================
+
+    def subscribe(
+        self,
+        thread_id: str | None = None,
+        run_id: str | None = None,
+        maxsize: int | None = None,
+        policy: OverflowPolicy | None = None,
+    ) -> Subscription:
+        """
+        按 thread_id 或 run_id 订阅事件 (二选一，传入 "*" 订阅全部)
+        """
+        if (thread_id is None) == (run_id is None):
+            raise ValueError("Exactly one of thread_id or run_id must be provided")
+
+        if thread_id is not None:
+            index, key = self._thread_index, str(thread_id)
+            label = f"thread:{key}"
+        else:
+            index, key = self._run_index, str(run_id)
+            label = f"run:{key}"
+
+        subscription = Subscription(
+            hub=self,
+            key=label,
+            maxsize=maxsize or self.queue_maxsize,
+            policy=policy or self.overflow_policy,
+        )
+        index.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """从索引中移除订阅"""
+        kind, _, key = subscription.key.partition(":")
+        index = self._thread_index if kind == "thread" else self._run_index
+        subscribers = index.get(key)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del index[key]
+        self._dropped_closed += subscription.dropped
+        self._coalesced_closed += subscription.coalesced
+        if not subscription.closed:
+            subscription.close()
+
+    # ========================================
+    # 分发
+    # ========================================
+
+    def publish(self, event: NotifyEvent) -> int:
+        """
+        将已解码的事件路由到匹配的订阅者 (同步、非阻塞)
+
+        Returns:
+            接收该事件的订阅者数量
+        """
+        started = time.perf_counter()
+        thread_id, run_id = extract_route(event.payload)
+
+        targets: list[Subscription] = []
+        for index, key in ((self._thread_index, thread_id), (self._run_index, run_id)):
+            if key is not None and key in index:
+                targets.extend(index[key])
+            if WILDCARD in index:
+                targets.extend(index[WILDCARD])
+
+        routed = 0
+        for subscription in targets:
+            if subscription.offer(event):
+                routed += 1
+
+        elapsed = time.perf_counter() - started
+        self._published += 1
+        self._routed += routed
+        self._dispatch_total += elapsed
+        self._dispatch_max = max(self._dispatch_max, elapsed)
+        return routed
+
+    def _record_delivery(self, latency: float) -> None:
+        self._delivery_total += latency
+        self._delivery_count += 1
+
+    # ========================================
+    # 指标
+    # ========================================
+
+    def _subscriptions(self) -> list[Subscription]:
+        return [s for index in (self._thread_index, self._run_index) for subs in index.values() for s in subs]
+
+    def subscriber_stats(self) -> list[SubscriptionStats]:
+        """每个订阅者的队列深度与丢弃统计"""
+        return [s.stats() for s in self._subscriptions()]
+
+    def get_metrics(self) -> HubMetrics:
+        """汇总指标：队列深度、分发延迟、投递延迟"""
+        subscriptions = self._subscriptions()
+        depths = [s.depth for s in subscriptions]
+        return HubMetrics(
+            subscribers=len(subscriptions),
+            indexed_keys=len(self._thread_index) + len(self._run_index),
+            total_queue_depth=sum(depths),
+            max_queue_depth=max(depths, default=0),
+            published=self._published,
+            routed=self._routed,
+            dropped=self._dropped_closed + sum(s.dropped for s in subscriptions),
+            coalesced=self._coalesced_closed + sum(s.coalesced for s in subscriptions),
+            avg_dispatch_latency_ms=(self._dispatch_total / self._published * 1000) if self._published else 0.0,
+            max_dispatch_latency_ms=self._dispatch_max * 1000,
+            avg_delivery_latency_ms=(
+                (self._delivery_total / self._delivery_count * 1000) if self._delivery_count else 0.0
+            ),
+        )
@@ -0,0 +1,251 @@
+"""
+Pulse EventRelay: 多节点事件中继
+
+每个 API 进程各自 asyncpg.connect + LISTEN 时，数据库侧的监听连接数随进程数线性增长，
+每条 NOTIFY 也要向每个监听连接各投递一次。中继模式下：
+- 单个 EventRelay 进程持有唯一的 LISTEN 连接，每条 NOTIFY 只读取一次
+- 通过本地 Unix socket 以换行分隔 JSON 帧转发给各 API 进程 (帧只编码一次)
+- API 进程使用 RelayTransport 替代 PgNotifyListener，接口一致，断线自动重连
+- 写缓冲超过水位的慢客户端会被断开，不拖慢其他节点
+
+启动中继:
+    python -m cognizes.engine.pulse.event_relay --dsn postgresql://... --socket /tmp/cognizes-events.sock
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+
+import asyncpg
+
+from cognizes.engine.pulse.pg_notify_listener import EventTransport, PgNotifyListener
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELAY_SOCKET = "/tmp/cognizes-events.sock"
+
+
+@dataclass
+class RelayMetrics:
+    """EventRelay 运行指标"""
+
+    clients: int
+    forwarded: int
+    frames_written: int
+    dropped_clients: int
+
+
+def encode_frame(channel: str, payload: str) -> bytes:
+    """编码中继帧：原样转发 NOTIFY 载荷字符串，由接收端解码"""
+    return (json.dumps({"channel": channel, "payload": payload}) + "\n").encode()
+
+
+class EventRelay(PgNotifyListener):
+    """
+    事件中继服务端
+
+    复用 PgNotifyListener 的单连接 LISTEN，但不解码载荷，直接转发给所有已连接的 API 节点。
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        socket_path: str = DEFAULT_RELAY_SOCKET,
+        channels: list[str] | None = None,
+        max_client_buffer: int = 4 * 1024 * 1024,
+    ):
+        super().__init__(dsn, channels)
+        self.socket_path = socket_path
+        self.max_client_buffer = max_client_buffer
+        self._server: asyncio.AbstractServer | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._forwarded = 0
+        self._frames_written = 0
+        self._dropped_clients = 0
+
+    async def start(self) -> None:
+        """启动 socket 服务与数据库监听"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        logger.info(f"EventRelay serving on {self.socket_path}")
+        await super().start()
+
+    async def stop(self) -> None:
+        """停止监听并断开所有客户端"""
+        await super().stop()
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def serve_forever(self) -> None:
+        """启动并一直运行，直到被取消"""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """登记客户端；客户端只读，读到 EOF 即视为断开"""
+        self._clients.add(writer)
+        logger.info(f"Relay client connected ({len(self._clients)} total)")
+        try:
+            await reader.read()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    def _handle_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        """转发 NOTIFY：帧只编码一次，写入各客户端的发送缓冲 (非阻塞)"""
+        self._forwarded += 1
+        frame = encode_frame(channel, payload)
+
+        for writer in list(self._clients):
+            if writer.is_closing():
+                self._clients.discard(writer)
+                continue
+            if writer.transport.get_write_buffer_size() > self.max_client_buffer:
+                logger.warning("Relay client too slow, disconnecting")
+                self._dropped_clients += 1
+                self._clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(frame)
+            self._frames_written += 1
+
+    def get_metrics(self) -> RelayMetrics:
+        return RelayMetrics(
+            clients=len(self._clients),
+            forwarded=self._forwarded,
+            frames_written=self._frames_written,
+            dropped_clients=self._dropped_clients,
+        )
+
+
+class RelayTransport(EventTransport):
+    """
+    事件中继客户端
+
+    与 PgNotifyListener 接口一致 (start / stop / on_event)，事件来自本地 EventRelay 而非数据库。
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_RELAY_SOCKET,
+        channels: list[str] | None = None,
+        reconnect_delay: float = 1.0,
+    ):
+        super().__init__(channels)
+        self.socket_path = socket_path
+        self.reconnect_delay = reconnect_delay
+        self._task: asyncio.Task | None = None
+        self._connected = asyncio.Event()
+
+    async def start(self) -> None:
+        """启动接收循环 (后台任务，断线后自动重连)"""
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止接收循环"""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def wait_connected(self, timeout: float | None = None) -> None:
+        """等待与中继建立连接"""
+        await asyncio.wait_for(self._connected.wait(), timeout=timeout)
+
+    async def _run(self) -> None:
+        while self._running:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=2**24)
+            except OSError as e:
+                logger.warning(f"EventRelay unavailable ({e}), retrying in {self.reconnect_delay}s")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            self._connected.set()
+            logger.info(f"Connected to EventRelay at {self.socket_path}")
+            try:
+                while line := await reader.readline():
+                    self.handle_frame(line)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                logger.warning(f"EventRelay connection lost: {e}")
+            finally:
+                self._connected.clear()
+                writer.close()
+
+            if self._running:
+                await asyncio.sleep(self.reconnect_delay)
+
+    def handle_frame(self, line: bytes) -> None:
+        """解析一帧并分发；未订阅的频道直接跳过载荷解码"""
+        try:
+            frame = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Malformed relay frame")
+            return
+        channel = frame.get("channel")
+        if channel in self.channels:
+            self.dispatch(channel, frame.get("payload", ""))
+
+
+def create_event_transport(
+    dsn: str,
+    channels: list[str] | None = None,
+    mode: str = "listen",
+    socket_path: str = DEFAULT_RELAY_SOCKET,
+) -> EventTransport:
+    """
+    事件传输层工厂
+
+    Args:
+        dsn: 数据库连接串 (listen 模式使用)
+        channels: 订阅频道
+        mode: listen (每进程直连 LISTEN) | relay (经本地 EventRelay 接收)
+        socket_path: relay 模式下的 Unix socket 路径
+    """
+    if mode == "relay":
+        return RelayTransport(socket_path=socket_path, channels=channels)
+    if mode == "listen":
+        return PgNotifyListener(dsn=dsn, channels=channels)
+    raise ValueError(f"Unknown event transport mode: {mode}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pulse EventRelay: 单连接 LISTEN，经本地 socket 扇出到 API 节点")
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL", "postgresql://aigc:@localhost/cognizes-engine"))
+    parser.add_argument("--socket", default=os.getenv("EVENT_RELAY_SOCKET", DEFAULT_RELAY_SOCKET))
+    parser.add_argument("--channels", nargs="+", default=["event_stream", "event_cursor", "tools_changed"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    relay = EventRelay(dsn=args.dsn, socket_path=args.socket, channels=args.channels)
+    try:
+        asyncio.run(relay.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
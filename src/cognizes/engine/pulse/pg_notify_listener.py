@@ -10,8 +10,10 @@ PgNotifyListener: PostgreSQL LISTEN/NOTIFY 事件监听器
 from __future__ import annotations
 
 import asyncio
+import inspect
 import json
 import logging
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Callable, Coroutine
@@ -30,7 +32,67 @@ class NotifyEvent:
     received_at: datetime
 
 
-class PgNotifyListener:
+class EventTransport(ABC):
+    """
+    事件传输层基类
+
+    PgNotifyListener (每进程直连 LISTEN) 与 RelayTransport (经本地 socket 订阅中继进程)
+    共享同一套回调注册与分发语义，上层 (EventHub / EventFetcher) 无需关心事件来源。
+    """
+
+    def __init__(self, channels: list[str] | None = None):
+        self.channels = channels or ["event_stream"]
+        self._listeners: dict[str, list[Callable]] = {}
+        self._running = False
+
+    @abstractmethod
+    async def start(self) -> None:
+        """开始接收 self.channels 上的事件"""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """停止接收事件并释放连接"""
+
+    def add_channel(self, channel: str) -> None:
+        """追加订阅频道 (需在 start() 前调用，start() 只对 self.channels 中的频道发起订阅)"""
+        if channel not in self.channels:
+            self.channels.append(channel)
+
+    def on_event(self, channel: str, callback: Callable[[NotifyEvent], Coroutine[Any, Any, None] | Any]) -> None:
+        """
+        注册事件回调
+
+        协程回调以独立 Task 调度；同步回调 (如 EventHub.publish) 在通知处理中直接执行，
+        不产生额外 Task。
+        """
+        if channel not in self._listeners:
+            self._listeners[channel] = []
+        self._listeners[channel].append(callback)
+
+    def dispatch(self, channel: str, payload: str) -> None:
+        """解码一次载荷并触发该频道的所有回调"""
+        received_at = datetime.now()
+
+        try:
+            data = json.loads(payload)
+        except json.JSONDecodeError:
+            data = {"raw": payload}
+
+        event = NotifyEvent(channel=channel, payload=data, received_at=received_at)
+
+        # 触发回调
+        callbacks = self._listeners.get(channel, [])
+        for callback in callbacks:
+            try:
+                result = callback(event)
+            except Exception:
+                logger.exception(f"Notify callback failed on channel: {channel}")
+                continue
+            if inspect.isawaitable(result):
+                asyncio.create_task(result)
+
+
+class PgNotifyListener(EventTransport):
     """
     PostgreSQL LISTEN/NOTIFY 监听器
 
@@ -41,11 +103,17 @@ class PgNotifyListener:
     """
 
     def __init__(self, dsn: str, channels: list[str] | None = None):
+        super().__init__(channels)
         self.dsn = dsn
-        self.channels = channels or ["event_stream"]
         self._connection: asyncpg.Connection | None = None
-        self._listeners: dict[str, list[Callable]] = {}
-        self._running = False
+
+    def add_channel(self, channel: str) -> None:
+        """追加订阅频道；监听器已启动时立即对该频道发起 LISTEN"""
+        if channel in self.channels:
+            return
+        super().add_channel(channel)
+        if self._connection is not None:
+            asyncio.get_running_loop().create_task(self._connection.add_listener(channel, self._handle_notification))
 
     async def start(self) -> None:
         """启动监听器"""
@@ -65,27 +133,9 @@ class PgNotifyListener:
             await self._connection.close()
             self._connection = None
 
-    def on_event(self, channel: str, callback: Callable[[NotifyEvent], Coroutine[Any, Any, None]]) -> None:
-        """注册事件回调"""
-        if channel not in self._listeners:
-            self._listeners[channel] = []
-        self._listeners[channel].append(callback)
-
     def _handle_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
         """处理 NOTIFY 通知"""
-        received_at = datetime.now()
-
-        try:
-            data = json.loads(payload)
-        except json.JSONDecodeError:
-            data = {"raw": payload}
-
-        event = NotifyEvent(channel=channel, payload=data, received_at=received_at)
-
-        # 触发回调
-        callbacks = self._listeners.get(channel, [])
-        for callback in callbacks:
-            asyncio.create_task(callback(event))
+        self.dispatch(channel, payload)
 
 
 # ========================================
@@ -158,7 +158,8 @@ BEGIN
             'thread_id', NEW.thread_id,
             'author', NEW.author,
             'event_type', NEW.event_type,
-            'created_at', NEW.created_at
+            'created_at', NEW.created_at,
+            'sequence_num', NEW.sequence_num
         )::text
     );
     RETURN NEW;
@@ -170,6 +171,33 @@ CREATE TRIGGER trigger_event_notify
     FOR EACH ROW
     EXECUTE FUNCTION notify_event_insert();
 
+-- Cursor 模式：NOTIFY 仅携带 (thread_id, min_seq, max_seq)，规避 8KB 载荷上限
+-- 语句级触发器按 thread 聚合，一条多行 INSERT 只产生一条通知；
+-- 监听端 (cognizes.engine.pulse.event_fetcher) 再按 idx_events_sequence 批量拉取行数据
+-- 触发器仅在 EVENT_STREAM_MODE=cursor 时由 EventFetcher.install_trigger() 安装:
+--   CREATE TRIGGER trigger_event_cursor_notify AFTER INSERT ON events
+--       REFERENCING NEW TABLE AS new_events FOR EACH STATEMENT EXECUTE FUNCTION notify_event_cursor();
+-- 全部节点切换到 Cursor 模式后可移除逐行通知: DROP TRIGGER trigger_event_notify ON events;
+-- 回退到 notify 模式时移除: DROP TRIGGER IF EXISTS trigger_event_cursor_notify ON events;
+CREATE OR REPLACE FUNCTION notify_event_cursor()
+RETURNS TRIGGER AS $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT thread_id, MIN(sequence_num) AS min_seq, MAX(sequence_num) AS max_seq
+        FROM new_events
+        GROUP BY thread_id
+    LOOP
+        PERFORM pg_notify(
+            'event_cursor',
+            json_build_object('thread_id', r.thread_id, 'min_seq', r.min_seq, 'max_seq', r.max_seq)::text
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================
 -- 9. 自动更新 updated_at 触发器
 -- ============================================
@@ -19,6 +19,9 @@ CREATE TABLE IF NOT EXISTS tools (
     -- 统计信息
     call_count      INTEGER NOT NULL DEFAULT 0,
     avg_latency_ms  FLOAT DEFAULT 0,
+    p50_latency_ms  FLOAT DEFAULT 0,
+    p95_latency_ms  FLOAT DEFAULT 0,
+    p99_latency_ms  FLOAT DEFAULT 0,
 
     -- 时间戳
     created_at      TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -28,9 +31,41 @@ CREATE TABLE IF NOT EXISTS tools (
     CONSTRAINT tools_app_name_unique UNIQUE (app_name, name)
 );
 
+-- 旧库升级: 分位数列 (由 ToolRegistry 周期性批量写回)
+ALTER TABLE tools ADD COLUMN IF NOT EXISTS p50_latency_ms FLOAT DEFAULT 0;
+ALTER TABLE tools ADD COLUMN IF NOT EXISTS p95_latency_ms FLOAT DEFAULT 0;
+ALTER TABLE tools ADD COLUMN IF NOT EXISTS p99_latency_ms FLOAT DEFAULT 0;
+
 CREATE INDEX IF NOT EXISTS idx_tools_app_name ON tools(app_name);
 CREATE INDEX IF NOT EXISTS idx_tools_is_active ON tools(app_name, is_active);
 
+-- 工具定义变更通知：ToolRegistry 据此失效进程内的工具目录缓存
+-- 仅监听定义相关列，统计列 (call_count / *_latency_ms) 的批量写回不会触发
+CREATE OR REPLACE FUNCTION notify_tools_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    r RECORD;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        r := OLD;
+    ELSE
+        r := NEW;
+    END IF;
+    PERFORM pg_notify(
+        'tools_changed',
+        json_build_object('app_name', r.app_name, 'name', r.name, 'operation', TG_OP)::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_tools_change_notify ON tools;
+CREATE TRIGGER trigger_tools_change_notify
+    AFTER INSERT OR DELETE OR UPDATE OF name, display_name, description, openapi_schema, permissions, is_active
+    ON tools
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_tools_change();
+
 -- tool_executions: 工具执行记录审计
 CREATE TABLE IF NOT EXISTS tool_executions (
     id              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -47,8 +82,23 @@ CREATE TABLE IF NOT EXISTS tool_executions (
 );
 
 -- traces: OpenTelemetry Trace 结构化存储
+-- 按 start_time 日分区：保留期清理直接 DROP 分区，查询按时间裁剪分区
+
+-- 旧版非分区表迁移 (1/2)：CREATE TABLE IF NOT EXISTS 对已存在的普通表不生效，
+-- 先将其连同主键与索引改名为 traces_legacy*，数据在分区创建后回灌 (见 ensure_traces_partitions 之后)
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('traces')) = 'r' THEN
+        ALTER TABLE traces RENAME TO traces_legacy;
+        ALTER TABLE traces_legacy RENAME CONSTRAINT traces_pkey TO traces_legacy_pkey;
+        ALTER INDEX IF EXISTS idx_traces_run_id RENAME TO idx_traces_legacy_run_id;
+        ALTER INDEX IF EXISTS idx_traces_trace_id RENAME TO idx_traces_legacy_trace_id;
+        ALTER INDEX IF EXISTS idx_traces_start_time RENAME TO idx_traces_legacy_start_time;
+    END IF;
+END $$;
+
 CREATE TABLE IF NOT EXISTS traces (
-    id                  UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    id                  UUID NOT NULL DEFAULT gen_random_uuid(),
     run_id              UUID, -- REFERENCES runs(id) ON DELETE CASCADE,
 
     -- OpenTelemetry 标识
@@ -76,12 +126,217 @@ CREATE TABLE IF NOT EXISTS traces (
     status_message      TEXT,
 
     -- 创建时间
-    created_at          TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at          TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    -- 分区表主键必须包含分区键
+    PRIMARY KEY (id, start_time)
+) PARTITION BY RANGE (start_time);
+
+-- 兜底分区：尚未创建日分区的数据落在这里，避免写入失败
+-- (ensure_traces_partitions 会把 default 分区中某天的数据迁入新建的该天分区)
+CREATE TABLE IF NOT EXISTS traces_default PARTITION OF traces DEFAULT;
 
 CREATE INDEX IF NOT EXISTS idx_traces_run_id ON traces(run_id);
 CREATE INDEX IF NOT EXISTS idx_traces_trace_id ON traces(trace_id);
 CREATE INDEX IF NOT EXISTS idx_traces_start_time ON traces(start_time DESC);
+CREATE INDEX IF NOT EXISTS idx_traces_operation_time ON traces(operation_name, start_time);
+-- rollup_trace_latency 按写入时间增量汇总
+CREATE INDEX IF NOT EXISTS idx_traces_created_at ON traces(created_at);
+
+-- 创建日分区 traces_YYYYMMDD (昨天 ~ 未来 p_days_ahead 天)，返回新建分区数
+-- default 分区中已有某天的数据时，先建独立表、迁入该天数据，再 ATTACH 为分区；
+-- 每天单独处理，某天失败只记录 WARNING，不影响其他日期
+CREATE OR REPLACE FUNCTION ensure_traces_partitions(p_days_ahead INTEGER DEFAULT 3)
+RETURNS INTEGER AS $$
+DECLARE
+    d DATE;
+    part_name TEXT;
+    created_count INTEGER := 0;
+BEGIN
+    FOR d IN
+        SELECT generate_series(CURRENT_DATE - 1, CURRENT_DATE + p_days_ahead, INTERVAL '1 day')::date
+    LOOP
+        part_name := 'traces_' || to_char(d, 'YYYYMMDD');
+        CONTINUE WHEN to_regclass(part_name) IS NOT NULL;
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM traces_default
+                WHERE start_time >= d::timestamptz AND start_time < (d + 1)::timestamptz
+            ) THEN
+                EXECUTE format('CREATE TABLE %I (LIKE traces INCLUDING DEFAULTS)', part_name);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM traces_default WHERE start_time >= %L AND start_time < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    d::timestamptz, (d + 1)::timestamptz, part_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE traces ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    part_name, d::timestamptz, (d + 1)::timestamptz
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF traces FOR VALUES FROM (%L) TO (%L)',
+                    part_name, d::timestamptz, (d + 1)::timestamptz
+                );
+            END IF;
+            created_count := created_count + 1;
+        EXCEPTION WHEN OTHERS THEN
+            RAISE WARNING 'ensure_traces_partitions: failed to create %: %', part_name, SQLERRM;
+        END;
+    END LOOP;
+    RETURN created_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 删除早于保留期的日分区 (DROP 而非 DELETE，瞬时完成且无膨胀)，返回删除分区数
+-- 未能建分区的日期留在 default 分区中的过期数据同时 DELETE
+CREATE OR REPLACE FUNCTION drop_traces_partitions(p_retention_days INTEGER DEFAULT 7)
+RETURNS INTEGER AS $$
+DECLARE
+    part RECORD;
+    dropped_count INTEGER := 0;
+BEGIN
+    FOR part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'traces'::regclass
+          AND c.relname ~ '^traces_[0-9]{8}$'
+          AND to_date(substring(c.relname FROM 8), 'YYYYMMDD') < CURRENT_DATE - p_retention_days
+    LOOP
+        EXECUTE format('DROP TABLE %I', part.relname);
+        dropped_count := dropped_count + 1;
+    END LOOP;
+    DELETE FROM traces_default WHERE start_time < (CURRENT_DATE - p_retention_days)::timestamptz;
+    RETURN dropped_count;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_traces_partitions(3);
+
+-- 旧版非分区表迁移 (2/2)：回灌数据后删除旧表
+-- 近期数据落入刚创建的日分区；更早的数据落入 default 分区 (这些日期不会再创建分区)
+DO $$
+BEGIN
+    IF to_regclass('traces_legacy') IS NOT NULL THEN
+        INSERT INTO traces (
+            id, run_id, trace_id, span_id, parent_span_id, operation_name, span_kind,
+            attributes, events, start_time, end_time, duration_ns, status_code, status_message, created_at
+        )
+        SELECT id, run_id, trace_id, span_id, parent_span_id, operation_name, span_kind,
+               attributes, events, start_time, end_time, duration_ns, status_code, status_message, created_at
+        FROM traces_legacy;
+        DROP TABLE traces_legacy;
+    END IF;
+END $$;
+
+-- trace_latency_rollups: 每分钟 x 每个 operation 的延迟直方图 (看板只读此表)
+-- histogram[i] 为落在 trace_latency_bounds_ms() 第 i 个区间的 Span 数 (最后一个为溢出桶)
+CREATE TABLE IF NOT EXISTS trace_latency_rollups (
+    bucket              TIMESTAMP WITH TIME ZONE NOT NULL,
+    operation_name      VARCHAR(255) NOT NULL,
+    span_count          BIGINT NOT NULL DEFAULT 0,
+    error_count         BIGINT NOT NULL DEFAULT 0,
+    total_duration_ns   BIGINT NOT NULL DEFAULT 0,
+    max_duration_ns     BIGINT NOT NULL DEFAULT 0,
+    histogram           BIGINT[] NOT NULL,
+    PRIMARY KEY (bucket, operation_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_trace_rollups_operation ON trace_latency_rollups(operation_name, bucket);
+
+-- 汇总水位：已汇总到的写入时间 created_at (不含)
+CREATE TABLE IF NOT EXISTS trace_rollup_state (
+    id                  INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    rolled_up_to        TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- 直方图区间上界 (毫秒)，与 cognizes.adapters.postgres.tracing.LATENCY_BUCKETS_MS 保持一致
+CREATE OR REPLACE FUNCTION trace_latency_bounds_ms()
+RETURNS DOUBLE PRECISION[] AS $$
+    SELECT ARRAY[1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000]::DOUBLE PRECISION[];
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 直方图逐元素相加
+CREATE OR REPLACE FUNCTION trace_histogram_add(a BIGINT[], b BIGINT[])
+RETURNS BIGINT[] AS $$
+    SELECT array_agg(COALESCE(x, 0) + COALESCE(y, 0) ORDER BY ord)
+    FROM unnest(a, b) WITH ORDINALITY AS t(x, y, ord);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 增量汇总写入时间 (created_at) 落在 [水位, p_upto) 区间的 Span，返回写入的 rollup 行数
+-- 水位按写入时间推进，晚导出的 Span 在写入后的下一轮汇总中计入其 start_time 所在分钟；
+-- 默认滞后 2 分钟，只需覆盖导出事务自开始 (created_at = NOW()) 到提交的耗时
+CREATE OR REPLACE FUNCTION rollup_trace_latency(
+    p_upto TIMESTAMP WITH TIME ZONE DEFAULT date_trunc('minute', NOW()) - INTERVAL '2 minutes'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_from TIMESTAMP WITH TIME ZONE;
+    v_upto TIMESTAMP WITH TIME ZONE := date_trunc('minute', p_upto);
+    v_bounds DOUBLE PRECISION[] := trace_latency_bounds_ms();
+    affected INTEGER;
+BEGIN
+    -- 行锁保证同一时刻只有一个汇总任务推进水位
+    SELECT rolled_up_to INTO v_from FROM trace_rollup_state WHERE id = 1 FOR UPDATE;
+    IF v_from IS NULL THEN
+        SELECT COALESCE(date_trunc('minute', MIN(created_at)), v_upto) INTO v_from FROM traces;
+        INSERT INTO trace_rollup_state (id, rolled_up_to) VALUES (1, v_from)
+        ON CONFLICT (id) DO NOTHING;
+    END IF;
+    IF v_from >= v_upto THEN
+        RETURN 0;
+    END IF;
+
+    WITH spans AS (
+        SELECT date_trunc('minute', start_time) AS bucket,
+               operation_name,
+               duration_ns,
+               status_code,
+               width_bucket((duration_ns / 1e6)::DOUBLE PRECISION, v_bounds) AS hb
+        FROM traces
+        WHERE created_at >= v_from AND created_at < v_upto AND duration_ns IS NOT NULL
+    ), totals AS (
+        SELECT bucket, operation_name,
+               COUNT(*) AS span_count,
+               COUNT(*) FILTER (WHERE status_code = 'ERROR') AS error_count,
+               SUM(duration_ns) AS total_duration_ns,
+               MAX(duration_ns) AS max_duration_ns
+        FROM spans
+        GROUP BY bucket, operation_name
+    ), hist AS (
+        SELECT bucket, operation_name, hb, COUNT(*) AS n
+        FROM spans
+        GROUP BY bucket, operation_name, hb
+    ), dense AS (
+        SELECT t.bucket, t.operation_name, array_agg(COALESCE(h.n, 0) ORDER BY i.idx) AS histogram
+        FROM totals t
+        CROSS JOIN generate_series(0, array_length(v_bounds, 1)) AS i(idx)
+        LEFT JOIN hist h ON h.bucket = t.bucket AND h.operation_name = t.operation_name AND h.hb = i.idx
+        GROUP BY t.bucket, t.operation_name
+    )
+    INSERT INTO trace_latency_rollups AS r
+        (bucket, operation_name, span_count, error_count, total_duration_ns, max_duration_ns, histogram)
+    SELECT t.bucket, t.operation_name, t.span_count, t.error_count, t.total_duration_ns, t.max_duration_ns, d.histogram
+    FROM totals t
+    JOIN dense d ON d.bucket = t.bucket AND d.operation_name = t.operation_name
+    ON CONFLICT (bucket, operation_name) DO UPDATE SET
+        span_count = r.span_count + EXCLUDED.span_count,
+        error_count = r.error_count + EXCLUDED.error_count,
+        total_duration_ns = r.total_duration_ns + EXCLUDED.total_duration_ns,
+        max_duration_ns = GREATEST(r.max_duration_ns, EXCLUDED.max_duration_ns),
+        histogram = trace_histogram_add(r.histogram, EXCLUDED.histogram);
+
+    GET DIAGNOSTICS affected = ROW_COUNT;
+    UPDATE trace_rollup_state SET rolled_up_to = v_upto WHERE id = 1;
+    RETURN affected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- pg_cron 定时任务 (可选)
+-- SELECT cron.schedule('rollup_traces', '* * * * *', $$SELECT rollup_trace_latency()$$);
+-- SELECT cron.schedule('maintain_traces', '0 1 * * *', $$SELECT ensure_traces_partitions(3); SELECT drop_traces_partitions(7)$$);
+-- 未启用 pg_cron 时由 TraceAnalytics.start() 的后台任务定期执行分区维护
 
 -- sandbox_executions: 沙箱执行记录
 CREATE TABLE IF NOT EXISTS sandbox_executions (
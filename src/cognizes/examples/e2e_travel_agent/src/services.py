@@ -123,6 +123,8 @@ async def create_services() -> tuple:
             langfuse_secret_key=config.langfuse_secret_key,
             langfuse_host=config.langfuse_host,
         )
+        # 定期创建 traces 日分区并清理过期分区
+        await tracing_manager.start(pool)
 
         # 创建 Embedding 函数
         from google import genai
@@ -27,6 +27,14 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def pdf_page_cache_dir(tmp_path, monkeypatch):
+    """Keep the PDF page cache out of the working tree and isolated per test."""
+    from cognizes.agents.config import settings
+
+    monkeypatch.setattr(settings, "PDF_PAGE_CACHE_DIR", str(tmp_path / "pdf_pages"))
+
+
 @pytest.fixture
 def temp_dir():
     """Create a temporary directory for test files."""
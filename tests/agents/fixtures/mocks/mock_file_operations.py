@@ -217,6 +217,13 @@ class MockFileManager:
             # for files that don't exist, so raise the expected error
             raise FileNotFoundError(f"File not found: {path_str}")
 
+    def replace(self, src, dst):
+        """Mock os.replace() method."""
+        src_str, dst_str = str(src), str(dst)
+        if src_str not in self.files:
+            raise FileNotFoundError(f"File not found: {src_str}")
+        self.files[dst_str] = self.files.pop(src_str)
+
     def stat_path(self, path_obj):
         """Mock stat() method for pathlib.Path."""
         # path_obj is the Path object when used as side_effect
@@ -550,6 +557,9 @@ class FileOperationsPatcher:
         # Patch os.path.exists
         self.patches.append(patch("os.path.exists", side_effect=self.file_manager.exists))
 
+        # Patch os.replace
+        self.patches.append(patch("os.replace", side_effect=self.file_manager.replace))
+
         # Start all patches
         for p in self.patches:
             p.start()
@@ -409,7 +409,7 @@ class TestAPIIntegration:
             assert data["papers"][0]["category"] == "llm-agents"
 
             # Verify service was called with correct parameters
-            service.list_papers.assert_called_with(category="llm-agents", status=None, limit=20, offset=0)
+            service.list_papers.assert_called_with(category="llm-agents", status=None, limit=20, offset=0, cursor=None)
         finally:
             # Clean up dependency override
             app.dependency_overrides.clear()
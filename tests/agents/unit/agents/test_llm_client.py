@@ -0,0 +1,98 @@
+"""Tests for the shared Anthropic client and request limiter."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import anthropic
+import pytest
+
+from cognizes.agents.claude import llm_client
+from cognizes.agents.claude.llm_client import LLMRateLimiter, get_anthropic_client
+from cognizes.agents.claude.skills import SkillInvoker
+
+
+class TestSharedClient:
+    """Test cases for get_anthropic_client."""
+
+    @pytest.fixture(autouse=True)
+    def clear_clients(self):
+        """Isolate the module-level client cache."""
+        with patch.dict(llm_client._clients, clear=True):
+            yield
+
+    def test_client_is_async_and_shared(self):
+        """Test invokers with the same credentials share one AsyncAnthropic client."""
+        client = get_anthropic_client("test-key")
+
+        assert isinstance(client, anthropic.AsyncAnthropic)
+        assert get_anthropic_client("test-key") is client
+        assert get_anthropic_client("test-key", "https://test.api.example.com") is not client
+
+    def test_skill_invokers_reuse_client(self):
+        """Test separately constructed invokers reuse the shared client."""
+        with patch.dict("os.environ", {"ANTHROPIC_API_KEY": "test-key"}):
+            assert SkillInvoker().anthropic_client is SkillInvoker().anthropic_client
+
+    async def test_close_clients(self):
+        """Test closing clears the cache."""
+        get_anthropic_client("test-key")
+
+        await llm_client.close_anthropic_clients()
+
+        assert llm_client._clients == {}
+
+
+class TestLLMRateLimiter:
+    """Test cases for LLMRateLimiter."""
+
+    async def test_bounds_concurrency(self):
+        """Test no more than max_concurrency requests run at once."""
+        limiter = LLMRateLimiter(max_concurrency=2)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+    async def test_limits_request_rate(self):
+        """Test requests beyond the burst wait for the token bucket to refill."""
+        limiter = LLMRateLimiter(max_concurrency=10, requests_per_minute=600)  # 10 req/s, burst 10
+
+        async def request():
+            async with limiter.slot():
+                pass
+
+        start = time.monotonic()
+        await asyncio.gather(*(request() for _ in range(12)))
+
+        assert time.monotonic() - start >= 0.15
+
+    async def test_batch_processor_runs_items_concurrently(self):
+        """Test batch-processor items in a batch are processed in parallel."""
+        invoker = SkillInvoker()
+        running = 0
+        peak = 0
+
+        async def handler(params):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"success": True, "content": params["content"]}
+
+        with patch.dict(invoker.skill_registry, {"markdown-formatter": AsyncMock(side_effect=handler)}):
+            result = await invoker._handle_batch_processor(
+                {"items": ["a", "b", "c", "d"], "skill": "markdown-formatter", "batch_size": 4}
+            )
+
+        assert [r["content"] for r in result["results"]] == ["a", "b", "c", "d"]
+        assert peak == 4
@@ -0,0 +1,189 @@
+"""Tests for off-loop, page-parallel PDF extraction."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from cognizes.agents.claude import pdf_extraction
+from cognizes.agents.claude.pdf_cache import PageCache
+from cognizes.agents.claude.pdf_extraction import (
+    DocumentInfo,
+    extract_pages,
+    file_sha256,
+    iter_pages,
+    load_document_info,
+    read_document_info,
+)
+from cognizes.agents.claude.skills import SkillInvoker
+
+
+def write_pdf(path: Path, page_count: int) -> Path:
+    """Write a minimal PDF whose page i (1-based) reads "Page i text"."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(f"{4 + 2 * i} 0 R".encode() for i in range(page_count))
+        + f"] /Count {page_count} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(page_count):
+        stream = f"BT /F1 12 Tf 72 720 Td (Page {i + 1} text) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * i} 0 R "
+            "/Resources << /Font << /F1 3 0 R >> >> >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.unit
+class TestPDFExtraction:
+    """Test cases for page extraction."""
+
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        """A 6-page PDF."""
+        return write_pdf(tmp_path / "paper.pdf", 6)
+
+    def test_read_document_info(self, pdf_path):
+        """Test the page count is read without extracting pages."""
+        assert read_document_info(str(pdf_path)).page_count == 6
+
+    def test_extract_pages_range(self, pdf_path):
+        """Test extraction of a page range returns 1-based page numbers and text."""
+        pages = extract_pages(str(pdf_path), 2, 4)
+
+        assert [page.number for page in pages] == [3, 4]
+        assert "Page 3 text" in pages[0].text
+
+    async def test_iter_pages_in_thread(self, pdf_path):
+        """Test short ranges are extracted in order in a worker thread."""
+        pages = [page async for page in iter_pages(str(pdf_path), 0, 6)]
+
+        assert [page.number for page in pages] == [1, 2, 3, 4, 5, 6]
+
+    async def test_iter_pages_process_pool_chunks(self, pdf_path):
+        """Test long ranges are split into chunks extracted in the process pool and merged in order."""
+        with patch.object(pdf_extraction, "PDF_EXTRACT_WORKERS", 2):
+            try:
+                pages = [page async for page in iter_pages(str(pdf_path), 1, 6, pages_per_chunk=2)]
+            finally:
+                pdf_extraction.shutdown_pdf_workers()
+
+        assert [page.number for page in pages] == [2, 3, 4, 5, 6]
+        assert all(f"Page {page.number} text" in page.text for page in pages)
+
+    async def test_pdf_reader_stream(self, pdf_path):
+        """Test the pdf-reader skill streams page Markdown in order and matches the full result."""
+        invoker = SkillInvoker()
+
+        chunks = [text async for text in invoker.stream_skill("pdf-reader", {"file_path": str(pdf_path)})]
+        result = await invoker._handle_pdf_reader({"file_path": str(pdf_path)})
+
+        assert len(chunks) == 6
+        assert chunks[0].startswith("\n\n## Page 1\n\n")
+        assert "".join(chunks) in result["data"]["content"]
+        assert result["metadata"]["page_count"] == 6
+
+
+@pytest.mark.unit
+class TestPageCache:
+    """Test cases for the per-page extraction cache."""
+
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        """A 6-page PDF."""
+        return write_pdf(tmp_path / "paper.pdf", 6)
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """A page cache in a temporary directory."""
+        cache = PageCache(tmp_path / "cache")
+        yield cache
+        cache.close()
+
+    async def test_only_new_pages_extracted(self, pdf_path, cache):
+        """Test a different page range only parses pages not cached yet."""
+        sha256 = await file_sha256(str(pdf_path))
+        extracted = []
+        original = pdf_extraction.extract_page_list
+
+        def recording(file_path, indexes, extract_tables=True):
+            extracted.append(list(indexes))
+            return original(file_path, indexes, extract_tables)
+
+        with patch.object(pdf_extraction, "extract_page_list", recording):
+            first = [page async for page in iter_pages(str(pdf_path), 0, 3, sha256=sha256, cache=cache)]
+            second = [page async for page in iter_pages(str(pdf_path), 1, 5, sha256=sha256, cache=cache)]
+
+        assert extracted == [[0, 1, 2], [3, 4]]
+        assert [page.number for page in second] == [2, 3, 4, 5]
+        assert second[0] == first[1]
+
+    async def test_options_are_part_of_the_key(self, pdf_path, cache):
+        """Test pages extracted without tables are not reused when tables are requested."""
+        sha256 = await file_sha256(str(pdf_path))
+        [page async for page in iter_pages(str(pdf_path), 0, 2, extract_tables=False, sha256=sha256, cache=cache)]
+
+        assert cache.get_pages(sha256, pdf_extraction.extraction_options(False), 0, 6).keys() == {0, 1}
+        assert cache.get_pages(sha256, pdf_extraction.extraction_options(True), 0, 6) == {}
+
+    async def test_pool_extracts_missing_pages_only(self, pdf_path, cache):
+        """Test the process-pool path merges cached and newly extracted pages in order."""
+        sha256 = await file_sha256(str(pdf_path))
+        [page async for page in iter_pages(str(pdf_path), 2, 4, sha256=sha256, cache=cache)]
+
+        with patch.object(pdf_extraction, "PDF_EXTRACT_WORKERS", 2):
+            try:
+                pages = [page async for page in iter_pages(str(pdf_path), 0, 6, 1, sha256=sha256, cache=cache)]
+            finally:
+                pdf_extraction.shutdown_pdf_workers()
+
+        assert [page.number for page in pages] == [1, 2, 3, 4, 5, 6]
+        assert len(cache.get_pages(sha256, pdf_extraction.extraction_options(True), 0, 6)) == 6
+
+    async def test_document_info_cached(self, pdf_path, cache):
+        """Test page count and metadata are served from the cache on repeat reads."""
+        sha256 = await file_sha256(str(pdf_path))
+        first = await load_document_info(str(pdf_path), sha256, cache)
+
+        with patch.object(pdf_extraction, "read_document_info", side_effect=AssertionError("re-parsed")):
+            assert await load_document_info(str(pdf_path), sha256, cache) == first
+
+    def test_least_recently_used_documents_evicted(self, tmp_path):
+        """Test documents beyond max_documents are evicted together with their pages."""
+        cache = PageCache(tmp_path / "cache", max_documents=1)
+        try:
+            cache.put_document("a", DocumentInfo(page_count=1, metadata={}))
+            cache.put_pages("a", "opts", [pdf_extraction.PageContent(number=1, text="A")])
+            cache.put_document("b", DocumentInfo(page_count=1, metadata={}))
+
+            assert cache.get_document("a") is None
+            assert cache.get_pages("a", "opts", 0, 1) == {}
+            assert cache.get_document("b") is not None
+        finally:
+            cache.close()
+
+    async def test_pdf_reader_uses_configured_cache(self, pdf_path):
+        """Test repeated pdf-reader calls are served from the configured cache."""
+        invoker = SkillInvoker()
+        first = await invoker._handle_pdf_reader({"file_path": str(pdf_path)})
+
+        with patch.object(pdf_extraction, "extract_page_list", side_effect=AssertionError("re-extracted")):
+            second = await invoker._handle_pdf_reader({"file_path": str(pdf_path), "page_range": [2, 4]})
+
+        assert first["success"] is True
+        assert second["success"] is True
+        assert "Page 3 text" in second["data"]["content"]
@@ -26,7 +26,7 @@ class TestSkillInvoker:
         """Create a SkillInvoker instance with API key."""
         with patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test-key"}):
             with patch(
-                "cognizes.agents.claude.skills.anthropic.Anthropic",
+                "cognizes.agents.claude.skills.get_anthropic_client",
                 return_value=mock_anthropic_client,
             ):
                 return SkillInvoker()
@@ -42,10 +42,10 @@ class TestSkillInvoker:
             },
         ):
             with patch(
-                "cognizes.agents.claude.skills.anthropic.Anthropic",
+                "cognizes.agents.claude.skills.get_anthropic_client",
                 return_value=mock_anthropic_client,
-            ) as mock_anthropic_class:
-                return SkillInvoker(), mock_anthropic_class
+            ) as mock_get_client:
+                return SkillInvoker(), mock_get_client
 
     @pytest.fixture
     def skill_invoker_no_api_key(self):
@@ -74,10 +74,10 @@ class TestSkillInvoker:
 
     def test_init_with_api_key_and_base_url(self, skill_invoker_with_api_key_and_base_url):
         """Test SkillInvoker initialization with API key and base URL."""
-        invoker, mock_anthropic_class = skill_invoker_with_api_key_and_base_url
+        invoker, mock_get_client = skill_invoker_with_api_key_and_base_url
         assert invoker.anthropic_client is not None
-        # Verify that Anthropic was called with both api_key and base_url
-        mock_anthropic_class.assert_called_once_with(api_key="test-key", base_url="https://test.api.example.com")
+        # Verify that the shared client was requested with both api_key and base_url
+        mock_get_client.assert_called_once_with("test-key", "https://test.api.example.com")
         assert len(invoker.skill_registry) == 7
 
     async def test_call_skill_success(self, skill_invoker_with_api_key):
@@ -501,3 +501,38 @@ class TestSkillInvoker:
 
         assert result["success"] is False
         assert "API error" in result["error"]
+
+    @pytest.mark.asyncio
+    async def test_stream_skill_yields_text_deltas(self, skill_invoker_with_api_key):
+        """Test zh-translator streaming yields deltas from the Claude message stream."""
+        invoker = skill_invoker_with_api_key
+
+        async def text_stream():
+            for text in ("中文", "翻译", "结果"):
+                yield text
+
+        stream = MagicMock()
+        stream.text_stream = text_stream()
+        invoker.anthropic_client.messages.stream = MagicMock()
+        invoker.anthropic_client.messages.stream.return_value.__aenter__ = AsyncMock(return_value=stream)
+        invoker.anthropic_client.messages.stream.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        chunks = [text async for text in invoker.stream_skill("zh-translator", {"content": "English text"})]
+
+        assert chunks == ["中文", "翻译", "结果"]
+        assert invoker.anthropic_client.messages.stream.call_args.kwargs["max_tokens"] == 4000
+
+    @pytest.mark.asyncio
+    async def test_stream_skill_heartfelt_without_api_key(self, skill_invoker_no_api_key):
+        """Test heartfelt streaming falls back to the offline analysis as one chunk."""
+        chunks = [text async for text in skill_invoker_no_api_key.stream_skill("heartfelt", {"content": "Doc"})]
+
+        assert len(chunks) == 1
+        assert "Document Analysis" in chunks[0]
+
+    @pytest.mark.asyncio
+    async def test_stream_skill_unsupported(self, skill_invoker_no_api_key):
+        """Test streaming a non-LLM skill raises ValueError."""
+        with pytest.raises(ValueError, match="Streaming not supported"):
+            async for _ in skill_invoker_no_api_key.stream_skill("markdown-formatter", {"content": "# Title"}):
+                pass
@@ -1,5 +1,6 @@
 """Unit tests for TranslationAgent."""
 
+import asyncio
 from pathlib import Path
 from unittest.mock import AsyncMock
 
@@ -247,6 +248,7 @@ class TestTranslationAgent:
         assert result["success"] is True
         assert "第一批翻译" in result["data"]["content"]
         assert "Second batch" in result["data"]["content"]  # Original content as fallback
+        assert result["data"]["failed_batches"] == [1]
 
     @pytest.mark.asyncio
     async def test_save_translation_success(self, translation_agent, tmp_path):
@@ -467,3 +469,73 @@ class TestTranslationAgent:
         assert call_params["preserve_format"] is True  # Default
         assert call_params["preserve_code"] is True  # Default
         assert call_params["preserve_formulas"] is True  # Default
+
+    @pytest.mark.asyncio
+    async def test_translate_stream_writes_batches_in_order(self, tmp_path):
+        """Test streaming translation forwards deltas and appends batches to disk in source order."""
+        agent = TranslationAgent({"papers_dir": str(tmp_path)})
+        agent.default_options["batch_size"] = 10
+        release_first = asyncio.Event()
+
+        async def fake_stream(skill_name, params):
+            if params["content"] == "aaaa":
+                await release_first.wait()
+            for char in params["content"]:
+                yield char.upper()
+
+        events = []
+
+        async def on_progress(event):
+            events.append(event)
+            if event["type"] == "batch_completed" and event["batch"] == 1:
+                # The second batch finished first: nothing may be on disk until batch 0 is done
+                assert output_file.read_text(encoding="utf-8") == ""
+                release_first.set()
+
+        output_file = tmp_path / "translation" / "cs" / "cs_paper.md"
+        agent.stream_skill = fake_stream
+        result = await agent.translate(
+            {"content": "aaaa\n\nbbbbbbbb", "paper_id": "cs_paper", "on_progress": on_progress}
+        )
+
+        assert result["success"] is True
+        assert result["data"]["content"] == "AAAABBBBBBBB"
+        assert result["data"]["batch_count"] == 2
+        assert output_file.read_text(encoding="utf-8") == "AAAABBBBBBBB"
+        deltas = "".join(e["text"] for e in events if e["type"] == "delta" and e["batch"] == 0)
+        assert deltas == "AAAA"
+        assert [e["completed"] for e in events if e["type"] == "batch_completed"] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_translate_stream_falls_back_to_source_on_error(self, tmp_path):
+        """Test a failed streaming batch keeps the source text and is reported."""
+        agent = TranslationAgent({"papers_dir": str(tmp_path)})
+        agent.default_options["batch_size"] = 5
+
+        async def flaky_stream(skill_name, params):
+            if params["content"] == "bbbb":
+                raise RuntimeError("API error")
+            yield params["content"].upper()
+
+        agent.stream_skill = flaky_stream
+        result = await agent.translate({"content": "aaaa\n\nbbbb", "on_progress": AsyncMock()})
+
+        assert result["success"] is True
+        assert result["data"]["content"] == "AAAAbbbb"
+        assert result["data"]["failed_batches"] == [1]
+
+    @pytest.mark.asyncio
+    async def test_translate_stream_fails_when_every_batch_fails(self, tmp_path):
+        """Test streaming translation fails, like a single translation, when no batch was translated."""
+        agent = TranslationAgent({"papers_dir": str(tmp_path)})
+
+        async def failing_stream(skill_name, params):
+            raise RuntimeError("API error")
+            yield  # pragma: no cover
+
+        agent.stream_skill = failing_stream
+        result = await agent.translate({"content": "source", "paper_id": "cs_paper", "on_progress": AsyncMock()})
+
+        assert result["success"] is False
+        assert "API error" in result["error"]
+        assert not (tmp_path / "translation" / "cs" / "cs_paper.md").exists()
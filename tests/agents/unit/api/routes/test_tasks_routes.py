@@ -88,6 +88,7 @@ class TestTasksRoutes:
             workflow="extract_only",
             limit=10,
             offset=5,
+            cursor=None,
             service=mock_task_service,
         )
 
@@ -98,6 +99,7 @@ class TestTasksRoutes:
             workflow="extract_only",
             limit=10,
             offset=5,
+            cursor=None,
         )
 
     @pytest.mark.asyncio
@@ -249,6 +251,49 @@ class TestTasksRoutes:
             await get_task_logs("nonexistent_task", 100, mock_task_service)
             assert exc.value.status_code == 404
 
+    def test_follow_task_logs_streams_sse(self, mock_task_service):
+        """Test follow mode streams log lines as server-sent events."""
+        from fastapi import FastAPI
+
+        from cognizes.api.services.task_logs import LogChunk
+
+        follow_calls = []
+
+        async def follow_task_logs(task_id, lines, offset):
+            follow_calls.append((task_id, lines, offset))
+            yield LogChunk(lines=["first", "second"], offsets=[6, 13], end_offset=13)
+            yield LogChunk(lines=[], offsets=[], end_offset=13)
+
+        mock_task_service.follow_task_logs = follow_task_logs
+        app = FastAPI()
+        app.include_router(router, prefix="/tasks")
+        app.dependency_overrides[get_task_service] = lambda: mock_task_service
+
+        with TestClient(app) as client:
+            response = client.get(
+                "/tasks/task123/logs", params={"follow": "true", "lines": 2}, headers={"Last-Event-ID": "4"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == ("id: 6\ndata: first\n\nid: 13\ndata: second\n\n: heartbeat\n\nevent: end\ndata: \n\n")
+        assert follow_calls == [("task123", 2, 4)]
+        mock_task_service.get_task_logs.assert_not_called()
+
+    def test_follow_task_logs_not_found(self, mock_task_service):
+        """Test follow mode returns 404 before streaming for unknown tasks."""
+        from fastapi import FastAPI
+
+        mock_task_service.get_task.side_effect = ValueError("Task not found")
+        app = FastAPI()
+        app.include_router(router, prefix="/tasks")
+        app.dependency_overrides[get_task_service] = lambda: mock_task_service
+
+        with TestClient(app) as client:
+            response = client.get("/tasks/missing/logs", params={"follow": "true"})
+
+        assert response.status_code == 404
+
     @pytest.mark.asyncio
     async def test_cleanup_completed_tasks_success(self, mock_task_service):
         """Test successful cleanup of completed tasks."""
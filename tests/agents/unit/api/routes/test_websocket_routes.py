@@ -1,5 +1,6 @@
 """Unit tests for websocket routes."""
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -10,6 +11,7 @@ from cognizes.api.routes.websocket import (
     WebSocketService,
     get_websocket_service,
     router,
+    send_task_stream,
 )
 
 
@@ -551,3 +553,240 @@ class TestWebSocketRoutes:
         assert "client3" not in manager.client_subscriptions
         assert "client1" in manager.client_subscriptions
         assert "client2" in manager.client_subscriptions
+
+
+@pytest.mark.unit
+class TestConnectionManagerFanOut:
+    """Test cases for the subscription index and concurrent fan-out."""
+
+    @staticmethod
+    async def _connect(manager, client_id, send_json=None):
+        websocket = AsyncMock()
+        if send_json is not None:
+            websocket.send_json = send_json
+        await manager.connect(websocket, client_id)
+        return websocket
+
+    async def test_subscription_index(self):
+        """Test the task -> subscribers index follows subscribe/unsubscribe/disconnect."""
+        manager = ConnectionManager()
+        await self._connect(manager, "a")
+        await self._connect(manager, "b")
+        await manager.subscribe("a", "task1")
+        await manager.subscribe("b", "task1")
+        await manager.subscribe("a", "task2")
+
+        assert manager.task_subscribers == {"task1": {"a", "b"}, "task2": {"a"}}
+
+        await manager.unsubscribe("a", "task1")
+        assert manager.get_subscriber_count("task1") == 1
+
+        await manager.disconnect("a")
+        assert manager.task_subscribers == {"task1": {"b"}}
+
+    async def test_broadcast_only_reaches_subscribers(self):
+        """Test broadcast sends only to clients subscribed to the task."""
+        manager = ConnectionManager()
+        subscriber = await self._connect(manager, "a")
+        other = await self._connect(manager, "b")
+        await manager.subscribe("a", "task1")
+
+        await manager.broadcast_to_subscribers({"type": "task_update", "task_id": "task1"}, "task1")
+
+        subscriber.send_json.assert_called_once()
+        other.send_json.assert_not_called()
+
+    async def test_slow_client_does_not_block_others(self):
+        """Test a stalled client times out and is disconnected while others receive the message."""
+        manager = ConnectionManager(send_timeout=0.05)
+
+        async def stall(message):
+            await asyncio.sleep(10)
+
+        await self._connect(manager, "slow", send_json=stall)
+        fast = await self._connect(manager, "fast")
+        for client_id in ("slow", "fast"):
+            await manager.subscribe(client_id, "task1")
+
+        await asyncio.wait_for(manager.broadcast_to_subscribers({"type": "task_update"}, "task1"), timeout=1)
+
+        fast.send_json.assert_called_once()
+        assert "slow" not in manager.active_connections
+        assert manager.task_subscribers == {"task1": {"fast"}}
+        assert manager.get_metrics()["timed_out"] == 1
+
+    async def test_progress_updates_coalesced_per_client(self):
+        """Test queued task updates for a busy client collapse to the latest one."""
+        manager = ConnectionManager()
+        release = asyncio.Event()
+        received = []
+
+        async def send_json(message):
+            received.append(message)
+            if len(received) == 1:
+                await release.wait()
+
+        await self._connect(manager, "a", send_json=send_json)
+        await manager.subscribe("a", "task1")
+
+        first = asyncio.create_task(manager.broadcast_to_subscribers({"type": "task_update", "progress": 0}, "task1"))
+        await asyncio.sleep(0)
+        for progress in (10, 20, 30):
+            await manager.broadcast_to_subscribers({"type": "task_update", "progress": progress}, "task1")
+        await manager.send_personal_message({"type": "error"}, "a")
+
+        assert manager.get_metrics()["lagging_clients"] == {"a": 2}
+        release.set()
+        await first
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert [m.get("progress") for m in received] == [0, 30, None]
+        metrics = manager.get_metrics()
+        assert metrics["coalesced"] == 2
+        assert metrics["sent"] == 3
+        assert metrics["lagging_clients"] == {}
+
+    async def test_stream_messages_not_coalesced(self):
+        """Test queued stream deltas for a busy client are all delivered in order."""
+        manager = ConnectionManager()
+        release = asyncio.Event()
+        received = []
+
+        async def send_json(message):
+            received.append(message)
+            if len(received) == 1:
+                await release.wait()
+
+        await self._connect(manager, "a", send_json=send_json)
+        await manager.subscribe("a", "task1")
+
+        with patch("cognizes.api.routes.websocket.manager", manager):
+            first = asyncio.create_task(send_task_stream("task1", 0, 0, "a"))
+            await asyncio.sleep(0)
+            await send_task_stream("task1", 0, 1, "b")
+            await send_task_stream("task1", 0, 2, "c")
+            release.set()
+            await first
+            for _ in range(5):
+                await asyncio.sleep(0)
+
+        assert [(m["type"], m["offset"], m["text"]) for m in received] == [
+            ("task_stream", 0, "a"),
+            ("task_stream", 1, "b"),
+            ("task_stream", 2, "c"),
+        ]
+        assert manager.get_metrics()["coalesced"] == 0
+
+    async def test_pending_queue_bounded(self):
+        """Test the oldest queued message is dropped when the per-client queue is full."""
+        manager = ConnectionManager(max_pending=2)
+        release = asyncio.Event()
+        received = []
+
+        async def send_json(message):
+            received.append(message)
+            if len(received) == 1:
+                await release.wait()
+
+        await self._connect(manager, "a", send_json=send_json)
+        first = asyncio.create_task(manager.send_personal_message({"n": 0}, "a"))
+        await asyncio.sleep(0)
+        for n in (1, 2, 3):
+            await manager.send_personal_message({"n": n}, "a")
+
+        release.set()
+        await first
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert [m["n"] for m in received] == [0, 2, 3]
+        assert manager.get_metrics()["dropped"] == 1
+
+    async def test_coalesced_update_keeps_order(self):
+        """Test a coalesced task update moves behind messages queued after the one it replaces."""
+        manager = ConnectionManager()
+        release = asyncio.Event()
+        received = []
+
+        async def send_json(message):
+            received.append(message)
+            if len(received) == 1:
+                await release.wait()
+
+        await self._connect(manager, "a", send_json=send_json)
+        await manager.subscribe("a", "task1")
+
+        first = asyncio.create_task(manager.broadcast_to_subscribers({"type": "task_stream", "text": "a"}, "task1"))
+        await asyncio.sleep(0)
+        await manager.broadcast_to_subscribers({"type": "task_update", "progress": 50}, "task1")
+        await manager.broadcast_to_subscribers({"type": "task_completed"}, "task1")
+        await manager.broadcast_to_subscribers({"type": "task_update", "status": "completed"}, "task1")
+
+        release.set()
+        await first
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert [m["type"] for m in received] == ["task_stream", "task_completed", "task_update"]
+        assert received[-1]["status"] == "completed"
+
+    async def test_overflow_keeps_task_completed(self):
+        """Test a full queue drops the oldest droppable message, never a completion notice."""
+        manager = ConnectionManager(max_pending=2)
+        release = asyncio.Event()
+        received = []
+
+        async def send_json(message):
+            received.append(message)
+            if len(received) == 1:
+                await release.wait()
+
+        await self._connect(manager, "a", send_json=send_json)
+        first = asyncio.create_task(manager.send_personal_message({"type": "task_stream", "n": 0}, "a"))
+        await asyncio.sleep(0)
+        await manager.send_personal_message({"type": "task_completed", "n": 1}, "a")
+        for n in (2, 3):
+            await manager.send_personal_message({"type": "task_stream", "n": n}, "a")
+
+        release.set()
+        await first
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert [m["n"] for m in received] == [0, 1, 3]
+        assert manager.get_metrics()["dropped"] == 1
+
+    async def test_broadcast_during_disconnect(self):
+        """Test messages sent while a client is closing neither revive it nor break the disconnect."""
+        manager = ConnectionManager()
+        closing = asyncio.Event()
+        release = asyncio.Event()
+
+        async def close():
+            closing.set()
+            await release.wait()
+
+        websocket = await self._connect(manager, "a")
+        websocket.close = close
+        await manager.subscribe("a", "task1")
+
+        disconnect = asyncio.create_task(manager.disconnect("a"))
+        await closing.wait()
+        await manager.broadcast_to_all({"type": "notice"})
+        await manager.broadcast_to_subscribers({"type": "task_update"}, "task1")
+        await manager.send_personal_message({"type": "error"}, "a")
+        release.set()
+        await disconnect
+
+        websocket.send_json.assert_not_called()
+        assert manager.get_connection_count() == 0
+        assert manager.get_metrics()["lagging_clients"] == {}
+        assert manager._channels == {}
+
+    async def test_stats_endpoint(self):
+        """Test the stats route returns manager metrics."""
+        from cognizes.api.routes.websocket import websocket_stats
+
+        stats = await websocket_stats()
+        assert {"connections", "sent", "dropped", "coalesced", "timed_out"} <= stats.keys()
@@ -0,0 +1,89 @@
+"""Unit tests for non-blocking file I/O helpers."""
+
+import hashlib
+import io
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from cognizes.api.services.file_io import (
+    UploadTooLargeError,
+    read_json,
+    read_text,
+    run_io,
+    save_upload,
+    write_json,
+    write_text,
+)
+
+
+class CountingReader(io.BytesIO):
+    """BytesIO that records the size of every read."""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.reads: list[int] = []
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+@pytest.mark.unit
+class TestFileIO:
+    """Test cases for file_io helpers."""
+
+    @pytest.mark.asyncio
+    async def test_run_io_uses_worker_thread(self):
+        """Test blocking calls run off the event loop thread."""
+        loop_thread = threading.get_ident()
+
+        worker_thread = await run_io(threading.get_ident)
+
+        assert worker_thread != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_text_and_json_round_trip(self, temp_dir):
+        """Test text and JSON helpers round-trip content."""
+        await write_text(temp_dir / "a.md", "# 标题")
+        await write_json(temp_dir / "a.json", {"name": "论文", "n": 1})
+
+        assert await read_text(temp_dir / "a.md") == "# 标题"
+        assert await read_json(temp_dir / "a.json") == {"name": "论文", "n": 1}
+
+    @pytest.mark.asyncio
+    async def test_write_json_replaces_atomically(self, temp_dir):
+        """Test a failed JSON write keeps the old file and leaves no temporary file."""
+        path = temp_dir / "a.json"
+        await write_json(path, {"n": 1})
+
+        with pytest.raises(TypeError):
+            await write_json(path, {"n": object()})
+        with patch("cognizes.api.services.file_io.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                await write_json(path, {"n": 2})
+
+        assert await read_json(path) == {"n": 1}
+        assert [p.name for p in temp_dir.iterdir()] == ["a.json"]
+
+    @pytest.mark.asyncio
+    async def test_save_upload_streams_in_chunks(self, temp_dir):
+        """Test uploads are copied chunk by chunk with an incremental hash."""
+        data = b"%PDF" + bytes(range(256)) * 100
+        src = CountingReader(data)
+
+        result = await save_upload(src, temp_dir / "paper.pdf", chunk_size=4096)
+
+        assert result.size == len(data)
+        assert result.sha256 == hashlib.sha256(data).hexdigest()
+        assert (temp_dir / "paper.pdf").read_bytes() == data
+        assert max(src.reads) <= 4096
+        assert len(src.reads) == len(data) // 4096 + 2
+
+    @pytest.mark.asyncio
+    async def test_save_upload_enforces_max_size(self, temp_dir):
+        """Test oversized uploads are rejected while streaming."""
+        with pytest.raises(UploadTooLargeError):
+            await save_upload(io.BytesIO(b"x" * 10_000), temp_dir / "big.pdf", chunk_size=1024, max_size=5_000)
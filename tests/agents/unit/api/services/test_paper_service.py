@@ -1,5 +1,7 @@
 """Unit tests for PaperService."""
 
+import asyncio
+import hashlib
 import io
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -9,6 +11,7 @@ from fastapi import UploadFile
 
 from cognizes.api.services.paper_service import PaperService
 from cognizes.agents.claude.base import BaseAgent
+from cognizes.agents.utils import get_output_dir
 from tests.agents.fixtures.mocks.mock_file_operations import (
     mock_file_manager,
     patch_file_operations,
@@ -64,6 +67,7 @@ class TestPaperService:
                     assert result["filename"] == "test_paper.pdf"
                     assert result["category"] == "llm-agents"
                     assert result["size"] == len(mock_upload_file.file.getvalue())
+                    assert result["sha256"] == hashlib.sha256(mock_upload_file.file.getvalue()).hexdigest()
 
     @pytest.mark.asyncio
     async def test_upload_paper_invalid_filename(self, paper_service):
@@ -299,7 +303,7 @@ class TestPaperService:
                 },
             ]
 
-            def mock_list_internal(category=None, status=None, limit=20, offset=0):
+            def mock_list_internal(category=None, status=None, limit=20, offset=0, cursor=None):
                 filtered_papers = papers_list
                 if category:
                     filtered_papers = [p for p in filtered_papers if p["category"] == category]
@@ -890,3 +894,420 @@ class TestPaperService:
             # Should complete quickly due to concurrency
             assert (end_time - start_time) < 0.05  # Much less than 3 * 0.01
             assert result["total_success"] == 3
+
+
+@pytest.mark.unit
+class TestPaperCatalog:
+    """Test cases for the indexed paper catalog."""
+
+    @pytest.fixture
+    def paper_service(self, temp_dir):
+        """Create a PaperService backed by a real temporary papers directory."""
+        with patch("cognizes.api.services.paper_service.settings") as mock_settings:
+            mock_settings.PAPERS_DIR = str(temp_dir / "papers")
+            service = PaperService()
+            service.workflow_agent = AsyncMock()
+            yield service
+            service.catalog.close()
+
+    @staticmethod
+    def write_paper(papers_dir: Path, paper_id: str, category: str, status: str, upload_time: str) -> dict:
+        """Create a source PDF and its metadata file on disk."""
+        import json
+
+        source = papers_dir / "source" / category / paper_id
+        source.parent.mkdir(parents=True, exist_ok=True)
+        source.write_bytes(b"%PDF-1.4")
+        metadata = {
+            "paper_id": paper_id,
+            "filename": paper_id,
+            "category": category,
+            "status": status,
+            "upload_time": upload_time,
+        }
+        metadata_dir = papers_dir / ".metadata"
+        metadata_dir.mkdir(parents=True, exist_ok=True)
+        (metadata_dir / f"{paper_id}.json").write_text(json.dumps(metadata))
+        return metadata
+
+    @pytest.mark.asyncio
+    async def test_bootstrap_from_existing_tree(self, paper_service):
+        """Test the catalog is built from existing metadata on first use."""
+        papers_dir = paper_service.papers_dir
+        self.write_paper(papers_dir, "ml_1_a.pdf", "ml", "uploaded", "2024-01-01T00:00:00")
+        self.write_paper(papers_dir, "rl_2_b.pdf", "rl", "completed", "2024-01-02T00:00:00")
+        # Metadata without a source PDF is not listed
+        (papers_dir / ".metadata" / "orphan.json").write_text('{"paper_id": "orphan", "category": "ml"}')
+
+        result = await paper_service.list_papers()
+
+        assert result["total"] == 2
+        assert [p["paper_id"] for p in result["papers"]] == ["rl_2_b.pdf", "ml_1_a.pdf"]
+        assert result["papers"][0]["size"] == len(b"%PDF-1.4")
+
+    @pytest.mark.asyncio
+    async def test_catalog_follows_metadata_changes(self, paper_service):
+        """Test save/update/delete keep the catalog in sync."""
+        await paper_service.list_papers()
+        metadata = self.write_paper(paper_service.papers_dir, "ml_1_a.pdf", "ml", "uploaded", "2024-01-01T00:00:00")
+        await paper_service._save_metadata("ml_1_a.pdf", metadata)
+
+        await paper_service._update_status("ml_1_a.pdf", "completed", "translate")
+        completed = await paper_service.list_papers(status="completed")
+        assert [p["paper_id"] for p in completed["papers"]] == ["ml_1_a.pdf"]
+        assert completed["papers"][0]["updated_at"] is not None
+
+        await paper_service.delete_paper("ml_1_a.pdf")
+        assert (await paper_service.list_papers())["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_metadata_updates_not_lost(self, paper_service):
+        """Test concurrent read-modify-write updates of one paper all persist."""
+        metadata = self.write_paper(paper_service.papers_dir, "ml_1_a.pdf", "ml", "uploaded", "2024-01-01T00:00:00")
+        await paper_service._save_metadata("ml_1_a.pdf", metadata)
+
+        await asyncio.gather(*(paper_service._update_metadata("ml_1_a.pdf", {f"key_{i}": i}) for i in range(10)))
+
+        saved = await paper_service._get_metadata("ml_1_a.pdf")
+        assert all(saved[f"key_{i}"] == i for i in range(10))
+
+    @pytest.mark.asyncio
+    async def test_concurrent_workflow_statuses_not_lost(self, paper_service):
+        """Test status updates of different workflows of one paper are merged."""
+        metadata = self.write_paper(paper_service.papers_dir, "ml_1_a.pdf", "ml", "uploaded", "2024-01-01T00:00:00")
+        await paper_service._save_metadata("ml_1_a.pdf", metadata)
+
+        await asyncio.gather(
+            paper_service._update_status("ml_1_a.pdf", "completed", "translate"),
+            paper_service._update_status("ml_1_a.pdf", "failed", "heartfelt", "boom"),
+        )
+
+        workflows = (await paper_service._get_metadata("ml_1_a.pdf"))["workflows"]
+        assert workflows["translate"]["status"] == "completed"
+        assert workflows["heartfelt"] == {
+            "status": "failed",
+            "updated_at": workflows["heartfelt"]["updated_at"],
+            "error": "boom",
+        }
+
+    @pytest.mark.asyncio
+    async def test_filter_and_keyset_pagination(self, paper_service):
+        """Test filtering and walking pages with next_cursor."""
+        for i in range(5):
+            metadata = self.write_paper(
+                paper_service.papers_dir, f"ml_{i}_p.pdf", "ml", "uploaded", f"2024-01-0{i + 1}T00:00:00"
+            )
+            await paper_service._save_metadata(metadata["paper_id"], metadata)
+        metadata = self.write_paper(paper_service.papers_dir, "rl_9_p.pdf", "rl", "uploaded", "2024-02-01T00:00:00")
+        await paper_service._save_metadata(metadata["paper_id"], metadata)
+
+        seen = []
+        cursor = None
+        while True:
+            page = await paper_service.list_papers(category="ml", limit=2, cursor=cursor)
+            assert page["total"] == 5
+            seen.extend(p["paper_id"] for p in page["papers"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == [f"ml_{i}_p.pdf" for i in reversed(range(5))]
+        offset_page = await paper_service.list_papers(category="ml", limit=2, offset=2)
+        assert [p["paper_id"] for p in offset_page["papers"]] == seen[2:4]
+
+    @pytest.mark.asyncio
+    async def test_scan_fallback_honours_cursor(self, paper_service):
+        """Test pagination continues from a catalog cursor when the catalog becomes unavailable."""
+        import sqlite3
+
+        for i in range(5):
+            metadata = self.write_paper(
+                paper_service.papers_dir, f"ml_{i}_p.pdf", "ml", "uploaded", f"2024-01-0{i + 1}T00:00:00"
+            )
+            await paper_service._save_metadata(metadata["paper_id"], metadata)
+        first = await paper_service.list_papers(limit=2)
+
+        seen = [p["paper_id"] for p in first["papers"]]
+        cursor = first["next_cursor"]
+        with patch.object(paper_service.catalog, "list_papers", side_effect=sqlite3.OperationalError("locked")):
+            while cursor is not None:
+                page = await paper_service.list_papers(limit=2, cursor=cursor)
+                assert page["total"] == 5
+                seen.extend(p["paper_id"] for p in page["papers"])
+                cursor = page["next_cursor"]
+
+        assert seen == [f"ml_{i}_p.pdf" for i in reversed(range(5))]
+
+    @pytest.mark.asyncio
+    async def test_filesystem_calls_run_off_the_event_loop(self, paper_service):
+        """Test existence checks, stat calls and directory walks run in the file I/O pool."""
+        import sqlite3
+        import threading
+
+        metadata = self.write_paper(paper_service.papers_dir, "ml_1_a.pdf", "ml", "uploaded", "2024-01-01T00:00:00")
+        await paper_service._save_metadata("ml_1_a.pdf", metadata)
+        loop_thread = threading.get_ident()
+        on_loop = []
+
+        def recording(name):
+            original = getattr(Path, name)
+
+            def call(self, *args, **kwargs):
+                if threading.get_ident() == loop_thread:
+                    on_loop.append((name, self))
+                return original(self, *args, **kwargs)
+
+            return call
+
+        names = ("exists", "is_file", "is_dir", "stat", "iterdir", "mkdir")
+        with patch.multiple(Path, **{name: recording(name) for name in names}):
+            await paper_service._sync_catalog("ml_1_a.pdf", {**metadata, "size": None})
+            await paper_service.get_paper_info("ml_1_a.pdf")
+            await paper_service.get_content("ml_1_a.pdf", "source")
+            await paper_service.process_paper("ml_1_a.pdf", "full")
+            with patch.object(paper_service.catalog, "list_papers", side_effect=sqlite3.OperationalError("locked")):
+                await paper_service.list_papers()
+
+        assert on_loop == []
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, paper_service):
+        """Test a malformed cursor raises ValueError."""
+        with pytest.raises(ValueError):
+            await paper_service.list_papers(cursor="not-a-cursor")
+
+    def test_rebuild_command(self, temp_dir, capsys):
+        """Test the one-shot rebuild command."""
+        from cognizes.api.services.paper_catalog import main
+
+        papers_dir = temp_dir / "papers"
+        self.write_paper(papers_dir, "ml_1_a.pdf", "ml", "uploaded", "2024-01-01T00:00:00")
+
+        with patch("sys.argv", ["paper_catalog", "--papers-dir", str(papers_dir)]):
+            main()
+
+        assert "Indexed 1 papers" in capsys.readouterr().out
+        assert (papers_dir / ".metadata" / "catalog.sqlite3").exists()
+
+
+@pytest.mark.unit
+class TestContentDedup:
+    """Test cases for content-hash deduplication of uploads and workflow outputs."""
+
+    @pytest.fixture
+    def paper_service(self, temp_dir):
+        """Create a PaperService backed by a real temporary papers directory."""
+        with patch("cognizes.api.services.paper_service.settings") as mock_settings:
+            mock_settings.PAPERS_DIR = str(temp_dir / "papers")
+            service = PaperService()
+            service.workflow_agent = AsyncMock()
+            service.heartfelt_agent = AsyncMock()
+            yield service
+            service.catalog.close()
+
+    @staticmethod
+    async def upload(service: PaperService, filename: str, content: bytes, category: str = "ml") -> dict:
+        """Upload an in-memory PDF."""
+        file = MagicMock(spec=UploadFile)
+        file.filename = filename
+        file.file = io.BytesIO(content)
+        return await service.upload_paper(file, category)
+
+    @pytest.mark.asyncio
+    async def test_upload_detects_duplicate(self, paper_service):
+        """Test identical content is linked to the earliest upload."""
+        first = await self.upload(paper_service, "a.pdf", b"%PDF-1.4 same")
+        second = await self.upload(paper_service, "b.pdf", b"%PDF-1.4 same")
+        other = await self.upload(paper_service, "c.pdf", b"%PDF-1.4 other")
+
+        assert first["duplicate_of"] is None
+        assert second["duplicate_of"] == first["paper_id"]
+        assert other["duplicate_of"] is None
+        metadata = await paper_service._get_metadata(second["paper_id"])
+        assert metadata["duplicate_of"] == first["paper_id"]
+
+    @pytest.mark.asyncio
+    async def test_process_reuses_completed_outputs(self, paper_service):
+        """Test a duplicate upload copies finished outputs instead of re-running the workflow."""
+        first = await self.upload(paper_service, "a.pdf", b"%PDF-1.4 same")
+        translation_dir = paper_service.papers_dir / "translation" / "ml"
+        translation_dir.mkdir(parents=True)
+        (translation_dir / f"{first['paper_id']}.md").write_text("# 译文", encoding="utf-8")
+        await paper_service._update_status(first["paper_id"], "completed", "full")
+
+        second = await self.upload(paper_service, "b.pdf", b"%PDF-1.4 same")
+        result = await paper_service.process_paper(second["paper_id"], "full")
+
+        paper_service.workflow_agent.process.assert_not_called()
+        assert result["status"] == "completed"
+        assert result["result"]["reused_from"] == first["paper_id"]
+        content = await paper_service.get_content(second["paper_id"], "translation")
+        assert content["content"] == "# 译文"
+        status = await paper_service.get_paper_status(second["paper_id"])
+        assert status["workflows"]["full"]["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_analyze_reuses_heartfelt_outputs(self, paper_service):
+        """Test heartfelt outputs are copied and the structured result is re-keyed."""
+        import json
+
+        first = await self.upload(paper_service, "a.pdf", b"%PDF-1.4 same")
+        heartfelt_dir = paper_service.papers_dir / "heartfelt" / "ml"
+        heartfelt_dir.mkdir(parents=True)
+        (heartfelt_dir / f"{first['paper_id']}.md").write_text("深度分析", encoding="utf-8")
+        (heartfelt_dir / f"{first['paper_id']}_analysis.json").write_text(
+            json.dumps({"paper_id": first["paper_id"], "summary": "s"})
+        )
+        await paper_service._update_status(first["paper_id"], "completed", "heartfelt")
+
+        second = await self.upload(paper_service, "b.pdf", b"%PDF-1.4 same")
+        await paper_service._update_status(second["paper_id"], "completed")
+        result = await paper_service.analyze_paper(second["paper_id"])
+
+        paper_service.heartfelt_agent.analyze.assert_not_called()
+        assert result["success"] is True
+        assert (await paper_service.get_content(second["paper_id"], "heartfelt"))["content"] == "深度分析"
+        structured = json.loads((heartfelt_dir / f"{second['paper_id']}_analysis.json").read_text())
+        assert structured == {"paper_id": second["paper_id"], "summary": "s"}
+
+    @pytest.mark.asyncio
+    async def test_no_reuse_without_completed_outputs(self, paper_service):
+        """Test the workflow still runs when the duplicate has not finished the workflow."""
+        await self.upload(paper_service, "a.pdf", b"%PDF-1.4 same")
+        second = await self.upload(paper_service, "b.pdf", b"%PDF-1.4 same")
+        paper_service.workflow_agent.process.return_value = {"success": True}
+
+        await paper_service.process_paper(second["paper_id"], "full")
+
+        paper_service.workflow_agent.process.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_no_reuse_of_output_overwritten_by_other_workflow(self, paper_service):
+        """Test a translation file last written by extract_only is not reused for translate."""
+        first = await self.upload(paper_service, "a.pdf", b"%PDF-1.4 same")
+        translation_dir = paper_service.papers_dir / "translation" / "ml"
+        translation_dir.mkdir(parents=True)
+        (translation_dir / f"{first['paper_id']}.md").write_text("# 译文", encoding="utf-8")
+        await paper_service._update_status(first["paper_id"], "completed", "translate")
+        (translation_dir / f"{first['paper_id']}.md").write_text("# Extracted", encoding="utf-8")
+        await paper_service._update_status(first["paper_id"], "processing", "extract_only")
+        await paper_service._update_status(first["paper_id"], "completed", "extract_only")
+
+        second = await self.upload(paper_service, "b.pdf", b"%PDF-1.4 same")
+        paper_service.workflow_agent.process.return_value = {"success": True}
+        await paper_service.process_paper(second["paper_id"], "translate")
+
+        paper_service.workflow_agent.process.assert_called_once()
+        metadata = await paper_service._get_metadata(first["paper_id"])
+        assert metadata["workflows"]["translate"]["status"] == "completed"
+        assert metadata["outputs"] == {"translation": "extract_only"}
+
+    @pytest.mark.asyncio
+    async def test_partial_translation_not_recorded_as_output(self, paper_service):
+        """Test a translation with batches kept in the source language is not reused."""
+        first = await self.upload(paper_service, "a.pdf", b"%PDF-1.4 same")
+        paper_service.workflow_agent.process.return_value = {
+            "success": True,
+            "data": {"content": "译文 source", "failed_batches": [1]},
+        }
+        await paper_service.process_paper(first["paper_id"], "translate_only")
+
+        metadata = await paper_service._get_metadata(first["paper_id"])
+        assert metadata["workflows"]["translate_only"]["status"] == "completed"
+        assert metadata["outputs"] == {"translation": None}
+
+        second = await self.upload(paper_service, "b.pdf", b"%PDF-1.4 same")
+        await paper_service.process_paper(second["paper_id"], "translate_only")
+
+        assert paper_service.workflow_agent.process.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_reuse_uses_agent_output_paths(self, paper_service):
+        """Test outputs are copied between the directories the agents use, not the metadata category."""
+        first = await self.upload(paper_service, "a.pdf", b"%PDF-1.4 same")
+        translation_dir = paper_service.papers_dir / "translation" / "ml"
+        translation_dir.mkdir(parents=True)
+        (translation_dir / f"{first['paper_id']}.md").write_text("# 译文", encoding="utf-8")
+        await paper_service._update_status(first["paper_id"], "completed", "translate")
+        await paper_service.update_paper_metadata(first["paper_id"], {"category": "rl"})
+
+        second = await self.upload(paper_service, "b.pdf", b"%PDF-1.4 same")
+        await paper_service.update_paper_metadata(second["paper_id"], {"category": "rl"})
+        result = await paper_service.process_paper(second["paper_id"], "translate")
+
+        assert result["result"]["reused_from"] == first["paper_id"]
+        assert get_output_dir(paper_service.papers_dir, "translation", second["paper_id"]) == translation_dir
+        assert (translation_dir / f"{second['paper_id']}.md").read_text(encoding="utf-8") == "# 译文"
+        assert not (paper_service.papers_dir / "translation" / "rl").exists()
+
+    def test_rebuild_hashes_legacy_papers(self, temp_dir):
+        """Test papers uploaded before hashing are indexed by their source content."""
+        from cognizes.api.services.paper_catalog import PaperCatalog
+
+        papers_dir = temp_dir / "papers"
+        TestPaperCatalog.write_paper(papers_dir, "ml_1_a.pdf", "ml", "uploaded", "2024-01-01T00:00:00")
+        TestPaperCatalog.write_paper(papers_dir, "ml_2_b.pdf", "ml", "uploaded", "2024-01-02T00:00:00")
+
+        catalog = PaperCatalog(papers_dir)
+        try:
+            sha256 = hashlib.sha256(b"%PDF-1.4").hexdigest()
+            assert catalog.find_by_sha256(sha256) == ["ml_1_a.pdf", "ml_2_b.pdf"]
+            assert catalog.find_by_sha256(sha256, exclude="ml_1_a.pdf") == ["ml_2_b.pdf"]
+        finally:
+            catalog.close()
+
+
+@pytest.mark.unit
+class TestStreamingProgress:
+    """Test cases for forwarding streaming translation progress."""
+
+    @pytest.fixture
+    def paper_service(self, temp_dir):
+        """Create a PaperService with a mocked workflow agent."""
+        with patch("cognizes.api.services.paper_service.settings") as mock_settings:
+            mock_settings.PAPERS_DIR = str(temp_dir / "papers")
+            service = PaperService()
+            service.workflow_agent = AsyncMock()
+            yield service
+            service.catalog.close()
+
+    @pytest.mark.asyncio
+    async def test_stream_option_passes_progress_callback(self, paper_service, temp_dir):
+        """Test stream=True wires a progress callback and uses the caller's task id."""
+        source_path = temp_dir / "paper.pdf"
+        source_path.write_bytes(b"%PDF-1.4")
+        paper_service.workflow_agent.process.return_value = {"success": True}
+
+        with (
+            patch.object(paper_service, "_get_source_path", return_value=source_path),
+            patch.object(paper_service, "_update_status", new_callable=AsyncMock),
+            patch.object(paper_service, "_create_task_record", new_callable=AsyncMock),
+        ):
+            result = await paper_service.process_paper("ml_paper", "translate_only", {"stream": True, "task_id": "t1"})
+
+        params = paper_service.workflow_agent.process.call_args[0][0]
+        assert callable(params["on_progress"])
+        assert result["task_id"] == "t1"
+
+    @pytest.mark.asyncio
+    async def test_progress_forwarded_as_throttled_stream_messages(self, paper_service):
+        """Test deltas are batched into stream messages with per-batch offsets and progress uses task updates."""
+        on_progress = paper_service._stream_progress("t1")
+
+        with (
+            patch("cognizes.api.routes.websocket.send_task_stream", new_callable=AsyncMock) as stream,
+            patch("cognizes.api.routes.websocket.send_task_update", new_callable=AsyncMock) as update,
+        ):
+            await on_progress({"type": "delta", "batch": 0, "text": "你好"})
+            await on_progress({"type": "delta", "batch": 1, "text": "Hi"})
+            await on_progress({"type": "delta", "batch": 0, "text": "世界"})
+            stream.assert_not_called()
+
+            await on_progress({"type": "batch_completed", "batch": 0, "completed": 1, "total": 2})
+            assert [c.args for c in stream.call_args_list] == [("t1", 0, 0, "你好世界"), ("t1", 1, 0, "Hi")]
+            update.assert_called_once_with("t1", "processing", 50.0, "")
+
+            with patch("cognizes.api.services.paper_service.STREAM_UPDATE_INTERVAL", 0):
+                await on_progress({"type": "delta", "batch": 1, "text": "!"})
+            assert stream.call_args.args == ("t1", 1, 2, "!")
+            update.assert_called_once()
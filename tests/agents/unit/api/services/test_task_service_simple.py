@@ -1,10 +1,13 @@
 """Unit tests for TaskService - simplified version."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from cognizes.api.services.task_logs import TaskLogWriter, read_new_lines, tail_lines
 from cognizes.api.services.task_service import TaskService
+from cognizes.api.services.task_store import MemoryTaskStore, PostgresTaskStore, SQLiteTaskStore, TaskStore
 
 
 @pytest.mark.unit
@@ -20,7 +23,7 @@ class TestTaskService:
             mock_logs_dir.mkdir = MagicMock()
             mock_path.return_value = mock_logs_dir
 
-            service = TaskService()
+            service = TaskService(store=MemoryTaskStore())
             return service
 
     @pytest.mark.asyncio
@@ -46,8 +49,7 @@ class TestTaskService:
 
         task_id = await task_service.create_task(paper_id, workflow, params)
 
-        assert task_id in task_service.tasks
-        task = task_service.tasks[task_id]
+        task = await task_service.get_task(task_id)
         assert task["task_id"] == task_id
         assert task["paper_id"] == paper_id
         assert task["workflow"] == workflow
@@ -64,7 +66,7 @@ class TestTaskService:
 
         task_id = await task_service.create_task(paper_id, workflow)
 
-        task = task_service.tasks[task_id]
+        task = await task_service.get_task(task_id)
         assert task["params"] == {}
 
     @pytest.mark.asyncio
@@ -96,7 +98,7 @@ class TestTaskService:
         # Update status and progress
         await task_service.update_task(task_id, status="processing", progress=50)
 
-        task = task_service.tasks[task_id]
+        task = await task_service.get_task(task_id)
         assert task["status"] == "processing"
         assert task["progress"] == 50
 
@@ -110,7 +112,7 @@ class TestTaskService:
         result_data = {"output": "processed_data"}
         await task_service.update_task(task_id, status="completed", result=result_data)
 
-        task = task_service.tasks[task_id]
+        task = await task_service.get_task(task_id)
         assert task["status"] == "completed"
         assert task["result"] == result_data
 
@@ -216,12 +218,11 @@ class TestTaskService:
     async def test_get_task_statistics(self, task_service):
         """Test getting task statistics."""
         # Create tasks
-        await task_service.create_task("paper1", "full")
-        await task_service.create_task("paper2", "full")
-        await task_service.create_task("paper3", "extract_only")
-
-        # Update statuses
-        tasks = list(task_service.tasks.keys())
+        tasks = [
+            await task_service.create_task("paper1", "full"),
+            await task_service.create_task("paper2", "full"),
+            await task_service.create_task("paper3", "extract_only"),
+        ]
         await task_service.update_task(tasks[0], status="completed")
         await task_service.update_task(tasks[1], status="processing")
         await task_service.update_task(tasks[2], status="failed")
@@ -235,3 +236,238 @@ class TestTaskService:
         assert "completed" in stats
         assert "failed" in stats
         assert stats["total"] == 3
+
+
+@pytest.mark.unit
+class TestSQLiteTaskStore:
+    """Test cases for the durable SQLite task store."""
+
+    @pytest.fixture
+    async def make_service(self, temp_dir, monkeypatch):
+        """Create TaskService instances sharing one database file, like separate workers."""
+        monkeypatch.chdir(temp_dir)
+        stores = []
+
+        def make() -> TaskService:
+            store = SQLiteTaskStore(temp_dir / "tasks.sqlite3")
+            stores.append(store)
+            return TaskService(store=store)
+
+        yield make
+        for store in stores:
+            await store.close()
+
+    @pytest.mark.asyncio
+    async def test_tasks_shared_between_instances(self, make_service):
+        """Test tasks survive restarts and are visible to every worker."""
+        first, second = make_service(), make_service()
+        task_id = await first.create_task("paper1", "full", {"option": 1})
+        await first.update_task(task_id, status="processing", progress=40, result={"pages": 3})
+
+        task = await second.get_task(task_id)
+        assert task["status"] == "processing"
+        assert task["progress"] == 40
+        assert task["params"] == {"option": 1}
+        assert task["result"] == {"pages": 3}
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination(self, make_service):
+        """Test walking filtered pages with next_cursor."""
+        service = make_service()
+        created = [await service.create_task("paper1" if i % 2 else "paper2", "full") for i in range(7)]
+
+        seen = []
+        cursor = None
+        while True:
+            page = await service.list_tasks(paper_id="paper1", limit=2, cursor=cursor)
+            assert page["total"] == 3
+            seen.extend(t["task_id"] for t in page["tasks"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert sorted(seen) == sorted(created[1::2])
+        assert len(seen) == 3
+        with pytest.raises(ValueError):
+            await service.list_tasks(cursor="not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_finished_task_is_not_overwritten(self, make_service):
+        """Test status transitions out of a finished state are rejected atomically."""
+        service = make_service()
+        task_id = await service.create_task("paper1", "full")
+        await service.update_task(task_id, status="cancelled")
+
+        await service.update_task(task_id, status="completed", progress=100)
+        result = await service.cancel_task(task_id)
+
+        task = await service.get_task(task_id)
+        assert task["status"] == "cancelled"
+        assert task["progress"] == 0
+        assert result["message"] == "Task is already cancelled"
+
+    @pytest.mark.asyncio
+    async def test_cleanup_and_statistics(self, make_service):
+        """Test old finished tasks are purged and counts come from the store."""
+        service = make_service()
+        old_id = await service.create_task("paper1", "full")
+        active_id = await service.create_task("paper2", "full")
+        await service.update_task(old_id, status="completed")
+        await service.store.update(old_id, {"updated_at": "2000-01-01T00:00:00"})
+
+        stats = await service.get_task_statistics()
+        assert stats["total"] == 2
+        assert stats["completed"] == 1
+        assert stats["pending"] == 1
+        assert stats["success_rate"] == 100
+
+        result = await service.cleanup_completed_tasks(older_than_hours=1)
+        assert result["cleaned"] == 1
+        with pytest.raises(ValueError, match="Task not found"):
+            await service.get_task(old_id)
+        assert (await service.get_task(active_id))["status"] == "pending"
+
+
+@pytest.mark.unit
+class TestPostgresTaskStore:
+    """Test cases for the PostgreSQL task store connection pool."""
+
+    @staticmethod
+    def fake_pool() -> MagicMock:
+        """An asyncpg pool whose connections accept the schema statement."""
+        pool = MagicMock()
+        pool.close = AsyncMock()
+        pool.acquire.return_value.__aenter__.return_value.execute = AsyncMock()
+        return pool
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_calls_create_one_pool(self):
+        """Test concurrent callers share a single pool."""
+        store = PostgresTaskStore("postgresql://localhost/test")
+        pool = self.fake_pool()
+
+        async def create_pool(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return pool
+
+        with patch("asyncpg.create_pool", side_effect=create_pool) as mock_create:
+            pools = await asyncio.gather(*(store._get_pool() for _ in range(5)))
+
+        assert mock_create.call_count == 1
+        assert all(p is pool for p in pools)
+        await store.close()
+        pool.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_schema_closes_pool(self):
+        """Test a pool whose schema setup failed is closed and not kept."""
+        store = PostgresTaskStore("postgresql://localhost/test")
+        pool = self.fake_pool()
+        pool.acquire.return_value.__aenter__.return_value.execute.side_effect = OSError("down")
+
+        with patch("asyncpg.create_pool", AsyncMock(return_value=pool)):
+            with pytest.raises(OSError):
+                await store.initialize()
+
+        pool.close.assert_awaited_once()
+        assert store._pool is None
+
+    def test_lifecycle_methods_are_abstract(self):
+        """Test stores must implement initialize and close."""
+        assert {"initialize", "close"} <= TaskStore.__abstractmethods__
+
+
+@pytest.mark.unit
+class TestTaskLogs:
+    """Test cases for buffered task logs, tail reads and follow mode."""
+
+    @pytest.fixture
+    async def task_service(self, temp_dir, monkeypatch):
+        """Create a TaskService writing logs under a temporary directory."""
+        monkeypatch.chdir(temp_dir)
+        service = TaskService(store=MemoryTaskStore())
+        service.log_writer = TaskLogWriter(service.logs_dir, flush_interval=0.05)
+        yield service
+        await service.log_writer.close()
+
+    def test_tail_lines_reads_backwards_in_blocks(self, temp_dir):
+        """Test tail reads across block boundaries, multi-byte text and a missing final newline."""
+        log_file = temp_dir / "task.log"
+        log_file.write_text("".join(f"第{i}行\n" for i in range(100)) + "last", encoding="utf-8")
+
+        assert tail_lines(log_file, 3, block_size=7) == ["第98行", "第99行", "last"]
+        assert tail_lines(log_file, 1000, block_size=7)[0] == "第0行"
+        assert tail_lines(log_file, 0) == []
+
+    def test_read_new_lines_skips_partial_line(self, temp_dir):
+        """Test incremental reads return only complete lines with their end offsets."""
+        log_file = temp_dir / "task.log"
+        log_file.write_bytes(b"a\nbb\npartial")
+
+        chunk = read_new_lines(log_file, 2)
+
+        assert chunk.lines == ["bb"]
+        assert chunk.offsets == [5]
+        assert chunk.end_offset == 5
+
+    def test_read_new_lines_splits_overlong_line(self, temp_dir):
+        """Test a line longer than max_bytes is returned in pieces instead of stalling."""
+        log_file = temp_dir / "task.log"
+        log_file.write_bytes("ab日志cd\nnext\n".encode())
+
+        pieces = []
+        offset = 0
+        while offset < log_file.stat().st_size:
+            chunk = read_new_lines(log_file, offset, max_bytes=4)
+            assert chunk.end_offset > offset
+            pieces.extend(chunk.lines)
+            offset = chunk.end_offset
+
+        assert pieces == ["ab", "日", "志c", "d", "next"]
+
+    @pytest.mark.asyncio
+    async def test_logs_are_buffered_and_flushed(self, task_service):
+        """Test messages are batched in memory and flushed periodically or on read."""
+        task_id = await task_service.create_task("paper1", "full")
+        await task_service.update_task(task_id, status="processing", progress=10)
+        log_file = task_service.log_writer.log_path(task_id)
+        assert not log_file.exists()
+
+        logs = await task_service.get_task_logs(task_id, lines=1)
+        assert len(logs) == 1
+        assert logs[0].endswith("Status: processing, Progress: 10%")
+
+        await task_service.update_task(task_id, progress=20)
+        await asyncio.sleep(0.2)
+        assert log_file.read_text(encoding="utf-8").count("\n") == 3
+
+    @pytest.mark.asyncio
+    async def test_follow_streams_until_task_finishes(self, task_service):
+        """Test follow mode yields the tail, then new lines, and stops after the task finishes."""
+        task_id = await task_service.create_task("paper1", "full")
+
+        async def run_task():
+            for progress in (30, 60):
+                await asyncio.sleep(0.05)
+                await task_service.update_task(task_id, status="processing", progress=progress)
+            await task_service.update_task(task_id, status="completed", progress=100)
+
+        runner = asyncio.create_task(run_task())
+        received = []
+        offsets = []
+        async for chunk in task_service.follow_task_logs(task_id, lines=10, poll_interval=0.01):
+            received.extend(chunk.lines)
+            offsets.extend(chunk.offsets)
+        await runner
+
+        assert received[0].endswith("Task created")
+        assert received[-1].endswith("Status: completed, Progress: 100%")
+        assert len(received) == 4
+        assert offsets[-1] == task_service.log_writer.log_path(task_id).stat().st_size
+
+        resumed = [
+            line
+            async for chunk in task_service.follow_task_logs(task_id, offset=offsets[1], poll_interval=0.01)
+            for line in chunk.lines
+        ]
+        assert resumed == received[2:]
@@ -13,6 +13,7 @@ from cognizes.agents.utils import (
     generate_paper_id,
     get_category_from_path,
     get_file_hash,
+    get_output_dir,
     get_task_status_color,
     merge_dicts,
     retry_on_failure,
@@ -224,6 +225,23 @@ class TestGetCategoryFromPath:
         assert result == "llm-agents"
 
 
+@pytest.mark.unit
+class TestGetOutputDir:
+    """Test cases for get_output_dir."""
+
+    @pytest.mark.parametrize(
+        "paper_id,expected",
+        [
+            ("ml_20240115_143022_paper.pdf", "papers/translation/ml"),
+            ("llm_agents_20240115_143022_paper.pdf", "papers/translation/llm"),
+            ("paper.pdf", "papers/translation/general"),
+        ],
+    )
+    def test_get_output_dir(self, paper_id, expected):
+        """Test the category is the first segment of the paper ID."""
+        assert get_output_dir("papers", "translation", paper_id) == Path(expected)
+
+
 @pytest.mark.unit
 class TestEnsureDirectory:
     """Test cases for ensure_directory."""
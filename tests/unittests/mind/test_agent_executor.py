@@ -124,3 +124,185 @@ class TestAgentExecutor:
         t, a, i, f = executor._parse_response(r2)
         assert t == "Result"
         assert f is True
+
+
+class TestParallelToolCalls:
+    """单步多工具并发执行测试"""
+
+    MULTI_ACTION = (
+        "Thought: look up everything at once\n"
+        'Action: search_flights\nAction Input: {"city": "Tokyo"}\n'
+        'Action: search_hotels\nAction Input: {"city": "Tokyo"}\n'
+        "Action: get_destination_info\nAction Input: {}"
+    )
+
+    def test_parse_multiple_actions(self):
+        """测试解析多个 Action 及 JSON 参数"""
+        executor = AgentExecutor(None, None)
+
+        actions = executor._parse_actions(self.MULTI_ACTION)
+
+        assert actions == [
+            ("search_flights", {"city": "Tokyo"}),
+            ("search_hotels", {"city": "Tokyo"}),
+            ("get_destination_info", {}),
+        ]
+
+    async def test_tools_run_concurrently_in_order(self, mock_tool_registry):
+        """测试工具并发执行，Observation 按 Action 顺序合并"""
+        delays = {"search_flights": 0.1, "search_hotels": 0.05, "get_destination_info": 0.0}
+        started: set[str] = set()
+        all_running = asyncio.Event()
+
+        async def invoke(name, params, run_id=None):
+            # 屏障：三个工具都已开始后才继续；串行执行时第一个工具在此超时
+            started.add(name)
+            if len(started) == len(delays):
+                all_running.set()
+            await asyncio.wait_for(all_running.wait(), timeout=5.0)
+            await asyncio.sleep(delays[name])
+            return f"{name} ok"
+
+        mock_tool_registry.invoke_tool.side_effect = invoke
+        llm = MockLLM([self.MULTI_ACTION, "Final Answer: done"])
+
+        result = await AgentExecutor(llm, mock_tool_registry).run("Plan trip")
+
+        step = result.steps[0]
+        assert [call.action for call in step.tool_calls] == list(delays)
+        assert step.observation.splitlines() == [
+            "[search_flights] search_flights ok",
+            "[search_hotels] search_hotels ok",
+            "[get_destination_info] get_destination_info ok",
+        ]
+        assert step.action == "search_flights"
+        assert all_running.is_set()
+        # 工具耗时之和大于该步墙钟耗时
+        assert step.tool_time_ms > step.wall_time_ms
+
+    async def test_per_tool_concurrency_limit(self, mock_tool_registry):
+        """测试同名工具受并发上限约束"""
+        running = 0
+        peak = 0
+
+        async def invoke(name, params, run_id=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "ok"
+
+        mock_tool_registry.invoke_tool.side_effect = invoke
+        response = "\n".join(f'Action: lookup\nAction Input: {{"i": {i}}}' for i in range(5))
+        llm = MockLLM([response, "Final Answer: done"])
+
+        result = await AgentExecutor(llm, mock_tool_registry, max_concurrency_per_tool=2).run("x")
+
+        assert peak == 2
+        assert len(result.steps[0].tool_calls) == 5
+
+    async def test_step_deadline(self, mock_tool_registry):
+        """测试超过单步截止时间的工具被取消，其余结果保留"""
+
+        async def invoke(name, params, run_id=None):
+            await asyncio.sleep(1 if name == "slow" else 0)
+            return f"{name} ok"
+
+        mock_tool_registry.invoke_tool.side_effect = invoke
+        llm = MockLLM(["Action: fast\nAction: slow", "Final Answer: done"])
+
+        result = await AgentExecutor(llm, mock_tool_registry, step_timeout_seconds=0.05).run("x")
+
+        fast, slow = result.steps[0].tool_calls
+        assert fast.observation == "fast ok"
+        assert slow.error == "Step deadline exceeded"
+        assert result.status == ExecutionStatus.COMPLETED
+
+    async def test_tool_timeout_is_not_step_deadline(self, mock_tool_registry):
+        """测试工具自身抛出的 TimeoutError 按工具错误上报，而非本步截止时间"""
+
+        async def invoke(name, params, run_id=None):
+            raise TimeoutError("upstream request timed out")
+
+        mock_tool_registry.invoke_tool.side_effect = invoke
+        llm = MockLLM(["Action: fetch", "Final Answer: done"])
+
+        result = await AgentExecutor(llm, mock_tool_registry, step_timeout_seconds=5).run("x")
+
+        call = result.steps[0].tool_calls[0]
+        assert call.error == "upstream request timed out"
+        assert call.observation == "Error: upstream request timed out"
+
+
+class TestStreamingExecution:
+    """流式执行与提前派发测试"""
+
+    class StreamingLLM:
+        """按 token 流式返回预设响应"""
+
+        def __init__(self, responses, token_delay=0.0):
+            self.responses = responses
+            self.token_delay = token_delay
+            self.call_count = 0
+
+        async def stream(self, user_input):
+            resp = self.responses[min(self.call_count, len(self.responses) - 1)]
+            self.call_count += 1
+            for i in range(0, len(resp), 4):
+                await asyncio.sleep(self.token_delay)
+                yield resp[i : i + 4]
+
+    def test_parser_emits_when_json_closes(self):
+        """测试 JSON 参数闭合即完成，无需等待流结束"""
+        from cognizes.engine.mind.agent_executor import StreamingActionParser
+
+        parser = StreamingActionParser()
+
+        assert parser.feed('Action: search\nAction Input: {"q": "to') == []
+        assert parser.feed('kyo"}') == [("search", {"q": "tokyo"})]
+        assert parser.feed("\nAction: hotels") == []
+        assert parser.close() == [("hotels", {})]
+
+    async def test_tool_dispatched_before_stream_ends(self, mock_tool_registry):
+        """测试工具在剩余 token 生成期间已开始执行"""
+        events = []
+
+        async def invoke(name, params, run_id=None):
+            events.append(("tool_start", name))
+            return "ok"
+
+        mock_tool_registry.invoke_tool.side_effect = invoke
+        response = 'Action: search\nAction Input: {"q": "x"}\nThought: waiting for results while I keep talking...'
+        llm = self.StreamingLLM([response, "Final Answer: done"], token_delay=0.001)
+
+        visualizer = Mock()
+        visualizer.emit_thinking_content = AsyncMock(
+            side_effect=lambda run_id, step_id, delta: events.append(("delta", delta))
+        )
+        visualizer.emit_tool_call_start = AsyncMock()
+        visualizer.emit_tool_call_end = AsyncMock()
+
+        result = await AgentExecutor(llm, mock_tool_registry, visualizer=visualizer).run_stream("x", run_id="r1")
+
+        assert result.status == ExecutionStatus.COMPLETED
+        assert result.steps[0].observation == "ok"
+        tool_index = events.index(("tool_start", "search"))
+        assert any(kind == "delta" for kind, _ in events[tool_index + 1 :])
+        streamed = "".join(d for kind, d in events if kind == "delta")
+        assert response in streamed
+        visualizer.emit_tool_call_end.assert_awaited_once()
+
+    async def test_stream_multiple_actions(self, mock_tool_registry):
+        """测试流式模式下多个工具并发执行，顺序确定"""
+        mock_tool_registry.invoke_tool.side_effect = lambda name, params, run_id=None: asyncio.sleep(0, f"{name} ok")
+        llm = self.StreamingLLM([TestParallelToolCalls.MULTI_ACTION, "Final Answer: done"])
+
+        result = await AgentExecutor(llm, mock_tool_registry).run_stream("x")
+
+        assert [call.action for call in result.steps[0].tool_calls] == [
+            "search_flights",
+            "search_hotels",
+            "get_destination_info",
+        ]
+        assert result.final_answer == "done"
@@ -346,3 +346,273 @@ class TestSandboxResult:
         assert result.success is False
         assert result.exit_code == 1
         assert "Error" in result.stderr
+
+
+class TestSandboxPool:
+    """预热沙箱池测试 (使用进程内桩后端，离线运行)"""
+
+    @pytest.fixture
+    async def make_runner(self):
+        from cognizes.adapters.postgres.sandbox import SandboxBackend, SandboxPoolConfig, create_sandbox_runner
+
+        runners = []
+
+        def factory(**pool_kwargs):
+            pool_kwargs.setdefault("min_size", 1)
+            pool_kwargs.setdefault("max_size", 2)
+            runner = create_sandbox_runner(SandboxBackend.STUB, pool_config=SandboxPoolConfig(**pool_kwargs))
+            runners.append(runner)
+            return runner
+
+        yield factory
+        for runner in runners:
+            await runner.cleanup()
+
+    async def test_warm_instance_reused(self, make_runner):
+        """测试预热实例被复用，不再冷启动"""
+        runner = make_runner()
+        await runner.warmup()
+        assert runner.started == 1
+
+        for _ in range(5):
+            result = await runner.execute("print('hi')")
+            assert result.success is True
+            assert result.stdout == "hi\n"
+
+        stats = runner.pool.get_stats()
+        assert runner.started == 1
+        assert stats.acquired == 5
+        assert stats.reused == 5
+        assert stats.idle == 1
+
+    async def test_state_reset_between_runs(self, make_runner):
+        """测试归还时清理上一次执行的状态"""
+        runner = make_runner()
+
+        await runner.execute("secret = 42")
+        result = await runner.execute("print(secret)")
+
+        assert result.success is False
+        assert "NameError" in result.stderr
+        assert runner.started == 1
+
+    async def test_max_uses_recycles_instance(self, make_runner):
+        """测试达到复用上限后销毁并补齐新实例"""
+        runner = make_runner(max_uses=2)
+
+        first = await runner.execute("print(1)")
+        second = await runner.execute("print(1)")
+        await asyncio.sleep(0)
+        third = await runner.execute("print(1)")
+
+        assert first.metadata["sandbox_id"] == second.metadata["sandbox_id"]
+        assert third.metadata["sandbox_id"] != first.metadata["sandbox_id"]
+        assert runner.pool.get_stats().destroyed == 1
+
+    async def test_max_size_bounds_concurrency(self, make_runner):
+        """测试实例总数不超过 max_size，超出的请求排队"""
+        runner = make_runner(min_size=0, max_size=2)
+        running = 0
+        peak = 0
+
+        async def work():
+            nonlocal running, peak
+            async with runner.sandbox():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        assert peak == 2
+        assert runner.started == 2
+        assert runner.pool.get_stats().size == 2
+
+    async def test_acquire_timeout(self, make_runner):
+        """测试池满时等待超时"""
+        runner = make_runner(min_size=0, max_size=1, acquire_timeout=0.01)
+
+        held = await runner.acquire()
+        try:
+            with pytest.raises(TimeoutError):
+                await runner.acquire()
+        finally:
+            await runner.release(held)
+
+    async def test_unhealthy_idle_instance_discarded(self, make_runner):
+        """测试空闲实例健康检查失败后被丢弃"""
+        runner = make_runner(health_check_idle_seconds=0)
+        await runner.warmup()
+        runner.pool._idle[0].instance.healthy = False
+
+        result = await runner.execute("print('ok')")
+
+        assert result.success is True
+        assert runner.started == 2
+        assert runner.pool.get_stats().health_check_failures == 1
+
+    async def test_failed_run_not_reused(self, make_runner):
+        """测试异常退出 acquire 上下文的实例不再复用"""
+        runner = make_runner()
+
+        with pytest.raises(RuntimeError):
+            async with runner.sandbox() as sandbox:
+                raise RuntimeError("boom")
+
+        assert sandbox.instance.stopped is True
+        assert runner.pool.get_stats().destroyed == 1
+
+    async def test_without_pool_cold_starts(self):
+        """测试未配置预热池时每次执行冷启动并销毁"""
+        from cognizes.adapters.postgres.sandbox.stub_runner import StubSandboxRunner
+
+        runner = StubSandboxRunner()
+
+        await runner.execute("print(1)")
+        await runner.execute("print(1)")
+
+        assert runner.pool is None
+        assert runner.started == 2
+
+    def test_reusable_runner_requires_lifecycle(self):
+        """测试复用基类的实例生命周期方法必须由子类实现"""
+        from cognizes.adapters.postgres.sandbox import ReusableSandboxRunner
+
+        with pytest.raises(TypeError, match="create_sandbox"):
+            ReusableSandboxRunner()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="子进程沙箱依赖 POSIX rlimit")
+class TestSubprocessSandboxRunner:
+    """本地子进程沙箱测试"""
+
+    @pytest.fixture
+    async def runner(self):
+        from cognizes.adapters.postgres.sandbox import SandboxBackend, SandboxPoolConfig, create_sandbox_runner
+        from cognizes.adapters.postgres.sandbox.base import SandboxConfig
+
+        runner = create_sandbox_runner(
+            SandboxBackend.SUBPROCESS,
+            SandboxConfig(memory_mb=128, timeout_seconds=2),
+            SandboxPoolConfig(min_size=1, max_size=1),
+        )
+        await runner.warmup()
+        yield runner
+        await runner.cleanup()
+
+    async def test_execute_reuses_worker(self, runner):
+        """测试预热工作进程被复用，并返回延迟指标"""
+        first = await runner.execute("print('hello')")
+        second = await runner.execute("print('again')")
+
+        assert first.success is True
+        assert first.stdout == "hello\n"
+        assert second.metadata["worker_pid"] == first.metadata["worker_pid"]
+        assert first.metadata["run_ms"] >= 0
+        assert first.metadata["cpu_ms"] >= 0
+
+    async def test_globals_not_shared_between_runs(self, runner):
+        """测试每次执行使用独立命名空间"""
+        await runner.execute("leaked = 1")
+        result = await runner.execute("print(leaked)")
+
+        assert result.success is False
+        assert "NameError" in result.stderr
+
+    async def test_workdir_cleared_between_runs(self, runner):
+        """测试归还时清空工作目录"""
+        await runner.execute("open('data.txt', 'w').write('x')")
+        result = await runner.execute("import os; print(os.listdir('.'))")
+
+        assert result.stdout == "[]\n"
+
+    async def test_memory_limit(self, runner):
+        """测试超出 RLIMIT_AS 时分配失败"""
+        result = await runner.execute("buf = bytearray(512 * 1024 * 1024)")
+
+        assert result.success is False
+        assert "MemoryError" in result.stderr
+
+    async def test_file_size_limit(self, runner):
+        """测试超出 RLIMIT_FSIZE 时写入失败"""
+        result = await runner.execute("open('big', 'wb').write(b'x' * (32 * 1024 * 1024))")
+
+        assert result.success is False
+        assert "File too large" in result.stderr
+
+    async def test_protocol_channel_hidden(self, runner):
+        """测试用户代码无法读取协议通道"""
+        result = await runner.execute("input()")
+        follow_up = await runner.execute("print('still alive')")
+
+        assert "EOFError" in result.stderr
+        assert follow_up.stdout == "still alive\n"
+
+    async def test_protocol_fds_closed_in_child(self, runner):
+        """测试用户代码无法向协议通道写入伪造的响应"""
+        forged = '{"stdout": "forged", "stderr": "", "exit_code": 0, "run_ms": 0, "cpu_ms": 0}'
+        await runner.execute(
+            "import os\n"
+            "for fd in range(3, 64):\n"
+            "    try:\n"
+            f"        os.write(fd, b'{forged}\\n')\n"
+            "    except OSError:\n"
+            "        pass\n"
+        )
+        follow_up = await runner.execute("print('ok')")
+
+        assert follow_up.stdout == "ok\n"
+
+    async def test_worker_state_not_modified_by_code(self, runner):
+        """测试用户代码修改模块状态不影响后续执行"""
+        await runner.execute("import json; json.dumps = None")
+        follow_up = await runner.execute("print('ok')")
+
+        assert follow_up.success is True
+        assert follow_up.stdout == "ok\n"
+
+    async def test_cpu_limit_kills_child_only(self, runner):
+        """测试超出 CPU 限制时只终止执行代码的子进程"""
+        runner._config.timeout_seconds = 5
+        result = await runner.execute(
+            "import resource\n"
+            "resource.setrlimit(resource.RLIMIT_CPU, (1, resource.getrlimit(resource.RLIMIT_CPU)[1]))\n"
+            "while True: pass"
+        )
+        follow_up = await runner.execute("print('ok')")
+
+        assert result.stderr == "CPU time limit exceeded"
+        assert follow_up.metadata["worker_pid"] == result.metadata["worker_pid"]
+
+    async def test_timeout_kills_worker(self, runner):
+        """测试超时的工作进程被终止并替换"""
+        runner._config.timeout_seconds = 0.2
+        result = await runner.execute("while True: pass")
+        runner._config.timeout_seconds = 2
+        follow_up = await runner.execute("print('ok')")
+
+        assert result.exit_code == -1
+        assert "timeout" in result.stderr.lower()
+        assert follow_up.success is True
+        assert follow_up.metadata["worker_pid"] != result.metadata["worker_pid"]
+
+    async def test_network_isolated_when_namespaces_available(self, runner):
+        """测试网络命名空间可用时无法建立外部连接"""
+        probe = await runner.execute("print('probe')")
+        if not probe.metadata["isolated"]:
+            pytest.skip("当前环境不支持 user/net namespace")
+
+        result = await runner.execute("import socket; socket.create_connection(('1.1.1.1', 80), timeout=1)")
+
+        assert result.success is False
+        assert "OSError" in result.stderr
+
+    def test_describe_exit(self):
+        """测试工作进程异常退出原因"""
+        import signal
+
+        from cognizes.adapters.postgres.sandbox.subprocess_runner import SubprocessSandboxRunner
+
+        assert SubprocessSandboxRunner._describe_exit(-signal.SIGXCPU) == "CPU time limit exceeded"
+        assert "SIGKILL" in SubprocessSandboxRunner._describe_exit(-signal.SIGKILL)
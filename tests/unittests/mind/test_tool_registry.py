@@ -9,12 +9,14 @@ ToolRegistry 单元测试
 - #16: 热更新 (无需重启)
 """
 
-import pytest
-import uuid
-import json
 import asyncio
+import json
+import time
+import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+
 # pytest-asyncio 配置
 pytestmark = pytest.mark.asyncio
 
@@ -199,7 +201,9 @@ class TestToolRegistry:
         # 验证结果
         assert result == 8
 
-        # 验证统计更新被调用
+        # 统计在进程内聚合，写回时才执行 UPDATE
+        assert "UPDATE tools" not in conn.execute.call_args[0][0]
+        await registry.flush_stats()
         update_call = conn.execute.call_args
         assert "UPDATE tools" in update_call[0][0]
         assert "call_count" in update_call[0][0]
@@ -324,3 +328,377 @@ class TestFrontendTool:
         assert tool.name == "confirm_booking"
         assert tool.requires_confirmation is True
         assert tool.render_component == "BookingConfirmDialog"
+
+
+class TestToolResultCache:
+    """工具结果缓存测试"""
+
+    @pytest.fixture
+    def registry(self):
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool = MagicMock()
+        conn = AsyncMock()
+        acm = AsyncMock()
+        acm.__aenter__.return_value = conn
+        acm.__aexit__.return_value = None
+        pool.acquire.return_value = acm
+        return ToolRegistry(pool=pool)
+
+    @staticmethod
+    def counting_tool():
+        calls = []
+
+        def lookup(city):
+            calls.append(city)
+            return {"city": city, "temp": 20}
+
+        return lookup, calls
+
+    async def test_uncached_tool_always_runs(self, registry):
+        """测试未声明缓存的工具每次都执行"""
+        lookup, calls = self.counting_tool()
+        await registry.register_tool(name="weather", func=lookup)
+
+        await registry.invoke_tool("weather", {"city": "Tokyo"}, run_id="r1")
+        await registry.invoke_tool("weather", {"city": "Tokyo"}, run_id="r1")
+
+        assert calls == ["Tokyo", "Tokyo"]
+        assert registry.get_cache_stats() == {}
+
+    async def test_run_scope_cache(self, registry):
+        """测试 run 作用域：同一 run 内复用，跨 run 不复用"""
+        lookup, calls = self.counting_tool()
+        await registry.register_tool(name="weather", func=lookup, openapi_schema={"x-cache": {"scope": "run"}})
+
+        first = await registry.invoke_tool("weather", {"city": "Tokyo"}, run_id="r1")
+        second = await registry.invoke_tool("weather", {"city": "Tokyo"}, run_id="r1")
+        await registry.invoke_tool("weather", {"city": "Tokyo"}, run_id="r2")
+
+        assert first == second
+        assert calls == ["Tokyo", "Tokyo"]
+        stats = registry.get_cache_stats()["weather"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+        registry.clear_run_cache("r1")
+        assert stats["entries"] - 1 == registry.get_cache_stats()["weather"]["entries"]
+
+    async def test_global_scope_canonical_params(self, registry):
+        """测试 global 作用域：参数顺序不同视为同一调用"""
+        calls = []
+
+        def search(origin, destination):
+            calls.append((origin, destination))
+            return "flights"
+
+        await registry.register_tool(name="flights", func=search, permissions={"cache": {"scope": "global"}})
+
+        await registry.invoke_tool("flights", {"origin": "SHA", "destination": "NRT"}, run_id="r1")
+        await registry.invoke_tool("flights", {"destination": "NRT", "origin": "SHA"}, run_id="r2")
+        await registry.invoke_tool("flights", {"destination": "NRT", "origin": "SHA"})
+
+        assert len(calls) == 1
+
+    async def test_ttl_and_size_bounds(self, registry):
+        """测试 TTL 过期与容量淘汰"""
+        lookup, calls = self.counting_tool()
+        await registry.register_tool(
+            name="weather",
+            func=lookup,
+            openapi_schema={"x-cache": {"scope": "global", "ttl_seconds": 60, "max_entries": 2}},
+        )
+
+        for city in ("A", "B", "C", "A"):
+            await registry.invoke_tool("weather", {"city": city})
+        assert calls == ["A", "B", "C", "A"]  # A 已被淘汰
+
+        with patch("cognizes.adapters.postgres.tool_registry.time.monotonic", return_value=time.monotonic() + 120):
+            await registry.invoke_tool("weather", {"city": "C"})
+        assert calls[-1] == "C"
+
+    async def test_reregister_invalidates_cache(self, registry):
+        """测试重新注册工具后缓存失效"""
+        await registry.register_tool(name="v", func=lambda: "v1", openapi_schema={"x-cache": {"scope": "global"}})
+        assert await registry.invoke_tool("v", {}) == "v1"
+
+        await registry.register_tool(name="v", func=lambda: "v2", openapi_schema={"x-cache": {"scope": "global"}})
+        assert await registry.invoke_tool("v", {}) == "v2"
+
+    async def test_hit_rate_reported_with_call_count(self, registry):
+        """测试 get_available_tools 返回缓存命中率"""
+        lookup, _ = self.counting_tool()
+        await registry.register_tool(name="weather", func=lookup, openapi_schema={"x-cache": {"scope": "global"}})
+        for _ in range(4):
+            await registry.invoke_tool("weather", {"city": "Tokyo"})
+
+        conn = registry._pool.acquire.return_value.__aenter__.return_value
+        conn.fetch = AsyncMock(
+            return_value=[
+                {
+                    "id": uuid.uuid4(),
+                    "name": "weather",
+                    "display_name": "weather",
+                    "description": None,
+                    "openapi_schema": json.dumps({"x-cache": {"scope": "global"}}),
+                    "permissions": json.dumps({}),
+                    "is_active": True,
+                    "call_count": 1,
+                    "avg_latency_ms": 0.1,
+                }
+            ]
+        )
+        [tool] = await registry.get_available_tools()
+
+        assert tool.cache_hits == 3
+        assert tool.cache_hit_rate == pytest.approx(0.75)
+
+
+class TestToolStats:
+    """进程内统计聚合与批量写回测试"""
+
+    @pytest.fixture
+    def mock_pool(self):
+        pool = MagicMock()
+        conn = AsyncMock()
+        acm = AsyncMock()
+        acm.__aenter__.return_value = conn
+        acm.__aexit__.return_value = None
+        pool.acquire.return_value = acm
+        return pool, conn
+
+    def test_latency_histogram_percentiles(self):
+        """测试直方图分位数估算"""
+        from cognizes.adapters.postgres.tool_registry import LatencyHistogram
+
+        histogram = LatencyHistogram()
+        for latency in [3] * 90 + [150] * 9 + [900]:
+            histogram.record(latency)
+
+        assert 2 <= histogram.percentile(0.50) <= 5
+        assert 100 <= histogram.percentile(0.95) <= 200
+        assert histogram.percentile(0.999) <= 900
+        assert histogram.max_ms == 900
+
+    async def test_invoke_does_not_touch_database(self, mock_pool):
+        """测试调用路径不访问数据库"""
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool)
+        registry._function_registry["echo"] = lambda msg: msg
+
+        for i in range(10):
+            await registry.invoke_tool("echo", {"msg": i})
+
+        pool.acquire.assert_not_called()
+        assert registry.get_latency_stats()["echo"]["pending_calls"] == 10
+
+    async def test_flush_batches_all_tools(self, mock_pool):
+        """测试多个工具的统计合并为一条 UPDATE"""
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool)
+        registry._function_registry["a"] = lambda: "a"
+        registry._function_registry["b"] = lambda: "b"
+        for name in ("a", "a", "b"):
+            await registry.invoke_tool(name, {})
+
+        assert await registry.flush_stats() == 2
+
+        conn.execute.assert_awaited_once()
+        sql, app_name, names, calls, *_ = conn.execute.call_args[0]
+        assert "unnest" in sql
+        assert "p99_latency_ms" in sql
+        assert dict(zip(names, calls, strict=True)) == {"a": 2, "b": 1}
+        # 已写回的增量不会重复提交
+        assert await registry.flush_stats() == 0
+
+    async def test_flush_failure_keeps_pending(self, mock_pool):
+        """测试写回失败时保留增量"""
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool, conn = mock_pool
+        conn.execute.side_effect = ConnectionError("db down")
+        registry = ToolRegistry(pool=pool)
+        registry._function_registry["a"] = lambda: "a"
+        await registry.invoke_tool("a", {})
+
+        with pytest.raises(ConnectionError):
+            await registry.flush_stats()
+
+        assert registry.get_latency_stats()["a"]["pending_calls"] == 1
+
+    async def test_periodic_flush_without_calls(self, mock_pool):
+        """测试后台任务按间隔写回，不依赖后续工具调用触发"""
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool, stats_flush_interval=0.01)
+        registry._function_registry["a"] = lambda: "a"
+        await registry.start()
+
+        await registry.invoke_tool("a", {})
+        await asyncio.sleep(0.05)
+
+        conn.execute.assert_awaited_once()
+        await registry.close()
+        conn.execute.assert_awaited_once()
+
+    async def test_close_flushes_remaining(self, mock_pool):
+        """测试 close 停止后台任务并写回剩余统计"""
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool, stats_flush_interval=60)
+        registry._function_registry["a"] = lambda: "a"
+
+        await registry.invoke_tool("a", {})
+        flush_task = registry._flush_task
+        await registry.close()
+
+        assert flush_task.cancelled()
+        conn.execute.assert_awaited_once()
+        assert registry.get_latency_stats()["a"]["pending_calls"] == 0
+
+
+class TestToolCatalog:
+    """工具目录缓存测试"""
+
+    @pytest.fixture
+    def mock_pool(self):
+        pool = MagicMock()
+        conn = AsyncMock()
+        acm = AsyncMock()
+        acm.__aenter__.return_value = conn
+        acm.__aexit__.return_value = None
+        pool.acquire.return_value = acm
+        pool.execute = AsyncMock()
+        conn.fetch = AsyncMock(
+            return_value=[
+                {
+                    "id": uuid.uuid4(),
+                    "name": "search_flights",
+                    "display_name": "航班搜索",
+                    "description": "Search flights",
+                    "openapi_schema": json.dumps(
+                        {"parameters": {"type": "object", "properties": {"city": {"type": "string"}}}}
+                    ),
+                    "permissions": json.dumps({}),
+                    "is_active": True,
+                    "call_count": 3,
+                    "avg_latency_ms": 12.0,
+                }
+            ]
+        )
+        return pool, conn
+
+    async def test_catalog_cached(self, mock_pool):
+        """测试重复获取工具列表只查询一次数据库"""
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool)
+
+        first = await registry.get_available_tools()
+        second = await registry.get_available_tools()
+
+        assert first == second
+        assert conn.fetch.await_count == 1
+
+    async def test_function_schemas_precomputed(self, mock_pool):
+        """测试预计算的 LLM function schema"""
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool)
+
+        schemas = await registry.get_function_schemas()
+
+        assert schemas == [
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_flights",
+                    "description": "Search flights",
+                    "parameters": {"type": "object", "properties": {"city": {"type": "string"}}},
+                },
+            }
+        ]
+        assert await registry.get_function_schemas() is schemas
+        assert conn.fetch.await_count == 1
+
+    async def test_register_invalidates_catalog(self, mock_pool):
+        """测试本进程注册工具后目录立即失效"""
+        from cognizes.adapters.postgres.tool_registry import FrontendTool, ToolRegistry
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool)
+
+        await registry.get_available_tools()
+        await registry.register_tool(name="new_tool", func=lambda: "x")
+        await registry.get_available_tools()
+        await registry.register_frontend_tool(
+            "default_app", FrontendTool(name="confirm", description="", parameters={}, render_component="Dialog")
+        )
+        await registry.get_available_tools()
+
+        assert conn.fetch.await_count == 3
+
+    async def test_notify_invalidates_catalog(self, mock_pool):
+        """测试 attach 后监听器对 tools_changed 发起 LISTEN，通知使对应 app 的目录失效"""
+        from cognizes.adapters.postgres.tool_registry import TOOLS_CHANGED_CHANNEL, ToolRegistry
+        from cognizes.engine.pulse.pg_notify_listener import PgNotifyListener
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool)
+        listener = PgNotifyListener(dsn="postgresql://unused", channels=["event_stream"])
+        registry.attach(listener)
+
+        listen_conn = AsyncMock()
+        with patch("asyncpg.connect", AsyncMock(return_value=listen_conn)):
+            await listener.start()
+        handlers = {call.args[0]: call.args[1] for call in listen_conn.add_listener.await_args_list}
+        assert TOOLS_CHANGED_CHANNEL in handlers
+        notify = handlers[TOOLS_CHANGED_CHANNEL]
+
+        await registry.get_available_tools()
+        notify(listen_conn, 1, TOOLS_CHANGED_CHANNEL, json.dumps({"app_name": "other_app", "name": "x"}))
+        await registry.get_available_tools()
+        assert conn.fetch.await_count == 1
+
+        notify(listen_conn, 1, TOOLS_CHANGED_CHANNEL, json.dumps({"app_name": "default_app", "name": "x"}))
+        await registry.get_available_tools()
+        assert conn.fetch.await_count == 2
+
+        await listener.stop()
+        await registry.close()
+
+    async def test_attach_after_start_listens_immediately(self):
+        """测试监听器已启动后再挂载时立即发起 LISTEN"""
+        from cognizes.adapters.postgres.tool_registry import TOOLS_CHANGED_CHANNEL, ToolRegistry
+        from cognizes.engine.pulse.pg_notify_listener import PgNotifyListener
+
+        listener = PgNotifyListener(dsn="postgresql://unused")
+        listen_conn = AsyncMock()
+        with patch("asyncpg.connect", AsyncMock(return_value=listen_conn)):
+            await listener.start()
+
+        registry = ToolRegistry(pool=MagicMock(), stats_flush_interval=0)
+        registry.attach(listener)
+        await asyncio.sleep(0)
+
+        assert TOOLS_CHANGED_CHANNEL in [call.args[0] for call in listen_conn.add_listener.await_args_list]
+
+    async def test_catalog_ttl(self, mock_pool):
+        """测试未挂载监听时按 TTL 兜底过期"""
+        from cognizes.adapters.postgres.tool_registry import ToolRegistry
+
+        pool, conn = mock_pool
+        registry = ToolRegistry(pool=pool, catalog_ttl_seconds=0)
+
+        await registry.get_available_tools()
+        await registry.get_available_tools()
+
+        assert conn.fetch.await_count == 2
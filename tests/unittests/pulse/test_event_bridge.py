@@ -13,7 +13,10 @@ from datetime import datetime
 from cognizes.engine.pulse.event_bridge import (
     AgUiEventType,
     AgUiEvent,
+    BackpressurePolicy,
     PulseEventBridge,
+    SubscriberQueue,
+    parse_event_id,
 )
 
 
@@ -207,3 +210,280 @@ class TestConvertToAgUiEvent:
         }
         event = bridge._convert_to_agui_event(pg_data)
         assert event is None
+
+
+class TestEventIdAndResume:
+    """sequence_num 事件 id 与断线续传测试"""
+
+    def test_sse_with_event_id(self):
+        """带 event_id 时输出 SSE id 字段"""
+        event = AgUiEvent(type=AgUiEventType.RAW, run_id="run-1", event_id="42")
+        sse = event.to_sse()
+
+        assert sse.startswith("id: 42\ndata: ")
+        assert sse.endswith("\n\n")
+
+    def test_parse_event_id(self):
+        """解析 Last-Event-ID"""
+        assert parse_event_id("42") == 42
+        assert parse_event_id(7) == 7
+        assert parse_event_id(None) is None
+        assert parse_event_id("") is None
+        assert parse_event_id("abc") is None
+        assert parse_event_id("-1") is None
+
+    def test_convert_sets_event_id_from_sequence_num(self):
+        """events 行的 sequence_num 作为 event_id"""
+        from unittest.mock import MagicMock
+
+        bridge = PulseEventBridge(MagicMock())
+        event = bridge._convert_to_agui_event(
+            {
+                "table": "events",
+                "operation": "INSERT",
+                "data": {
+                    "id": "evt-1",
+                    "run_id": "run-1",
+                    "event_type": "message",
+                    "content": {"text": "hi"},
+                    "sequence_num": 17,
+                },
+            }
+        )
+        assert event.event_id == "17"
+
+    @staticmethod
+    def _make_bridge(payloads, truncated=False):
+        from unittest.mock import AsyncMock, MagicMock
+
+        fetcher = MagicMock()
+        fetcher.replay = AsyncMock(return_value=(payloads, truncated))
+        bridge = PulseEventBridge(MagicMock(), fetcher=fetcher)
+        bridge._running = True
+        return bridge, fetcher
+
+    @staticmethod
+    def _message_payload(seq: int) -> dict:
+        return {
+            "table": "events",
+            "operation": "INSERT",
+            "data": {
+                "id": f"evt-{seq}",
+                "event_type": "message",
+                "content": {"text": f"m{seq}"},
+                "sequence_num": seq,
+            },
+        }
+
+    @pytest.mark.asyncio
+    async def test_subscribe_replays_then_dedupes_live(self):
+        """先回放遗漏事件，再跳过已回放的实时事件"""
+        bridge, fetcher = self._make_bridge([self._message_payload(11), self._message_payload(12)])
+
+        stream = bridge.subscribe("run-1", thread_id="thread-1", last_event_id="10")
+        first = await stream.__anext__()
+        second = await stream.__anext__()
+
+        # 回放期间到达的重复事件与新事件
+        for seq in (12, 13):
+            bridge._subscribers["run-1"][0].offer(
+                AgUiEvent(type=AgUiEventType.TEXT_MESSAGE_CONTENT, run_id="run-1", event_id=str(seq))
+            )
+        third = await stream.__anext__()
+        await stream.aclose()
+
+        fetcher.replay.assert_awaited_once_with("thread-1", 10, max_events=1000)
+        assert [first.event_id, second.event_id, third.event_id] == ["11", "12", "13"]
+        assert first.run_id == "run-1"
+        assert first.data["delta"] == "m11"
+
+    @pytest.mark.asyncio
+    async def test_subscribe_delivers_late_committed_lower_seq(self):
+        """晚提交的较小序号事件不会被已发送的较大序号跳过，重复事件仍被去重"""
+        bridge, _ = self._make_bridge([self._message_payload(11), self._message_payload(13)])
+
+        stream = bridge.subscribe("run-1", thread_id="thread-1", last_event_id="10")
+        replayed = [await stream.__anext__(), await stream.__anext__()]
+
+        for seq in (13, 12, 15, 14, 12):
+            bridge._subscribers["run-1"][0].offer(
+                AgUiEvent(type=AgUiEventType.TEXT_MESSAGE_CONTENT, run_id="run-1", event_id=str(seq))
+            )
+        live = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+
+        assert [event.event_id for event in replayed + live] == ["11", "13", "12", "15", "14"]
+
+    @pytest.mark.asyncio
+    async def test_replay_skips_other_runs(self):
+        """回放只保留属于订阅 run 的事件，不含 run_id 的行归入当前订阅"""
+        other = self._message_payload(11)
+        other["data"]["run_id"] = "run-other"
+        own = self._message_payload(12)
+        own["data"]["run_id"] = "run-1"
+        bridge, _ = self._make_bridge([other, own, self._message_payload(13)])
+
+        events = [event async for event in bridge._replay("run-1", "thread-1", 10)]
+
+        assert [event.event_id for event in events] == ["12", "13"]
+        assert {event.run_id for event in events} == {"run-1"}
+        assert other["data"]["run_id"] == "run-other"
+
+    @pytest.mark.asyncio
+    async def test_subscribe_truncated_replay_requests_resync(self):
+        """回放超出上限时通知客户端重新同步"""
+        bridge, _ = self._make_bridge([], truncated=True)
+
+        stream = bridge.subscribe("run-1", thread_id="thread-1", last_event_id=5)
+        event = await stream.__anext__()
+        await stream.aclose()
+
+        assert event.type == AgUiEventType.CUSTOM
+        assert event.data["name"] == "resync_required"
+
+    @pytest.mark.asyncio
+    async def test_subscribe_without_cursor_skips_replay(self):
+        """未提供游标时不回放"""
+        import asyncio
+
+        bridge, fetcher = self._make_bridge([])
+
+        stream = bridge.subscribe("run-1", thread_id="thread-1")
+        pending = asyncio.ensure_future(stream.__anext__())
+        while "run-1" not in bridge._subscribers:
+            await asyncio.sleep(0)
+        bridge._subscribers["run-1"][0].offer(AgUiEvent(type=AgUiEventType.RUN_FINISHED, run_id="run-1"))
+        event = await asyncio.wait_for(pending, timeout=1.0)
+
+        assert event.type == AgUiEventType.RUN_FINISHED
+        fetcher.replay.assert_not_awaited()
+
+
+class TestBackpressure:
+    """有界队列与背压策略测试"""
+
+    @staticmethod
+    def _delta(seq: int) -> AgUiEvent:
+        return AgUiEvent(type=AgUiEventType.STATE_DELTA, run_id="run-1", data={"delta": [seq]}, event_id=str(seq))
+
+    @staticmethod
+    def _message(seq: int) -> AgUiEvent:
+        return AgUiEvent(type=AgUiEventType.TEXT_MESSAGE_CONTENT, run_id="run-1", event_id=str(seq))
+
+    def test_drop_oldest(self):
+        """满载时丢弃最旧事件"""
+        queue = SubscriberQueue("run-1", maxsize=2, policy=BackpressurePolicy.DROP_OLDEST)
+        for seq in range(3):
+            assert queue.offer(self._message(seq))
+
+        assert [e.event_id for _, e in queue._buffer] == ["1", "2"]
+        assert queue.dropped == 1
+
+    def test_coalesce_state_deltas_into_snapshot(self):
+        """满载时积压的 STATE_DELTA 合并为 STATE_SNAPSHOT"""
+        queue = SubscriberQueue("run-1", maxsize=3, policy=BackpressurePolicy.COALESCE_STATE)
+        queue.offer(self._message(1))
+        queue.offer(self._delta(2), snapshot={"v": 2})
+        queue.offer(self._delta(3), snapshot={"v": 3})
+        queue.offer(self._delta(4), snapshot={"v": 4})
+
+        events = [e for _, e in queue._buffer]
+        assert [e.type for e in events] == [AgUiEventType.TEXT_MESSAGE_CONTENT, AgUiEventType.STATE_SNAPSHOT]
+        assert events[1].data["snapshot"] == {"v": 4}
+        assert events[1].event_id == "4"
+        assert queue.coalesced == 3
+        assert queue.dropped == 0
+
+    def test_coalesce_without_snapshot_falls_back_to_drop_oldest(self):
+        """没有已知完整状态时退化为丢弃最旧"""
+        queue = SubscriberQueue("run-1", maxsize=1, policy=BackpressurePolicy.COALESCE_STATE)
+        queue.offer(self._delta(1))
+        queue.offer(self._delta(2))
+
+        assert [e.event_id for _, e in queue._buffer] == ["2"]
+        assert queue.dropped == 1
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy(self):
+        """满载时断开订阅者"""
+        queue = SubscriberQueue("run-1", maxsize=1, policy=BackpressurePolicy.DISCONNECT)
+        queue.offer(self._message(1))
+
+        assert queue.offer(self._message(2)) is False
+        assert queue.disconnected
+        with pytest.raises(ConnectionAbortedError):
+            await queue.get()
+
+    def test_dispatch_is_non_blocking_and_isolated(self):
+        """慢订阅者满载不影响其他订阅者"""
+        from unittest.mock import MagicMock
+
+        bridge = PulseEventBridge(MagicMock(), queue_maxsize=1, backpressure=BackpressurePolicy.DISCONNECT)
+        slow = SubscriberQueue("run-1", maxsize=1, policy=BackpressurePolicy.DISCONNECT)
+        fast = SubscriberQueue("run-1", maxsize=10, policy=BackpressurePolicy.DROP_OLDEST)
+        bridge._subscribers["run-1"] = [slow, fast]
+
+        pg_data = {"table": "runs", "operation": "INSERT", "data": {"id": "run-1", "thread_id": "t"}}
+        assert bridge.dispatch(pg_data) == 2
+        assert bridge.dispatch(pg_data) == 1
+
+        assert slow.disconnected
+        assert len(fast) == 2
+
+    def test_dispatch_tracks_latest_state_for_snapshot(self):
+        """threads 状态更新用于合并快照"""
+        from unittest.mock import MagicMock
+
+        bridge = PulseEventBridge(MagicMock())
+        queue = SubscriberQueue("thread-1", maxsize=1, policy=BackpressurePolicy.COALESCE_STATE)
+        bridge._subscribers["thread-1"] = [queue]
+
+        for counter in (1, 2):
+            bridge.dispatch(
+                {
+                    "table": "threads",
+                    "operation": "UPDATE",
+                    "data": {"id": "thread-1", "state": {"counter": counter}, "state_delta": []},
+                }
+            )
+
+        event = queue._buffer[0][1]
+        assert event.type == AgUiEventType.STATE_SNAPSHOT
+        assert event.data["snapshot"] == {"counter": 2}
+
+    def test_subscriber_lag_metrics(self):
+        """订阅者滞后指标"""
+        from unittest.mock import MagicMock
+
+        bridge = PulseEventBridge(MagicMock())
+        queue = SubscriberQueue("run-1", maxsize=5, policy=BackpressurePolicy.DROP_OLDEST)
+        bridge._subscribers["run-1"] = [queue]
+        queue.offer(self._message(1))
+
+        (lag,) = bridge.get_subscriber_lag()
+        assert lag.run_id == "run-1"
+        assert lag.depth == 1
+        assert lag.enqueued == 1
+        assert lag.oldest_age_ms >= 0.0
+
+    @pytest.mark.asyncio
+    async def test_subscribe_emits_disconnect_notice(self):
+        """被断开的订阅流发送 backpressure_disconnect 后结束"""
+        import asyncio
+        from unittest.mock import MagicMock
+
+        bridge = PulseEventBridge(MagicMock(), queue_maxsize=1, backpressure=BackpressurePolicy.DISCONNECT)
+        bridge._running = True
+
+        stream = bridge.subscribe("run-1")
+        pending = asyncio.ensure_future(stream.__anext__())
+        while "run-1" not in bridge._subscribers:
+            await asyncio.sleep(0)
+        queue = bridge._subscribers["run-1"][0]
+        queue.offer(self._message(1))
+        queue.offer(self._message(2))
+
+        event = await asyncio.wait_for(pending, timeout=1.0)
+        assert event.data["name"] == "backpressure_disconnect"
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
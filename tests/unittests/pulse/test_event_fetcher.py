@@ -0,0 +1,289 @@
+"""
+EventFetcher 单元测试
+
+测试范围：纯逻辑测试，使用 Mock 连接池
+- cursor 通知解析与突发合并
+- keyset 批量拉取与有序投递
+- row_to_payload 载荷结构
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from cognizes.engine.pulse.event_fetcher import EventFetcher, SequenceWindow, row_to_payload
+from cognizes.engine.pulse.event_hub import EventHub
+from cognizes.engine.pulse.pg_notify_listener import NotifyEvent
+
+THREAD_ID = str(uuid.uuid4())
+
+
+def make_row(seq: int, thread_id: str = THREAD_ID) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "thread_id": uuid.UUID(thread_id),
+        "invocation_id": uuid.uuid4(),
+        "author": "agent",
+        "event_type": "tool_result",
+        "content": json.dumps({"output": "x" * 10_000}),
+        "actions": "{}",
+        "created_at": datetime(2026, 1, 1),
+        "sequence_num": seq,
+    }
+
+
+def make_pool(rows: list[dict]):
+    """Mock 连接池：按 (after_seq, upto_seq, limit) 过滤 rows"""
+    conn = MagicMock()
+
+    async def fetch(sql, thread_id, after_seq, upto_seq, limit):
+        await asyncio.sleep(0)
+        matched = [r for r in rows if r["thread_id"] == thread_id and after_seq < r["sequence_num"] <= upto_seq]
+        return matched[:limit]
+
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.fetchval = AsyncMock(return_value=0)
+
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+    return pool, conn
+
+
+def cursor_event(thread_id: str, max_seq: int, min_seq: int | None = None) -> NotifyEvent:
+    payload = {"thread_id": thread_id, "max_seq": max_seq}
+    if min_seq is not None:
+        payload["min_seq"] = min_seq
+    return NotifyEvent(channel="event_cursor", payload=payload, received_at=datetime.now())
+
+
+async def wait_drained(fetcher: EventFetcher) -> None:
+    for _ in range(100):
+        if not fetcher._drains:
+            return
+        await asyncio.sleep(0)
+
+
+class TestRowToPayload:
+    """行数据转换测试"""
+
+    def test_payload_structure(self):
+        payload = row_to_payload(make_row(7))
+
+        assert payload["table"] == "events"
+        assert payload["operation"] == "INSERT"
+        assert payload["thread_id"] == THREAD_ID
+        assert payload["sequence_num"] == 7
+        assert len(payload["data"]["content"]["output"]) == 10_000
+        assert payload["data"]["created_at"] == "2026-01-01T00:00:00"
+
+
+class TestSequenceWindow:
+    """已投递序号窗口测试"""
+
+    def test_add_reports_first_occurrence(self):
+        window = SequenceWindow()
+
+        assert window.add(5) is True
+        assert window.add(5) is False
+        assert 5 in window
+
+    def test_evicts_oldest(self):
+        window = SequenceWindow(maxlen=2)
+        for seq in (1, 2, 3):
+            window.add(seq)
+
+        assert 1 not in window
+        assert 2 in window and 3 in window
+
+
+class TestCursorFetch:
+    """cursor 通知 -> 批量拉取测试"""
+
+    @pytest.mark.asyncio
+    async def test_fetches_and_emits_in_order(self):
+        pool, conn = make_pool([make_row(seq) for seq in (1, 2, 3)])
+        fetcher = EventFetcher(pool)
+        await fetcher.start()
+        received = []
+        fetcher.on_event(lambda event: received.append(event.payload["sequence_num"]))
+
+        fetcher.handle_notify(cursor_event(THREAD_ID, 3))
+        await wait_drained(fetcher)
+
+        assert received == [1, 2, 3]
+        assert conn.fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced(self):
+        pool, conn = make_pool([make_row(seq) for seq in range(1, 6)])
+        fetcher = EventFetcher(pool)
+        received = []
+        fetcher.on_event(lambda event: received.append(event.payload["sequence_num"]))
+
+        for seq in range(1, 6):
+            fetcher.handle_notify(cursor_event(THREAD_ID, seq))
+        await wait_drained(fetcher)
+
+        assert received == [1, 2, 3, 4, 5]
+        assert fetcher.get_metrics().coalesced == 4
+        assert conn.fetch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_batches_by_limit(self):
+        pool, conn = make_pool([make_row(seq) for seq in range(1, 6)])
+        fetcher = EventFetcher(pool, batch_size=2)
+        received = []
+        fetcher.on_event(lambda event: received.append(event.payload["sequence_num"]))
+
+        fetcher.handle_notify(cursor_event(THREAD_ID, 5))
+        await wait_drained(fetcher)
+
+        assert received == [1, 2, 3, 4, 5]
+        assert conn.fetch.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_late_commit_below_cursor_is_delivered(self):
+        """较小序号的事务晚提交：其通知低于已投递水位，仍需重新查询并投递"""
+        rows = [make_row(2)]
+        pool, conn = make_pool(rows)
+        fetcher = EventFetcher(pool)
+        received = []
+        fetcher.on_event(lambda event: received.append(event.payload["sequence_num"]))
+
+        # seq=1 的事务尚未提交，seq=2 先提交
+        fetcher.handle_notify(cursor_event(THREAD_ID, 2))
+        await wait_drained(fetcher)
+        rows.append(make_row(1))
+        fetcher.handle_notify(cursor_event(THREAD_ID, 1))
+        await wait_drained(fetcher)
+
+        assert received == [2, 1]
+        assert fetcher._cursors[THREAD_ID] == 2
+
+    @pytest.mark.asyncio
+    async def test_invisible_rows_do_not_advance_cursor(self):
+        """通知到达时行尚不可见：水位不越过未拉取到的序号"""
+        rows = []
+        pool, _ = make_pool(rows)
+        fetcher = EventFetcher(pool)
+        received = []
+        fetcher.on_event(lambda event: received.append(event.payload["sequence_num"]))
+
+        fetcher.handle_notify(cursor_event(THREAD_ID, 3))
+        await wait_drained(fetcher)
+        assert THREAD_ID not in fetcher._cursors
+
+        rows.append(make_row(3))
+        fetcher.handle_notify(cursor_event(THREAD_ID, 3))
+        await wait_drained(fetcher)
+
+        assert received == [3]
+
+    @pytest.mark.asyncio
+    async def test_requery_does_not_redeliver(self):
+        """多行语句通知 (min_seq, max_seq] 与已投递区间重叠时按序号去重"""
+        rows = [make_row(seq) for seq in (1, 3)]
+        pool, _ = make_pool(rows)
+        fetcher = EventFetcher(pool)
+        received = []
+        fetcher.on_event(lambda event: received.append(event.payload["sequence_num"]))
+
+        fetcher.handle_notify(cursor_event(THREAD_ID, 3))
+        await wait_drained(fetcher)
+        rows.extend([make_row(2), make_row(4)])
+        fetcher.handle_notify(cursor_event(THREAD_ID, 4, min_seq=2))
+        await wait_drained(fetcher)
+
+        assert received == [1, 3, 2, 4]
+
+    @pytest.mark.asyncio
+    async def test_idle_threads_are_evicted(self):
+        """超过跟踪上限时淘汰最久未活动的 thread，淘汰后再次活动不重复投递"""
+        threads = [str(uuid.uuid4()) for _ in range(3)]
+        rows = [make_row(seq, thread_id) for seq, thread_id in enumerate(threads, start=1)]
+        pool, _ = make_pool(rows)
+        fetcher = EventFetcher(pool, max_tracked_threads=2)
+        received = []
+        fetcher.on_event(lambda event: received.append(event.payload["sequence_num"]))
+
+        for seq, thread_id in enumerate(threads, start=1):
+            fetcher.handle_notify(cursor_event(thread_id, seq))
+            await wait_drained(fetcher)
+
+        assert list(fetcher._cursors) == threads[1:]
+        assert threads[0] not in fetcher._delivered
+        assert fetcher.get_metrics().evicted_threads == 1
+
+        rows.append(make_row(4, threads[0]))
+        fetcher.handle_notify(cursor_event(threads[0], 4))
+        await wait_drained(fetcher)
+
+        assert received == [1, 2, 3, 4]
+        assert len(fetcher._cursors) == 2
+
+    @pytest.mark.asyncio
+    async def test_install_trigger(self):
+        pool, conn = make_pool([])
+        conn.execute = AsyncMock()
+        conn.transaction = MagicMock()
+        conn.transaction.return_value.__aenter__ = AsyncMock(return_value=None)
+        conn.transaction.return_value.__aexit__ = AsyncMock(return_value=None)
+        fetcher = EventFetcher(pool)
+
+        await fetcher.install_trigger()
+
+        sql = conn.execute.await_args.args[0]
+        assert "CREATE TRIGGER trigger_event_cursor_notify" in sql
+        assert "FOR EACH STATEMENT" in sql
+
+    def test_malformed_notification_ignored(self):
+        pool, _ = make_pool([])
+        fetcher = EventFetcher(pool)
+
+        fetcher.handle_notify(NotifyEvent(channel="event_cursor", payload={"raw": "x"}, received_at=datetime.now()))
+
+        assert fetcher.get_metrics().notifications == 0
+
+    @pytest.mark.asyncio
+    async def test_publishes_into_event_hub(self):
+        pool, _ = make_pool([make_row(1)])
+        fetcher = EventFetcher(pool)
+        hub = EventHub()
+        fetcher.on_event(hub.publish)
+        sub = hub.subscribe(thread_id=THREAD_ID)
+
+        fetcher.handle_notify(cursor_event(THREAD_ID, 1))
+        await wait_drained(fetcher)
+
+        event = sub.get_nowait()
+        assert event.payload["data"]["event_type"] == "tool_result"
+
+
+class TestReplay:
+    """断线重连回放测试"""
+
+    @pytest.mark.asyncio
+    async def test_replay_pages_through_missed_events(self):
+        pool, conn = make_pool([make_row(seq) for seq in range(1, 8)])
+        fetcher = EventFetcher(pool, batch_size=3)
+
+        payloads, truncated = await fetcher.replay(THREAD_ID, after_seq=2)
+
+        assert [p["sequence_num"] for p in payloads] == [3, 4, 5, 6, 7]
+        assert truncated is False
+        assert conn.fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_replay_is_bounded(self):
+        pool, _ = make_pool([make_row(seq) for seq in range(1, 8)])
+        fetcher = EventFetcher(pool, batch_size=3)
+
+        payloads, truncated = await fetcher.replay(THREAD_ID, after_seq=0, max_events=4)
+
+        assert [p["sequence_num"] for p in payloads] == [1, 2, 3, 4]
+        assert truncated is True
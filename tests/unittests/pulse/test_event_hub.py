@@ -0,0 +1,222 @@
+"""
+EventHub 单元测试
+
+测试范围：纯逻辑测试，不依赖数据库连接
+- thread_id / run_id 索引路由
+- 有界队列溢出策略 (drop_oldest / drop_newest / coalesce)
+- 指标统计
+- PgNotifyListener 同步回调集成
+"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from cognizes.engine.pulse.event_hub import (
+    EventHub,
+    OverflowPolicy,
+    SubscriptionClosedError,
+    extract_route,
+)
+from cognizes.engine.pulse.pg_notify_listener import NotifyEvent, PgNotifyListener
+
+
+def make_event(**payload) -> NotifyEvent:
+    return NotifyEvent(channel="event_stream", payload=payload, received_at=datetime.now())
+
+
+class TestExtractRoute:
+    """路由键提取测试"""
+
+    def test_top_level_fields(self):
+        assert extract_route({"thread_id": "t1", "run_id": "r1"}) == ("t1", "r1")
+
+    def test_nested_data_fields(self):
+        assert extract_route({"data": {"thread_id": "t2", "run_id": "r2"}}) == ("t2", "r2")
+
+    def test_id_fallback_for_run_id(self):
+        assert extract_route({"thread_id": "t3", "id": "run-3"}) == ("t3", "run-3")
+
+    def test_missing_fields(self):
+        assert extract_route({"event_type": "message"}) == (None, None)
+
+
+class TestRouting:
+    """索引路由测试"""
+
+    def test_routes_by_thread_id(self):
+        hub = EventHub()
+        sub_a = hub.subscribe(thread_id="t1")
+        sub_b = hub.subscribe(thread_id="t2")
+
+        routed = hub.publish(make_event(thread_id="t1"))
+
+        assert routed == 1
+        assert sub_a.depth == 1
+        assert sub_b.depth == 0
+
+    def test_routes_by_run_id(self):
+        hub = EventHub()
+        sub = hub.subscribe(run_id="r1")
+
+        hub.publish(make_event(run_id="r1", table="events"))
+        hub.publish(make_event(run_id="r2", table="events"))
+
+        assert sub.depth == 1
+
+    def test_wildcard_receives_everything(self):
+        hub = EventHub()
+        sub = hub.subscribe(thread_id="*")
+
+        hub.publish(make_event(thread_id="t1"))
+        hub.publish(make_event(thread_id="t2"))
+
+        assert sub.depth == 2
+
+    def test_subscribe_requires_exactly_one_key(self):
+        hub = EventHub()
+        with pytest.raises(ValueError):
+            hub.subscribe()
+        with pytest.raises(ValueError):
+            hub.subscribe(thread_id="t1", run_id="r1")
+
+    def test_close_removes_from_index(self):
+        hub = EventHub()
+        sub = hub.subscribe(thread_id="t1")
+        sub.close()
+
+        assert hub.publish(make_event(thread_id="t1")) == 0
+        assert hub.get_metrics().indexed_keys == 0
+
+    @pytest.mark.asyncio
+    async def test_get_returns_events_in_order(self):
+        hub = EventHub()
+        sub = hub.subscribe(thread_id="t1")
+
+        hub.publish(make_event(thread_id="t1", seq=1))
+        hub.publish(make_event(thread_id="t1", seq=2))
+
+        assert (await sub.get()).payload["seq"] == 1
+        assert (await sub.get()).payload["seq"] == 2
+
+    @pytest.mark.asyncio
+    async def test_get_timeout(self):
+        hub = EventHub()
+        sub = hub.subscribe(thread_id="t1")
+
+        with pytest.raises(asyncio.TimeoutError):
+            await sub.get(timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_closed_subscription_stops_iteration(self):
+        hub = EventHub()
+        sub = hub.subscribe(thread_id="t1")
+        sub.close()
+
+        with pytest.raises(SubscriptionClosedError):
+            await sub.get()
+        assert [event async for event in sub] == []
+
+
+class TestOverflowPolicy:
+    """有界队列溢出策略测试"""
+
+    def test_drop_oldest(self):
+        hub = EventHub(queue_maxsize=2, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        sub = hub.subscribe(thread_id="t1")
+
+        for seq in range(3):
+            hub.publish(make_event(thread_id="t1", seq=seq))
+
+        assert [sub.get_nowait().payload["seq"] for _ in range(2)] == [1, 2]
+        assert sub.dropped == 1
+
+    def test_drop_newest(self):
+        hub = EventHub(queue_maxsize=2, overflow_policy=OverflowPolicy.DROP_NEWEST)
+        sub = hub.subscribe(thread_id="t1")
+
+        for seq in range(3):
+            hub.publish(make_event(thread_id="t1", seq=seq))
+
+        assert [sub.get_nowait().payload["seq"] for _ in range(2)] == [0, 1]
+        assert sub.dropped == 1
+
+    def test_coalesce_replaces_same_kind(self):
+        hub = EventHub(queue_maxsize=2, overflow_policy=OverflowPolicy.COALESCE)
+        sub = hub.subscribe(thread_id="t1")
+
+        hub.publish(make_event(thread_id="t1", event_type="message", seq=0))
+        hub.publish(make_event(thread_id="t1", event_type="state", seq=1))
+        hub.publish(make_event(thread_id="t1", event_type="state", seq=2))
+
+        assert [sub.get_nowait().payload["seq"] for _ in range(2)] == [0, 2]
+        assert sub.coalesced == 1
+        assert sub.dropped == 0
+
+    def test_per_subscription_policy_override(self):
+        hub = EventHub(queue_maxsize=1, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        sub = hub.subscribe(thread_id="t1", maxsize=3, policy=OverflowPolicy.DROP_NEWEST)
+
+        for seq in range(4):
+            hub.publish(make_event(thread_id="t1", seq=seq))
+
+        assert sub.depth == 3
+        assert sub.dropped == 1
+
+
+class TestMetrics:
+    """指标统计测试"""
+
+    def test_queue_depth_and_counts(self):
+        hub = EventHub()
+        hub.subscribe(thread_id="t1")
+        hub.subscribe(thread_id="t1")
+        hub.subscribe(run_id="r1")
+
+        hub.publish(make_event(thread_id="t1", run_id="r1"))
+        metrics = hub.get_metrics()
+
+        assert metrics.subscribers == 3
+        assert metrics.indexed_keys == 2
+        assert metrics.total_queue_depth == 3
+        assert metrics.max_queue_depth == 1
+        assert metrics.published == 1
+        assert metrics.routed == 3
+        assert metrics.avg_dispatch_latency_ms >= 0.0
+
+    def test_delivery_latency_recorded(self):
+        hub = EventHub()
+        sub = hub.subscribe(thread_id="t1")
+        hub.publish(make_event(thread_id="t1"))
+        sub.get_nowait()
+
+        assert sub.delivered == 1
+        assert hub.get_metrics().avg_delivery_latency_ms >= 0.0
+
+    def test_dropped_survives_unsubscribe(self):
+        hub = EventHub(queue_maxsize=1)
+        sub = hub.subscribe(thread_id="t1")
+        hub.publish(make_event(thread_id="t1"))
+        hub.publish(make_event(thread_id="t1"))
+        sub.close()
+
+        assert hub.get_metrics().dropped == 1
+
+
+class TestListenerIntegration:
+    """PgNotifyListener 集成测试"""
+
+    def test_attach_dispatches_without_tasks(self):
+        listener = PgNotifyListener(dsn="postgresql://localhost/test")
+        hub = EventHub()
+        hub.attach(listener)
+        sub = hub.subscribe(thread_id="t1")
+
+        with patch("asyncio.create_task") as mock_task:
+            listener._handle_notification(MagicMock(), 1, "event_stream", '{"thread_id": "t1"}')
+            assert not mock_task.called
+
+        assert sub.depth == 1
+        assert sub.get_nowait().payload == {"thread_id": "t1"}
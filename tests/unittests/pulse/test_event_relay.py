@@ -0,0 +1,196 @@
+"""
+EventRelay 单元测试
+
+测试范围：纯逻辑测试，不连接数据库
+- EventTransport 载荷解码与回调分发
+- EventRelay -> Unix socket -> RelayTransport 转发链路
+- 慢客户端断开与传输层工厂
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from cognizes.engine.pulse.event_hub import EventHub
+from cognizes.engine.pulse.event_relay import (
+    EventRelay,
+    RelayTransport,
+    create_event_transport,
+    encode_frame,
+)
+from cognizes.engine.pulse.pg_notify_listener import EventTransport, PgNotifyListener
+
+
+@pytest.fixture
+def socket_path():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield str(Path(tmp) / "relay.sock")
+
+
+class InlineTransport(EventTransport):
+    """仅用于测试基类分发逻辑的传输层"""
+
+    async def start(self) -> None:
+        self._running = True
+
+    async def stop(self) -> None:
+        self._running = False
+
+
+async def start_relay(socket_path: str) -> EventRelay:
+    """只启动 socket 服务，跳过数据库 LISTEN"""
+    relay = EventRelay(dsn="postgresql://unused", socket_path=socket_path, channels=["event_stream"])
+    relay._server = await asyncio.start_unix_server(relay._handle_client, path=socket_path)
+    return relay
+
+
+async def wait_for(predicate, attempts: int = 200) -> None:
+    for _ in range(attempts):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+class TestEventTransport:
+    """传输层基类分发测试"""
+
+    def test_base_is_abstract(self):
+        with pytest.raises(TypeError):
+            EventTransport()
+
+    def test_dispatch_decodes_once_for_all_callbacks(self):
+        transport = InlineTransport(channels=["event_stream"])
+        received = []
+        transport.on_event("event_stream", lambda event: received.append(event.payload))
+        transport.on_event("event_stream", lambda event: received.append(event.payload))
+
+        transport.dispatch("event_stream", json.dumps({"thread_id": "t1"}))
+
+        assert received == [{"thread_id": "t1"}, {"thread_id": "t1"}]
+        assert received[0] is received[1]
+
+    def test_dispatch_invalid_json(self):
+        transport = InlineTransport()
+        received = []
+        transport.on_event("event_stream", lambda event: received.append(event.payload))
+
+        transport.dispatch("event_stream", "not-json")
+
+        assert received == [{"raw": "not-json"}]
+
+    def test_callback_error_isolated(self):
+        transport = InlineTransport()
+        received = []
+
+        def broken(event):
+            raise RuntimeError("boom")
+
+        transport.on_event("event_stream", broken)
+        transport.on_event("event_stream", lambda event: received.append(event))
+
+        transport.dispatch("event_stream", "{}")
+
+        assert len(received) == 1
+
+
+class TestRelayForwarding:
+    """中继转发链路测试"""
+
+    @pytest.mark.asyncio
+    async def test_frames_reach_all_clients(self, socket_path):
+        relay = await start_relay(socket_path)
+        hub = EventHub()
+        sub = hub.subscribe(thread_id="t1")
+        clients = [RelayTransport(socket_path=socket_path, channels=["event_stream"]) for _ in range(2)]
+        hub.attach(clients[0])
+        received = []
+        clients[1].on_event("event_stream", lambda event: received.append(event.payload))
+        try:
+            for client in clients:
+                await client.start()
+                await client.wait_connected(timeout=2)
+            await wait_for(lambda: relay.get_metrics().clients == 2)
+
+            relay._handle_notification(MagicMock(), 1, "event_stream", json.dumps({"thread_id": "t1", "n": 1}))
+            await wait_for(lambda: received)
+
+            assert received == [{"thread_id": "t1", "n": 1}]
+            event = await sub.get(timeout=2)
+            assert event.payload["n"] == 1
+            metrics = relay.get_metrics()
+            assert metrics.forwarded == 1
+            assert metrics.frames_written == 2
+        finally:
+            for client in clients:
+                await client.stop()
+            await relay.stop()
+
+    @pytest.mark.asyncio
+    async def test_unsubscribed_channel_skipped(self):
+        transport = RelayTransport(channels=["event_stream"])
+        received = []
+        transport.on_event("event_cursor", lambda event: received.append(event))
+
+        transport.handle_frame(encode_frame("event_cursor", "{}"))
+        transport.handle_frame(b"garbage\n")
+
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_slow_client_disconnected(self, socket_path):
+        relay = await start_relay(socket_path)
+        relay.max_client_buffer = 0
+        writer = MagicMock()
+        writer.is_closing.return_value = False
+        writer.transport.get_write_buffer_size.return_value = 1
+        relay._clients.add(writer)
+        try:
+            relay._handle_notification(MagicMock(), 1, "event_stream", "{}")
+
+            writer.close.assert_called_once()
+            writer.write.assert_not_called()
+            assert relay.get_metrics().dropped_clients == 1
+            assert relay.get_metrics().clients == 0
+        finally:
+            await relay.stop()
+
+    @pytest.mark.asyncio
+    async def test_client_reconnects_after_relay_restart(self, socket_path):
+        client = RelayTransport(socket_path=socket_path, channels=["event_stream"], reconnect_delay=0.01)
+        received = []
+        client.on_event("event_stream", lambda event: received.append(event.payload))
+        await client.start()
+        try:
+            relay = await start_relay(socket_path)
+            await client.wait_connected(timeout=2)
+            await wait_for(lambda: relay.get_metrics().clients == 1)
+
+            relay._handle_notification(MagicMock(), 1, "event_stream", json.dumps({"n": 1}))
+            await wait_for(lambda: received)
+
+            assert received == [{"n": 1}]
+        finally:
+            await client.stop()
+            await relay.stop()
+
+
+class TestCreateEventTransport:
+    """传输层工厂测试"""
+
+    def test_listen_mode(self):
+        transport = create_event_transport(dsn="postgresql://x", mode="listen")
+        assert isinstance(transport, PgNotifyListener)
+
+    def test_relay_mode(self):
+        transport = create_event_transport(dsn="postgresql://x", mode="relay", socket_path="/tmp/x.sock")
+        assert isinstance(transport, RelayTransport)
+        assert transport.socket_path == "/tmp/x.sock"
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            create_event_transport(dsn="postgresql://x", mode="kafka")